@@ -0,0 +1,393 @@
+"""
+Simulates search strategies offline, such that they can be compared without spending browser hours.
+Outcomes are replayed from an exported results collection or generated synthetically, and evaluations are performed
+by a simulated pool of worker slots with a distribution of evaluation latencies.
+"""
+from __future__ import annotations
+
+import heapq
+import itertools
+import logging
+import math
+import random
+from abc import abstractmethod
+from collections import Counter
+from dataclasses import dataclass
+from typing import Callable, Iterable, Optional
+
+from bson import json_util
+
+from bci.evaluations.logic import SequenceConfiguration
+from bci.evaluations.outcome_checker import OutcomeChecker
+from bci.search_strategy.bgb_search import BiggestGapBisectionSearch
+from bci.search_strategy.bgb_sequence import BiggestGapBisectionSequence
+from bci.search_strategy.composite_search import CompositeSearch
+from bci.search_strategy.multisection_search import MultisectionSearch
+from bci.search_strategy.probabilistic_search import ProbabilisticBisectionSearch
+from bci.search_strategy.sequence_strategy import SequenceFinished
+from bci.version_control.binary_availability import AvailabilityBitmap
+from bci.version_control.states.state import State, StateCondition, StateResult
+
+logger = logging.getLogger(__name__)
+
+STRATEGIES = ('bgb_sequence', 'bgb_search', 'comp_search', 'multisection_search', 'probabilistic_search')
+# Strategies that keep returning states that are deduplicated are considered finished after this many in a row
+MAX_NB_OF_CONSECUTIVE_DUPLICATES = 1000
+
+
+class OutcomeSource:
+    """
+    The outcomes and binary availability of a range of revisions.
+    """
+
+    def __init__(self, availability: AvailabilityBitmap) -> None:
+        self.availability = availability
+
+    @property
+    def first_index(self) -> int:
+        return self.availability.first_index
+
+    @property
+    def last_index(self) -> int:
+        return self.availability.last_index
+
+    @abstractmethod
+    def get_outcome(self, index: int, repetition: int, rng: random.Random) -> Optional[bool]:
+        """
+        Returns the outcome of the given evaluation of the state with the given index, or None if it failed.
+        """
+        pass
+
+    def get_expected_transition(self) -> Optional[tuple[int, int]]:
+        """
+        Returns the indexes of the consecutive available states between which the outcome changes, if it is known.
+        """
+        return None
+
+
+class SyntheticOutcomes(OutcomeSource):
+    """
+    Outcomes of a PoC that reproduces on one side of a single transition, which fails to reproduce with the given
+    probability. Binaries are missing in runs, like builds that were not archived for a while.
+    """
+
+    def __init__(
+        self,
+        first_index: int,
+        last_index: int,
+        transition_index: int,
+        reproduces_before_transition: bool = True,
+        flakiness: float = 0.0,
+        unavailable_fraction: float = 0.0,
+        max_hole_size: int = 200,
+        seed: int = 0,
+    ) -> None:
+        """
+        :param first_index: The first index of the range.
+        :param last_index: The last index of the range.
+        :param transition_index: The first index after the transition.
+        :param reproduces_before_transition: Whether the PoC reproduces before the transition (fixed bugs) or after it
+        (introduced bugs).
+        :param flakiness: The probability that the PoC does not reproduce where it should.
+        :param unavailable_fraction: The fraction of runs of revisions of which binaries are missing.
+        :param max_hole_size: The maximum length of a run of missing binaries.
+        :param seed: The seed of the generated availability.
+        """
+        rng = random.Random(seed)
+        available_runs = []
+        index = first_index
+        while index <= last_index:
+            run_length = rng.randint(1, max_hole_size)
+            if rng.random() >= unavailable_fraction:
+                available_runs.append((index, min(index + run_length, last_index + 1) - 1))
+            index += run_length
+        # The boundaries of the range and the revisions around the transition are always available
+        available_runs.extend(
+            (index, index) for index in (first_index, last_index, transition_index - 1, transition_index)
+        )
+        super().__init__(AvailabilityBitmap.from_runs(first_index, last_index, available_runs))
+        self.transition_index = transition_index
+        self.reproduces_before_transition = reproduces_before_transition
+        self.flakiness = flakiness
+
+    def get_outcome(self, index: int, repetition: int, rng: random.Random) -> Optional[bool]:
+        should_reproduce = (index < self.transition_index) == self.reproduces_before_transition
+        return should_reproduce and rng.random() >= self.flakiness
+
+    def get_expected_transition(self) -> Optional[tuple[int, int]]:
+        return self.transition_index - 1, self.transition_index
+
+
+class RecordedOutcomes(OutcomeSource):
+    """
+    Outcomes of stored evaluations, of which only the recorded revisions are considered available.
+    Repeated evaluations cycle through the recorded outcomes of a revision.
+    """
+
+    def __init__(self, outcomes_per_index: dict[int, list[Optional[bool]]]) -> None:
+        if not outcomes_per_index:
+            raise AttributeError('No outcomes were recorded')
+        super().__init__(
+            AvailabilityBitmap.from_indexes(min(outcomes_per_index), max(outcomes_per_index), outcomes_per_index)
+        )
+        self.outcomes_per_index = outcomes_per_index
+
+    @staticmethod
+    def from_documents(documents: Iterable[dict], outcome_checker: OutcomeChecker) -> RecordedOutcomes:
+        """
+        Derives the outcomes from result documents of a single experiment, as they are stored in the database.
+        """
+        outcomes_per_index: dict[int, list[Optional[bool]]] = {}
+        for document in sorted(documents, key=lambda document: document.get('repetition', 0)):
+            result = StateResult.from_dict(document['results'], is_dirty=document.get('dirty', False))
+            revision_nb = document['state']['revision_number']
+            outcomes_per_index.setdefault(revision_nb, []).append(outcome_checker.get_outcome(result))
+        return RecordedOutcomes(outcomes_per_index)
+
+    @staticmethod
+    def load(path: str, mech_group: str, target_mech_id: Optional[str] = None) -> RecordedOutcomes:
+        """
+        Loads the outcomes of the given experiment from an exported results collection, which is either a JSON array
+        or a document per line (as exported by mongoexport).
+
+        :param path: The exported collection.
+        :param mech_group: The experiment of which the outcomes are replayed.
+        :param target_mech_id: The reproduction ID, which is the experiment by default.
+        """
+        with open(path) as file:
+            content = file.read().strip()
+        if content.startswith('['):
+            documents = json_util.loads(content)
+        else:
+            documents = [json_util.loads(line) for line in content.splitlines() if line.strip()]
+        documents = [
+            document
+            for document in documents
+            if document.get('mech_group') == mech_group and document.get('state', {}).get('type') == 'revision'
+        ]
+        outcome_checker = OutcomeChecker(SequenceConfiguration(target_mech_id=target_mech_id or mech_group))
+        return RecordedOutcomes.from_documents(documents, outcome_checker)
+
+    def get_outcome(self, index: int, repetition: int, rng: random.Random) -> Optional[bool]:
+        outcomes = self.outcomes_per_index[index]
+        return outcomes[repetition % len(outcomes)]
+
+
+class SimulatedState(State):
+    def __init__(self, index: int, availability: AvailabilityBitmap) -> None:
+        super().__init__()
+        self.__index = index
+        self.__availability = availability
+
+    @property
+    def name(self) -> str:
+        return f'{self.__index}'
+
+    @property
+    def browser_name(self) -> str:
+        return 'simulated'
+
+    @property
+    def type(self) -> str:
+        return 'revision'
+
+    @property
+    def index(self) -> int:
+        return self.__index
+
+    @property
+    def revision_nb(self) -> int:
+        return self.__index
+
+    def to_dict(self) -> dict:
+        return {'type': self.type, 'browser_name': self.browser_name, 'revision_number': self.__index}
+
+    def has_online_binary(self) -> bool:
+        return self.__availability.is_available(self.__index)
+
+    def get_online_binary_url(self) -> str:
+        raise NotImplementedError('Simulated states do not have binaries')
+
+
+class SimulatedStateFactory:
+    """
+    Provides the search strategies with simulated states and the results of the simulated evaluations, in place of
+    `StateFactory`.
+    """
+
+    def __init__(self, source: OutcomeSource) -> None:
+        self.__availability = source.availability
+        self.__results: list[State] = []
+        self.boundary_states = (self.create_state(source.first_index), self.create_state(source.last_index))
+
+    def create_state(self, index: int) -> State:
+        return SimulatedState(index, self.__availability)
+
+    def get_availability(self, first_index: int, last_index: int) -> Optional[AvailabilityBitmap]:
+        return self.__availability
+
+    def create_evaluated_states(self) -> list[State]:
+        return list(self.__results)
+
+    def create_new_evaluated_states(self, inserted_after: Optional[int]) -> tuple[list[State], Optional[int]]:
+        # The high-water mark is simply the number of results that were fetched
+        return self.__results[inserted_after or 0 :], len(self.__results)
+
+    def add_result(self, state: State, outcome: Optional[bool]) -> None:
+        evaluated_state = self.create_state(state.index)
+        evaluated_state.repetition = state.repetition
+        evaluated_state.outcome = outcome
+        evaluated_state.condition = StateCondition.FAILED if outcome is None else StateCondition.COMPLETED
+        self.__results.append(evaluated_state)
+
+
+@dataclass(frozen=True)
+class SimulationReport:
+    strategy: str
+    nb_of_evaluations: int
+    nb_of_binaries: int
+    wall_clock: float
+    """Simulated seconds until the strategy finished."""
+    slot_utilisation: float
+    """Fraction of the slot time in which slots were evaluating."""
+    transitions: list[tuple[int, int]]
+    """The transitions that were found, see `get_transitions`."""
+    nb_of_evaluations_to_pinpoint: Optional[int] = None
+    """Number of evaluations until both states around the expected transition were evaluated, if it is known."""
+    time_to_pinpoint: Optional[float] = None
+
+    def is_correct(self, expected_transition: tuple[int, int]) -> bool:
+        return self.transitions == [expected_transition]
+
+
+def lognormal_latency(median: float, sigma: float = 0.5) -> Callable[[random.Random], float]:
+    """
+    Returns a latency distribution of which the logarithm is normally distributed, like most evaluation durations.
+    """
+    return lambda rng: rng.lognormvariate(math.log(median), sigma)
+
+
+def create_strategy(name: str, state_factory: SimulatedStateFactory, nb_of_slots: int, sequence_limit: int):
+    """
+    Creates the given strategy like `Master.create_sequence_strategy`.
+    Outcome-independent sequences are consulted directly instead of through a compiled plan.
+    """
+    if name == 'bgb_sequence':
+        return BiggestGapBisectionSequence(state_factory, sequence_limit)
+    elif name == 'bgb_search':
+        return BiggestGapBisectionSearch(state_factory)
+    elif name == 'comp_search':
+        return CompositeSearch(state_factory, sequence_limit)
+    elif name == 'multisection_search':
+        return MultisectionSearch(state_factory, nb_of_slots)
+    elif name == 'probabilistic_search':
+        return ProbabilisticBisectionSearch(state_factory, nb_of_slots)
+    else:
+        raise AttributeError(f"Unknown search strategy option '{name}'")
+
+
+def simulate(
+    strategy_name: str,
+    source: OutcomeSource,
+    nb_of_slots: int,
+    latency: Callable[[random.Random], float],
+    sequence_limit: int = 50,
+    seed: int = 0,
+) -> SimulationReport:
+    """
+    Drives the given strategy through a pool of simulated worker slots until it finishes.
+    Like the master, free slots are filled with the states the strategy returns, and states that were already evaluated
+    or that are being evaluated are skipped without occupying a slot. A strategy that has no state to return while
+    evaluations are running is consulted again once one of them finishes.
+
+    :param strategy_name: The strategy to simulate, see `STRATEGIES`.
+    :param source: The outcomes and binary availability.
+    :param nb_of_slots: The number of evaluations that run concurrently.
+    :param latency: The distribution of the duration of an evaluation.
+    :param sequence_limit: The sequence limit of the strategies that have one.
+    :param seed: The seed of the outcomes and latencies.
+    """
+    rng = random.Random(seed)
+    state_factory = SimulatedStateFactory(source)
+    strategy = create_strategy(strategy_name, state_factory, nb_of_slots, sequence_limit)
+    expected_transition = source.get_expected_transition()
+
+    clock, busy_time = 0.0, 0.0
+    counter = itertools.count()
+    running: list[tuple[float, int, State]] = []
+    running_keys: set[tuple[int, int]] = set()
+    evaluated_keys: set[tuple[int, int]] = set()
+    evaluated_indexes: set[int] = set()
+    nb_of_evaluations_to_pinpoint, time_to_pinpoint = None, None
+    is_finished = False
+    while not is_finished:
+        nb_of_consecutive_duplicates = 0
+        while len(running) < nb_of_slots:
+            try:
+                state = strategy.next()
+            except SequenceFinished:
+                is_finished = not running
+                break
+            key = (state.index, state.repetition)
+            if key in evaluated_keys or key in running_keys:
+                nb_of_consecutive_duplicates += 1
+                if nb_of_consecutive_duplicates >= MAX_NB_OF_CONSECUTIVE_DUPLICATES:
+                    logger.warning(f"Strategy '{strategy_name}' keeps returning evaluated states")
+                    is_finished = not running
+                    break
+                continue
+            nb_of_consecutive_duplicates = 0
+            duration = latency(rng)
+            busy_time += duration
+            heapq.heappush(running, (clock + duration, next(counter), state))
+            running_keys.add(key)
+        if not running:
+            break
+
+        clock, _, state = heapq.heappop(running)
+        key = (state.index, state.repetition)
+        running_keys.discard(key)
+        evaluated_keys.add(key)
+        evaluated_indexes.add(state.index)
+        state_factory.add_result(state, source.get_outcome(state.index, state.repetition, rng))
+        if (
+            nb_of_evaluations_to_pinpoint is None
+            and expected_transition is not None
+            and all(index in evaluated_indexes for index in expected_transition)
+        ):
+            nb_of_evaluations_to_pinpoint, time_to_pinpoint = len(evaluated_keys), clock
+
+    return SimulationReport(
+        strategy_name,
+        len(evaluated_keys),
+        len(evaluated_indexes),
+        clock,
+        busy_time / (nb_of_slots * clock) if clock else 0.0,
+        get_transitions(strategy, state_factory.create_evaluated_states()),
+        nb_of_evaluations_to_pinpoint,
+        time_to_pinpoint,
+    )
+
+
+def get_transitions(strategy, evaluated_states: list[State]) -> list[tuple[int, int]]:
+    """
+    Returns the transition the strategy reports if it does, or else the pairs of consecutive evaluated indexes of which
+    the majority outcome differs, ignoring failed evaluations and ties.
+    """
+    if isinstance(strategy, ProbabilisticBisectionSearch):
+        transition = strategy.get_transition()
+        return [transition[:2]] if transition else []
+    outcomes_per_index: dict[int, Counter] = {}
+    for state in evaluated_states:
+        if state.outcome is not None:
+            outcomes_per_index.setdefault(state.index, Counter())[state.outcome] += 1
+    majority_outcomes = []
+    for index in sorted(outcomes_per_index):
+        counts = outcomes_per_index[index]
+        if counts[True] != counts[False]:
+            majority_outcomes.append((index, counts[True] > counts[False]))
+    return [
+        (first_index, last_index)
+        for (first_index, first_outcome), (last_index, last_outcome) in zip(majority_outcomes, majority_outcomes[1:])
+        if first_outcome != last_outcome
+    ]
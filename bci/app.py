@@ -11,7 +11,7 @@ def create_app():
     bci_api.initialize()
 
     # Blueprint modules are only imported after loggers are configured
-    from bci.web.blueprints.api import api
+    from bci.web.blueprints.api import api, resume_interrupted_jobs
     from bci.web.blueprints.experiments import exp
 
     app = Flask(__name__)
@@ -26,6 +26,8 @@ def create_app():
     signal.signal(signal.SIGTERM, bci_api.sigint_handler)
     signal.signal(signal.SIGINT, bci_api.sigint_handler)
 
+    resume_interrupted_jobs()
+
     return app
 
 
@@ -1,24 +1,36 @@
 import logging
+import os
 import signal
 import subprocess
+import threading
 import time
 
+from bci.configuration import Global
+
 logger = logging.getLogger(__name__)
 
 
 class TerminalAutomation:
+    # Process groups of the browsers that are running, so they can be stopped when the worker itself is stopped
+    __browser_process_groups: set[int] = set()
+    __lock = threading.Lock()
 
     @staticmethod
     def run(url: str, args: list[str], seconds_per_visit: int):
         logger.debug("Starting browser process...")
         args.append(url)
         logger.debug(f'Command string: \'{" ".join(args)}\'')
-        with open('/tmp/browser.log', 'a') as file:
+        with open(Global.get_browser_log_path(), 'a') as file:
+            # The browser leads its own process group, such that signals reach its child processes but not the
+            # browsers of other workers on the same host
             proc = subprocess.Popen(
                 args,
                 stdout=file,
-                stderr=file
+                stderr=file,
+                start_new_session=True
             )
+        with TerminalAutomation.__lock:
+            TerminalAutomation.__browser_process_groups.add(proc.pid)
 
         time.sleep(seconds_per_visit)
 
@@ -30,8 +42,34 @@ class TerminalAutomation:
         try:
             stdout, stderr = proc.communicate(timeout=5)
         except subprocess.TimeoutExpired:
-            logger.info("Browser process did not terminate after 5s. Killing process through pkill...")
-            subprocess.run(['pkill', '-2', args[0].split('/')[-1]])
+            logger.info("Browser process did not terminate after 5s. Interrupting its process group...")
+            TerminalAutomation.__signal_process_group(proc.pid, signal.SIGINT)
 
-        proc.wait()
+        try:
+            proc.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            logger.warning('Browser process did not terminate after interrupting its process group. Killing it...')
+            TerminalAutomation.__signal_process_group(proc.pid, signal.SIGKILL)
+            proc.wait()
+        with TerminalAutomation.__lock:
+            TerminalAutomation.__browser_process_groups.discard(proc.pid)
         logger.debug("Browser process terminated.")
+
+    @staticmethod
+    def kill_running_browsers():
+        """
+        Kills the process groups of all browsers that are still running, e.g., when the worker is stopped.
+        """
+        with TerminalAutomation.__lock:
+            process_groups = list(TerminalAutomation.__browser_process_groups)
+            TerminalAutomation.__browser_process_groups.clear()
+        for process_group in process_groups:
+            TerminalAutomation.__signal_process_group(process_group, signal.SIGKILL)
+
+    @staticmethod
+    def __signal_process_group(process_group: int, sig: signal.Signals):
+        try:
+            os.killpg(process_group, sig)
+        except ProcessLookupError:
+            # All processes of the group already exited
+            pass
@@ -5,8 +5,9 @@ import os
 from abc import abstractmethod
 from typing import Optional
 
-from bci import util
+from bci import garbage_collector
 from bci.browser.binary.artisanal_manager import ArtisanalBuildManager
+from bci.configuration import Global
 from bci.database.mongo.binary_cache import BinaryCache
 from bci.version_control.states.state import State
 
@@ -56,6 +57,9 @@ class Binary:
     def list_downloaded_binaries(bin_folder_path: str) -> list[dict[str, str]]:
         binaries = []
         for subfolder_path in os.listdir(os.path.join(bin_folder_path, 'downloaded')):
+            # Skips the trash folder of the garbage collector
+            if subfolder_path.startswith('.'):
+                continue
             bin_entry = {}
             bin_entry['id'] = subfolder_path
             binaries.append(bin_entry)
@@ -125,7 +129,7 @@ class Binary:
         """
         if artisanal:
             return os.path.join(self.bin_folder_path, 'artisanal', self.state.name, self.executable_name)
-        return os.path.join(self.bin_folder_path, 'downloaded', self.state.name, self.executable_name)
+        return os.path.join(self.get_potential_bin_folder_path(), self.executable_name)
 
     def get_bin_folder_path(self):
         path_downloaded = self.get_potential_bin_folder_path()
@@ -139,12 +143,14 @@ class Binary:
     def get_potential_bin_folder_path(self, artisanal=False):
         if artisanal:
             return os.path.join(self.bin_folder_path, 'artisanal', self.state.name)
-        return os.path.join(self.bin_folder_path, 'downloaded', self.state.name)
+        return os.path.join(
+            self.bin_folder_path, 'downloaded', Global.get_downloaded_binary_subfolder(), self.state.name
+        )
 
     def remove_bin_folder(self):
         path = self.get_bin_folder_path()
         if path and 'artisanal' not in path:
-            if not util.rmtree(path):
+            if not garbage_collector.dispose(path):
                 logger.error("Could not remove folder '%s'" % path)
 
     @abstractmethod
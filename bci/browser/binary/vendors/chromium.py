@@ -9,6 +9,7 @@ import requests
 from bci import cli, util
 from bci.browser.binary.artisanal_manager import ArtisanalBuildManager
 from bci.browser.binary.binary import Binary
+from bci.configuration import Global
 from bci.version_control.states.state import State
 
 logger = logging.getLogger(__name__)
@@ -56,7 +57,8 @@ class ChromiumBinary(Binary):
             return
         binary_url = self.state.get_online_binary_url()
         logger.info(f'Downloading binary for {self.state} from \'{binary_url}\'')
-        zip_file_path = f'/tmp/{self.state.name}/archive.zip'
+        # Worker processes that share a machine each download into their own temporary folder
+        zip_file_path = os.path.join(Global.get_worker_tmp_folder(), 'downloads', self.state.name, 'archive.zip')
         if os.path.exists(os.path.dirname(zip_file_path)):
             shutil.rmtree(os.path.dirname(zip_file_path))
         os.makedirs(os.path.dirname(zip_file_path))
@@ -70,7 +72,7 @@ class ChromiumBinary(Binary):
         unzipped_folder_path = os.path.join(os.path.dirname(zip_file_path), "chrome-linux")
         util.safe_move_dir(unzipped_folder_path, os.path.dirname(bin_path))
         cli.execute_and_return_status("chmod -R a+x %s" % os.path.dirname(bin_path))
-        # Remove temporary files in /tmp/COMMIT_POS
+        # Remove the temporary files of the download
         shutil.rmtree(os.path.dirname(zip_file_path))
 
     def _get_version(self) -> str:
@@ -9,6 +9,7 @@ import requests
 from bci import cli, util
 from bci.browser.binary.artisanal_manager import ArtisanalBuildManager
 from bci.browser.binary.binary import Binary
+from bci.configuration import Global
 from bci.version_control.states.state import State
 
 logger = logging.getLogger('bci')
@@ -44,7 +45,8 @@ class FirefoxBinary(Binary):
             return
         binary_url = self.state.get_online_binary_url()
         logger.debug(f'Downloading binary for {self.state} from \'{binary_url}\'')
-        tar_file_path = f'/tmp/{self.state.name}/archive.tar.bz2'
+        # Worker processes that share a machine each download into their own temporary folder
+        tar_file_path = os.path.join(Global.get_worker_tmp_folder(), 'downloads', self.state.name, 'archive.tar.bz2')
         if os.path.exists(os.path.dirname(tar_file_path)):
             shutil.rmtree(os.path.dirname(tar_file_path))
         os.makedirs(os.path.dirname(tar_file_path))
@@ -59,7 +61,7 @@ class FirefoxBinary(Binary):
         util.safe_move_dir(unzipped_folder_path, os.path.dirname(bin_path))
         cli.execute_and_return_status("chmod -R a+x %s" % os.path.dirname(bin_path))
         cli.execute_and_return_status("chmod -R a+w %s" % os.path.dirname(bin_path))
-        # Remove temporary files in /tmp/COMMIT_POS
+        # Remove the temporary files of the download
         shutil.rmtree(os.path.dirname(tar_file_path))
         # Add policy.json to prevent updating. (this measure is effective from version 60)
         # https://github.com/mozilla/policy-templates/blob/master/README.md
@@ -2,17 +2,17 @@ from __future__ import annotations
 
 import os
 from abc import abstractmethod
+from typing import Optional
 
 import bci.browser.binary.factory as binary_factory
-from bci import util
+from bci import garbage_collector, util
 from bci.browser.automation.terminal import TerminalAutomation
 from bci.browser.binary.binary import Binary
 from bci.browser.configuration.profile import remove_profile_execution_folder
+from bci.configuration import Global
 from bci.evaluations.logic import BrowserConfiguration, EvaluationConfiguration
 from bci.version_control.states.state import State
 
-EXECUTION_PARENT_FOLDER = '/tmp'
-
 
 class Browser:
 
@@ -40,18 +40,27 @@ class Browser:
 
     def pre_evaluation_setup(self):
         self.__fetch_binary()
+        self.__prepare_execution_folder()
 
     def post_evaluation_cleanup(self):
+        self.__remove_execution_folder()
         self.__remove_binary()
 
     def pre_test_setup(self):
-        self.__prepare_execution_folder()
         self._prepare_profile_folder()
 
     def post_test_cleanup(self):
-        self.__remove_execution_folder()
         self.__remove_profile_folder()
 
+    def has_prepared_profile(self) -> bool:
+        return self._profile_path is not None
+
+    def with_configuration(self, browser_config: BrowserConfiguration) -> Browser:
+        """
+        Returns a browser that uses the same (prepared) binary, but is configured differently.
+        """
+        return Browser.get_browser(browser_config, self.eval_config, self.state, binary=self.binary)
+
     def __fetch_binary(self):
         self.binary.fetch_binary()
 
@@ -67,14 +76,14 @@ class Browser:
         pass
 
     def __remove_execution_folder(self):
-        util.rmtree(self.__get_execution_folder_path())
+        garbage_collector.dispose(self.__get_execution_folder_path())
 
     def __remove_profile_folder(self):
         remove_profile_execution_folder(self._profile_path)
         self._profile_path = None
 
     def __get_execution_folder_path(self) -> str:
-        return os.path.join(EXECUTION_PARENT_FOLDER, str(self.state.name))
+        return os.path.join(Global.get_worker_tmp_folder(), str(self.state.name))
 
     def _get_executable_file_path(self) -> str:
         return os.path.join(self.__get_execution_folder_path(), self.binary.executable_name)
@@ -84,11 +93,17 @@ class Browser:
         pass
 
     @staticmethod
-    def get_browser(browser_config: BrowserConfiguration, eval_config: EvaluationConfiguration, state: State) -> Browser:
+    def get_browser(
+        browser_config: BrowserConfiguration,
+        eval_config: EvaluationConfiguration,
+        state: State,
+        binary: Optional[Binary] = None,
+    ) -> Browser:
         from bci.browser.configuration.chromium import Chromium
         from bci.browser.configuration.firefox import Firefox
 
-        binary = binary_factory.get_binary(state)
+        if binary is None:
+            binary = binary_factory.get_binary(state)
 
         if browser_config.browser_name == 'chromium':
             return Chromium(browser_config, eval_config, binary)
@@ -1,14 +1,14 @@
 import os
 
-from bci import cli
+from bci import cli, garbage_collector
+from bci.configuration import Global
 
 PROFILE_STORAGE_FOLDER = '/app/browser/profiles'
-PROFILE_EXECUTION_FOLDER = '/tmp/profiles'
 
 
 def prepare_chromium_profile(profile_name: str = None) -> str:
     # Create new execution profile folder
-    profile_execution_path = os.path.join(PROFILE_EXECUTION_FOLDER, 'new_profile')
+    profile_execution_path = os.path.join(get_profile_execution_folder(), 'new_profile')
     profile_execution_path = __create_folder(profile_execution_path)
 
     # Copy profile from storage to execution folder if profile_name is given
@@ -22,7 +22,7 @@ def prepare_chromium_profile(profile_name: str = None) -> str:
 
 def prepare_firefox_profile(profile_name: str = None) -> str:
     # Create new execution profile folder
-    profile_execution_path = os.path.join(PROFILE_EXECUTION_FOLDER, 'new_profile')
+    profile_execution_path = os.path.join(get_profile_execution_folder(), 'new_profile')
     profile_execution_path = __create_folder(profile_execution_path)
 
     # Copy profile from storage to execution folder if profile_name is given
@@ -34,9 +34,13 @@ def prepare_firefox_profile(profile_name: str = None) -> str:
     return profile_execution_path
 
 
+def get_profile_execution_folder() -> str:
+    return os.path.join(Global.get_worker_tmp_folder(), 'profiles')
+
+
 def remove_profile_execution_folder(profile_path: str):
-    assert profile_path.startswith(PROFILE_EXECUTION_FOLDER)
-    cli.execute(f'rm -rf {profile_path}')
+    assert profile_path.startswith(get_profile_execution_folder())
+    garbage_collector.dispose(profile_path)
 
 
 def __create_folder(folder_path: str) -> str:
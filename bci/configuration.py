@@ -2,6 +2,7 @@ import logging
 import logging.handlers
 import os
 import sys
+from typing import Optional
 
 import bci.database.mongo.container as container
 from bci.evaluations.logic import DatabaseParameters
@@ -95,6 +96,155 @@ class Global:
             raise ValueError('BUGHOG_VERSION is not set')
         return bughog_version
 
+    @staticmethod
+    def get_worker_mode() -> str:
+        """
+        Returns how evaluations are distributed over worker containers:
+        - 'container': a fresh worker container is started for every evaluation (default).
+        - 'pool': long-lived worker containers pull evaluations from a job queue and are recycled after a number of jobs.
+        - 'process': evaluations are performed by worker processes of the core itself, which does not require Docker.
+        """
+        worker_mode = os.getenv('BCI_WORKER_MODE', 'container')
+        if worker_mode not in ['container', 'pool', 'process']:
+            raise ValueError(f"Invalid worker mode '{worker_mode}'")
+        return worker_mode
+
+    @staticmethod
+    def get_worker_recycle_limit() -> int:
+        """
+        Returns the number of evaluations a pooled worker performs before it is replaced by a fresh one.
+        """
+        return int(os.getenv('BCI_WORKER_RECYCLE_AFTER', 50))
+
+    @staticmethod
+    def get_pipeline_look_ahead() -> int:
+        """
+        Returns the number of upcoming evaluations of which a pooled worker prepares the binary while it is busy.
+        """
+        return int(os.getenv('BCI_PIPELINE_LOOK_AHEAD') or 1)
+
+    @staticmethod
+    def get_max_nb_of_retries() -> int:
+        """
+        Returns how many times a state is evaluated again after its binary could not be fetched, the browser crashed or
+        the sanity check failed, after which it is excluded from future runs.
+        """
+        return int(os.getenv('BCI_MAX_RETRIES') or 2)
+
+    @staticmethod
+    def get_retry_backoff() -> float:
+        """
+        Returns the number of seconds before the first retry of a failed evaluation, which doubles for every retry.
+        """
+        return float(os.getenv('BCI_RETRY_BACKOFF') or 30)
+
+    @staticmethod
+    def get_cpu_pinning() -> Optional[str]:
+        """
+        Returns how local worker containers are pinned to cores, or None if they can use all cores:
+        - 'cores': each worker slot is pinned to a fixed set of cores.
+        - 'numa': each worker slot is pinned to a fixed set of cores and the memory of their NUMA node.
+        """
+        cpu_pinning = os.getenv('BCI_CPU_PINNING', '')
+        if not cpu_pinning:
+            return None
+        if cpu_pinning not in ['cores', 'numa']:
+            raise ValueError(f"Invalid CPU pinning '{cpu_pinning}'")
+        return cpu_pinning
+
+    @staticmethod
+    def get_disk_high_water_mark() -> float:
+        """
+        Returns the fraction of the disk above which removed folders are deleted right away instead of in the background.
+        """
+        high_water_mark = float(os.getenv('BCI_DISK_HIGH_WATER_MARK') or 0.9)
+        if not 0 < high_water_mark <= 1:
+            raise ValueError(f"Invalid disk high-water mark '{high_water_mark}'")
+        return high_water_mark
+
+    @staticmethod
+    def get_availability_index_folder() -> str:
+        """
+        Returns the folder in which the binary availability of revisions is persisted per browser.
+        """
+        return os.getenv('BCI_AVAILABILITY_INDEX_FOLDER') or '/app/browser/availability'
+
+    @staticmethod
+    def get_worker_tmp_folder() -> str:
+        """
+        Returns the folder that holds the browser log, execution folders and profiles of this worker.
+        Worker processes that share a machine are each given their own folder.
+        """
+        return os.getenv('BCI_WORKER_TMP_FOLDER', '/tmp')
+
+    @staticmethod
+    def get_downloaded_binary_subfolder() -> str:
+        """
+        Returns the subfolder of the downloaded binaries into which this worker fetches binaries.
+        Worker processes that share a machine are each given their own subfolder, such that one never removes a binary
+        that another is still using.
+        """
+        return os.getenv('BCI_DOWNLOADED_BINARY_SUBFOLDER', '')
+
+    @staticmethod
+    def get_browser_log_path() -> str:
+        return os.path.join(Global.get_worker_tmp_folder(), 'browser.log')
+
+    @staticmethod
+    def get_collector_port() -> int:
+        """
+        Returns the port of the request collector of this worker, to which nginx reports the requests of the browser.
+        Worker processes that share a machine are each given their own port.
+        """
+        return int(os.getenv('BCI_COLLECTOR_PORT', 5001))
+
+    @staticmethod
+    def get_remote_nodes() -> list[str]:
+        """
+        Returns the URLs of the node agents on other machines that can perform evaluations, configured as a
+        comma-separated list in BCI_REMOTE_NODES.
+        """
+        remote_nodes = os.getenv('BCI_REMOTE_NODES', '')
+        return [url.strip() for url in remote_nodes.split(',') if url.strip()]
+
+    @staticmethod
+    def get_node_agent_token() -> Optional[str]:
+        """
+        Returns the secret that the core and the node agents share to authenticate evaluation requests, configured in
+        BCI_NODE_AGENT_TOKEN.
+        """
+        return os.getenv('BCI_NODE_AGENT_TOKEN') or None
+
+    @staticmethod
+    def get_target_utilization() -> Optional[float]:
+        """
+        Returns the fraction of CPU and memory the local worker slots should use, or None if the number of concurrent
+        evaluations should not be adapted to the load of the host.
+        """
+        target_utilization = os.getenv('BCI_TARGET_UTILIZATION', '')
+        if not target_utilization:
+            return None
+        target_utilization = float(target_utilization)
+        if not 0 < target_utilization <= 1:
+            raise ValueError(f"Invalid target utilization '{target_utilization}'")
+        return target_utilization
+
+    @staticmethod
+    def get_max_nb_of_workers() -> int:
+        """
+        Returns the number of local worker slots up to which the number of concurrent evaluations can grow when the
+        host has resources left. Zero means it never grows beyond the number of containers chosen for the experiments.
+        """
+        return int(os.getenv('BCI_MAX_WORKERS', 0))
+
+    @staticmethod
+    def get_nb_of_interactive_slots() -> int:
+        """
+        Returns the number of worker slots that only evaluations of a higher priority class than 'batch' can occupy.
+        At least one slot is always left to batch evaluations.
+        """
+        return int(os.getenv('BCI_INTERACTIVE_SLOTS') or 0)
+
 
 class Chromium:
     extension_folder = '/app/browser/extensions/chromium'
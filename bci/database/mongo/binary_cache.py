@@ -44,8 +44,8 @@ class BinaryCache:
             {'$inc': {'access_count': 1}, '$set': {'last_access_ts': datetime.datetime.now()}},
         )
         binary_folder_path = os.path.dirname(binary_executable_path)
-        if not os.path.exists(binary_folder_path):
-            os.mkdir(binary_folder_path)
+        # The parent folder is the subfolder of this worker, which might not exist yet
+        os.makedirs(binary_folder_path, exist_ok=True)
 
         def write_from_db(file_path: str, grid_file_id: str) -> None:
             grid_file = fs.get(grid_file_id)
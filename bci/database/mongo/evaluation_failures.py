@@ -0,0 +1,96 @@
+import logging
+import os
+from datetime import datetime, timezone
+
+from bci.database.mongo.mongodb import MongoDB
+from bci.evaluations.logic import FAILURE_CLASSES, EvaluationParameters, TestParameters, WorkerParameters
+
+logger = logging.getLogger(__name__)
+
+
+class EvaluationFailures:
+    """
+    Records why tests failed, such that the core can retry them, and the states that keep failing, such that future
+    runs skip them.
+    """
+
+    @staticmethod
+    def record(params: TestParameters, failure_class: str) -> None:
+        """
+        Records that the given test failed, which is called by the worker that performed it.
+
+        :param params: The parameters of the failed test.
+        :param failure_class: One of `FAILURE_CLASSES`.
+        """
+        if failure_class not in FAILURE_CLASSES:
+            raise AttributeError(f"Unknown failure class '{failure_class}'")
+        try:
+            EvaluationFailures.__get_failure_collection().insert_one(
+                {
+                    'state': params.state.to_dict(),
+                    'mech_group': params.mech_group,
+                    'failure_class': failure_class,
+                    'worker': os.getenv('HOSTNAME', 'bh_worker'),
+                    'ts': datetime.now(timezone.utc),
+                }
+            )
+        except Exception:
+            # The failure is still reflected by the (missing or dirty) result
+            logger.error(f"Could not record failure '{failure_class}' of '{params}'", exc_info=True)
+
+    @staticmethod
+    def pop_failures(params: WorkerParameters) -> dict[str, str]:
+        """
+        Returns and removes the recorded failures of the tests of the given evaluation.
+
+        :return: The failure class per failed experiment, the most recent one if an experiment failed multiple times.
+        """
+        collection = EvaluationFailures.__get_failure_collection()
+        mech_groups = [test_params.mech_group for test_params in params.create_test_params_list()]
+        query = {'state': params.state.to_dict(), 'mech_group': {'$in': mech_groups}}
+        failures = list(collection.find(query).sort('ts', 1))
+        if failures:
+            collection.delete_many({'_id': {'$in': [failure['_id'] for failure in failures]}})
+        return {failure['mech_group']: failure['failure_class'] for failure in failures}
+
+    @staticmethod
+    def exclude(params: TestParameters, failure_class: str, nb_of_attempts: int) -> None:
+        """
+        Excludes the state of the given test from future runs of the same experiment.
+        States of which the binary could not be fetched are excluded for all experiments.
+        """
+        state = params.state
+        mech_group = None if failure_class == 'binary_fetch' else params.mech_group
+        EvaluationFailures.__get_excluded_collection().update_one(
+            {'browser_name': state.browser_name, 'type': state.type, 'index': state.index, 'mech_group': mech_group},
+            {
+                '$set': {
+                    'state': state.to_dict(),
+                    'failure_class': failure_class,
+                    'nb_of_attempts': nb_of_attempts,
+                    'ts': datetime.now(timezone.utc),
+                }
+            },
+            upsert=True,
+        )
+
+    @staticmethod
+    def get_excluded_indexes(eval_params: EvaluationParameters) -> set[int]:
+        """
+        Returns the indexes of the states that are excluded for the given experiment.
+        """
+        query = {
+            'browser_name': eval_params.browser_configuration.browser_name,
+            'type': 'version' if eval_params.evaluation_range.only_release_revisions else 'revision',
+            'mech_group': {'$in': [eval_params.evaluation_range.mech_group, None]},
+        }
+        documents = EvaluationFailures.__get_excluded_collection().find(query, {'_id': False, 'index': True})
+        return {document['index'] for document in documents}
+
+    @staticmethod
+    def __get_failure_collection():
+        return MongoDB().get_collection('evaluation_failures')
+
+    @staticmethod
+    def __get_excluded_collection():
+        return MongoDB().get_collection('excluded_states')
@@ -0,0 +1,74 @@
+from datetime import datetime, timezone
+from typing import Optional
+
+from bson import ObjectId
+
+from bci.database.mongo.mongodb import MongoDB
+
+
+class EvaluationPlanStore:
+    """
+    Persists the compiled evaluation plan of each experiment of a run, which is used to report its progress.
+    """
+
+    @staticmethod
+    def start_plan(run_id: ObjectId, experiment_name: str) -> None:
+        """
+        Starts a new, empty plan for the given experiment, replacing the plan of an earlier attempt of the run.
+        """
+        EvaluationPlanStore.__get_collection().replace_one(
+            {'run_id': run_id, 'experiment_name': experiment_name},
+            {
+                'run_id': run_id,
+                'experiment_name': experiment_name,
+                'states': [],
+                'nb_of_dispatched_states': 0,
+                'is_compiled': False,
+                'is_failed': False,
+                'started_ts': datetime.now(timezone.utc),
+            },
+            upsert=True,
+        )
+
+    @staticmethod
+    def add_states(run_id: ObjectId, experiment_name: str, state_names: list[str], is_compiled: bool = False) -> None:
+        """
+        Appends the given states to the plan of the given experiment.
+
+        :param is_compiled: Whether these are the last states of the plan.
+        """
+        update = {'$push': {'states': {'$each': state_names}}}
+        if is_compiled:
+            update['$set'] = {'is_compiled': True, 'compiled_ts': datetime.now(timezone.utc)}
+        EvaluationPlanStore.__get_collection().update_one(
+            {'run_id': run_id, 'experiment_name': experiment_name}, update
+        )
+
+    @staticmethod
+    def fail_plan(run_id: ObjectId, experiment_name: str, error: str) -> None:
+        """
+        Marks the plan of the given experiment as failed, its states that were compiled before the failure are kept.
+
+        :param error: The reason why compiling the plan failed.
+        """
+        EvaluationPlanStore.__get_collection().update_one(
+            {'run_id': run_id, 'experiment_name': experiment_name},
+            {'$set': {'is_failed': True, 'error': error, 'failed_ts': datetime.now(timezone.utc)}},
+        )
+
+    @staticmethod
+    def set_nb_of_dispatched_states(run_id: ObjectId, experiment_name: str, nb_of_dispatched_states: int) -> None:
+        EvaluationPlanStore.__get_collection().update_one(
+            {'run_id': run_id, 'experiment_name': experiment_name},
+            {'$set': {'nb_of_dispatched_states': nb_of_dispatched_states}},
+        )
+
+    @staticmethod
+    def get_plan(run_id: ObjectId, experiment_name: str) -> Optional[dict]:
+        return EvaluationPlanStore.__get_collection().find_one(
+            {'run_id': run_id, 'experiment_name': experiment_name}, {'_id': False}
+        )
+
+    @staticmethod
+    def __get_collection():
+        return MongoDB().get_collection('evaluation_plans')
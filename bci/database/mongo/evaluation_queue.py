@@ -0,0 +1,147 @@
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from bson import ObjectId
+from pymongo import ASCENDING
+
+from bci.database.mongo.mongodb import MongoDB
+from bci.evaluations.logic import EvaluationParameters, WorkerParameters
+
+logger = logging.getLogger(__name__)
+
+# Seconds after which the evaluations of a core that stopped sending heartbeats are considered abandoned
+LEASE_DURATION = 60
+
+
+class EvaluationQueue:
+    """
+    Persists a run for each submitted evaluation job and the dispatched jobs that evaluate their states, such that a
+    restarted core can resume where it stopped.
+    Each job is leased by the core that dispatched it, which has to renew the lease through heartbeats.
+    """
+
+    @staticmethod
+    def start_run(job_id: str, eval_params_list: list[EvaluationParameters]) -> ObjectId:
+        """
+        Returns the identifier of the unfinished run of the given job if it has the same parameters, or starts a new
+        run for the job.
+        """
+        collection = EvaluationQueue.__get_run_collection()
+        eval_params = [params.to_dict() for params in eval_params_list]
+        if (run := collection.find_one({'job_id': job_id, 'status': 'running'})) is not None:
+            if run['eval_params'] == eval_params:
+                logger.info(f"Resuming evaluation run '{run['_id']}' of job '{job_id}'")
+                return run['_id']
+            EvaluationQueue.finish_run(run['_id'], 'abandoned')
+        result = collection.insert_one(
+            {
+                'job_id': job_id,
+                'eval_params': eval_params,
+                'status': 'running',
+                'started_ts': datetime.now(timezone.utc),
+            }
+        )
+        return result.inserted_id
+
+    @staticmethod
+    def get_unfinished_runs() -> list[tuple[str, list[EvaluationParameters]]]:
+        """
+        Returns the job identifier and parameters of each run that was interrupted by a core restart, in the order in
+        which they were started.
+        """
+        runs = EvaluationQueue.__get_run_collection().find({'status': 'running'}).sort('started_ts', ASCENDING)
+        return [
+            (run.get('job_id', str(run['_id'])), [EvaluationParameters.from_dict(params) for params in run['eval_params']])
+            for run in runs
+        ]
+
+    @staticmethod
+    def finish_run(run_id: ObjectId, status: str = 'done') -> None:
+        EvaluationQueue.__get_run_collection().update_one(
+            {'_id': run_id}, {'$set': {'status': status, 'finished_ts': datetime.now(timezone.utc)}}
+        )
+        # Jobs that are shared with the runs of other jobs are kept for those runs
+        job_collection = EvaluationQueue.__get_job_collection()
+        job_collection.update_many({'run_ids': run_id}, {'$pull': {'run_ids': run_id}})
+        job_collection.delete_many({'run_ids': []})
+
+    @staticmethod
+    def add_job(run_ids: list[ObjectId], experiment_names: list[str], params: WorkerParameters, owner: str) -> ObjectId:
+        """
+        Adds a job that is waiting for a worker slot.
+
+        :param run_ids: The runs the job belongs to, since the same state can be evaluated for multiple runs at once.
+        :param experiment_names: The experiments that are evaluated by the job.
+        :param params: The parameters of the evaluation.
+        :param owner: The identifier of the core that leases the job.
+        :return: The identifier of the job.
+        """
+        result = EvaluationQueue.__get_job_collection().insert_one(
+            {
+                'run_ids': run_ids,
+                'experiment_names': experiment_names,
+                'params': params.serialize(),
+                'status': 'queued',
+                'owner': owner,
+                'lease_expires_ts': EvaluationQueue.__get_lease_expiration(),
+                'submitted_ts': datetime.now(timezone.utc),
+            }
+        )
+        return result.inserted_id
+
+    @staticmethod
+    def start_job(job_id: ObjectId) -> None:
+        EvaluationQueue.__get_job_collection().update_one(
+            {'_id': job_id}, {'$set': {'status': 'running', 'started_ts': datetime.now(timezone.utc)}}
+        )
+
+    @staticmethod
+    def finish_job(job_id: ObjectId) -> None:
+        EvaluationQueue.__get_job_collection().delete_one({'_id': job_id})
+
+    @staticmethod
+    def renew_leases(owner: str) -> int:
+        """
+        Extends the leases of all jobs of the given core, which serves as its heartbeat.
+
+        :return: The number of renewed leases.
+        """
+        result = EvaluationQueue.__get_job_collection().update_many(
+            {'owner': owner}, {'$set': {'lease_expires_ts': EvaluationQueue.__get_lease_expiration()}}
+        )
+        return result.modified_count
+
+    @staticmethod
+    def get_jobs(run_id: ObjectId) -> list[dict]:
+        """
+        Returns all queued and running jobs of the given run.
+        """
+        return list(EvaluationQueue.__get_job_collection().find({'run_ids': run_id}))
+
+    @staticmethod
+    def take_over_job(job_id: ObjectId, owner: str) -> None:
+        EvaluationQueue.__get_job_collection().update_one(
+            {'_id': job_id}, {'$set': {'owner': owner, 'lease_expires_ts': EvaluationQueue.__get_lease_expiration()}}
+        )
+
+    @staticmethod
+    def pop_expired_job(run_ids: list[ObjectId]) -> Optional[dict]:
+        """
+        Atomically removes and returns a job of one of the given runs of which the lease has expired.
+        """
+        return EvaluationQueue.__get_job_collection().find_one_and_delete(
+            {'run_ids': {'$in': run_ids}, 'lease_expires_ts': {'$lt': datetime.now(timezone.utc)}}
+        )
+
+    @staticmethod
+    def __get_lease_expiration() -> datetime:
+        return datetime.now(timezone.utc) + timedelta(seconds=LEASE_DURATION)
+
+    @staticmethod
+    def __get_run_collection():
+        return MongoDB().get_collection('evaluation_runs')
+
+    @staticmethod
+    def __get_job_collection():
+        return MongoDB().get_collection('evaluation_jobs')
@@ -1,12 +1,13 @@
 from __future__ import annotations
 
 import logging
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 from typing import Optional
 
+from bson import ObjectId
 from flatten_dict import flatten
 from gridfs import GridFS
-from pymongo import ASCENDING, MongoClient
+from pymongo import ASCENDING, MongoClient, UpdateOne
 from pymongo.collection import Collection
 from pymongo.database import Database
 from pymongo.errors import ServerSelectionTimeoutError
@@ -25,6 +26,9 @@ from bci.version_control.states.state import State, StateCondition
 
 logger = logging.getLogger(__name__)
 
+# Seconds before the high-water mark of which results are fetched again, covering clock skew between workers
+RESULT_INSERTION_MARGIN = 60
+
 
 def singleton(class_):
     instances = {}
@@ -89,6 +93,10 @@ class MongoDB:
         for collection_name in ['chromium_binary_availability']:
             if collection_name not in self._db.list_collection_names():
                 self._db.create_collection(collection_name)
+            # Allows fetching the availability of a range of revisions at once
+            self._db[collection_name].create_index(
+                [('state.browser_name', ASCENDING), ('state.revision_number', ASCENDING)]
+            )
 
         # Binary cache
         if 'fs.files' not in self._db.list_collection_names():
@@ -110,6 +118,35 @@ class MongoDB:
             self._db['firefox_binary_availability'].create_index([('revision_number', ASCENDING)])
             self._db['firefox_binary_availability'].create_index(['node'])
 
+        # Job queue of pooled workers
+        if 'worker_jobs' not in self._db.list_collection_names():
+            self._db.create_collection('worker_jobs')
+            self._db['worker_jobs'].create_index(
+                [('pool_id', ASCENDING), ('status', ASCENDING), ('submitted_ts', ASCENDING)]
+            )
+
+        # Durable queue of the evaluations of the submitted jobs
+        if 'evaluation_runs' not in self._db.list_collection_names():
+            self._db.create_collection('evaluation_runs')
+            self._db['evaluation_runs'].create_index([('job_id', ASCENDING), ('status', ASCENDING)])
+            self._db['evaluation_runs'].create_index(['status'])
+        if 'evaluation_jobs' not in self._db.list_collection_names():
+            self._db.create_collection('evaluation_jobs')
+            self._db['evaluation_jobs'].create_index([('run_ids', ASCENDING), ('lease_expires_ts', ASCENDING)])
+        if 'evaluation_plans' not in self._db.list_collection_names():
+            self._db.create_collection('evaluation_plans')
+            self._db['evaluation_plans'].create_index([('run_id', ASCENDING), ('experiment_name', ASCENDING)])
+
+        # Failed tests that are awaiting a retry, and states that failed too often
+        if 'evaluation_failures' not in self._db.list_collection_names():
+            self._db.create_collection('evaluation_failures')
+            self._db['evaluation_failures'].create_index([('state', ASCENDING), ('mech_group', ASCENDING)])
+        if 'excluded_states' not in self._db.list_collection_names():
+            self._db.create_collection('excluded_states')
+            self._db['excluded_states'].create_index(
+                [('browser_name', ASCENDING), ('type', ASCENDING), ('mech_group', ASCENDING)]
+            )
+
     def get_collection(self, name: str, create_if_not_found: bool = False) -> Collection:
         if self._db is None:
             raise ServerException('Database server does not have a database')
@@ -146,6 +183,8 @@ class MongoDB:
         }
         if result.driver_version:
             document['driver_version'] = result.driver_version
+        if result.params.state.repetition:
+            document['repetition'] = result.params.state.repetition
 
         if browser_config.browser_name == 'firefox':
             build_id = self.get_build_id_firefox(result.params.state)
@@ -175,9 +214,57 @@ class MongoDB:
         nb_of_documents = collection.count_documents(query)
         return nb_of_documents > 0
 
+    def remove_dirty_result(self, params: TestParameters) -> int:
+        """
+        Removes the dirty result of the given test, such that it is performed again.
+
+        :return: The number of removed results.
+        """
+        collection = self.__get_data_collection(params)
+        return collection.delete_many({**self.__to_query(params), 'dirty': True}).deleted_count
+
+    def has_results(self, params_list: list[TestParameters]) -> list[bool]:
+        """
+        Checks for each of the given tests whether its result is already stored, using one query per collection.
+
+        :param params_list: The parameters of the tests.
+        :return: Whether a result is stored, in the same order as the given tests.
+        """
+        params_per_collection: dict[str, list[int]] = {}
+        for i, params in enumerate(params_list):
+            params_per_collection.setdefault(params.database_collection, []).append(i)
+
+        has_results = [False] * len(params_list)
+        for collection_name, indexes in params_per_collection.items():
+            collection = self.get_collection(collection_name, create_if_not_found=True)
+            projection = {field: True for field in self.__to_query(params_list[indexes[0]])}
+            query = {'$or': [self.__to_query(params_list[i]) for i in indexes]}
+            documents = list(collection.find(query, projection))
+            for i in indexes:
+                has_results[i] = any(self.__matches(document, params_list[i]) for document in documents)
+        return has_results
+
     def get_evaluated_states(
         self, params: EvaluationParameters, boundary_states: tuple[State, State], outcome_checker: OutcomeChecker
     ) -> list[State]:
+        states, _ = self.get_evaluated_states_since(params, boundary_states, outcome_checker, None)
+        return states
+
+    def get_evaluated_states_since(
+        self,
+        params: EvaluationParameters,
+        boundary_states: tuple[State, State],
+        outcome_checker: OutcomeChecker,
+        inserted_after: Optional[ObjectId],
+    ) -> tuple[list[State], Optional[ObjectId]]:
+        """
+        Returns the evaluated states of which the result was inserted after the given high-water mark, together with the
+        new high-water mark. Only the fields that are needed to determine the outcome are fetched.
+        Results are inserted by workers with their own clocks, so results that were inserted shortly before the
+        high-water mark are fetched again.
+
+        :param inserted_after: The high-water mark returned by the previous call, or None to fetch all states.
+        """
         collection = self.get_collection(params.database_collection)
         query = {
             'browser_config': params.browser_configuration.browser_setting,
@@ -204,10 +291,17 @@ class MongoDB:
             }
         else:
             query['cli_options'] = []
-        cursor = collection.find(query)
+        if inserted_after is not None:
+            margin = timedelta(seconds=RESULT_INSERTION_MARGIN)
+            query['_id'] = {'$gt': ObjectId.from_datetime(inserted_after.generation_time - margin)}
+        projection = {'_id': True, 'state': True, 'repetition': True, 'dirty': True}
+        projection.update({f'results.{field}': True for field in outcome_checker.get_required_result_fields()})
+        cursor = collection.find(query, projection)
         states = []
+        high_water_mark = inserted_after
         for doc in cursor:
             state = State.from_dict(doc['state'])
+            state.repetition = doc.get('repetition', 0)
             state.result = StateResult.from_dict(doc['results'], is_dirty=doc['dirty'])
             state.outcome = outcome_checker.get_outcome(state.result)
             if doc['dirty']:
@@ -215,7 +309,9 @@ class MongoDB:
             else:
                 state.condition = StateCondition.COMPLETED
             states.append(state)
-        return states
+            if high_water_mark is None or doc['_id'] > high_water_mark:
+                high_water_mark = doc['_id']
+        return states, high_water_mark
 
     def __to_query(self, params: TestParameters) -> dict:
         query = {
@@ -223,6 +319,8 @@ class MongoDB:
             'browser_automation': params.evaluation_configuration.automation,
             'browser_config': params.browser_configuration.browser_setting,
             'mech_group': params.mech_group,
+            # Results of the first evaluation of a state are stored without a repetition
+            'repetition': params.state.repetition if params.state.repetition else {'$exists': False},
         }
         if len(params.browser_configuration.extensions) > 0:
             query['extensions'] = {
@@ -240,6 +338,21 @@ class MongoDB:
             query['cli_options'] = []
         return query
 
+    @staticmethod
+    def __matches(document: dict, params: TestParameters) -> bool:
+        """
+        Returns whether the given result document was produced by the given test, equivalent to `__to_query`.
+        """
+        return (
+            document.get('state') == params.state.to_dict()
+            and document.get('browser_automation') == params.evaluation_configuration.automation
+            and document.get('browser_config') == params.browser_configuration.browser_setting
+            and document.get('mech_group') == params.mech_group
+            and document.get('repetition', 0) == params.state.repetition
+            and sorted(document.get('extensions', [])) == sorted(params.browser_configuration.extensions)
+            and sorted(document.get('cli_options', [])) == sorted(params.browser_configuration.cli_options)
+        )
+
     def __get_data_collection(self, test_params: TestParameters) -> Collection:
         collection_name = test_params.database_collection
         return self.get_collection(collection_name, create_if_not_found=True)
@@ -252,11 +365,64 @@ class MongoDB:
 
     def has_binary_available_online(self, browser: str, state: State):
         collection = self.get_binary_availability_collection(browser)
-        document = collection.find_one({'state': state.to_dict()})
+        if state.type == 'revision' and state.revision_nb is not None:
+            # Availability that was stored in bulk is only keyed by revision number
+            query = {
+                'state.type': 'revision',
+                'state.browser_name': state.browser_name,
+                'state.revision_number': state.revision_nb,
+            }
+        else:
+            query = {'state': state.to_dict()}
+        document = collection.find_one(query)
         if document is None:
             return None
         return document['binary_online']
 
+    def get_binary_availability_in_range(
+        self, browser: str, first_revision_nb: int, last_revision_nb: int
+    ) -> dict[int, bool]:
+        """
+        Returns the cached online binary availability of the revisions in the given range (inclusive).
+        Revisions of which the availability is unknown are omitted.
+        """
+        collection = self.get_binary_availability_collection(browser)
+        documents = collection.find(
+            {
+                'state.browser_name': browser,
+                'state.revision_number': {'$gte': first_revision_nb, '$lte': last_revision_nb},
+            },
+            {'_id': False, 'state.revision_number': True, 'binary_online': True},
+        )
+        availability = {}
+        for document in documents:
+            revision_nb = document['state']['revision_number']
+            availability[revision_nb] = availability.get(revision_nb, False) or document.get('binary_online', False)
+        return availability
+
+    def store_binary_availability_in_bulk(self, browser: str, availability: dict[int, bool]) -> None:
+        """
+        Caches the online binary availability of the given revisions.
+
+        :param browser: The browser of the revisions.
+        :param availability: Whether a binary is available online, per revision number.
+        """
+        if not availability:
+            return
+        collection = self.get_binary_availability_collection(browser)
+        ts = str(datetime.now(timezone.utc).replace(microsecond=0))
+        collection.bulk_write(
+            [
+                UpdateOne(
+                    {'state.type': 'revision', 'state.browser_name': browser, 'state.revision_number': revision_nb},
+                    {'$set': {'binary_online': binary_online, 'ts': ts}},
+                    upsert=True,
+                )
+                for revision_nb, binary_online in availability.items()
+            ],
+            ordered=False,
+        )
+
     def get_stored_binary_availability(self, browser):
         collection = MongoDB().get_binary_availability_collection(browser)
         result = collection.find(
@@ -4,6 +4,7 @@ from typing import Optional
 from pymongo import ASCENDING, DESCENDING
 
 from bci.database.mongo.mongodb import MongoDB
+from bci.version_control.availability_index import get_availability_index
 
 logger = logging.getLogger(__name__)
 
@@ -20,6 +21,8 @@ class RevisionCache:
 
         collection.delete_many({})
         collection.insert_many(values)
+        # The availability index was derived from the previous documents
+        get_availability_index('firefox').clear()
         logger.info(f'Revision Cache was updates ({len(values)} documents).')
 
     @staticmethod
@@ -46,6 +49,18 @@ class RevisionCache:
         collection = MongoDB().get_collection('firefox_binary_availability')
         return collection.find_one({'revision_id': revision_id}, {'files_url': 1, 'app_version': 1})
 
+    @staticmethod
+    def firefox_get_revision_nbs_with_binary(first_revision_nb: int, last_revision_nb: int) -> list[int]:
+        """
+        Returns the revision numbers in the given range (inclusive) for which a binary is available.
+        """
+        collection = MongoDB().get_collection('firefox_binary_availability')
+        documents = collection.find(
+            {'revision_number': {'$gte': first_revision_nb, '$lte': last_revision_nb}},
+            {'_id': False, 'revision_number': True},
+        )
+        return [document['revision_number'] for document in documents]
+
     @staticmethod
     def firefox_get_previous_and_next_revision_nb_with_binary(revision_nb: int) -> tuple[Optional[int], Optional[int]]:
         collection = MongoDB().get_collection('firefox_binary_availability')
@@ -0,0 +1,170 @@
+import logging
+from datetime import datetime, timezone
+from typing import Optional
+
+from bson import ObjectId
+from pymongo import ASCENDING, ReturnDocument
+
+from bci.database.mongo.mongodb import MongoDB
+from bci.evaluations.logic import WorkerParameters
+
+logger = logging.getLogger(__name__)
+
+
+class WorkerJobQueue:
+    """
+    Queue of evaluations that is consumed by long-lived worker processes.
+    Jobs are scoped to a pool, so workers never pick up jobs that were left behind by an earlier pool.
+    """
+
+    @staticmethod
+    def submit(pool_id: str, params: WorkerParameters) -> ObjectId:
+        """
+        Adds an evaluation to the queue of the given pool.
+
+        :param pool_id: The identifier of the pool that should perform the evaluation.
+        :param params: The parameters of the evaluation.
+        :return: The identifier of the job.
+        """
+        collection = WorkerJobQueue.__get_collection()
+        result = collection.insert_one(
+            {
+                'pool_id': pool_id,
+                'params': params.serialize(),
+                'status': 'pending',
+                'worker': None,
+                'submitted_ts': datetime.now(timezone.utc),
+            }
+        )
+        return result.inserted_id
+
+    @staticmethod
+    def claim(
+        pool_id: str, worker_name: str, submitted_before: Optional[datetime] = None
+    ) -> Optional[tuple[ObjectId, WorkerParameters]]:
+        """
+        Atomically claims the oldest pending job of the given pool.
+
+        :param pool_id: The identifier of the pool the worker belongs to.
+        :param worker_name: The name of the claiming worker.
+        :param submitted_before: If given, only jobs that were submitted before this time are claimed.
+        :return: The job identifier and its parameters, or None if no job is pending.
+        """
+        collection = WorkerJobQueue.__get_collection()
+        query = {'pool_id': pool_id, 'status': 'pending'}
+        if submitted_before is not None:
+            query['submitted_ts'] = {'$lt': submitted_before}
+        document = collection.find_one_and_update(
+            query,
+            {'$set': {'status': 'running', 'worker': worker_name, 'claimed_ts': datetime.now(timezone.utc)}},
+            sort=[('submitted_ts', ASCENDING)],
+            return_document=ReturnDocument.AFTER,
+        )
+        if document is None:
+            return None
+        return document['_id'], WorkerParameters.deserialize(document['params'])
+
+    @staticmethod
+    def start(job_id: ObjectId) -> bool:
+        """
+        Marks that the evaluation of the given claimed job has started, as opposed to jobs that are claimed in advance.
+
+        :return: True if the job can be started, False if it was cancelled after it was claimed.
+        """
+        collection = WorkerJobQueue.__get_collection()
+        result = collection.update_one(
+            {'_id': job_id, 'status': 'running'}, {'$set': {'started_ts': datetime.now(timezone.utc)}}
+        )
+        return result.modified_count > 0
+
+    @staticmethod
+    def finish(job_id: ObjectId, success: bool = True) -> None:
+        collection = WorkerJobQueue.__get_collection()
+        collection.update_one(
+            {'_id': job_id},
+            {'$set': {'status': 'done' if success else 'failed', 'finished_ts': datetime.now(timezone.utc)}},
+        )
+
+    @staticmethod
+    def get_worker_of_running_job(job_id: ObjectId) -> Optional[str]:
+        """
+        Returns the name of the worker that is performing the given job, or None if its evaluation is not running.
+        """
+        collection = WorkerJobQueue.__get_collection()
+        document = collection.find_one(
+            {'_id': job_id, 'status': 'running', 'started_ts': {'$exists': True}}, {'worker': True}
+        )
+        return None if document is None else document['worker']
+
+    @staticmethod
+    def release_jobs_of_worker(pool_id: str, worker_name: str) -> tuple[int, int]:
+        """
+        Releases the jobs that the given worker claimed but did not finish, e.g., because its container exited.
+        The job of which the evaluation had started is marked as failed, while jobs that were only claimed in advance
+        are put back in the queue for another worker.
+
+        :return: The number of failed jobs and the number of requeued jobs.
+        """
+        collection = WorkerJobQueue.__get_collection()
+        query = {'pool_id': pool_id, 'worker': worker_name, 'status': 'running'}
+        failed = collection.update_many(
+            {**query, 'started_ts': {'$exists': True}},
+            {'$set': {'status': 'failed', 'finished_ts': datetime.now(timezone.utc)}},
+        )
+        requeued = collection.update_many(
+            {**query, 'started_ts': {'$exists': False}},
+            {'$set': {'status': 'pending', 'worker': None}, '$unset': {'claimed_ts': ''}},
+        )
+        return failed.modified_count, requeued.modified_count
+
+    @staticmethod
+    def cancel_pending_jobs(pool_id: str) -> int:
+        """
+        Cancels all jobs of the given pool that were not claimed by a worker yet.
+
+        :return: The number of cancelled jobs.
+        """
+        collection = WorkerJobQueue.__get_collection()
+        result = collection.update_many(
+            {'pool_id': pool_id, 'status': 'pending'},
+            {'$set': {'status': 'cancelled', 'finished_ts': datetime.now(timezone.utc)}},
+        )
+        return result.modified_count
+
+    @staticmethod
+    def cancel_pending_job(job_id: ObjectId) -> bool:
+        """
+        Cancels the given job if its evaluation did not start yet, i.e., it is not claimed or only claimed in advance.
+
+        :return: True if the job was cancelled.
+        """
+        collection = WorkerJobQueue.__get_collection()
+        result = collection.update_one(
+            {'_id': job_id, '$or': [{'status': 'pending'}, {'status': 'running', 'started_ts': {'$exists': False}}]},
+            {'$set': {'status': 'cancelled', 'finished_ts': datetime.now(timezone.utc)}},
+        )
+        return result.modified_count > 0
+
+    @staticmethod
+    def pop_finished_jobs(pool_id: str) -> list[dict]:
+        """
+        Returns and removes all finished jobs of the given pool, including failed and cancelled ones.
+        Jobs are claimed one at a time, such that concurrent callers never return the same job.
+        """
+        collection = WorkerJobQueue.__get_collection()
+        query = {'pool_id': pool_id, 'status': {'$in': ['done', 'failed', 'cancelled']}}
+        documents = []
+        while (document := collection.find_one_and_delete(query, projection={'_id': True, 'status': True})) is not None:
+            documents.append(document)
+        return documents
+
+    @staticmethod
+    def clear(pool_id: str) -> None:
+        """
+        Removes all jobs of the given pool.
+        """
+        WorkerJobQueue.__get_collection().delete_many({'pool_id': pool_id})
+
+    @staticmethod
+    def __get_collection():
+        return MongoDB().get_collection('worker_jobs')
@@ -0,0 +1,105 @@
+from abc import ABC, abstractmethod
+from typing import Callable, Optional
+
+from bci.distribution.slot_scheduler import SlotScheduler
+from bci.evaluations.logic import WorkerParameters
+from bci.version_control.states.state import State
+
+
+class ExecutionBackend(ABC):
+    """
+    Executes evaluations on a number of worker slots, e.g., local Docker containers or a remote node.
+    """
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.on_capacity_changed: Callable[[], None] = lambda: None
+        """Called whenever slots might have been freed, so waiting dispatchers can be woken up."""
+
+    @abstractmethod
+    def get_nb_of_slots(self) -> int:
+        pass
+
+    @abstractmethod
+    def get_nb_of_free_slots(self) -> int:
+        pass
+
+    @abstractmethod
+    def start(self, params: WorkerParameters, on_finished: Callable[[bool], None]) -> None:
+        """
+        Starts the evaluation of the given parameters. This is only called when the backend has a free slot.
+
+        :param params: The parameters of the evaluation.
+        :param on_finished: Called with the success of the evaluation once it has finished.
+        """
+        pass
+
+    def prefetch(self, params: WorkerParameters) -> bool:
+        """
+        Prepares the evaluation of the given parameters in advance, because it is expected to be started on this
+        backend next.
+
+        :param params: The parameters of the upcoming evaluation, which should be passed to `start` as is.
+        :return: True if the evaluation is being prepared.
+        """
+        return False
+
+    def reattach(self, params: WorkerParameters, on_finished: Callable[[bool], None]) -> bool:
+        """
+        Takes over an evaluation of the given parameters that was started before the core restarted and is still
+        running.
+
+        :param params: The parameters of the evaluation.
+        :param on_finished: Called with the success of the evaluation once it has finished.
+        :return: True if the evaluation was found and taken over.
+        """
+        return False
+
+    def kill(self, params: WorkerParameters) -> bool:
+        """
+        Stops a running evaluation, after which it is reported as unsuccessful through its `on_finished` callback.
+
+        :param params: The parameters that were passed to `start`.
+        :return: True if the evaluation is being stopped, False if this backend cannot stop a single evaluation.
+        """
+        return False
+
+    def get_slot_scheduler(self) -> Optional[SlotScheduler]:
+        """
+        Returns the scheduler of the local slots of this backend, or None if its slots are not managed locally.
+        """
+        return None
+
+    def get_cached_binaries(self) -> set[str]:
+        """
+        Returns the binaries that are readily available to this backend, formatted as '<browser name>/<state name>'.
+        """
+        return set()
+
+    def has_cached_binary(self, state: State) -> bool:
+        return f'{state.browser_name}/{state.name}' in self.get_cached_binaries()
+
+    def get_free_disk_space(self) -> Optional[int]:
+        """
+        Returns the free disk space in bytes available to this backend, or None if unknown.
+        """
+        return None
+
+    @abstractmethod
+    def cancel_pending(self) -> None:
+        """
+        Cancels evaluations that were accepted but not finished yet, which happens when the core stops forcefully.
+        Backends of which the evaluations are not stopped through `WorkerManager.forcefully_stop_all_running_containers`
+        should stop their running evaluations here as well.
+        """
+        pass
+
+    @abstractmethod
+    def shutdown(self) -> None:
+        """
+        Releases the resources that outlive a single evaluation.
+        """
+        pass
+
+    def get_slot_statistics(self) -> dict:
+        return {}
@@ -0,0 +1,190 @@
+import logging
+import threading
+from typing import Callable, Optional
+
+import docker
+import docker.errors
+
+from bci.distribution import worker_container
+from bci.distribution.backends.base import ExecutionBackend
+from bci.distribution.cpu_pinning import create_cpu_pinning
+from bci.distribution.slot_scheduler import SlotLease, SlotScheduler
+from bci.evaluations.logic import WorkerParameters
+
+logger = logging.getLogger(__name__)
+
+# Seconds to wait before reconnecting to the Docker event stream, doubled after each failed attempt up to the maximum
+EVENT_STREAM_MIN_BACKOFF = 1
+EVENT_STREAM_MAX_BACKOFF = 60
+
+
+class ContainerBackend(ExecutionBackend):
+    """
+    Starts a fresh worker container on the local Docker daemon for every evaluation.
+    """
+
+    def __init__(self, nb_of_slots: int) -> None:
+        super().__init__('local')
+        self.slot_scheduler = SlotScheduler(nb_of_slots)
+        self.cpu_pinning = create_cpu_pinning(nb_of_slots)
+        self.client = docker.from_env()
+        # Names of the containers that perform the running evaluations, by the identity of their parameters
+        self.__container_names: dict[int, str] = {}
+        self.__lock = threading.Lock()
+        self.__stopped = threading.Event()
+        self.__events = None
+        self.__start_container_event_listener()
+
+    def get_nb_of_slots(self) -> int:
+        return self.slot_scheduler.get_limit()
+
+    def get_nb_of_free_slots(self) -> int:
+        return self.slot_scheduler.get_nb_of_free_slots()
+
+    def get_slot_scheduler(self) -> SlotScheduler:
+        return self.slot_scheduler
+
+    def start(self, params: WorkerParameters, on_finished: Callable[[bool], None]) -> None:
+        # Keyed by state, such that a retry of a failed evaluation runs in another slot than the previous attempt
+        lease = self.slot_scheduler.acquire(timeout=0, key=f'{params.state.browser_name}/{params.state.name}')
+        if lease is None:
+            raise AttributeError('Evaluation was started without a free slot')
+        container_name = f'bh_worker_{lease.slot_id}'
+        core_set = self.cpu_pinning.get_core_set(lease.slot_id) if self.cpu_pinning is not None else None
+        with self.__lock:
+            self.__container_names[id(params)] = container_name
+
+        def start_container_thread():
+            success = False
+            try:
+                worker_container.remove_containers_with_name(self.client, container_name)
+                self.client.containers.run(
+                    worker_container.get_image(),
+                    detach=False,
+                    remove=True,
+                    # The slot and lease labels allow the event listener to release the slot of an exited container
+                    labels={'bh_worker': '', 'bh_slot': str(lease.slot_id), 'bh_lease': str(lease.lease_id)},
+                    command=[params.serialize()],
+                    **worker_container.get_run_arguments(container_name, core_set),
+                )
+                logger.debug(f"Container '{container_name}' finished experiments for '{params.state}'")
+                success = True
+            except (docker.errors.ContainerError, docker.errors.NotFound):
+                logger.error(
+                    f"Could not run container '{container_name}' or container was unexpectedly removed", exc_info=True
+                )
+            finally:
+                with self.__lock:
+                    self.__container_names.pop(id(params), None)
+                # Container-exit callback: the slot might already have been released by the event listener
+                self.slot_scheduler.release(lease)
+                on_finished(success)
+
+        thread = threading.Thread(target=start_container_thread)
+        thread.start()
+        logger.info(f"Container '{container_name}' started experiments for '{params.state}'")
+
+    def reattach(self, params: WorkerParameters, on_finished: Callable[[bool], None]) -> bool:
+        serialized_params = params.serialize()
+        containers = self.client.containers.list(filters={'label': 'bh_worker', 'status': 'running'}, ignore_removed=True)
+        container = next((container for container in containers if container.attrs['Args'] == [serialized_params]), None)
+        if container is None or 'bh_slot' not in container.labels:
+            return False
+        if (lease := self.slot_scheduler.acquire_slot(int(container.labels['bh_slot']))) is None:
+            return False
+        with self.__lock:
+            self.__container_names[id(params)] = container.name
+
+        def wait_for_container_thread():
+            success = False
+            try:
+                success = container.wait()['StatusCode'] == 0
+            except docker.errors.NotFound:
+                logger.warning(f"Container '{container.name}' was removed before its exit code could be retrieved")
+            finally:
+                with self.__lock:
+                    self.__container_names.pop(id(params), None)
+                self.slot_scheduler.release(lease)
+                on_finished(success)
+
+        threading.Thread(target=wait_for_container_thread).start()
+        logger.info(f"Reattached to container '{container.name}' that performs experiments for '{params.state}'")
+        return True
+
+    def kill(self, params: WorkerParameters) -> bool:
+        with self.__lock:
+            if (container_name := self.__container_names.get(id(params))) is None:
+                return False
+        logger.info(f"Removing container '{container_name}' that evaluates '{params.state}'")
+        worker_container.remove_containers_with_name(self.client, container_name)
+        return True
+
+    def cancel_pending(self) -> None:
+        # Containers are started immediately, so no evaluation is ever pending
+        pass
+
+    def shutdown(self) -> None:
+        self.__stopped.set()
+        with self.__lock:
+            events, self.__events = self.__events, None
+        if events is not None:
+            # Unblocks the event listener, which then stops
+            events.close()
+
+    def get_cached_binaries(self) -> set[str]:
+        return worker_container.get_cached_binaries()
+
+    def get_free_disk_space(self) -> Optional[int]:
+        return worker_container.get_free_disk_space()
+
+    def get_slot_statistics(self) -> dict:
+        return {
+            'idle_time_per_slot': self.slot_scheduler.get_idle_time_per_slot(),
+            **self.slot_scheduler.get_refill_statistics(),
+        }
+
+    def __start_container_event_listener(self) -> None:
+        """
+        Listens to the Docker event stream to release slots as soon as their worker container is destroyed.
+        This is often earlier than the return of the blocking `containers.run` call, which still has to process the
+        container's exit.
+        """
+
+        def listen():
+            backoff = EVENT_STREAM_MIN_BACKOFF
+            while not self.__stopped.is_set():
+                try:
+                    events = self.client.events(
+                        decode=True,
+                        filters={'type': 'container', 'event': 'destroy', 'label': 'bh_worker'},
+                    )
+                    with self.__lock:
+                        self.__events = events
+                    if self.__stopped.is_set():
+                        # Shut down before the stream could be closed
+                        events.close()
+                        return
+                    backoff = EVENT_STREAM_MIN_BACKOFF
+                    for event in events:
+                        self.__handle_container_destroyed(event)
+                except Exception:
+                    if self.__stopped.is_set():
+                        return
+                    logger.warning(
+                        f'Lost connection to the Docker event stream, reconnecting in {backoff}s...', exc_info=True
+                    )
+                if self.__stopped.wait(backoff):
+                    return
+                backoff = min(2 * backoff, EVENT_STREAM_MAX_BACKOFF)
+
+        thread = threading.Thread(target=listen, name='bh_container_events', daemon=True)
+        thread.start()
+
+    def __handle_container_destroyed(self, event: dict) -> None:
+        attributes = event.get('Actor', {}).get('Attributes', {})
+        if 'bh_slot' not in attributes or 'bh_lease' not in attributes:
+            return
+        lease = SlotLease(int(attributes['bh_slot']), int(attributes['bh_lease']))
+        if self.slot_scheduler.release(lease):
+            logger.debug(f"Released slot {lease.slot_id} after container '{attributes.get('name')}' was destroyed")
+            self.on_capacity_changed()
@@ -0,0 +1,59 @@
+import logging
+import threading
+from typing import Callable, Optional
+
+from bci.distribution.backends.base import ExecutionBackend
+from bci.evaluations.custom.custom_evaluation import CustomEvaluationFramework
+from bci.evaluations.logic import WorkerParameters
+from bci.evaluations.pipeline import EvaluationPipeline
+
+logger = logging.getLogger(__name__)
+
+
+class InlineBackend(ExecutionBackend):
+    """
+    Performs evaluations one at a time in the current process (single container mode).
+    Since evaluations block the dispatcher, the dispatcher announces the next evaluation of the same batch beforehand,
+    such that it is prepared while the current one is performed.
+    """
+
+    def __init__(self) -> None:
+        super().__init__('inline')
+        self.__busy = threading.Event()
+        # Prepares the announced evaluation and removes the binaries of finished evaluations in the background
+        self.__pipeline: Optional[EvaluationPipeline] = None
+
+    def get_nb_of_slots(self) -> int:
+        return 1
+
+    def get_nb_of_free_slots(self) -> int:
+        return 0 if self.__busy.is_set() else 1
+
+    def prefetch(self, params: WorkerParameters) -> bool:
+        return self.__get_pipeline().prefetch(params)
+
+    def start(self, params: WorkerParameters, on_finished: Callable[[bool], None]) -> None:
+        self.__busy.set()
+        success = True
+        try:
+            self.__get_pipeline().evaluate(params)
+        except Exception:
+            logger.error(f'Could not perform evaluation for {params.state}', exc_info=True)
+            success = False
+        finally:
+            self.__busy.clear()
+        on_finished(success)
+
+    def cancel_pending(self) -> None:
+        # Evaluations are performed immediately, so no evaluation is ever pending
+        pass
+
+    def __get_pipeline(self) -> EvaluationPipeline:
+        if self.__pipeline is None:
+            self.__pipeline = EvaluationPipeline(CustomEvaluationFramework(), max_look_ahead=1)
+        return self.__pipeline
+
+    def shutdown(self) -> None:
+        if self.__pipeline is not None:
+            self.__pipeline.close()
+            self.__pipeline = None
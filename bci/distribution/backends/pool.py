@@ -0,0 +1,102 @@
+import logging
+import threading
+from typing import Callable, Optional
+
+from bson import ObjectId
+
+from bci.distribution import worker_container
+from bci.distribution.backends.base import ExecutionBackend
+from bci.distribution.slot_scheduler import SlotLease, SlotScheduler
+from bci.distribution.worker_pool import WarmWorkerPool
+from bci.evaluations.logic import WorkerParameters
+
+logger = logging.getLogger(__name__)
+
+
+class PoolBackend(ExecutionBackend):
+    """
+    Submits evaluations to a warm pool of long-lived local worker containers.
+    The pool is started upon the first evaluation, since it needs the database parameters of the workers.
+    """
+
+    def __init__(self, nb_of_slots: int, recycle_limit: int, look_ahead: int = 0) -> None:
+        super().__init__('local')
+        self.slot_scheduler = SlotScheduler(nb_of_slots)
+        self.recycle_limit = recycle_limit
+        self.look_ahead = look_ahead
+        self.__worker_pool: Optional[WarmWorkerPool] = None
+        self.__jobs: dict[ObjectId, tuple[SlotLease, Callable[[bool], None]]] = {}
+        # Jobs of the submitted evaluations, by the identity of their parameters
+        self.__job_ids: dict[int, ObjectId] = {}
+        self.__lock = threading.Lock()
+        logger.info(f'Running in warm worker pool mode with {nb_of_slots} workers')
+
+    def get_nb_of_slots(self) -> int:
+        return self.slot_scheduler.get_limit()
+
+    def get_nb_of_free_slots(self) -> int:
+        return self.slot_scheduler.get_nb_of_free_slots()
+
+    def get_slot_scheduler(self) -> SlotScheduler:
+        return self.slot_scheduler
+
+    def start(self, params: WorkerParameters, on_finished: Callable[[bool], None]) -> None:
+        lease = self.slot_scheduler.acquire(timeout=0)
+        if lease is None:
+            raise AttributeError('Evaluation was started without a free slot')
+        with self.__lock:
+            if self.__worker_pool is None:
+                self.__worker_pool = WarmWorkerPool(
+                    self.slot_scheduler.nb_of_slots,
+                    self.recycle_limit,
+                    params.database_connection_params,
+                    self.__on_job_finished,
+                    self.look_ahead,
+                )
+                self.__worker_pool.start()
+            job_id = self.__worker_pool.submit(params)
+            self.__jobs[job_id] = (lease, on_finished)
+            self.__job_ids[id(params)] = job_id
+        logger.info(f"Submitted experiments for '{params.state}' to the worker pool")
+
+    def __on_job_finished(self, job_id: ObjectId, success: bool) -> None:
+        with self.__lock:
+            job = self.__jobs.pop(job_id, None)
+            self.__job_ids = {key: value for key, value in self.__job_ids.items() if value != job_id}
+        if job is None:
+            return
+        lease, on_finished = job
+        if not success:
+            logger.error(f"Pooled job '{job_id}' did not finish successfully")
+        self.slot_scheduler.release(lease)
+        on_finished(success)
+
+    def kill(self, params: WorkerParameters) -> bool:
+        with self.__lock:
+            job_id = self.__job_ids.get(id(params))
+            worker_pool = self.__worker_pool
+        if job_id is None or worker_pool is None:
+            return False
+        return worker_pool.kill_job(job_id)
+
+    def cancel_pending(self) -> None:
+        if self.__worker_pool is not None:
+            self.__worker_pool.cancel_pending_jobs()
+
+    def shutdown(self) -> None:
+        with self.__lock:
+            worker_pool, self.__worker_pool = self.__worker_pool, None
+        if worker_pool is not None:
+            worker_pool.stop()
+
+    def get_cached_binaries(self) -> set[str]:
+        return worker_container.get_cached_binaries()
+
+    def get_free_disk_space(self) -> Optional[int]:
+        return worker_container.get_free_disk_space()
+
+    def get_slot_statistics(self) -> dict:
+        return {
+            'idle_time_per_slot': self.slot_scheduler.get_idle_time_per_slot(),
+            **self.slot_scheduler.get_refill_statistics(),
+        }
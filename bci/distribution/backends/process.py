@@ -0,0 +1,167 @@
+import logging
+import logging.handlers
+import multiprocessing
+import os
+import signal
+import threading
+from multiprocessing.connection import Connection
+from multiprocessing.process import BaseProcess
+from typing import Callable
+
+from bci import worker
+from bci.configuration import Global
+from bci.distribution.backends.base import ExecutionBackend
+from bci.distribution.collector_relay import CollectorRelay
+from bci.distribution.slot_scheduler import SlotScheduler
+from bci.evaluations.logic import WorkerParameters
+
+logger = logging.getLogger(__name__)
+
+# Worker process i runs its request collector on this port + i
+COLLECTOR_BASE_PORT = 5100
+
+
+class ProcessBackend(ExecutionBackend):
+    """
+    Performs evaluations in long-lived worker processes of the core, one per slot, which does not require Docker.
+    Each worker process has its own collector port, folder for downloaded binaries, and temporary folder for its browser
+    log, execution folders and profiles. Reports of nginx arrive at the collector relay, which forwards them to the
+    right worker process.
+    """
+
+    def __init__(self, nb_of_slots: int) -> None:
+        super().__init__('local')
+        self.slot_scheduler = SlotScheduler(nb_of_slots)
+        # Forking would copy the threads and database connection of the core
+        self.__context = multiprocessing.get_context('spawn')
+        self.__processes: dict[int, tuple[BaseProcess, Connection]] = {}
+        # Slots of the running evaluations, by the identity of their parameters
+        self.__slots: dict[int, int] = {}
+        self.__lock = threading.Lock()
+
+        self.__log_queue = self.__context.Queue()
+        self.__log_listener = logging.handlers.QueueListener(self.__log_queue, ForwardingHandler())
+        self.__log_listener.start()
+        self.__relay = CollectorRelay(Global.get_collector_port())
+        self.__relay.start()
+        logger.info(f'Running in process mode with {nb_of_slots} worker processes')
+
+    def get_nb_of_slots(self) -> int:
+        return self.slot_scheduler.get_limit()
+
+    def get_nb_of_free_slots(self) -> int:
+        return self.slot_scheduler.get_nb_of_free_slots()
+
+    def get_slot_scheduler(self) -> SlotScheduler:
+        return self.slot_scheduler
+
+    def start(self, params: WorkerParameters, on_finished: Callable[[bool], None]) -> None:
+        # Keyed by state, such that a retry of a failed evaluation runs in another slot than the previous attempt
+        lease = self.slot_scheduler.acquire(timeout=0, key=f'{params.state.browser_name}/{params.state.name}')
+        if lease is None:
+            raise AttributeError('Evaluation was started without a free slot')
+        _, connection = self.__get_process(lease.slot_id)
+        with self.__lock:
+            self.__slots[id(params)] = lease.slot_id
+
+        def wait_for_process():
+            success = False
+            try:
+                connection.send(params.serialize())
+                success = connection.recv()
+                logger.debug(f'Worker process {lease.slot_id} finished experiments for {params.state}')
+            except (EOFError, OSError):
+                logger.error(f'Worker process {lease.slot_id} exited unexpectedly')
+                self.__remove_process(lease.slot_id)
+            finally:
+                with self.__lock:
+                    self.__slots.pop(id(params), None)
+                self.slot_scheduler.release(lease)
+                on_finished(success)
+
+        threading.Thread(target=wait_for_process).start()
+        logger.info(f'Worker process {lease.slot_id} started experiments for {params.state}')
+
+    def kill(self, params: WorkerParameters) -> bool:
+        with self.__lock:
+            if (slot_id := self.__slots.get(id(params))) is None:
+                return False
+        logger.info(f"Stopping worker process {slot_id} that evaluates '{params.state}'")
+        self.__remove_process(slot_id)
+        return True
+
+    def cancel_pending(self) -> None:
+        for slot_id in list(self.__processes.keys()):
+            if self.slot_scheduler.get_lease(slot_id) is not None:
+                self.__remove_process(slot_id)
+
+    def shutdown(self) -> None:
+        for slot_id in list(self.__processes.keys()):
+            self.__remove_process(slot_id, graceful=True)
+        self.__relay.stop()
+        self.__log_listener.stop()
+
+    def get_slot_statistics(self) -> dict:
+        return {
+            'idle_time_per_slot': self.slot_scheduler.get_idle_time_per_slot(),
+            **self.slot_scheduler.get_refill_statistics(),
+        }
+
+    def __get_process(self, slot_id: int) -> tuple[BaseProcess, Connection]:
+        with self.__lock:
+            if slot_id in self.__processes and self.__processes[slot_id][0].is_alive():
+                return self.__processes[slot_id]
+            collector_port = COLLECTOR_BASE_PORT + slot_id
+            environment = {
+                'BCI_WORKER_TMP_FOLDER': os.path.join(Global.get_worker_tmp_folder(), f'bh_worker_{slot_id}'),
+                'BCI_COLLECTOR_PORT': str(collector_port),
+                # Groups of the same state can be evaluated by several worker processes at once
+                'BCI_DOWNLOADED_BINARY_SUBFOLDER': f'.bh_worker_{slot_id}',
+            }
+            connection, child_connection = self.__context.Pipe()
+            process = self.__context.Process(
+                target=worker.run_process,
+                args=(environment, child_connection, self.__log_queue),
+                name=f'bh_worker_{slot_id}',
+                daemon=True,
+            )
+            process.start()
+            child_connection.close()
+            self.__relay.register(process.pid, collector_port)
+            self.__processes[slot_id] = (process, connection)
+            return process, connection
+
+    def __remove_process(self, slot_id: int, graceful: bool = False) -> None:
+        with self.__lock:
+            if (entry := self.__processes.pop(slot_id, None)) is None:
+                return
+        process, connection = entry
+        self.__relay.unregister(process.pid)
+        if graceful:
+            # Idle worker processes exit as soon as their connection is closed
+            connection.close()
+            process.join(timeout=5)
+        if process.is_alive():
+            # Browsers lead their own process group, so the worker process is asked to kill them before it exits
+            try:
+                os.kill(process.pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+            process.join(timeout=5)
+        if process.is_alive():
+            # The worker process leads its own process group, which includes its helper processes
+            try:
+                os.killpg(process.pid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+            process.join(timeout=5)
+        connection.close()
+
+
+class ForwardingHandler(logging.Handler):
+    """
+    Passes log records of worker processes to the loggers of the core, so they end up in the same handlers.
+    """
+
+    def emit(self, record: logging.LogRecord) -> None:
+        logging.getLogger(record.name).handle(record)
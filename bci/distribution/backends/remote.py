@@ -0,0 +1,142 @@
+import logging
+import threading
+from typing import Callable, Optional
+
+import requests
+
+from bci.distribution.backends.base import ExecutionBackend
+from bci.evaluations.logic import WorkerParameters
+
+logger = logging.getLogger(__name__)
+
+# Interval at which the node is polled for its capacity and the status of its evaluations
+POLL_INTERVAL = 1
+# Evaluations on a node are considered failed when the node could not be reached this many consecutive times
+MAX_NB_OF_FAILED_POLLS = 30
+
+
+class RemoteNodeBackend(ExecutionBackend):
+    """
+    Dispatches evaluations over HTTP to a node agent (`bci/distribution/node_agent.py`) running on another machine.
+    """
+
+    def __init__(self, url: str, token: Optional[str] = None) -> None:
+        """
+        :param url: The URL of the node agent.
+        :param token: The secret the node agent expects as bearer token.
+        """
+        super().__init__(url)
+        self.url = url.rstrip('/')
+        self.__session = requests.Session()
+        if token is not None:
+            self.__session.headers['Authorization'] = f'Bearer {token}'
+        self.__lock = threading.Lock()
+        self.__capacity = {'slots': 0, 'free_slots': 0, 'free_disk': None, 'cached_binaries': []}
+        self.__evaluations: dict[str, Callable[[bool], None]] = {}
+        self.__nb_of_failed_polls = 0
+        self.__stopped = threading.Event()
+        self.__refresh_capacity()
+        threading.Thread(target=self.__monitor, daemon=True).start()
+
+    def get_nb_of_slots(self) -> int:
+        with self.__lock:
+            return self.__capacity['slots']
+
+    def get_nb_of_free_slots(self) -> int:
+        with self.__lock:
+            return max(0, self.__capacity['free_slots'])
+
+    def get_cached_binaries(self) -> set[str]:
+        with self.__lock:
+            return set(self.__capacity['cached_binaries'])
+
+    def get_free_disk_space(self) -> Optional[int]:
+        with self.__lock:
+            return self.__capacity['free_disk']
+
+    def start(self, params: WorkerParameters, on_finished: Callable[[bool], None]) -> None:
+        try:
+            response = self.__session.post(
+                f'{self.url}/evaluations/', json={'params': params.serialize()}, timeout=10
+            ).json()
+        except (requests.exceptions.RequestException, ValueError) as e:
+            self.__mark_unavailable()
+            raise NodeUnavailable(f"Could not reach node '{self.url}'") from e
+        if response.get('status') != 'OK':
+            self.__mark_unavailable()
+            raise NodeUnavailable(f"Node '{self.url}' refused evaluation: {response.get('msg')}")
+        with self.__lock:
+            self.__evaluations[response['id']] = on_finished
+            # Account for the taken slot until the next capacity update
+            self.__capacity['free_slots'] -= 1
+        logger.info(f"Node '{self.url}' started experiments for '{params.state}'")
+
+    def cancel_pending(self) -> None:
+        try:
+            self.__session.post(f'{self.url}/evaluations/stop/', timeout=10)
+        except requests.exceptions.RequestException:
+            logger.warning(f"Could not reach node '{self.url}' to cancel its evaluations")
+
+    def shutdown(self) -> None:
+        self.__stopped.set()
+
+    def __monitor(self) -> None:
+        while not self.__stopped.wait(POLL_INTERVAL):
+            self.__refresh_capacity()
+            self.__check_evaluations()
+
+    def __refresh_capacity(self) -> None:
+        try:
+            response = self.__session.get(f'{self.url}/capacity/', timeout=5).json()
+        except (requests.exceptions.RequestException, ValueError):
+            self.__mark_unavailable()
+            return
+        if response.get('status') != 'OK':
+            logger.warning(f"Node '{self.url}' refused to report its capacity: {response.get('msg')}")
+            self.__mark_unavailable()
+            return
+        with self.__lock:
+            previously_free_slots = self.__capacity['free_slots']
+            self.__capacity = {
+                'slots': response['slots'],
+                'free_slots': response['free_slots'],
+                'free_disk': response['free_disk'],
+                'cached_binaries': response['cached_binaries'],
+            }
+        self.__nb_of_failed_polls = 0
+        if response['free_slots'] > previously_free_slots:
+            self.on_capacity_changed()
+
+    def __check_evaluations(self) -> None:
+        with self.__lock:
+            evaluation_ids = list(self.__evaluations.keys())
+        if not evaluation_ids:
+            return
+        try:
+            response = self.__session.get(
+                f'{self.url}/evaluations/', params={'ids': ','.join(evaluation_ids)}, timeout=5
+            ).json()
+            statuses = response['evaluations']
+        except (requests.exceptions.RequestException, ValueError, KeyError):
+            self.__nb_of_failed_polls += 1
+            if self.__nb_of_failed_polls >= MAX_NB_OF_FAILED_POLLS:
+                logger.error(f"Lost connection to node '{self.url}', considering its evaluations as failed")
+                statuses = {evaluation_id: 'failed' for evaluation_id in evaluation_ids}
+            else:
+                return
+        for evaluation_id, status in statuses.items():
+            if status == 'running':
+                continue
+            with self.__lock:
+                on_finished = self.__evaluations.pop(evaluation_id, None)
+            if on_finished:
+                on_finished(status == 'done')
+
+    def __mark_unavailable(self) -> None:
+        with self.__lock:
+            self.__capacity['free_slots'] = 0
+        logger.warning(f"Node '{self.url}' is unavailable")
+
+
+class NodeUnavailable(Exception):
+    pass
@@ -0,0 +1,147 @@
+import http.client
+import http.server
+import logging
+import os
+import socket
+import socketserver
+import threading
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+
+class CollectorRelay:
+    """
+    Forwards the reports that nginx sends to the collector port of this machine to the request collector of the worker
+    process that owns the reporting browser.
+    Worker processes share the IP address of the core, so nginx cannot address their collectors directly. Instead, the
+    source port of the browser's connection (X-Real-Port) is traced back to its process through /proc.
+    """
+
+    def __init__(self, port: int) -> None:
+        self.port = port
+        self.__collector_ports: dict[int, int] = {}
+        self.__lock = threading.Lock()
+        self.__httpd: Optional[socketserver.TCPServer] = None
+
+    def register(self, pid: int, collector_port: int) -> None:
+        """
+        Forwards reports of browsers that descend from the given process to the given collector port.
+        """
+        with self.__lock:
+            self.__collector_ports[pid] = collector_port
+
+    def unregister(self, pid: int) -> None:
+        with self.__lock:
+            self.__collector_ports.pop(pid, None)
+
+    def start(self) -> None:
+        socketserver.ThreadingTCPServer.allow_reuse_address = True
+        self.__httpd = socketserver.ThreadingTCPServer(
+            ('', self.port), lambda *args, **kwargs: RelayRequestHandler(self, *args, **kwargs)
+        )
+        self.__httpd.daemon_threads = True
+        threading.Thread(target=self.__httpd.serve_forever, daemon=True).start()
+        logger.debug(f'Started collector relay on port {self.port}')
+
+    def stop(self) -> None:
+        if self.__httpd:
+            self.__httpd.shutdown()
+            self.__httpd.server_close()
+            self.__httpd = None
+
+    def get_collector_port_for(self, source_port: int) -> Optional[int]:
+        """
+        Returns the collector port of the worker process that owns the local socket with the given source port.
+        """
+        if (inode := find_socket_inode(source_port)) is None:
+            return None
+        if (pid := find_pid_of_socket(inode)) is None:
+            return None
+        with self.__lock:
+            collector_ports = dict(self.__collector_ports)
+        # Browsers spawn many processes, so we walk up the process tree until we find the worker process
+        while pid is not None and pid > 1:
+            if pid in collector_ports:
+                return collector_ports[pid]
+            pid = get_parent_pid(pid)
+        return None
+
+    def forward(self, source_port: int, body: bytes) -> None:
+        if (collector_port := self.get_collector_port_for(source_port)) is None:
+            logger.debug(f'Could not find the worker process of the browser connection on port {source_port}')
+            return
+        connection = http.client.HTTPConnection('127.0.0.1', collector_port, timeout=5)
+        try:
+            connection.request('POST', '/report/', body=body, headers={'Content-Type': 'application/json'})
+            connection.getresponse()
+        except (OSError, http.client.HTTPException):
+            logger.warning(f'Could not propagate report to collector on port {collector_port}')
+        finally:
+            connection.close()
+
+
+class RelayRequestHandler(http.server.BaseHTTPRequestHandler):
+    def __init__(self, relay: CollectorRelay, request, client_address, server) -> None:
+        self.relay = relay
+        super().__init__(request, client_address, server)
+
+    def log_message(self, format: str, *args) -> None:
+        pass
+
+    def do_POST(self):
+        body = b''
+        if self.headers['Content-Length'] is not None:
+            body = self.rfile.read(int(self.headers['Content-Length']))
+        source_port = self.headers['X-Real-Port']
+
+        # Because of our hacky NGINX methodology, we have to allow premature socket closings.
+        try:
+            self.send_response(200)
+            self.end_headers()
+        except socket.error:
+            logger.debug('Socket closed by NGINX (expected)')
+
+        if source_port is not None and source_port.isdigit():
+            self.relay.forward(int(source_port), body)
+        else:
+            logger.debug('Received report without source port')
+
+
+def find_socket_inode(local_port: int) -> Optional[str]:
+    """
+    Returns the inode of the TCP socket that is bound to the given local port.
+    """
+    for table in ['/proc/net/tcp', '/proc/net/tcp6']:
+        if not os.path.isfile(table):
+            continue
+        with open(table) as file:
+            # The first line holds the column names
+            for line in file.readlines()[1:]:
+                columns = line.split()
+                if int(columns[1].split(':')[1], 16) == local_port and columns[9] != '0':
+                    return columns[9]
+    return None
+
+
+def find_pid_of_socket(inode: str) -> Optional[int]:
+    target = f'socket:[{inode}]'
+    for pid in filter(str.isdigit, os.listdir('/proc')):
+        fd_folder = f'/proc/{pid}/fd'
+        try:
+            for fd in os.listdir(fd_folder):
+                if os.readlink(os.path.join(fd_folder, fd)) == target:
+                    return int(pid)
+        except OSError:
+            # The process exited or is not ours to inspect
+            continue
+    return None
+
+
+def get_parent_pid(pid: int) -> Optional[int]:
+    try:
+        with open(f'/proc/{pid}/stat') as file:
+            # The command name between parentheses might contain spaces
+            return int(file.read().rsplit(')', 1)[1].split()[1])
+    except (OSError, IndexError, ValueError):
+        return None
@@ -0,0 +1,242 @@
+import logging
+import os
+import threading
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+import docker
+import docker.errors
+
+from bci.distribution.slot_scheduler import SlotScheduler
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_INTERVAL = 10
+# Deviation from the target utilization that is tolerated before the limit is changed, to prevent oscillation
+TOLERANCE = 0.05
+# Fraction of time in which at least one task stalled on a resource (PSI 'some avg10'), above which the host is thrashing
+PRESSURE_LIMIT = 0.1
+# Containers that come this close to their memory limit are likely to crash the browser
+CONTAINER_MEMORY_LIMIT = 0.9
+
+
+@dataclass(frozen=True)
+class ResourceSample:
+    cpu_utilization: float
+    memory_utilization: float
+    cpu_pressure: Optional[float] = None
+    memory_pressure: Optional[float] = None
+    io_pressure: Optional[float] = None
+    container_memory_utilization: Optional[float] = None
+    """The highest memory utilization of a single worker container relative to its memory limit."""
+
+    def get_utilization(self) -> float:
+        return max(self.cpu_utilization, self.memory_utilization)
+
+    def get_pressure(self) -> float:
+        pressures = [self.cpu_pressure, self.memory_pressure, self.io_pressure]
+        return max((pressure for pressure in pressures if pressure is not None), default=0.0)
+
+    def __str__(self) -> str:
+        def format_fraction(fraction: Optional[float]) -> str:
+            return 'n/a' if fraction is None else f'{fraction:.0%}'
+
+        return (
+            f'cpu {format_fraction(self.cpu_utilization)}, memory {format_fraction(self.memory_utilization)}, '
+            f'pressure cpu/memory/io {format_fraction(self.cpu_pressure)}/{format_fraction(self.memory_pressure)}/'
+            f'{format_fraction(self.io_pressure)}, container memory {format_fraction(self.container_memory_utilization)}'
+        )
+
+
+class ResourceSampler:
+    """
+    Samples the CPU, memory and I/O pressure of the host through /proc, and the memory usage of worker containers.
+    """
+
+    def __init__(self, proc_folder: str = '/proc') -> None:
+        self.proc_folder = proc_folder
+        self.__previous_cpu_times: Optional[tuple[int, int]] = None
+        self.__docker_client = None
+
+    def sample(self) -> ResourceSample:
+        return ResourceSample(
+            cpu_utilization=self.__sample_cpu_utilization(),
+            memory_utilization=read_memory_utilization(os.path.join(self.proc_folder, 'meminfo')),
+            cpu_pressure=read_pressure(os.path.join(self.proc_folder, 'pressure', 'cpu')),
+            memory_pressure=read_pressure(os.path.join(self.proc_folder, 'pressure', 'memory')),
+            io_pressure=read_pressure(os.path.join(self.proc_folder, 'pressure', 'io')),
+            container_memory_utilization=self.__sample_container_memory_utilization(),
+        )
+
+    def __sample_cpu_utilization(self) -> float:
+        busy_time, total_time = read_cpu_times(os.path.join(self.proc_folder, 'stat'))
+        previous_cpu_times, self.__previous_cpu_times = self.__previous_cpu_times, (busy_time, total_time)
+        if previous_cpu_times is None or total_time <= previous_cpu_times[1]:
+            return 0.0
+        return (busy_time - previous_cpu_times[0]) / (total_time - previous_cpu_times[1])
+
+    def __sample_container_memory_utilization(self) -> Optional[float]:
+        try:
+            if self.__docker_client is None:
+                self.__docker_client = docker.from_env()
+            containers = self.__docker_client.containers.list(
+                filters={'label': 'bh_worker', 'status': 'running'}, ignore_removed=True
+            )
+            utilizations = [get_container_memory_utilization(container.stats(stream=False, one_shot=True))
+                            for container in containers]
+        except docker.errors.DockerException:
+            # Worker processes do not run in containers
+            return None
+        return max((utilization for utilization in utilizations if utilization is not None), default=None)
+
+
+class ConcurrencyController:
+    """
+    Grows or shrinks the number of concurrent evaluations, such that the host is utilized close to the target.
+    Too many concurrent browsers cause thrashing and crashes, which result in dirty results, while too few waste resources.
+    The limit is decreased multiplicatively as soon as the host is under pressure, and increased one slot at a time
+    when all allowed slots are in use and there is headroom left.
+    """
+
+    def __init__(
+        self,
+        slot_scheduler: SlotScheduler,
+        target_utilization: float,
+        on_limit_increased: Callable[[], None],
+        sample_resources: Optional[Callable[[], ResourceSample]] = None,
+        interval: float = SAMPLE_INTERVAL,
+    ) -> None:
+        """
+        Initializes the controller.
+
+        :param slot_scheduler: The scheduler of which the concurrency limit is controlled.
+        :param target_utilization: The fraction of CPU and memory the evaluations should use.
+        :param on_limit_increased: Called when slots became available by increasing the limit.
+        :param sample_resources: Returns the current resource usage, which defaults to sampling this host.
+        :param interval: The number of seconds between two decisions.
+        """
+        self.slot_scheduler = slot_scheduler
+        self.target_utilization = target_utilization
+        self.on_limit_increased = on_limit_increased
+        self.sample_resources = sample_resources or ResourceSampler().sample
+        self.interval = interval
+        self.__stop_event = threading.Event()
+        self.__thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        logger.info(
+            f'Controlling concurrency towards {self.target_utilization:.0%} utilization, starting from '
+            f'{self.slot_scheduler.get_limit()} out of {self.slot_scheduler.nb_of_slots} slots'
+        )
+        # The first sample only initializes the CPU counters
+        self.sample_resources()
+        self.__thread = threading.Thread(target=self.__run, daemon=True)
+        self.__thread.start()
+
+    def stop(self) -> None:
+        self.__stop_event.set()
+        if self.__thread is not None:
+            self.__thread.join()
+            self.__thread = None
+
+    def __run(self) -> None:
+        while not self.__stop_event.wait(self.interval):
+            try:
+                self.step(self.sample_resources())
+            except Exception:
+                logger.error('Could not adjust the concurrency limit', exc_info=True)
+
+    def step(self, sample: ResourceSample) -> int:
+        """
+        Decides on the concurrency limit given the current resource usage, and applies it.
+
+        :param sample: The current resource usage.
+        :return: The new concurrency limit.
+        """
+        limit = self.slot_scheduler.get_limit()
+        nb_of_busy_slots = self.slot_scheduler.get_nb_of_busy_slots()
+        new_limit, reason = self.decide(sample, limit, nb_of_busy_slots)
+        if new_limit == limit:
+            logger.debug(f'Keeping concurrency limit at {limit} ({reason}; {sample})')
+            return limit
+
+        logger.info(f'Changing concurrency limit from {limit} to {new_limit} ({reason}; {sample})')
+        self.slot_scheduler.set_limit(new_limit)
+        if new_limit > limit:
+            self.on_limit_increased()
+        return self.slot_scheduler.get_limit()
+
+    def decide(self, sample: ResourceSample, limit: int, nb_of_busy_slots: int) -> tuple[int, str]:
+        """
+        Returns the concurrency limit for the given resource usage, and the reason for it.
+
+        :param sample: The current resource usage.
+        :param limit: The current concurrency limit.
+        :param nb_of_busy_slots: The number of evaluations that are currently running.
+        """
+        utilization = sample.get_utilization()
+        decreased_limit = max(1, limit - max(1, limit // 4))
+        if (pressure := sample.get_pressure()) > PRESSURE_LIMIT:
+            return decreased_limit, f'host is stalling {pressure:.0%} of the time'
+        if (sample.container_memory_utilization or 0.0) > CONTAINER_MEMORY_LIMIT:
+            return decreased_limit, 'worker container is close to its memory limit'
+        if utilization > self.target_utilization + TOLERANCE:
+            return decreased_limit, f'utilization {utilization:.0%} is above target'
+        if utilization < self.target_utilization - TOLERANCE:
+            if limit >= self.slot_scheduler.nb_of_slots:
+                return limit, 'maximum number of slots reached'
+            if nb_of_busy_slots < limit:
+                return limit, 'not all allowed slots are in use'
+            return limit + 1, f'utilization {utilization:.0%} is below target'
+        return limit, f'utilization {utilization:.0%} is on target'
+
+
+def read_cpu_times(path: str) -> tuple[int, int]:
+    """
+    Returns the busy and total CPU time since boot, in clock ticks.
+    """
+    with open(path) as file:
+        times = [int(value) for value in file.readline().split()[1:]]
+    # The fourth and fifth value are idle and iowait time
+    idle_time = sum(times[3:5])
+    total_time = sum(times)
+    return total_time - idle_time, total_time
+
+
+def read_memory_utilization(path: str) -> float:
+    """
+    Returns the fraction of memory that is not available for new processes.
+    """
+    memory_info = {}
+    with open(path) as file:
+        for line in file:
+            key, value = line.split(':', 1)
+            memory_info[key] = int(value.split()[0])
+    return 1 - memory_info['MemAvailable'] / memory_info['MemTotal']
+
+
+def read_pressure(path: str) -> Optional[float]:
+    """
+    Returns the fraction of time in which at least one task stalled on the resource over the last ten seconds, or None
+    if the kernel does not provide pressure stall information.
+    """
+    try:
+        with open(path) as file:
+            for line in file:
+                fields = line.split()
+                if fields[0] == 'some':
+                    return float(dict(field.split('=') for field in fields[1:])['avg10']) / 100
+    except OSError:
+        return None
+    return None
+
+
+def get_container_memory_utilization(stats: dict) -> Optional[float]:
+    """
+    Returns the memory usage of a container relative to its memory limit, excluding reclaimable page cache.
+    """
+    memory_stats = stats.get('memory_stats', {})
+    if not memory_stats.get('limit') or 'usage' not in memory_stats:
+        return None
+    cache = memory_stats.get('stats', {}).get('inactive_file', 0)
+    return (memory_stats['usage'] - cache) / memory_stats['limit']
@@ -0,0 +1,156 @@
+import glob
+import logging
+import os
+import re
+from dataclasses import dataclass
+from typing import Optional
+
+from bci.configuration import Global
+
+logger = logging.getLogger(__name__)
+
+NUMA_NODES_FOLDER = '/sys/devices/system/node'
+
+
+@dataclass(frozen=True)
+class CoreSet:
+    cores: tuple[int, ...]
+    # The NUMA node the cores belong to, or None if its memory should not be pinned
+    node: Optional[int] = None
+
+    def get_run_arguments(self) -> dict:
+        """
+        Returns the arguments of `containers.run` that pin a container to this core set.
+        """
+        arguments = {'cpuset_cpus': format_cpu_list(self.cores)}
+        if self.node is not None:
+            arguments['cpuset_mems'] = str(self.node)
+        return arguments
+
+
+class CpuPinning:
+    """
+    Maps each worker slot to a fixed set of cores, such that concurrent browsers do not compete for the same cores.
+    This lowers the variance of browser start-up and visit durations under load.
+    """
+
+    def __init__(self, nb_of_slots: int, cores_per_node: dict[int, list[int]], pin_memory: bool) -> None:
+        """
+        Initializes the mapping from slots to core sets.
+
+        :param nb_of_slots: The number of worker slots.
+        :param cores_per_node: The cores of each NUMA node.
+        :param pin_memory: Whether the memory of each slot should be allocated on the NUMA node of its cores.
+        """
+        self.core_sets = assign_core_sets(nb_of_slots, cores_per_node, pin_memory)
+
+    def get_core_set(self, slot_id: int) -> CoreSet:
+        return self.core_sets[slot_id % len(self.core_sets)]
+
+    def get_run_arguments(self, slot_id: int) -> dict:
+        return self.get_core_set(slot_id).get_run_arguments()
+
+
+def create_cpu_pinning(nb_of_slots: int) -> Optional[CpuPinning]:
+    """
+    Returns the core sets of the given number of worker slots, or None if pinning is not configured.
+    """
+    match Global.get_cpu_pinning():
+        case 'cores':
+            pin_memory = False
+        case 'numa':
+            pin_memory = True
+        case _:
+            return None
+    cores_per_node = get_cores_per_node()
+    cpu_pinning = CpuPinning(nb_of_slots, cores_per_node, pin_memory)
+    logger.info(
+        f'Pinning {nb_of_slots} worker slots to core sets '
+        f'{[format_cpu_list(core_set.cores) for core_set in cpu_pinning.core_sets]}'
+    )
+    return cpu_pinning
+
+
+def assign_core_sets(nb_of_slots: int, cores_per_node: dict[int, list[int]], pin_memory: bool) -> list[CoreSet]:
+    """
+    Divides the cores over the slots, such that the core set of a slot never spans multiple NUMA nodes.
+    Slots are spread over the nodes in proportion to their number of cores. If there are more slots than cores, slots
+    share cores.
+
+    :param nb_of_slots: The number of worker slots.
+    :param cores_per_node: The cores of each NUMA node.
+    :param pin_memory: Whether the core sets include their NUMA node, so memory is allocated on it.
+    :return: The core set of each slot.
+    """
+    nodes = sorted(node for node, cores in cores_per_node.items() if cores)
+    if nb_of_slots < 1 or not nodes:
+        return []
+    nb_of_cores = sum(len(cores_per_node[node]) for node in nodes)
+    # Largest remainder method, with at least one slot per node as long as there are enough slots
+    quotas = {node: nb_of_slots * len(cores_per_node[node]) / nb_of_cores for node in nodes}
+    slots_per_node = {node: int(quota) for node, quota in quotas.items()}
+    for node in sorted(nodes, key=lambda node: quotas[node] - slots_per_node[node], reverse=True):
+        if sum(slots_per_node.values()) >= nb_of_slots:
+            break
+        slots_per_node[node] += 1
+
+    core_sets = []
+    for node in nodes:
+        cores = sorted(cores_per_node[node])
+        nb_of_node_slots = slots_per_node[node]
+        for slot_index in range(nb_of_node_slots):
+            if nb_of_node_slots <= len(cores):
+                start = slot_index * len(cores) // nb_of_node_slots
+                end = (slot_index + 1) * len(cores) // nb_of_node_slots
+                slot_cores = cores[start:end]
+            else:
+                slot_cores = [cores[slot_index % len(cores)]]
+            core_sets.append(CoreSet(tuple(slot_cores), node if pin_memory else None))
+    return core_sets
+
+
+def get_cores_per_node() -> dict[int, list[int]]:
+    """
+    Returns the cores of each NUMA node of the host, or all usable cores as a single node if the topology is unknown.
+    """
+    cores_per_node = {}
+    for node_folder in glob.glob(os.path.join(NUMA_NODES_FOLDER, 'node[0-9]*')):
+        try:
+            with open(os.path.join(node_folder, 'cpulist')) as file:
+                cores = parse_cpu_list(file.read())
+        except OSError:
+            continue
+        if cores:
+            cores_per_node[int(re.sub(r'\D', '', os.path.basename(node_folder)))] = cores
+    if not cores_per_node:
+        cores_per_node[0] = sorted(os.sched_getaffinity(0))
+    return cores_per_node
+
+
+def parse_cpu_list(cpu_list: str) -> list[int]:
+    """
+    Parses a list of cores in the format of the Linux kernel and Docker, e.g., '0-3,8,10-11'.
+    """
+    cores = []
+    for part in cpu_list.strip().split(','):
+        if not part:
+            continue
+        if '-' in part:
+            first, last = part.split('-')
+            cores.extend(range(int(first), int(last) + 1))
+        else:
+            cores.append(int(part))
+    return cores
+
+
+def format_cpu_list(cores) -> str:
+    """
+    Formats the given cores in the format of the Linux kernel and Docker, e.g., '0-3,8,10-11'.
+    """
+    ranges = []
+    for core in sorted(cores):
+        if ranges and core == ranges[-1][1] + 1:
+            ranges[-1][1] = core
+        else:
+            ranges.append([core, core])
+    return ','.join(str(first) if first == last else f'{first}-{last}' for first, last in ranges)
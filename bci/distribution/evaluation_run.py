@@ -0,0 +1,90 @@
+import time
+from dataclasses import dataclass, field
+from typing import Optional
+
+from bson import ObjectId
+
+from bci.distribution.fair_share_scheduler import FairShareScheduler
+from bci.evaluations.logic import EvaluationParameters
+from bci.search_strategy.joint_planner import JointPlanner
+from bci.search_strategy.plan_compiler import EvaluationPlan
+
+# Statuses of runs that will not dispatch any evaluation anymore
+FINISHED_STATUSES = ('done', 'cancelled', 'stopped', 'failed')
+
+
+@dataclass(eq=False)
+class EvaluationRun:
+    """
+    The evaluation of a job that was submitted through the API, of which the experiments share the scheduler with the
+    experiments of the other jobs that are running.
+    """
+
+    job_id: str
+    eval_params_list: list[EvaluationParameters]
+    # One of 'admitting', 'running' or the finished statuses
+    status: str = 'admitting'
+    run_id: Optional[ObjectId] = None
+    scheduler: Optional[FairShareScheduler] = None
+    submitted_ts: float = field(default_factory=time.time)
+    finished_ts: Optional[float] = None
+    finished_experiment_names: set[str] = field(default_factory=set)
+    # Compiled plans of the experiments with an outcome-independent strategy, by experiment name
+    plans: dict[str, EvaluationPlan] = field(default_factory=dict)
+    # Planners that align the splitters of experiments that search the same range
+    joint_planners: list[JointPlanner] = field(default_factory=list)
+
+    def get_experiment_name(self, eval_params: EvaluationParameters) -> str:
+        """
+        Returns the name of the given experiment of this job in the scheduler, which is unique over all jobs.
+        """
+        return f'{self.job_id}/{eval_params.evaluation_range.mech_group}'
+
+    def get_eval_params_per_experiment(self) -> dict[str, EvaluationParameters]:
+        return {self.get_experiment_name(eval_params): eval_params for eval_params in self.eval_params_list}
+
+    def is_finished(self) -> bool:
+        return self.status in FINISHED_STATUSES
+
+    def finish(self, status: str) -> None:
+        self.status = status
+        self.finished_ts = time.time()
+        for plan in self.plans.values():
+            plan.stop()
+
+    def get_progress(self) -> dict:
+        """
+        Returns the status of the job and the number of dispatched, running and finished evaluations per experiment.
+        """
+        experiments = []
+        for name, eval_params in self.get_eval_params_per_experiment().items():
+            statistics = {}
+            if self.scheduler is not None:
+                statistics = self.scheduler.get_statistics(name)
+            if name in self.plans:
+                statistics['plan'] = self.plans[name].get_progress(statistics.get('nb_of_finished_evaluations', 0))
+            experiments.append(
+                {
+                    'experiment': eval_params.evaluation_range.mech_group,
+                    'browser_name': eval_params.browser_configuration.browser_name,
+                    **statistics,
+                    'is_finished': name in self.finished_experiment_names,
+                }
+            )
+        progress = {
+            **self.to_summary(),
+            'experiments': experiments,
+        }
+        if self.joint_planners:
+            progress['splitter_alignment'] = [joint_planner.get_report() for joint_planner in self.joint_planners]
+        return progress
+
+    def to_summary(self) -> dict:
+        return {
+            'job_id': self.job_id,
+            'status': self.status,
+            'submitted_ts': self.submitted_ts,
+            'finished_ts': self.finished_ts,
+            'nb_of_experiments': len(self.get_eval_params_per_experiment()),
+            'nb_of_finished_experiments': len(self.finished_experiment_names),
+        }
@@ -0,0 +1,299 @@
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+from bci.search_strategy.sequence_strategy import SequenceFinished, SequenceNotReady, SequenceStrategy
+from bci.version_control.states.state import State
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ScheduledExperiment:
+    name: str
+    strategy: SequenceStrategy
+    weight: float
+    # Rank of the priority class of the experiment, higher ranks are always handed out first
+    priority_rank: int = 0
+    nb_of_running_evaluations: int = 0
+    nb_of_dispatched_evaluations: int = 0
+    # Incremented whenever an evaluation finishes, since its result might give the strategy new states to evaluate
+    nb_of_finished_evaluations: int = 0
+    # Incremented whenever the strategy might have new states to evaluate, i.e., an evaluation finished or it was woken
+    nb_of_updates: int = 0
+    is_waiting: bool = False
+    is_cancelled: bool = False
+    is_finished: bool = False
+    order: int = 0
+
+    def get_priority(self) -> tuple[int, float, float, int]:
+        # Within a priority class, experiments that occupy the smallest weighted share of the workers go first
+        return (
+            -self.priority_rank,
+            self.nb_of_running_evaluations / self.weight,
+            self.nb_of_dispatched_evaluations / self.weight,
+            self.order,
+        )
+
+
+class FairShareScheduler:
+    """
+    Interleaves the states of the search strategies of multiple experiments, so workers do not sit idle while a
+    strategy waits for the results of its running evaluations.
+    Each experiment receives a share of the workers that is proportional to its weight, after the experiments of
+    higher priority classes are served.
+    """
+
+    def __init__(
+        self,
+        on_experiment_finished: Callable[[str], None] = lambda _: None,
+        on_experiment_failed: Callable[[str], None] = lambda _: None,
+    ) -> None:
+        """
+        Initializes the scheduler.
+
+        :param on_experiment_finished: Called with the name of an experiment once its strategy is exhausted and none of
+        its evaluations are still running.
+        :param on_experiment_failed: Called with the name of an experiment of which the strategy raised an error, after
+        which the experiment is cancelled.
+        """
+        self.on_experiment_finished = on_experiment_finished
+        self.on_experiment_failed = on_experiment_failed
+        self.__experiments: list[ScheduledExperiment] = []
+        # States of running evaluations that have to be evaluated again, which are handed out before any new state
+        self.__requeued: list[tuple[str, State]] = []
+        self.__condition = threading.Condition()
+        self.__stopped = False
+
+    def add(self, name: str, strategy: SequenceStrategy, weight: float = 1, priority_rank: int = 0) -> None:
+        """
+        Adds an experiment to the scheduler.
+
+        :param name: The name of the experiment.
+        :param strategy: The search strategy of the experiment.
+        :param weight: The relative share of the workers the experiment is entitled to.
+        :param priority_rank: The rank of the priority class of the experiment.
+        """
+        if weight <= 0:
+            raise AttributeError(f"Weight of experiment '{name}' should be positive")
+        with self.__condition:
+            self.__experiments.append(
+                ScheduledExperiment(name, strategy, weight, priority_rank, order=len(self.__experiments))
+            )
+            # Experiments can be added while states are being handed out, e.g., when a job is submitted
+            self.__condition.notify_all()
+
+    def next(
+        self, blocking: bool = True, min_priority_rank: int = 0, timeout: Optional[float] = None
+    ) -> Optional[tuple[str, State]]:
+        """
+        Blocks until one of the experiments has a state to evaluate.
+
+        :param blocking: Whether to wait for running evaluations if no experiment has a state to evaluate right away.
+        :param min_priority_rank: Only experiments of a priority class with at least this rank are considered.
+        :param timeout: The maximum number of seconds to wait when blocking.
+        :return: The name of the experiment and the state to evaluate, or None if all experiments are finished, the
+        scheduler was stopped, the timeout expired or, when not blocking, no state is available right away.
+        """
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        while True:
+            with self.__condition:
+                while True:
+                    requeued = self.__get_requeued(min_priority_rank)
+                    candidates = self.__get_candidates(min_priority_rank)
+                    if requeued or candidates:
+                        break
+                    if self.__stopped or all(experiment.is_finished for experiment in self.__experiments):
+                        return None
+                    if not blocking:
+                        return None
+                    if deadline is None:
+                        self.__condition.wait()
+                    elif not self.__condition.wait(deadline - time.monotonic()):
+                        return None
+                if self.__stopped:
+                    return None
+                # Requeued states go before new states of the same or a lower priority class
+                if requeued and (
+                    not candidates
+                    or self.__get_experiment(requeued[0][0]).priority_rank >= candidates[0].priority_rank
+                ):
+                    self.__requeued.remove(requeued[0])
+                    return requeued[0]
+            # Strategies are only called from this thread, so they can be consulted without holding the lock
+            for experiment in candidates:
+                if (state := self.__next_state_of(experiment)) is not None:
+                    return experiment.name, state
+
+    def add_running_evaluation(self, name: str) -> None:
+        """
+        Registers an evaluation of the given experiment that was not dispatched through this scheduler, e.g., one that
+        was taken over after a restart of the core.
+        Its experiment is not finished before the evaluation is reported through `on_evaluation_finished`.
+        """
+        with self.__condition:
+            experiment = self.__get_experiment(name)
+            experiment.nb_of_running_evaluations += 1
+            experiment.nb_of_dispatched_evaluations += 1
+
+    def requeue(self, name: str, state: State) -> None:
+        """
+        Hands out the state of a running evaluation of the given experiment again, since it has to be evaluated anew.
+        The evaluation keeps counting as running until it is reported through `on_evaluation_finished`.
+        """
+        with self.__condition:
+            if not self.__get_experiment(name).is_cancelled:
+                self.__requeued.append((name, state))
+                self.__condition.notify_all()
+                return
+        # States of cancelled experiments are dropped instead, which finishes their evaluation
+        self.on_evaluation_finished(name)
+
+    def on_evaluation_finished(self, name: str, state: Optional[State] = None) -> None:
+        """
+        Reports that an evaluation of the given experiment finished.
+
+        :param name: The name of the experiment.
+        :param state: The state of the evaluation, which is reported to the strategy such that it stops waiting for
+        the evaluation, even if no result was stored.
+        """
+        with self.__condition:
+            experiment = self.__get_experiment(name)
+            if state is not None:
+                # Reported before the strategy is consulted again, which happens once the lock is released
+                experiment.strategy.on_evaluation_finished(state)
+            experiment.nb_of_running_evaluations -= 1
+            experiment.nb_of_finished_evaluations += 1
+            experiment.nb_of_updates += 1
+            experiment.is_waiting = False
+            is_finished = self.__finish_if_cancelled(experiment)
+            self.__condition.notify_all()
+        if is_finished:
+            self.on_experiment_finished(name)
+
+    def wake(self, name: str) -> None:
+        """
+        Consults the strategy of the given experiment again, which should be called by strategies that raised
+        `SequenceNotReady` once they computed new states.
+        """
+        with self.__condition:
+            experiment = self.__get_experiment(name)
+            experiment.nb_of_updates += 1
+            experiment.is_waiting = False
+            self.__condition.notify_all()
+
+    def cancel(self, name: str) -> None:
+        """
+        Stops handing out states of the given experiment, including those that were requeued.
+        The experiment is finished as soon as none of its evaluations are still running.
+        """
+        with self.__condition:
+            experiment = self.__get_experiment(name)
+            experiment.is_cancelled = True
+            # Requeued states count as running evaluations, which are finished by dropping them
+            nb_of_dropped_states = sum(1 for requeued_name, _ in self.__requeued if requeued_name == name)
+            self.__requeued = [(requeued_name, state) for requeued_name, state in self.__requeued if requeued_name != name]
+            experiment.nb_of_running_evaluations -= nb_of_dropped_states
+            experiment.nb_of_finished_evaluations += nb_of_dropped_states
+            is_finished = self.__finish_if_cancelled(experiment)
+            self.__condition.notify_all()
+        if is_finished:
+            self.on_experiment_finished(name)
+
+    def get_statistics(self, name: str) -> dict:
+        """
+        Returns the number of dispatched, running and finished evaluations of the given experiment.
+        """
+        with self.__condition:
+            experiment = self.__get_experiment(name)
+            return {
+                'nb_of_dispatched_evaluations': experiment.nb_of_dispatched_evaluations,
+                'nb_of_running_evaluations': experiment.nb_of_running_evaluations,
+                'nb_of_finished_evaluations': experiment.nb_of_finished_evaluations,
+                'is_cancelled': experiment.is_cancelled,
+                'is_finished': experiment.is_finished,
+            }
+
+    def stop(self) -> None:
+        with self.__condition:
+            self.__stopped = True
+            self.__condition.notify_all()
+
+    def __get_requeued(self, min_priority_rank: int) -> list[tuple[str, State]]:
+        requeued = [
+            (name, state) for name, state in self.__requeued
+            if self.__get_experiment(name).priority_rank >= min_priority_rank
+        ]
+        return sorted(requeued, key=lambda requeued_state: -self.__get_experiment(requeued_state[0]).priority_rank)
+
+    def __get_candidates(self, min_priority_rank: int = 0) -> list[ScheduledExperiment]:
+        candidates = [
+            experiment
+            for experiment in self.__experiments
+            if not experiment.is_finished
+            and not experiment.is_waiting
+            and not experiment.is_cancelled
+            and experiment.priority_rank >= min_priority_rank
+        ]
+        return sorted(candidates, key=lambda experiment: experiment.get_priority())
+
+    def __finish_if_cancelled(self, experiment: ScheduledExperiment) -> bool:
+        """
+        Finishes the given cancelled experiment if none of its evaluations are running, which should be called while
+        holding the lock.
+
+        :return: True if the experiment was finished.
+        """
+        if not experiment.is_cancelled or experiment.is_finished or experiment.nb_of_running_evaluations > 0:
+            return False
+        experiment.is_finished = True
+        logger.info(f"Experiment '{experiment.name}' was cancelled")
+        return True
+
+    def __next_state_of(self, experiment: ScheduledExperiment) -> Optional[State]:
+        with self.__condition:
+            nb_of_updates = experiment.nb_of_updates
+        try:
+            state = experiment.strategy.next()
+        except SequenceNotReady:
+            with self.__condition:
+                # The strategy wakes the experiment once it has computed new states
+                if experiment.nb_of_updates == nb_of_updates:
+                    experiment.is_waiting = True
+            return None
+        except SequenceFinished:
+            with self.__condition:
+                if experiment.is_cancelled:
+                    # Cancelled experiments are finished once their running evaluations are
+                    return None
+                if experiment.nb_of_updates != nb_of_updates:
+                    # An evaluation finished in the meantime, so the strategy should be consulted again
+                    return None
+                if experiment.nb_of_running_evaluations > 0:
+                    # The results of running evaluations might still yield new states
+                    experiment.is_waiting = True
+                    return None
+                experiment.is_finished = True
+            logger.info(f"All evaluations of experiment '{experiment.name}' are done")
+            self.on_experiment_finished(experiment.name)
+            return None
+        except Exception:
+            logger.error(f"Strategy of experiment '{experiment.name}' failed", exc_info=True)
+            # Reported before cancelling, such that the experiment is not considered done once it is finished
+            self.on_experiment_failed(experiment.name)
+            self.cancel(experiment.name)
+            return None
+        with self.__condition:
+            if experiment.is_cancelled:
+                return None
+            experiment.nb_of_running_evaluations += 1
+            experiment.nb_of_dispatched_evaluations += 1
+        return state
+
+    def __get_experiment(self, name: str) -> ScheduledExperiment:
+        for experiment in self.__experiments:
+            if experiment.name == name:
+                return experiment
+        raise AttributeError(f"Unknown experiment '{name}'")
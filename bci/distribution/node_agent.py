@@ -0,0 +1,116 @@
+"""
+Agent that lets a BugHog core dispatch evaluations to this machine.
+The machine should run the regular BugHog stack (including nginx for the experiment pages), configured to use the same
+database as the core. The core is pointed to agents through the BCI_REMOTE_NODES environment variable.
+Requests have to carry the secret in BCI_NODE_AGENT_TOKEN as bearer token, which should be set on the core and on each
+agent. The agent only listens on localhost unless another address is given through `--host`.
+"""
+
+import argparse
+import hmac
+import logging
+import threading
+import uuid
+
+from flask import Flask, request
+
+from bci.distribution.backends.base import ExecutionBackend
+from bci.evaluations.logic import WorkerParameters
+
+logger = logging.getLogger(__name__)
+
+
+def create_agent(backend: ExecutionBackend, token: str, stop_running_evaluations=None) -> Flask:
+    """
+    Creates the agent application.
+
+    :param backend: The backend that performs the evaluations on this machine.
+    :param token: The secret that requests have to carry as bearer token.
+    :param stop_running_evaluations: Called to stop all running evaluations when the core stops forcefully.
+    """
+    if not token:
+        raise AttributeError('The node agent requires a token')
+    agent = Flask(__name__)
+    # Reentrant, since backends can report an evaluation as finished while it is being started
+    lock = threading.RLock()
+    # Maps evaluation identifiers to 'running', 'done' or 'failed'
+    evaluations: dict[str, str] = {}
+
+    def on_finished(evaluation_id: str, success: bool) -> None:
+        with lock:
+            evaluations[evaluation_id] = 'done' if success else 'failed'
+
+    @agent.before_request
+    def authenticate():
+        authorization = request.headers.get('Authorization', '')
+        if not hmac.compare_digest(authorization.encode(), f'Bearer {token}'.encode()):
+            return {'status': 'NOK', 'msg': 'Unauthorized'}, 401
+
+    @agent.route('/capacity/', methods=['GET'])
+    def get_capacity():
+        return {
+            'status': 'OK',
+            'slots': backend.get_nb_of_slots(),
+            'free_slots': backend.get_nb_of_free_slots(),
+            'free_disk': backend.get_free_disk_space(),
+            'cached_binaries': sorted(backend.get_cached_binaries()),
+        }
+
+    @agent.route('/evaluations/', methods=['POST'])
+    def start_evaluation():
+        params = WorkerParameters.deserialize(request.json['params'])
+        evaluation_id = uuid.uuid4().hex
+        # Concurrent requests could otherwise all claim the last free slot
+        with lock:
+            if backend.get_nb_of_free_slots() == 0:
+                return {'status': 'NOK', 'msg': 'No free slot available'}, 503
+            evaluations[evaluation_id] = 'running'
+            try:
+                backend.start(params, lambda success: on_finished(evaluation_id, success))
+            except Exception as e:
+                logger.error(f"Could not start the evaluation of '{params.state}'", exc_info=True)
+                evaluations.pop(evaluation_id, None)
+                return {'status': 'NOK', 'msg': f'Could not start evaluation: {e}'}, 503
+        return {'status': 'OK', 'id': evaluation_id}
+
+    @agent.route('/evaluations/', methods=['GET'])
+    def get_evaluations():
+        evaluation_ids = [evaluation_id for evaluation_id in request.args.get('ids', '').split(',') if evaluation_id]
+        with lock:
+            # Unknown evaluations were lost, e.g., because the agent restarted
+            statuses = {evaluation_id: evaluations.get(evaluation_id, 'failed') for evaluation_id in evaluation_ids}
+            # Finished evaluations are only reported once
+            for evaluation_id, status in statuses.items():
+                if status != 'running':
+                    evaluations.pop(evaluation_id, None)
+        return {'status': 'OK', 'evaluations': statuses}
+
+    @agent.route('/evaluations/stop/', methods=['POST'])
+    def stop_evaluations():
+        backend.cancel_pending()
+        if stop_running_evaluations is not None:
+            stop_running_evaluations()
+        return {'status': 'OK'}
+
+    return agent
+
+
+if __name__ == '__main__':
+    from bci.configuration import Global, Loggers
+    from bci.distribution.worker_manager import WorkerManager
+
+    parser = argparse.ArgumentParser(description='Performs evaluations on behalf of a BugHog core.')
+    parser.add_argument('--host', default='127.0.0.1', help='Address to listen on, e.g., 0.0.0.0 for all interfaces')
+    parser.add_argument('--port', type=int, default=5002)
+    parser.add_argument('--slots', type=int, default=4, help='Number of concurrent evaluations on this machine')
+    args = parser.parse_args()
+    # Single container mode would block the agent, so at least two slots are required
+    if args.slots < 2:
+        parser.error('--slots should be at least 2')
+    if (token := Global.get_node_agent_token()) is None:
+        parser.error('BCI_NODE_AGENT_TOKEN should be set to the secret that is shared with the core')
+
+    Loggers.configure_loggers()
+    local_backend = WorkerManager.create_local_backend(args.slots)
+    agent = create_agent(local_backend, token, WorkerManager.forcefully_stop_all_running_containers)
+    agent.run(host=args.host, port=args.port, threaded=True)
@@ -0,0 +1,210 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+# The number of keys for which the last slot is remembered
+MAX_NB_OF_REMEMBERED_KEYS = 1024
+
+
+@dataclass(frozen=True)
+class SlotLease:
+    slot_id: int
+    lease_id: int
+
+
+class SlotScheduler:
+    """
+    Hands out worker slots to evaluations and takes them back as soon as an evaluation finishes.
+    Waiting for a slot blocks on a condition variable instead of polling, so a freed slot is refilled immediately.
+    """
+
+    def __init__(self, nb_of_slots: int) -> None:
+        """
+        Initializes the scheduler.
+
+        :param nb_of_slots: The number of evaluations that can run concurrently.
+        """
+        self.nb_of_slots = nb_of_slots
+        self.__limit = nb_of_slots
+        self.__condition = threading.Condition()
+        self.__free_slots: list[int] = list(range(nb_of_slots))
+        self.__leases: dict[int, int] = {}
+        self.__lease_counter = 0
+        self.__nb_of_waiters = 0
+        # The slot that was last leased for each key, so retries of a failed evaluation can avoid it
+        self.__last_slot_per_key: OrderedDict[str, int] = OrderedDict()
+
+        now = time.monotonic()
+        self.__idle_since: dict[int, float] = {slot_id: now for slot_id in range(nb_of_slots)}
+        self.__idle_time: dict[int, float] = {slot_id: 0.0 for slot_id in range(nb_of_slots)}
+        # Refills are only measured when a dispatcher was already waiting for the released slot.
+        # The time between release and refill is then pure scheduling overhead.
+        self.__pending_refills: dict[int, float] = {}
+        self.__refill_latencies: dict[int, list[float]] = {slot_id: [] for slot_id in range(nb_of_slots)}
+
+    def acquire(self, timeout: Optional[float] = None, key: Optional[str] = None) -> Optional[SlotLease]:
+        """
+        Blocks until a slot is free and leases it.
+
+        :param timeout: The maximum number of seconds to wait. None means waiting indefinitely.
+        :param key: Identifies the evaluation, such that a retry prefers another slot than the previous attempt.
+        :return: The lease of the acquired slot, or None if the timeout expired.
+        """
+        with self.__condition:
+            self.__nb_of_waiters += 1
+            try:
+                if not self.__condition.wait_for(self.__has_leasable_slot, timeout=timeout):
+                    return None
+            finally:
+                self.__nb_of_waiters -= 1
+            slot_id = self.__pop_free_slot(key)
+            now = time.monotonic()
+            self.__idle_time[slot_id] += now - self.__idle_since.pop(slot_id)
+            if (released_at := self.__pending_refills.pop(slot_id, None)) is not None:
+                self.__refill_latencies[slot_id].append(now - released_at)
+            self.__lease_counter += 1
+            self.__leases[slot_id] = self.__lease_counter
+            return SlotLease(slot_id, self.__lease_counter)
+
+    @contextmanager
+    def waiting(self) -> Iterator[None]:
+        """
+        Registers a dispatcher that waits for a free slot without blocking in `acquire`, e.g., because it waits for the
+        slots of multiple backends at once, such that the refills of slots released in the meantime are measured.
+        """
+        with self.__condition:
+            self.__nb_of_waiters += 1
+        try:
+            yield
+        finally:
+            with self.__condition:
+                self.__nb_of_waiters -= 1
+
+    def __pop_free_slot(self, key: Optional[str]) -> int:
+        if key is None:
+            return self.__free_slots.pop(0)
+        avoided_slot_id = self.__last_slot_per_key.pop(key, None)
+        slot_id = next(
+            (slot_id for slot_id in self.__free_slots if slot_id != avoided_slot_id), self.__free_slots[0]
+        )
+        self.__free_slots.remove(slot_id)
+        self.__last_slot_per_key[key] = slot_id
+        if len(self.__last_slot_per_key) > MAX_NB_OF_REMEMBERED_KEYS:
+            self.__last_slot_per_key.popitem(last=False)
+        return slot_id
+
+    def acquire_slot(self, slot_id: int) -> Optional[SlotLease]:
+        """
+        Leases the given slot if it is free, e.g., to take over a worker that was started before a restart of the core.
+        The concurrency limit is not taken into account, since the worker is running anyway.
+
+        :param slot_id: The slot to lease.
+        :return: The lease of the slot, or None if the slot does not exist or is not free.
+        """
+        with self.__condition:
+            if slot_id not in self.__free_slots:
+                return None
+            self.__free_slots.remove(slot_id)
+            self.__idle_time[slot_id] += time.monotonic() - self.__idle_since.pop(slot_id)
+            self.__lease_counter += 1
+            self.__leases[slot_id] = self.__lease_counter
+            return SlotLease(slot_id, self.__lease_counter)
+
+    def release(self, lease: SlotLease) -> bool:
+        """
+        Returns the leased slot to the pool.
+        Releasing is idempotent: both the container-exit callback and the Docker event stream may report the same exit.
+
+        :param lease: The lease obtained through `acquire`.
+        :return: True if the slot was released by this call, False if it was already released.
+        """
+        with self.__condition:
+            if self.__leases.get(lease.slot_id) != lease.lease_id:
+                return False
+            del self.__leases[lease.slot_id]
+            now = time.monotonic()
+            self.__idle_since[lease.slot_id] = now
+            if self.__nb_of_waiters > 0:
+                self.__pending_refills[lease.slot_id] = now
+            self.__free_slots.append(lease.slot_id)
+            self.__condition.notify_all()
+            return True
+
+    def get_lease(self, slot_id: int) -> Optional[SlotLease]:
+        """
+        Returns the current lease of the given slot, or None if the slot is free.
+        """
+        with self.__condition:
+            if (lease_id := self.__leases.get(slot_id)) is None:
+                return None
+            return SlotLease(slot_id, lease_id)
+
+    def get_nb_of_busy_slots(self) -> int:
+        with self.__condition:
+            return len(self.__leases)
+
+    def get_nb_of_free_slots(self) -> int:
+        """
+        Returns the number of slots that can be leased right away, taking the concurrency limit into account.
+        """
+        with self.__condition:
+            return max(0, min(len(self.__free_slots), self.__limit - len(self.__leases)))
+
+    def get_limit(self) -> int:
+        with self.__condition:
+            return self.__limit
+
+    def set_limit(self, limit: int) -> None:
+        """
+        Limits the number of slots that can be leased at the same time.
+        Lowering the limit does not affect running evaluations, their slots are just not handed out again.
+
+        :param limit: The new limit, which is clamped between 1 and the number of slots.
+        """
+        with self.__condition:
+            self.__limit = max(1, min(limit, self.nb_of_slots))
+            self.__condition.notify_all()
+
+    def __has_leasable_slot(self) -> bool:
+        return bool(self.__free_slots) and len(self.__leases) < self.__limit
+
+    def wait_until_all_released(self, timeout: Optional[float] = None) -> bool:
+        """
+        Blocks until no slot is leased anymore.
+
+        :param timeout: The maximum number of seconds to wait. None means waiting indefinitely.
+        :return: True if all slots are free, False if the timeout expired.
+        """
+        with self.__condition:
+            return self.__condition.wait_for(lambda: not self.__leases, timeout=timeout)
+
+    def get_idle_time_per_slot(self) -> dict[int, float]:
+        """
+        Returns the number of seconds each slot has spent without a running evaluation.
+        """
+        with self.__condition:
+            now = time.monotonic()
+            return {
+                slot_id: idle_time + (now - self.__idle_since[slot_id] if slot_id in self.__idle_since else 0.0)
+                for slot_id, idle_time in self.__idle_time.items()
+            }
+
+    def get_refill_statistics(self) -> dict:
+        """
+        Returns statistics on how fast released slots were handed to a waiting dispatcher.
+        The previous polling approach added up to 8 seconds of dead time per refill (5s poll interval + 3s sleep).
+        """
+        with self.__condition:
+            latencies = [latency for slot_latencies in self.__refill_latencies.values() for latency in slot_latencies]
+        nb_of_refills = len(latencies)
+        return {
+            'nb_of_refills': nb_of_refills,
+            'mean_refill_latency': sum(latencies) / nb_of_refills if nb_of_refills else 0.0,
+            'max_refill_latency': max(latencies, default=0.0),
+        }
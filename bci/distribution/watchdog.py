@@ -0,0 +1,102 @@
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Optional
+
+from bci.distribution.backends.base import ExecutionBackend
+from bci.evaluations.logic import WorkerParameters
+
+logger = logging.getLogger(__name__)
+
+CHECK_INTERVAL = 10
+
+
+@dataclass(eq=False)
+class WatchedEvaluation:
+    params: WorkerParameters
+    backend: ExecutionBackend
+    time_budget: Optional[float]
+    """The number of seconds in which the evaluation should finish, or None if it should not be watched."""
+    nb_of_timeouts: int = 0
+    """The number of earlier attempts of this evaluation that timed out."""
+    priority: int = 0
+    """The rank of the priority class of the evaluation, which is kept when it is requeued."""
+    started_at: float = field(default_factory=time.monotonic)
+    timed_out: bool = False
+
+    def is_overdue(self, now: float) -> bool:
+        return self.time_budget is not None and now - self.started_at > self.time_budget
+
+
+class Watchdog:
+    """
+    Stops evaluations that exceed their time budget, e.g., because a browser hangs, so they do not occupy a worker slot
+    forever.
+    """
+
+    def __init__(self, interval: float = CHECK_INTERVAL) -> None:
+        self.interval = interval
+        self.__evaluations: list[WatchedEvaluation] = []
+        self.__nb_of_timeouts_per_backend: dict[str, int] = {}
+        self.__lock = threading.Lock()
+        self.__stop_event = threading.Event()
+        self.__thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        self.__thread = threading.Thread(target=self.__run, daemon=True)
+        self.__thread.start()
+
+    def stop(self) -> None:
+        self.__stop_event.set()
+        if self.__thread is not None:
+            self.__thread.join()
+            self.__thread = None
+
+    def watch(self, evaluation: WatchedEvaluation) -> None:
+        with self.__lock:
+            self.__evaluations.append(evaluation)
+
+    def unwatch(self, evaluation: WatchedEvaluation) -> None:
+        with self.__lock:
+            if evaluation in self.__evaluations:
+                self.__evaluations.remove(evaluation)
+
+    def get_nb_of_timeouts_per_backend(self) -> dict[str, int]:
+        with self.__lock:
+            return dict(self.__nb_of_timeouts_per_backend)
+
+    def __run(self) -> None:
+        while not self.__stop_event.wait(self.interval):
+            try:
+                self.check()
+            except Exception:
+                logger.error('Could not check running evaluations for timeouts', exc_info=True)
+
+    def check(self, now: Optional[float] = None) -> list[WatchedEvaluation]:
+        """
+        Stops the evaluations that exceeded their time budget.
+
+        :param now: The current time as given by `time.monotonic`.
+        :return: The evaluations that timed out since the previous check.
+        """
+        now = time.monotonic() if now is None else now
+        with self.__lock:
+            overdue = [
+                evaluation
+                for evaluation in self.__evaluations
+                if not evaluation.timed_out and evaluation.is_overdue(now)
+            ]
+            for evaluation in overdue:
+                evaluation.timed_out = True
+                backend_name = evaluation.backend.name
+                self.__nb_of_timeouts_per_backend[backend_name] = self.__nb_of_timeouts_per_backend.get(backend_name, 0) + 1
+
+        for evaluation in overdue:
+            logger.warning(
+                f"Evaluation of '{evaluation.params.state}' on '{evaluation.backend.name}' exceeded its time budget "
+                f'of {evaluation.time_budget:.0f}s'
+            )
+            if not evaluation.backend.kill(evaluation.params):
+                logger.error(f"Backend '{evaluation.backend.name}' could not stop the evaluation of '{evaluation.params.state}'")
+        return overdue
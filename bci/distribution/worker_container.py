@@ -0,0 +1,96 @@
+import logging
+import os
+import shutil
+from typing import Optional
+
+import docker
+import docker.errors
+
+from bci.configuration import Global
+from bci.distribution.cpu_pinning import CoreSet
+
+logger = logging.getLogger(__name__)
+
+BINARIES_FOLDER = '/app/browser/binaries'
+
+
+def get_image() -> str:
+    return f'bughog/worker:{Global.get_tag()}'
+
+
+def get_run_arguments(container_name: str, core_set: Optional[CoreSet] = None) -> dict:
+    """
+    Returns the arguments that are shared by all worker containers started through `containers.run`.
+
+    :param container_name: The name of the worker container.
+    :param core_set: The cores the container is pinned to, if any.
+    """
+    if (host_pwd := os.getenv('HOST_PWD', None)) is None:
+        raise AttributeError('Could not find HOST_PWD environment var')
+    return {
+        **(core_set.get_run_arguments() if core_set is not None else {}),
+        'name': container_name,
+        'hostname': container_name,
+        'shm_size': '2gb',
+        'network': 'bh_net',
+        'mem_limit': '1g',  # To prevent one container from consuming multiple gigs of memory (was the case for a Firefox evaluation)
+        'volumes': [
+            os.path.join(host_pwd, 'config') + ':/app/config:ro',
+            os.path.join(host_pwd, 'browser/binaries/chromium/artisanal') + ':/app/browser/binaries/chromium/artisanal:rw',
+            os.path.join(host_pwd, 'browser/binaries/firefox/artisanal') + ':/app/browser/binaries/firefox/artisanal:rw',
+            os.path.join(host_pwd, 'browser/availability') + ':/app/browser/availability:rw',
+            os.path.join(host_pwd, 'experiments') + ':/app/experiments:ro',
+            os.path.join(host_pwd, 'browser/extensions') + ':/app/browser/extensions:ro',
+            os.path.join(host_pwd, 'logs') + ':/app/logs:rw',
+            os.path.join(host_pwd, 'nginx/ssl') + ':/etc/nginx/ssl:ro',
+            '/dev/shm:/dev/shm',
+        ],
+    }
+
+
+def remove_containers_with_name(client: docker.DockerClient, container_name: str) -> None:
+    """
+    Removes any container with the given name, so a new container can take over the name.
+    """
+    # Sometimes, it takes a while for Docker to remove the container
+    while True:
+        # Get all containers with same name
+        active_containers = client.containers.list(
+            all=True,
+            ignore_removed=True,
+            filters={
+                'name': f'^/{container_name}$'  # The exact name has to match
+            },
+        )
+        # Break loop if no container with same name is active
+        if not active_containers:
+            break
+        # Remove all containers with same name (never higher than 1 in practice)
+        for container in active_containers:
+            logger.info(f'Removing old container \'{container.attrs["Name"]}\' to start new one')
+            try:
+                container.remove(force=True)
+            except docker.errors.NotFound:
+                pass
+
+
+def get_cached_binaries() -> set[str]:
+    """
+    Returns the artisanal binaries that are shared with the worker containers, formatted as '<browser name>/<state name>'.
+    """
+    cached_binaries = set()
+    for browser in ['chromium', 'firefox']:
+        folder = os.path.join(BINARIES_FOLDER, browser, 'artisanal')
+        if not os.path.isdir(folder):
+            continue
+        cached_binaries.update(
+            f'{browser}/{entry}' for entry in os.listdir(folder) if os.path.isdir(os.path.join(folder, entry))
+        )
+    return cached_binaries
+
+
+def get_free_disk_space() -> Optional[int]:
+    try:
+        return shutil.disk_usage(BINARIES_FOLDER).free
+    except FileNotFoundError:
+        return None
@@ -1,124 +1,375 @@
+import heapq
+import itertools
 import logging
-import os
 import threading
-import time
-from queue import Queue
+from contextlib import ExitStack
+from typing import Callable, Optional
 
 import docker
 import docker.errors
 
-from bci import worker
 from bci.configuration import Global
-from bci.evaluations.logic import WorkerParameters
+from bci.distribution.backends.base import ExecutionBackend
+from bci.distribution.backends.container import ContainerBackend
+from bci.distribution.backends.inline import InlineBackend
+from bci.distribution.backends.pool import PoolBackend
+from bci.distribution.backends.process import ProcessBackend
+from bci.distribution.backends.remote import NodeUnavailable, RemoteNodeBackend
+from bci.distribution.concurrency_controller import ConcurrencyController
+from bci.distribution.watchdog import WatchedEvaluation, Watchdog
+from bci.evaluations.logic import PRIORITY_CLASSES, WorkerParameters
 from bci.web.clients import Clients
 
 logger = logging.getLogger(__name__)
 
+# The number of times an evaluation is started again after exceeding its time budget
+MAX_NB_OF_RETRIES_AFTER_TIMEOUT = 2
+
 
 class WorkerManager:
+    """
+    Dispatches evaluations over the local execution backend and the remote nodes that are configured.
+    """
+
     def __init__(self, max_nb_of_containers: int) -> None:
         self.max_nb_of_containers = max_nb_of_containers
+        local_backend = WorkerManager.create_local_backend(max_nb_of_containers)
+        self.backends: list[ExecutionBackend] = [local_backend]
+        for url in Global.get_remote_nodes():
+            logger.info(f"Dispatching evaluations to remote node '{url}' as well")
+            self.backends.append(RemoteNodeBackend(url, Global.get_node_agent_token()))
+
+        self.nb_of_interactive_slots = Global.get_nb_of_interactive_slots()
+        self.__dispatch_lock = threading.Lock()
+        self.__condition = threading.Condition()
+        # Tickets of the evaluations that wait for a free slot, of which the smallest is served first
+        self.__waiting: list[tuple[int, int]] = []
+        self.__tickets = itertools.count()
+        self.__nb_of_running_evaluations = 0
+        self.__is_cancelled = False
+        for backend in self.backends:
+            backend.on_capacity_changed = self.__notify_dispatcher
+
+        self.watchdog = Watchdog()
+        self.watchdog.start()
+
+        self.concurrency_controller = WorkerManager.create_concurrency_controller(local_backend, max_nb_of_containers)
+        if self.concurrency_controller is not None:
+            self.concurrency_controller.start()
 
-        if self.max_nb_of_containers == 1:
+    @staticmethod
+    def create_local_backend(nb_of_slots: int) -> ExecutionBackend:
+        if nb_of_slots == 1:
             logger.info('Running in single container mode')
-        else:
-            self.container_id_pool = Queue(maxsize=max_nb_of_containers)
-            for i in range(max_nb_of_containers):
-                self.container_id_pool.put(i)
-            self.client = docker.from_env()
-
-    def start_test(self, params: WorkerParameters, blocking_wait=True) -> None:
-        if self.max_nb_of_containers != 1:
-            return self.__run_container(params, blocking_wait)
-
-        # Single container mode
-        worker.run(params)
+            return InlineBackend()
+        if Global.get_target_utilization() is not None:
+            # The concurrency controller can grow the number of concurrent evaluations up to the maximum
+            nb_of_slots = max(nb_of_slots, Global.get_max_nb_of_workers())
+        match Global.get_worker_mode():
+            case 'pool':
+                return PoolBackend(nb_of_slots, Global.get_worker_recycle_limit(), Global.get_pipeline_look_ahead())
+            case 'process':
+                return ProcessBackend(nb_of_slots)
+            case _:
+                return ContainerBackend(nb_of_slots)
+
+    @staticmethod
+    def create_concurrency_controller(backend: ExecutionBackend, nb_of_slots: int) -> Optional[ConcurrencyController]:
+        """
+        Returns a controller that adapts the number of concurrent evaluations of the given backend to the load of the
+        host, starting from the given number of slots, or None if this is not configured.
+        """
+        target_utilization = Global.get_target_utilization()
+        if target_utilization is None or (slot_scheduler := backend.get_slot_scheduler()) is None:
+            return None
+        slot_scheduler.set_limit(nb_of_slots)
+        return ConcurrencyController(
+            slot_scheduler, target_utilization, on_limit_increased=lambda: backend.on_capacity_changed()
+        )
+
+    def start_test(
+        self,
+        params: WorkerParameters,
+        blocking_wait=True,
+        on_finished: Optional[Callable[[bool], None]] = None,
+        time_budget: Optional[float] = None,
+        priority: int = 0,
+    ) -> None:
+        """
+        Starts the evaluation of the given parameters on the most suitable backend, waiting for a free slot if needed.
+
+        :param params: The parameters of the evaluation.
+        :param blocking_wait: Whether to wait for a free slot, otherwise `NoSlotAvailable` is raised.
+        :param on_finished: Called with the success of the evaluation once it has finished.
+        :param time_budget: The number of seconds after which the evaluation is stopped and started again, or None if
+        it can take as long as it needs.
+        :param priority: The rank of the priority class of the evaluation in `PRIORITY_CLASSES`. Evaluations that wait
+        for a slot are started in order of priority, and only those above 'batch' can occupy the interactive slots.
+        """
+        self.__dispatch(params, blocking_wait, on_finished, time_budget, priority)
+
+    def prefetch(self, params: WorkerParameters) -> bool:
+        """
+        Prepares the evaluation of the given parameters in advance, which the caller starts next through `start_test`.
+        This only has an effect when evaluations are performed inline, since those block the caller. With remote nodes,
+        the evaluation might be started elsewhere, so it is not prepared locally.
+
+        :return: True if the evaluation is being prepared.
+        """
+        if len(self.backends) > 1:
+            return False
+        return self.backends[0].prefetch(params)
+
+    def __dispatch(
+        self,
+        params: WorkerParameters,
+        blocking_wait: bool,
+        on_finished: Optional[Callable[[bool], None]],
+        time_budget: Optional[float],
+        priority: int = 0,
+        nb_of_timeouts: int = 0,
+    ) -> None:
+        # Waiting evaluations get a free slot in order of priority, and in order of arrival within the same priority
+        ticket = (-priority, next(self.__tickets))
+        with self.__condition:
+            heapq.heappush(self.__waiting, ticket)
+        try:
+            while True:
+                backend = self.__wait_for_backend(params, blocking_wait, ticket, priority)
+                # Only one dispatcher at a time, so a selected backend cannot run out of free slots before it is started
+                with self.__dispatch_lock:
+                    with self.__condition:
+                        self.__nb_of_running_evaluations += 1
+                    evaluation = WatchedEvaluation(params, backend, time_budget, nb_of_timeouts, priority=priority)
+                    self.watchdog.watch(evaluation)
+                    try:
+                        backend.start(
+                            params,
+                            lambda success, evaluation=evaluation: self.__on_evaluation_finished(
+                                evaluation, success, on_finished
+                            ),
+                        )
+                        return
+                    except NodeUnavailable:
+                        logger.warning(f"Could not dispatch '{params.state}' to '{backend.name}', trying another backend")
+                        self.watchdog.unwatch(evaluation)
+                        with self.__condition:
+                            self.__nb_of_running_evaluations -= 1
+        finally:
+            with self.__condition:
+                self.__waiting.remove(ticket)
+                heapq.heapify(self.__waiting)
+                self.__condition.notify_all()
+
+    def reattach(
+        self,
+        params: WorkerParameters,
+        on_finished: Optional[Callable[[bool], None]] = None,
+        time_budget: Optional[float] = None,
+    ) -> bool:
+        """
+        Takes over an evaluation that was started before the core restarted, if one of the backends is still running it.
+
+        :param params: The parameters of the evaluation.
+        :param on_finished: Called with the success of the evaluation once it has finished.
+        :param time_budget: The number of seconds from now after which the evaluation is stopped and started again.
+        :return: True if the evaluation was taken over.
+        """
+        with self.__dispatch_lock:
+            for backend in self.backends:
+                with self.__condition:
+                    self.__nb_of_running_evaluations += 1
+                evaluation = WatchedEvaluation(params, backend, time_budget)
+                self.watchdog.watch(evaluation)
+                if backend.reattach(
+                    params,
+                    lambda success, evaluation=evaluation: self.__on_evaluation_finished(evaluation, success, on_finished),
+                ):
+                    return True
+                self.watchdog.unwatch(evaluation)
+                with self.__condition:
+                    self.__nb_of_running_evaluations -= 1
+        return False
+
+    def wait_for_free_slot(self, timeout: Optional[float] = None) -> Optional[int]:
+        """
+        Blocks until a slot is free, such that the state to evaluate can be chosen once it can be started right away.
+
+        :param timeout: The maximum number of seconds to wait.
+        :return: The rank of the lowest priority class that can be started right away, or None if no slot became free
+        in time.
+        """
+        with self.__condition, self.__waiting_for_slots():
+            self.__condition.wait_for(lambda: self.__get_lowest_startable_priority() is not None, timeout)
+            return self.__get_lowest_startable_priority()
+
+    def __waiting_for_slots(self) -> ExitStack:
+        """
+        Registers the caller as waiting for the local slots of all backends, which then measure how fast released slots
+        are refilled.
+        """
+        stack = ExitStack()
+        for backend in self.backends:
+            if (slot_scheduler := backend.get_slot_scheduler()) is not None:
+                stack.enter_context(slot_scheduler.waiting())
+        return stack
+
+    def __get_lowest_startable_priority(self) -> Optional[int]:
+        if not any(backend.get_nb_of_free_slots() > 0 for backend in self.backends):
+            return None
+        return 0 if self.__has_unreserved_slot() else len(PRIORITY_CLASSES) - 1
+
+    def __has_unreserved_slot(self) -> bool:
+        """
+        Returns whether a free slot is left after reserving the interactive slots, which batch evaluations can occupy.
+        """
+        nb_of_slots = sum(backend.get_nb_of_slots() for backend in self.backends)
+        nb_of_reserved_slots = min(self.nb_of_interactive_slots, nb_of_slots - 1)
+        return sum(backend.get_nb_of_free_slots() for backend in self.backends) > nb_of_reserved_slots
+
+    def __wait_for_backend(
+        self, params: WorkerParameters, blocking_wait: bool, ticket: tuple[int, int], priority: int
+    ) -> ExecutionBackend:
+        with self.__condition, self.__waiting_for_slots():
+            while self.__waiting[0] != ticket or (backend := self.__select_backend(params, priority)) is None:
+                if not blocking_wait:
+                    raise NoSlotAvailable()
+                self.__condition.wait()
+            return backend
+
+    def __select_backend(self, params: WorkerParameters, priority: int) -> Optional[ExecutionBackend]:
+        """
+        Selects the backend with a free slot that is best suited for the given evaluation.
+        Backends that already hold the required binary are preferred, followed by the least loaded backends and those
+        with the most free disk space.
+        """
+        if priority == 0 and not self.__has_unreserved_slot():
+            return None
+        candidates = [backend for backend in self.backends if backend.get_nb_of_free_slots() > 0]
+        if not candidates:
+            return None
+        return max(
+            candidates,
+            key=lambda backend: (
+                backend.has_cached_binary(params.state),
+                backend.get_nb_of_free_slots() / max(1, backend.get_nb_of_slots()),
+                backend.get_free_disk_space() or 0,
+            ),
+        )
+
+    def __notify_dispatcher(self) -> None:
+        with self.__condition:
+            self.__condition.notify_all()
+
+    def __on_evaluation_finished(
+        self,
+        evaluation: WatchedEvaluation,
+        success: bool,
+        on_finished: Optional[Callable[[bool], None]],
+    ) -> None:
+        params, backend = evaluation.params, evaluation.backend
+        self.watchdog.unwatch(evaluation)
+        if evaluation.timed_out and self.__requeue(evaluation, on_finished):
+            return
+        if not success:
+            logger.error(f"Evaluation of '{params.state}' on '{backend.name}' did not finish successfully")
+        if on_finished is not None:
+            on_finished(success)
+        with self.__condition:
+            self.__nb_of_running_evaluations -= 1
+            self.__condition.notify_all()
         Clients.push_results_to_all()
 
-    def __run_container(self, params: WorkerParameters, blocking_wait=True) -> None:
-        while blocking_wait and self.get_nb_of_running_worker_containers() >= self.max_nb_of_containers:
-            time.sleep(5)
-        container_id = self.container_id_pool.get()
-        container_name = f'bh_worker_{container_id}'
+    def __requeue(self, evaluation: WatchedEvaluation, on_finished: Optional[Callable[[bool], None]]) -> bool:
+        """
+        Starts an evaluation that exceeded its time budget again, unless it timed out too often already.
+        The evaluation keeps counting as running, so waiting for all evaluations includes the requeued one.
 
-        def start_container_thread():
+        :return: True if the evaluation was requeued.
+        """
+        nb_of_timeouts = evaluation.nb_of_timeouts + 1
+        if self.__is_cancelled or nb_of_timeouts > MAX_NB_OF_RETRIES_AFTER_TIMEOUT:
+            logger.error(f"Giving up on '{evaluation.params.state}' after {nb_of_timeouts} timeout(s)")
+            return False
+        logger.info(f"Requeueing '{evaluation.params.state}' after {nb_of_timeouts} timeout(s)")
+
+        def dispatch():
             try:
-                # Sometimes, it takes a while for Docker to remove the container
-                while True:
-                    # Get all containers with same name
-                    active_containers = self.client.containers.list(
-                        all=True,
-                        ignore_removed=True,
-                        filters={
-                            'name': f'^/{container_name}$'  # The exact name has to match
-                        },
-                    )
-                    # Break loop if no container with same name is active
-                    if not active_containers:
-                        break
-                    # Remove all containers with same name (never higher than 1 in practice)
-                    for container in active_containers:
-                        logger.info(f'Removing old container \'{container.attrs["Name"]}\' to start new one')
-                        container.remove(force=True)
-                if (host_pwd := os.getenv('HOST_PWD', None)) is None:
-                    raise AttributeError('Could not find HOST_PWD environment var')
-                self.client.containers.run(
-                    f'bughog/worker:{Global.get_tag()}',
-                    name=container_name,
-                    hostname=container_name,
-                    shm_size='2gb',
-                    network='bh_net',
-                    mem_limit='1g',  # To prevent one container from consuming multiple gigs of memory (was the case for a Firefox evaluation)
-                    detach=False,
-                    remove=True,
-                    labels=['bh_worker'],
-                    command=[params.serialize()],
-                    volumes=[
-                        os.path.join(host_pwd, 'config') + ':/app/config:ro',
-                        os.path.join(host_pwd, 'browser/binaries/chromium/artisanal')
-                        + ':/app/browser/binaries/chromium/artisanal:rw',
-                        os.path.join(host_pwd, 'browser/binaries/firefox/artisanal')
-                        + ':/app/browser/binaries/firefox/artisanal:rw',
-                        os.path.join(host_pwd, 'experiments') + ':/app/experiments:ro',
-                        os.path.join(host_pwd, 'browser/extensions') + ':/app/browser/extensions:ro',
-                        os.path.join(host_pwd, 'logs') + ':/app/logs:rw',
-                        os.path.join(host_pwd, 'nginx/ssl') + ':/etc/nginx/ssl:ro',
-                        '/dev/shm:/dev/shm',
-                    ],
-                )
-                logger.debug(f"Container '{container_name}' finished experiments for '{params.state}'")
-                Clients.push_results_to_all()
-            except docker.errors.ContainerError:
-                logger.error(
-                    f"Could not run container '{container_name}' or container was unexpectedly removed", exc_info=True
+                self.__dispatch(
+                    evaluation.params, True, on_finished, evaluation.time_budget, evaluation.priority, nb_of_timeouts
                 )
             finally:
-                self.container_id_pool.put(container_id)
+                with self.__condition:
+                    self.__nb_of_running_evaluations -= 1
+                    self.__condition.notify_all()
 
-        thread = threading.Thread(target=start_container_thread)
-        thread.start()
-        logger.info(f"Container '{container_name}' started experiments for '{params.state}'")
-        # To avoid race-condition where more than max containers are started
-        time.sleep(3)
+        # The finish callback runs on a thread of the backend, which should not wait for a free slot
+        threading.Thread(target=dispatch, daemon=True).start()
+        return True
 
     def get_nb_of_running_worker_containers(self):
         return len(self.get_runnning_containers())
 
     @staticmethod
     def get_runnning_containers():
-        return docker.from_env().containers.list(
-            filters={'label': 'bh_worker', 'status': 'running'}, ignore_removed=True
-        )
+        try:
+            client = docker.from_env()
+        except docker.errors.DockerException:
+            # Worker processes do not require access to Docker
+            logger.debug('Could not connect to Docker to list worker containers')
+            return []
+        return client.containers.list(filters={'label': 'bh_worker', 'status': 'running'}, ignore_removed=True)
+
+    def get_slot_statistics(self) -> dict:
+        """
+        Returns the idle time per slot, how fast freed slots were refilled and how many evaluations timed out, per
+        backend.
+        """
+        nb_of_timeouts_per_backend = self.watchdog.get_nb_of_timeouts_per_backend()
+        return {
+            backend.name: {
+                **backend.get_slot_statistics(),
+                'nb_of_timeouts': nb_of_timeouts_per_backend.get(backend.name, 0),
+            }
+            for backend in self.backends
+        }
 
     def wait_until_all_evaluations_are_done(self):
-        if self.max_nb_of_containers == 1:
-            return
-        while True:
-            if self.get_nb_of_running_worker_containers() == 0:
-                break
-            time.sleep(5)
+        with self.__condition:
+            self.__condition.wait_for(lambda: self.__nb_of_running_evaluations == 0)
+        for name, statistics in self.get_slot_statistics().items():
+            if statistics['nb_of_timeouts'] > 0:
+                logger.warning(f"{statistics['nb_of_timeouts']} evaluation(s) on '{name}' exceeded their time budget")
+            if 'nb_of_refills' not in statistics:
+                continue
+            logger.info(
+                f"Slots of '{name}' were refilled {statistics['nb_of_refills']} times with a mean latency of "
+                f"{statistics['mean_refill_latency'] * 1000:.1f}ms"
+            )
+
+    def cancel_pending_evaluations(self) -> None:
+        """
+        Cancels evaluations that were submitted but not finished yet, as part of a forced stop.
+        """
+        self.__is_cancelled = True
+        for backend in self.backends:
+            backend.cancel_pending()
+
+    def shutdown(self) -> None:
+        """
+        Releases the resources that outlive a single evaluation, such as the warm worker pool.
+        """
+        self.watchdog.stop()
+        if self.concurrency_controller is not None:
+            self.concurrency_controller.stop()
+        for backend in self.backends:
+            backend.shutdown()
 
     @staticmethod
     def forcefully_stop_all_running_containers():
         for container in WorkerManager.get_runnning_containers():
             container.remove(force=True)
+
+
+class NoSlotAvailable(Exception):
+    pass
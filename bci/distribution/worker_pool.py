@@ -0,0 +1,144 @@
+import logging
+import threading
+import uuid
+from typing import Callable, Optional
+
+import docker
+import docker.errors
+from bson import ObjectId
+
+from bci.database.mongo.worker_job_queue import WorkerJobQueue
+from bci.distribution import worker_container
+from bci.distribution.cpu_pinning import CoreSet, create_cpu_pinning
+from bci.evaluations.logic import DatabaseParameters, WorkerParameters
+
+logger = logging.getLogger(__name__)
+
+# Interval at which the job queue is checked for finished jobs
+MONITOR_INTERVAL = 0.25
+
+
+class WarmWorkerPool:
+    """
+    A pool of long-lived worker containers that pull evaluations from a job queue.
+    This avoids paying the container start-up cost (imports, database connection, Xvfb) for every evaluation.
+    Each worker is replaced by a fresh one after performing `recycle_limit` evaluations.
+    """
+
+    def __init__(
+        self,
+        nb_of_workers: int,
+        recycle_limit: int,
+        database_params: DatabaseParameters,
+        on_job_finished: Callable[[ObjectId, bool], None],
+        look_ahead: int = 0,
+    ) -> None:
+        """
+        Initializes the pool without starting any worker.
+
+        :param nb_of_workers: The number of concurrently running worker containers.
+        :param recycle_limit: The number of evaluations after which a worker container is replaced.
+        :param database_params: The database the workers should connect to.
+        :param on_job_finished: Called with the job identifier and its success once a job has finished.
+        :param look_ahead: The number of upcoming jobs a busy worker can claim to prepare their binary in advance.
+        """
+        self.pool_id = uuid.uuid4().hex
+        self.nb_of_workers = nb_of_workers
+        self.recycle_limit = recycle_limit
+        self.database_params = database_params
+        self.on_job_finished = on_job_finished
+        self.look_ahead = look_ahead
+        self.cpu_pinning = create_cpu_pinning(nb_of_workers)
+        self.client = docker.from_env()
+        self.__stopped = threading.Event()
+        self.__threads: list[threading.Thread] = []
+        self.__monitor_thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        for worker_id in range(self.nb_of_workers):
+            core_set = self.cpu_pinning.get_core_set(worker_id) if self.cpu_pinning is not None else None
+            thread = threading.Thread(target=self.__keep_worker_alive, args=[f'bh_pool_worker_{worker_id}', core_set])
+            thread.start()
+            self.__threads.append(thread)
+        self.__monitor_thread = threading.Thread(target=self.__monitor_finished_jobs, daemon=True)
+        self.__monitor_thread.start()
+        logger.info(f'Started warm worker pool with {self.nb_of_workers} workers')
+
+    def submit(self, params: WorkerParameters) -> ObjectId:
+        return WorkerJobQueue.submit(self.pool_id, params)
+
+    def kill_job(self, job_id: ObjectId) -> bool:
+        """
+        Stops the given job by replacing the worker that performs it, or cancels it if no worker claimed it yet.
+
+        :return: True if the job is being stopped, False if it already finished.
+        """
+        if WorkerJobQueue.cancel_pending_job(job_id):
+            return True
+        if (worker_name := WorkerJobQueue.get_worker_of_running_job(job_id)) is None:
+            return False
+        logger.info(f"Replacing pooled worker '{worker_name}' to stop job '{job_id}'")
+        # The keeper thread marks the job as failed once the worker has exited
+        worker_container.remove_containers_with_name(self.client, worker_name)
+        return True
+
+    def cancel_pending_jobs(self) -> None:
+        WorkerJobQueue.cancel_pending_jobs(self.pool_id)
+
+    def stop(self) -> None:
+        """
+        Stops all workers of the pool and removes its remaining jobs.
+        """
+        self.__stopped.set()
+        # A keeper thread might just have started a new container, so we keep removing until all of them returned
+        while any(thread.is_alive() for thread in self.__threads):
+            for worker_id in range(self.nb_of_workers):
+                worker_container.remove_containers_with_name(self.client, f'bh_pool_worker_{worker_id}')
+            for thread in self.__threads:
+                thread.join(timeout=1)
+        # The monitor might still be reporting, which must finish before the final report to not report jobs twice
+        if self.__monitor_thread is not None:
+            self.__monitor_thread.join()
+        self.__report_finished_jobs()
+        WorkerJobQueue.clear(self.pool_id)
+        logger.info('Stopped warm worker pool')
+
+    def __keep_worker_alive(self, container_name: str, core_set: Optional[CoreSet]) -> None:
+        while not self.__stopped.is_set():
+            try:
+                worker_container.remove_containers_with_name(self.client, container_name)
+                self.client.containers.run(
+                    worker_container.get_image(),
+                    detach=False,
+                    remove=True,
+                    labels={'bh_worker': '', 'bh_pool': self.pool_id},
+                    command=[
+                        '--pool',
+                        self.pool_id,
+                        self.database_params.serialize(),
+                        str(self.recycle_limit),
+                        str(self.look_ahead),
+                    ],
+                    **worker_container.get_run_arguments(container_name, core_set),
+                )
+                logger.debug(f"Pooled worker '{container_name}' is recycled")
+            except (docker.errors.ContainerError, docker.errors.NotFound):
+                if not self.__stopped.is_set():
+                    logger.error(f"Pooled worker '{container_name}' exited unexpectedly", exc_info=True)
+            # Jobs that were still running on the exited worker will never finish
+            nb_of_failed_jobs, nb_of_requeued_jobs = WorkerJobQueue.release_jobs_of_worker(self.pool_id, container_name)
+            if nb_of_failed_jobs > 0:
+                logger.warning(f"Marked {nb_of_failed_jobs} job(s) of '{container_name}' as failed")
+            if nb_of_requeued_jobs > 0:
+                logger.info(f"Requeued {nb_of_requeued_jobs} job(s) that '{container_name}' claimed in advance")
+
+    def __monitor_finished_jobs(self) -> None:
+        while not self.__stopped.wait(MONITOR_INTERVAL):
+            try:
+                self.__report_finished_jobs()
+            except Exception:
+                logger.error('Could not check job queue for finished jobs', exc_info=True)
+
+    def __report_finished_jobs(self) -> None:
+        for job in WorkerJobQueue.pop_finished_jobs(self.pool_id):
+            self.on_job_finished(job['_id'], job['status'] == 'done')
@@ -1,3 +1,5 @@
+from bci.configuration import Global
+
 from .base import BaseCollector
 
 
@@ -8,13 +10,13 @@ class LogCollector(BaseCollector):
         self.data['log_vars'] = []
 
     def start(self):
-        with open('/tmp/browser.log', 'w') as file:
+        with open(Global.get_browser_log_path(), 'w') as file:
             file.write('')
 
     def stop(self):
         data = []
         regex = r'\+\+\+bughog_(.+)=(.+)\+\+\+'
-        with open('/tmp/browser.log', 'r+') as log_file:
+        with open(Global.get_browser_log_path(), 'r+') as log_file:
             log_lines = [line for line in log_file.readlines()]
             log_file.write('')
         data = self._parse_bughog_variables(log_lines, regex)
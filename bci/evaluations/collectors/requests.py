@@ -5,12 +5,12 @@ import socket
 import socketserver
 from threading import Thread
 
+from bci.configuration import Global
+
 from .base import BaseCollector
 
 logger = logging.getLogger(__name__)
 
-PORT = 5001
-
 
 class RequestHandler(http.server.BaseHTTPRequestHandler):
     """
@@ -66,7 +66,7 @@ class RequestCollector(BaseCollector):
     def start(self):
         logger.debug('Starting collector...')
         socketserver.TCPServer.allow_reuse_address = True
-        self.__httpd = socketserver.TCPServer(('', PORT), lambda *args, **kwargs: RequestHandler(self, *args, **kwargs))
+        self.__httpd = socketserver.TCPServer(('', Global.get_collector_port()), lambda *args, **kwargs: RequestHandler(self, *args, **kwargs))
         # self.__httpd.allow_reuse_address = True
         self.__thread = Thread(target=self.__httpd.serve_forever)
         self.__thread.start()
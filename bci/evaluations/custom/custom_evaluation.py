@@ -4,6 +4,7 @@ import textwrap
 
 from bci.browser.configuration.browser import Browser
 from bci.configuration import Global
+from bci.database.mongo.evaluation_failures import EvaluationFailures
 from bci.evaluations.collectors.collector import Collector, Type
 from bci.evaluations.evaluation_framework import EvaluationFramework
 from bci.evaluations.logic import TestParameters, TestResult
@@ -11,6 +12,8 @@ from bci.web.clients import Clients
 
 logger = logging.getLogger(__name__)
 
+NB_OF_TRIES_PER_URL = 3
+
 
 class CustomEvaluationFramework(EvaluationFramework):
     def __init__(self):
@@ -78,6 +81,10 @@ class CustomEvaluationFramework(EvaluationFramework):
             return False
         return True
 
+    def get_nb_of_visits(self, params: TestParameters) -> int:
+        url_queue = self.tests_per_project[params.evaluation_configuration.project][params.mech_group]['url_queue']
+        return len(url_queue) * NB_OF_TRIES_PER_URL
+
     def perform_specific_evaluation(self, browser: Browser, params: TestParameters) -> TestResult:
         logger.info(f'Starting test for {params}')
         browser_version = browser.version
@@ -87,16 +94,18 @@ class CustomEvaluationFramework(EvaluationFramework):
         collector.start()
 
         is_dirty = False
+        failure_class = None
         try:
             url_queue = self.tests_per_project[params.evaluation_configuration.project][params.mech_group]['url_queue']
             for url in url_queue:
                 tries = 0
-                while tries < 3:
+                while tries < NB_OF_TRIES_PER_URL:
                     tries += 1
                     browser.visit(url)
         except Exception as e:
             logger.error(f'Error during test: {e}', exc_info=True)
             is_dirty = True
+            failure_class = 'browser_crash'
         finally:
             collector.stop()
             results = collector.collect_results()
@@ -113,6 +122,9 @@ class CustomEvaluationFramework(EvaluationFramework):
                     pass
                 else:
                     is_dirty = True
+                    failure_class = 'sanity_failure'
+        if failure_class is not None:
+            EvaluationFailures.record(params, failure_class)
         return params.create_test_result_with(browser_version, binary_origin, results, is_dirty)
 
     def get_mech_groups(self, project: str) -> list[tuple[str, bool]]:
@@ -1,53 +1,138 @@
 import logging
 import os
-import traceback
 from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Optional
 
 from bci.browser.configuration.browser import Browser
 from bci.configuration import Global
+from bci.database.mongo.evaluation_failures import EvaluationFailures
 from bci.database.mongo.mongodb import MongoDB
 from bci.evaluations.logic import TestParameters, TestResult, WorkerParameters
 from bci.version_control.states.state import StateCondition
 
 logger = logging.getLogger(__name__)
 
+# Seconds allowed for fetching the binary and preparing its execution folder
+BINARY_FETCH_ALLOWANCE = 300
+# Seconds allowed per visit on top of `seconds_per_visit`, for starting and terminating the browser
+VISIT_ALLOWANCE = 15
+
+
+@dataclass
+class PreparedEvaluation:
+    """
+    An evaluation of which the binary is in place, such that its tests can be performed right away.
+    """
+
+    browser: Browser
+    test_params_list: list[TestParameters]
+    # Browser with the configuration of the first test, of which the profile is prepared in advance
+    first_browser: Browser
+
 
 class EvaluationFramework(ABC):
     def __init__(self):
         self.should_stop = False
 
     def evaluate(self, worker_params: WorkerParameters):
-        test_params = worker_params.create_test_params()
-
-        if MongoDB().has_result(test_params):
-            logger.warning(
-                f"Experiment '{test_params.mech_group}' for '{test_params.state}' was already performed, skipping."
-            )
+        """
+        Performs all tests of the given worker parameters, for which the binary is prepared only once.
+        """
+        if (prepared := self.prepare(worker_params)) is None:
             return
+        try:
+            self.perform(prepared)
+        finally:
+            self.cleanup(prepared)
+        logger.debug('Evaluation finished')
+
+    def prepare(self, worker_params: WorkerParameters) -> Optional[PreparedEvaluation]:
+        """
+        Fetches the binary of the given worker parameters and prepares its execution folder and the profile of the
+        first test, such that the tests can be performed right away.
+
+        :return: The prepared evaluation, or None if all tests were already performed.
+        """
+        test_params_list = []
+        for test_params in worker_params.create_test_params_list():
+            if MongoDB().has_result(test_params):
+                logger.warning(
+                    f"Experiment '{test_params.mech_group}' for '{test_params.state}' was already performed, skipping."
+                )
+            else:
+                test_params_list.append(test_params)
+        if not test_params_list:
+            return None
 
-        browser_config = worker_params.browser_configuration
         eval_config = worker_params.evaluation_configuration
         state = worker_params.state
-        browser = Browser.get_browser(browser_config, eval_config, state)
-        browser.pre_evaluation_setup()
+        browser = Browser.get_browser(test_params_list[0].browser_configuration, eval_config, state)
+        try:
+            browser.pre_evaluation_setup()
+        except Exception:
+            for test_params in test_params_list:
+                EvaluationFailures.record(test_params, 'binary_fetch')
+            raise
+        first_browser = browser.with_configuration(test_params_list[0].browser_configuration)
+        try:
+            first_browser.pre_test_setup()
+        except Exception:
+            # The profile is prepared again when the test is performed, which reports the error as a test failure
+            logger.warning(f"Could not prepare the profile for '{state}' in advance", exc_info=True)
+        return PreparedEvaluation(browser, test_params_list, first_browser)
 
-        if self.should_stop:
-            self.should_stop = False
-            return
+    def perform(self, prepared: PreparedEvaluation) -> None:
+        """
+        Performs the tests of the given prepared evaluation.
+        """
+        for i, test_params in enumerate(prepared.test_params_list):
+            if self.should_stop:
+                self.should_stop = False
+                break
+            if i == 0:
+                browser = prepared.first_browser
+            else:
+                browser = prepared.browser.with_configuration(test_params.browser_configuration)
+            self.__perform_test(browser, test_params)
+
+    @staticmethod
+    def cleanup(prepared: PreparedEvaluation) -> None:
+        """
+        Removes the binary, execution folder and any remaining profile of the given prepared evaluation.
+        """
+        if prepared.first_browser.has_prepared_profile():
+            prepared.first_browser.post_test_cleanup()
+        prepared.browser.post_evaluation_cleanup()
+
+    def __perform_test(self, browser: Browser, test_params: TestParameters) -> None:
         try:
-            browser.pre_test_setup()
+            if not browser.has_prepared_profile():
+                browser.pre_test_setup()
             result = self.perform_specific_evaluation(browser, test_params)
             MongoDB().store_result(result)
             logger.info(f'Test finalized: {test_params}')
-        except Exception as e:
-            state.condition = StateCondition.FAILED
+        except Exception:
+            test_params.state.condition = StateCondition.FAILED
             logger.error('An error occurred during evaluation', exc_info=True)
-            traceback.print_exc()
+            EvaluationFailures.record(test_params, 'browser_crash')
         finally:
             browser.post_test_cleanup()
 
-        browser.post_evaluation_cleanup()
-        logger.debug('Evaluation finished')
+    def get_time_budget(self, worker_params: WorkerParameters) -> float:
+        """
+        Returns the number of seconds in which all tests of the given worker parameters should be finished.
+        """
+        nb_of_visits = sum(self.get_nb_of_visits(test_params) for test_params in worker_params.create_test_params_list())
+        seconds_per_visit = worker_params.evaluation_configuration.seconds_per_visit
+        return BINARY_FETCH_ALLOWANCE + nb_of_visits * (seconds_per_visit + VISIT_ALLOWANCE)
+
+    @abstractmethod
+    def get_nb_of_visits(self, params: TestParameters) -> int:
+        """
+        Returns the number of times a browser is started to perform the given test.
+        """
+        pass
 
     @abstractmethod
     def perform_specific_evaluation(self, browser: Browser, params: TestParameters) -> TestResult:
@@ -2,7 +2,7 @@ from __future__ import annotations
 
 import json
 import logging
-from dataclasses import asdict, dataclass
+from dataclasses import asdict, dataclass, replace
 from typing import Optional
 
 from werkzeug.datastructures import ImmutableMultiDict
@@ -13,6 +13,11 @@ from bci.version_control.states.state import State, StateResult
 
 logger = logging.getLogger(__name__)
 
+# Priority classes of evaluations, from the lowest to the highest priority
+PRIORITY_CLASSES = ('batch', 'interactive')
+# Reasons for which a test did not produce a clean result, which are worth retrying
+FAILURE_CLASSES = ('binary_fetch', 'browser_crash', 'sanity_failure')
+
 
 @dataclass(frozen=True)
 class EvaluationParameters:
@@ -21,6 +26,15 @@ class EvaluationParameters:
     evaluation_range: EvaluationRange
     sequence_configuration: SequenceConfiguration
     database_collection: str
+    weight: int = 1
+    """Relative share of the workers this evaluation is entitled to when evaluations are interleaved."""
+    priority: str = 'batch'
+    """Priority class of this evaluation, of which the states are dispatched before those of lower classes."""
+
+    def get_priority_rank(self) -> int:
+        if self.priority not in PRIORITY_CLASSES:
+            raise AttributeError(f"Unknown priority class '{self.priority}'")
+        return PRIORITY_CLASSES.index(self.priority)
 
     def create_worker_params_for(
         self, state: State, database_connection_params: DatabaseParameters) -> WorkerParameters:
@@ -38,6 +52,29 @@ class EvaluationParameters:
             self.browser_configuration, self.evaluation_configuration, state, self.evaluation_range.mech_group, self.database_collection
         )
 
+    def to_dict(self) -> dict:
+        return {
+            'browser_configuration': self.browser_configuration.to_dict(),
+            'evaluation_configuration': self.evaluation_configuration.to_dict(),
+            'evaluation_range': self.evaluation_range.to_dict(),
+            'sequence_configuration': self.sequence_configuration.to_dict(),
+            'database_collection': self.database_collection,
+            'weight': self.weight,
+            'priority': self.priority,
+        }
+
+    @staticmethod
+    def from_dict(data: dict) -> EvaluationParameters:
+        return EvaluationParameters(
+            BrowserConfiguration.from_dict(data['browser_configuration']),
+            EvaluationConfiguration.from_dict(data['evaluation_configuration']),
+            EvaluationRange.from_dict(data['evaluation_range']),
+            SequenceConfiguration.from_dict(data['sequence_configuration']),
+            data['database_collection'],
+            data.get('weight', 1),
+            data.get('priority', 'batch'),
+        )
+
     def create_plot_params(self, target_mech_id: str, dirty_allowed: bool = True) -> PlotParameters:
         return PlotParameters(
             self.evaluation_range.mech_group,
@@ -100,6 +137,20 @@ class EvaluationRange:
         else:
             raise AttributeError('Evaluation ranges require either major versions or revision numbers')
 
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+    @staticmethod
+    def from_dict(data: dict) -> EvaluationRange:
+        major_version_range = data['major_version_range']
+        revision_number_range = data['revision_number_range']
+        return EvaluationRange(
+            data['mech_group'],
+            tuple(major_version_range) if major_version_range else None,
+            tuple(revision_number_range) if revision_number_range else None,
+            data['only_release_revisions'],
+        )
+
 
 @dataclass(frozen=True)
 class SequenceConfiguration:
@@ -109,6 +160,19 @@ class SequenceConfiguration:
     target_cookie_name: str | None = None
     search_strategy: str | None = None
 
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+    @staticmethod
+    def from_dict(data: dict) -> SequenceConfiguration:
+        return SequenceConfiguration(
+            data['nb_of_containers'],
+            data['sequence_limit'],
+            data['target_mech_id'],
+            data['target_cookie_name'],
+            data['search_strategy'],
+        )
+
 
 @dataclass(frozen=True)
 class DatabaseParameters:
@@ -125,10 +189,41 @@ class DatabaseParameters:
     def from_dict(data: dict) -> DatabaseParameters:
         return DatabaseParameters(data['host'], data['username'], data['password'], data['database_name'], data['binary_cache_limit'])
 
+    def serialize(self) -> str:
+        return json.dumps(self.to_dict())
+
+    @staticmethod
+    def deserialize(string: str) -> DatabaseParameters:
+        return DatabaseParameters.from_dict(json.loads(string))
+
     def __str__(self) -> str:
         return f'{self.username}@{self.host}:27017/{self.database_name}'
 
 
+@dataclass(frozen=True)
+class BatchedTest:
+    """
+    A test that is performed by a worker next to the main test of its `WorkerParameters`, using the same binary.
+    """
+
+    browser_configuration: BrowserConfiguration
+    mech_group: str
+    database_collection: str
+
+    def to_dict(self) -> dict:
+        return {
+            'browser_configuration': self.browser_configuration.to_dict(),
+            'mech_group': self.mech_group,
+            'database_collection': self.database_collection,
+        }
+
+    @staticmethod
+    def from_dict(data: dict) -> BatchedTest:
+        return BatchedTest(
+            BrowserConfiguration.from_dict(data['browser_configuration']), data['mech_group'], data['database_collection']
+        )
+
+
 @dataclass(frozen=True)
 class WorkerParameters:
     browser_configuration: BrowserConfiguration
@@ -137,20 +232,54 @@ class WorkerParameters:
     mech_group: str
     database_collection: str
     database_connection_params: DatabaseParameters
+    batched_tests: tuple[BatchedTest, ...] = ()
+    """Other tests on the same state, for which the binary is only prepared once."""
 
     def create_test_params(self) -> TestParameters:
         return TestParameters(
             self.browser_configuration, self.evaluation_configuration, self.state, self.mech_group, self.database_collection
         )
 
+    def create_test_params_list(self) -> list[TestParameters]:
+        """
+        Returns the parameters of the main test, followed by those of the batched tests.
+        """
+        return [self.create_test_params()] + [
+            TestParameters(
+                test.browser_configuration, self.evaluation_configuration, self.state, test.mech_group, test.database_collection
+            )
+            for test in self.batched_tests
+        ]
+
+    @staticmethod
+    def batch(worker_params_list: list[WorkerParameters]) -> WorkerParameters:
+        """
+        Combines the given worker parameters into a single evaluation, so the binary is only prepared once.
+        All parameters should concern the same state and evaluation configuration.
+        """
+        first, others = worker_params_list[0], worker_params_list[1:]
+        batched_tests = list(first.batched_tests)
+        for other in others:
+            if (
+                other.state != first.state
+                or other.state.repetition != first.state.repetition
+                or other.evaluation_configuration != first.evaluation_configuration
+            ):
+                raise AttributeError(f'Cannot batch {other} with {first}')
+            batched_tests.append(BatchedTest(other.browser_configuration, other.mech_group, other.database_collection))
+            batched_tests.extend(other.batched_tests)
+        return replace(first, batched_tests=tuple(batched_tests))
+
     def _to_dict(self):
         return {
             'browser_configuration': self.browser_configuration.to_dict(),
             'evaluation_configuration': self.evaluation_configuration.to_dict(),
             'state': self.state.to_dict(),
+            'repetition': self.state.repetition,
             'mech_group': self.mech_group,
             'database_collection': self.database_collection,
-            'database_connection_params': self.database_connection_params.to_dict()
+            'database_connection_params': self.database_connection_params.to_dict(),
+            'batched_tests': [test.to_dict() for test in self.batched_tests],
         }
 
     def serialize(self) -> str:
@@ -168,15 +297,18 @@ class WorkerParameters:
         browser_config = BrowserConfiguration.from_dict(data['browser_configuration'])
         eval_config = EvaluationConfiguration.from_dict(data['evaluation_configuration'])
         state = State.from_dict(data['state'])
+        state.repetition = data.get('repetition', 0)
         mech_group = data['mech_group']
         database_collection = data['database_collection']
         database_connection_params = DatabaseParameters.from_dict(data['database_connection_params'])
+        batched_tests = tuple(BatchedTest.from_dict(test) for test in data.get('batched_tests', []))
         return WorkerParameters(
-            browser_config, eval_config, state, mech_group, database_collection, database_connection_params
+            browser_config, eval_config, state, mech_group, database_collection, database_connection_params, batched_tests
         )
 
     def __str__(self) -> str:
-        return f'Eval({self.state}: [{", ".join(self.mech_group)}])'
+        mech_groups = [self.mech_group] + [test.mech_group for test in self.batched_tests]
+        return f'Eval({self.state}: [{", ".join(mech_groups)}])'
 
 
 @dataclass(frozen=True)
@@ -254,7 +386,13 @@ def evaluation_factory(kwargs: ImmutableMultiDict) -> list[EvaluationParameters]
         )
         database_collection = kwargs.get('db_collection')
         evaluation_params = EvaluationParameters(
-            browser_configuration, evaluation_configuration, evaluation_range, sequence_configuration, database_collection
+            browser_configuration,
+            evaluation_configuration,
+            evaluation_range,
+            sequence_configuration,
+            database_collection,
+            int(kwargs.get('weights', {}).get(mech_group, 1)),
+            kwargs.get('priority', 'batch'),
         )
         evaluation_params_list.append(evaluation_params)
     return evaluation_params_list
@@ -9,6 +9,15 @@ class OutcomeChecker:
     def __init__(self, sequence_config: SequenceConfiguration):
         self.sequence_config = sequence_config
 
+    def get_required_result_fields(self) -> list[str]:
+        '''
+        Returns the fields of stored results that are needed to determine the outcome.
+        '''
+        fields = ['req_vars', 'log_vars']
+        if self.sequence_config.target_mech_id:
+            fields.extend(['requests.url', 'requests.headers.Cookie'])
+        return fields
+
     def get_outcome(self, result: StateResult) -> bool | None:
         '''
         Returns the outcome of the test result.
@@ -0,0 +1,181 @@
+import logging
+import shutil
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Optional
+
+from bci.configuration import Global
+from bci.evaluations.evaluation_framework import EvaluationFramework, PreparedEvaluation
+from bci.evaluations.logic import WorkerParameters
+
+logger = logging.getLogger(__name__)
+
+# Upcoming evaluations are only prepared in advance while at least this many bytes are free in the worker folder
+MIN_FREE_DISK_SPACE_FOR_PREFETCH = 2 * 1024**3
+
+
+class EvaluationPipeline:
+    """
+    Overlaps the stages of consecutive evaluations of a persistent worker.
+    While the browser visits of the current evaluation are performed, the binaries of upcoming evaluations are fetched
+    and prepared, and those of finished evaluations are removed, in background threads.
+    """
+
+    def __init__(
+        self,
+        evaluation_framework: EvaluationFramework,
+        max_look_ahead: int = 1,
+        min_free_disk_space: int = MIN_FREE_DISK_SPACE_FOR_PREFETCH,
+    ) -> None:
+        """
+        Initializes the pipeline.
+
+        :param evaluation_framework: The framework that performs the evaluations.
+        :param max_look_ahead: The maximum number of upcoming evaluations that are prepared in advance.
+        :param min_free_disk_space: The number of bytes that should stay free when preparing evaluations in advance.
+        """
+        self.evaluation_framework = evaluation_framework
+        self.max_look_ahead = max_look_ahead
+        self.min_free_disk_space = min_free_disk_space
+        self.__prepare_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='bh_prepare')
+        self.__cleanup_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='bh_cleanup')
+        # Evaluations that are prepared in advance, by the identity of their parameters
+        self.__prepared: dict[int, Future] = {}
+        # Cleanups that did not finish yet, by the state of which they remove the binary
+        self.__cleanups: dict[str, list[Future]] = {}
+        # Number of prepared and running evaluations per state, of which the binary should not be removed
+        self.__states_in_use: dict[str, int] = {}
+        self.__lock = threading.Lock()
+
+    def can_prefetch(self) -> bool:
+        """
+        Returns whether another upcoming evaluation can be prepared in advance, given the look-ahead and disk budget.
+        """
+        with self.__lock:
+            if len(self.__prepared) >= self.max_look_ahead:
+                return False
+        if not self.__has_disk_space_left():
+            logger.debug('Not preparing evaluations in advance, since the disk is almost full')
+            return False
+        return True
+
+    def prefetch(self, worker_params: WorkerParameters) -> bool:
+        """
+        Starts preparing the given upcoming evaluation in the background, if the look-ahead and disk budget allow it.
+
+        :return: True if the evaluation is being prepared.
+        """
+        key = self.__get_state_key(worker_params)
+        if not self.can_prefetch():
+            return False
+        with self.__lock:
+            # Evaluations of a state that is in use share its folders, so they are prepared once the other is cleaned up
+            if key in self.__states_in_use:
+                return False
+            self.__states_in_use[key] = self.__states_in_use.get(key, 0) + 1
+            self.__prepared[id(worker_params)] = self.__prepare_executor.submit(self.__prepare, worker_params)
+        logger.debug(f"Preparing '{worker_params.state}' in advance")
+        return True
+
+    def evaluate(self, worker_params: WorkerParameters) -> None:
+        """
+        Performs the given evaluation, of which the binary is removed in the background afterwards.
+        """
+        with self.__lock:
+            future = self.__prepared.pop(id(worker_params), None)
+            if future is None:
+                key = self.__get_state_key(worker_params)
+                self.__states_in_use[key] = self.__states_in_use.get(key, 0) + 1
+        try:
+            prepared = future.result() if future is not None else self.__prepare(worker_params)
+        except Exception:
+            self.__release_state(worker_params)
+            raise
+        if prepared is None:
+            self.__release_state(worker_params)
+            return
+        try:
+            self.evaluation_framework.perform(prepared)
+        finally:
+            self.__schedule_cleanup(worker_params, prepared)
+
+    def discard(self, worker_params: WorkerParameters) -> None:
+        """
+        Cleans up the given evaluation that was prepared in advance, but will not be performed after all.
+        """
+        with self.__lock:
+            future = self.__prepared.pop(id(worker_params), None)
+        if future is None:
+            return
+        if future.exception() is not None or (prepared := future.result()) is None:
+            self.__release_state(worker_params)
+            return
+        self.__schedule_cleanup(worker_params, prepared)
+
+    def get_backlog(self) -> int:
+        """
+        Returns the number of evaluations that are prepared in advance or of which the cleanup did not finish yet.
+        """
+        with self.__lock:
+            return len(self.__prepared) + sum(len(futures) for futures in self.__cleanups.values())
+
+    def close(self) -> None:
+        """
+        Waits for all background stages to finish, and cleans up evaluations that were prepared in advance but never
+        performed, e.g., because the worker was stopped.
+        """
+        self.__prepare_executor.shutdown(wait=True)
+        with self.__lock:
+            unperformed = list(self.__prepared.values())
+            self.__prepared.clear()
+        for future in unperformed:
+            if future.exception() is None and (prepared := future.result()) is not None:
+                try:
+                    self.evaluation_framework.cleanup(prepared)
+                except Exception:
+                    logger.error('Could not clean up an evaluation that was prepared in advance', exc_info=True)
+        self.__cleanup_executor.shutdown(wait=True)
+
+    def __prepare(self, worker_params: WorkerParameters) -> Optional[PreparedEvaluation]:
+        # The folders of an earlier evaluation of the same state have to be removed first
+        with self.__lock:
+            cleanups = list(self.__cleanups.get(self.__get_state_key(worker_params), []))
+        for cleanup in cleanups:
+            cleanup.result()
+        return self.evaluation_framework.prepare(worker_params)
+
+    def __schedule_cleanup(self, worker_params: WorkerParameters, prepared: PreparedEvaluation) -> None:
+        key = self.__get_state_key(worker_params)
+
+        def cleanup():
+            try:
+                self.evaluation_framework.cleanup(prepared)
+            except Exception:
+                logger.error(f"Could not clean up after the evaluation of '{worker_params.state}'", exc_info=True)
+            finally:
+                with self.__lock:
+                    self.__cleanups[key].remove(future)
+                    if not self.__cleanups[key]:
+                        del self.__cleanups[key]
+
+        with self.__lock:
+            future = self.__cleanup_executor.submit(cleanup)
+            self.__cleanups.setdefault(key, []).append(future)
+        self.__release_state(worker_params)
+
+    def __release_state(self, worker_params: WorkerParameters) -> None:
+        key = self.__get_state_key(worker_params)
+        with self.__lock:
+            self.__states_in_use[key] -= 1
+            if self.__states_in_use[key] == 0:
+                del self.__states_in_use[key]
+
+    def __has_disk_space_left(self) -> bool:
+        try:
+            return shutil.disk_usage(Global.get_worker_tmp_folder()).free >= self.min_free_disk_space
+        except FileNotFoundError:
+            return False
+
+    @staticmethod
+    def __get_state_key(worker_params: WorkerParameters) -> str:
+        return f'{worker_params.state.browser_name}/{worker_params.state.name}'
@@ -0,0 +1,144 @@
+"""
+Removes folders (binaries, execution folders and profiles) in the background, such that an evaluation does not have to
+wait until hundreds of megabytes are deleted before it can report its result.
+"""
+import logging
+import os
+import queue
+import shutil
+import threading
+import uuid
+from typing import Optional
+
+from bci import util
+from bci.configuration import Global
+
+logger = logging.getLogger(__name__)
+
+# Disposed folders are moved to this folder next to them, which is on the same file system so the move is atomic
+TRASH_FOLDER_NAME = '.bh_trash'
+
+
+class GarbageCollector:
+    """
+    Moves disposed folders to a trash folder with an atomic rename and deletes them in a background thread.
+    When the disk usage exceeds the high-water mark, disposing waits until the trash is emptied.
+    """
+
+    def __init__(self, high_water_mark: Optional[float] = None) -> None:
+        """
+        Initializes the garbage collector without starting its thread.
+
+        :param high_water_mark: The fraction of the disk above which disposed folders are deleted right away.
+        """
+        self.high_water_mark = Global.get_disk_high_water_mark() if high_water_mark is None else high_water_mark
+        self.__queue: queue.Queue[str] = queue.Queue()
+        self.__trash_folders: set[str] = set()
+        self.__lock = threading.Lock()
+        self.__thread: Optional[threading.Thread] = None
+
+    def dispose(self, path: Optional[str]) -> bool:
+        """
+        Removes the given folder, which is deleted in the background if it can be moved to the trash.
+
+        :param path: The folder to remove.
+        :return: True if the folder is gone or will be deleted, False if it could not be removed.
+        """
+        if path is None or not os.path.exists(path):
+            return True
+        path = os.path.normpath(path)
+        trash_folder = self.__get_trash_folder(path)
+        trash_path = os.path.join(trash_folder, f'{os.path.basename(path)}_{uuid.uuid4().hex}')
+        try:
+            os.rename(path, trash_path)
+        except OSError:
+            logger.debug(f"Could not move '{path}' to the trash, removing it right away", exc_info=True)
+            return util.rmtree(path)
+        self.__queue.put(trash_path)
+        self.__ensure_started()
+        if self.__is_above_high_water_mark(trash_folder):
+            logger.info(f'Disk usage exceeds {self.high_water_mark:.0%}, waiting for {self.get_backlog()} folder(s) to be deleted')
+            self.drain()
+        return True
+
+    def get_backlog(self) -> int:
+        """
+        Returns the number of disposed folders that are not deleted yet.
+        """
+        return self.__queue.unfinished_tasks
+
+    def drain(self) -> None:
+        """
+        Waits until all disposed folders are deleted.
+        """
+        if self.get_backlog() > 0:
+            self.__ensure_started()
+            self.__queue.join()
+
+    def __get_trash_folder(self, path: str) -> str:
+        trash_folder = os.path.join(os.path.dirname(path), TRASH_FOLDER_NAME)
+        with self.__lock:
+            if trash_folder in self.__trash_folders:
+                return trash_folder
+            os.makedirs(trash_folder, exist_ok=True)
+            self.__trash_folders.add(trash_folder)
+        # Folders that a previous worker did not get to delete are collected as well
+        for entry in os.listdir(trash_folder):
+            self.__queue.put(os.path.join(trash_folder, entry))
+        return trash_folder
+
+    def __ensure_started(self) -> None:
+        with self.__lock:
+            if self.__thread is None:
+                self.__thread = threading.Thread(target=self.__run, name='bh_garbage_collector', daemon=True)
+                self.__thread.start()
+
+    def __run(self) -> None:
+        while True:
+            trash_path = self.__queue.get()
+            try:
+                if not self.__delete(trash_path):
+                    logger.error(f"Could not delete '{trash_path}'")
+            except Exception:
+                logger.error(f"Could not delete '{trash_path}'", exc_info=True)
+            finally:
+                self.__queue.task_done()
+
+    @staticmethod
+    def __delete(path: str) -> bool:
+        def on_error(_, __, exc_info):
+            # Leftover folders might be deleted by another worker that shares the trash folder
+            if not isinstance(exc_info[1], FileNotFoundError):
+                raise exc_info[1]
+
+        try:
+            shutil.rmtree(path, onerror=on_error)
+            return True
+        except OSError:
+            return util.rmtree(path) or not os.path.exists(path)
+
+    def __is_above_high_water_mark(self, folder: str) -> bool:
+        try:
+            usage = shutil.disk_usage(folder)
+        except FileNotFoundError:
+            return False
+        return usage.used / usage.total > self.high_water_mark
+
+
+_garbage_collector: Optional[GarbageCollector] = None
+_garbage_collector_lock = threading.Lock()
+
+
+def get_garbage_collector() -> GarbageCollector:
+    global _garbage_collector
+    with _garbage_collector_lock:
+        if _garbage_collector is None:
+            _garbage_collector = GarbageCollector()
+        return _garbage_collector
+
+
+def dispose(path: Optional[str]) -> bool:
+    """
+    Removes the given folder in the background, see `GarbageCollector.dispose`.
+    """
+    return get_garbage_collector().dispose(path)
@@ -1,4 +1,5 @@
 import logging
+from typing import Optional
 
 import bci.browser.binary.factory as binary_factory
 from bci.analysis.plot_factory import PlotFactory
@@ -27,8 +28,24 @@ class Main:
         return Main.master is not None
 
     @staticmethod
-    def run(params: EvaluationParameters):
-        Main.master.run(params)
+    def submit_job(params: list[EvaluationParameters], job_id: Optional[str] = None) -> str:
+        return Main.master.submit(params, job_id)
+
+    @staticmethod
+    def cancel_job(job_id: str) -> bool:
+        return Main.master.cancel_job(job_id)
+
+    @staticmethod
+    def get_jobs() -> list[dict]:
+        return Main.master.get_jobs()
+
+    @staticmethod
+    def get_job_progress(job_id: str) -> Optional[dict]:
+        return Main.master.get_job_progress(job_id)
+
+    @staticmethod
+    def get_interrupted_jobs() -> list[tuple[str, list[EvaluationParameters]]]:
+        return Main.master.get_interrupted_jobs()
 
     @staticmethod
     def stop_gracefully():
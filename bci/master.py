@@ -1,26 +1,47 @@
 import logging
+import threading
+import uuid
+from typing import Optional
+
+from bson import ObjectId
 
 import bci.database.mongo.container as mongodb_container
 from bci.configuration import Global
+from bci.database.mongo.evaluation_failures import EvaluationFailures
+from bci.database.mongo.evaluation_queue import EvaluationQueue
 from bci.database.mongo.mongodb import MongoDB, ServerException
 from bci.database.mongo.revision_cache import RevisionCache
+from bci.distribution.evaluation_run import EvaluationRun
+from bci.distribution.fair_share_scheduler import FairShareScheduler
 from bci.distribution.worker_manager import WorkerManager
 from bci.evaluations.custom.custom_evaluation import CustomEvaluationFramework
 from bci.evaluations.logic import (
     DatabaseParameters,
     EvaluationParameters,
+    TestParameters,
+    WorkerParameters,
 )
 from bci.evaluations.outcome_checker import OutcomeChecker
 from bci.search_strategy.bgb_search import BiggestGapBisectionSearch
 from bci.search_strategy.bgb_sequence import BiggestGapBisectionSequence
 from bci.search_strategy.composite_search import CompositeSearch
-from bci.search_strategy.sequence_strategy import SequenceFinished, SequenceStrategy
+from bci.search_strategy.joint_planner import JointPlanner
+from bci.search_strategy.multisection_search import MultisectionSearch
+from bci.search_strategy.plan_compiler import EvaluationPlan
+from bci.search_strategy.probabilistic_search import ProbabilisticBisectionSearch
+from bci.search_strategy.sequence_strategy import SequenceStrategy
 from bci.version_control.factory import StateFactory
 from bci.version_control.states.revisions.firefox import BINARY_AVAILABILITY_MAPPING
+from bci.version_control.states.state import State
 from bci.web.clients import Clients
 
 logger = logging.getLogger(__name__)
 
+# Seconds between two renewals of the leases on the jobs of this core
+HEARTBEAT_INTERVAL = 15
+# Seconds after which the dispatcher checks again whether a slot is free or a state of a higher priority class arrived
+SLOT_POLL_INTERVAL = 0.5
+
 
 class Master:
     def __init__(self) -> None:
@@ -28,11 +49,31 @@ class Master:
 
         self.stop_gracefully = False
         self.stop_forcefully = False
+        # Set when the core shuts down during an evaluation, which is then resumed after the core restarted
+        self.is_detaching = False
 
         self.firefox_build = None
         self.chromium_build = None
 
         self.eval_queue = []
+        self.scheduler = None
+        self.worker_manager = None
+        # Jobs submitted since the core started by their identifier, of which the experiments share the scheduler
+        self.runs: dict[str, EvaluationRun] = {}
+        # Guards the jobs and the status of the dispatcher, and is notified whenever a job is admitted or finished
+        self.__runs_condition = threading.Condition()
+        # Either 'idle', 'dispatching' or 'stopping' while the running evaluations are awaited
+        self.__dispatcher_status = 'idle'
+        self.__runs_per_experiment: dict[str, EvaluationRun] = {}
+        self.__eval_params_per_experiment: dict[str, EvaluationParameters] = {}
+        self.__heartbeat_stop_event = threading.Event()
+        # Evaluations that were dispatched but did not finish yet, mapped to the number of duplicates that wait for them
+        self.__in_flight: dict[tuple[str, State], int] = {}
+        self.__in_flight_lock = threading.Lock()
+        # Number of times the evaluation of a state failed for an experiment, by experiment name and state
+        self.__nb_of_attempts: dict[tuple[str, State], int] = {}
+        # Identifies the jobs leased by this core in the durable evaluation queue
+        self.core_id = uuid.uuid4().hex
 
         Global.initialize_folders()
         self.db_connection_params = Global.get_database_params()
@@ -47,66 +88,386 @@ class Master:
         except ServerException:
             logger.error('Could not connect to database.', exc_info=True)
 
-    def run(self, eval_params_list: list[EvaluationParameters]) -> None:
-        # Sequence_configuration settings are the same over evaluation parameters (quick fix)
-        worker_manager = WorkerManager(eval_params_list[0].sequence_configuration.nb_of_containers)
+    def submit(self, eval_params_list: list[EvaluationParameters], job_id: Optional[str] = None) -> str:
+        """
+        Submits an evaluation as a job, which is admitted next to the jobs that are already running, such that their
+        experiments share the workers.
+
+        :param eval_params_list: The evaluation parameters of each experiment of the job.
+        :param job_id: The identifier of the job, which is generated if not given.
+        :return: The identifier of the job.
+        """
+        job_id = job_id or uuid.uuid4().hex[:8]
+        for eval_params in eval_params_list:
+            # Raises for unknown priority classes before the job is accepted
+            eval_params.get_priority_rank()
+        with self.__runs_condition:
+            if job_id in self.runs and not self.runs[job_id].is_finished():
+                raise AttributeError(f"Job '{job_id}' is still running")
+            run = EvaluationRun(job_id, eval_params_list)
+            self.runs[job_id] = run
+            self.eval_queue = [entry for entry in self.eval_queue if entry['job_id'] != job_id]
+            for experiment_name, eval_params in run.get_eval_params_per_experiment().items():
+                self.eval_queue.append({
+                    'job_id': job_id,
+                    'experiment': eval_params.evaluation_range.mech_group,
+                    'name': experiment_name,
+                    'state': 'pending',
+                })
+        self.__update_state(queue=self.eval_queue)
+        logger.info(f"Job '{job_id}' was submitted")
+        # Creating the search strategies can take a while, so the job is admitted in the background
+        threading.Thread(target=self.__admit, args=[run]).start()
+        return job_id
+
+    def __admit(self, run: EvaluationRun) -> None:
+        """
+        Adds the experiments of the given job to the scheduler, starting to dispatch evaluations if no other job is
+        running.
+        The container budget is taken from the job that starts the dispatching and shared by all jobs admitted later.
+        """
+        try:
+            strategies = {
+                experiment_name: self.create_sequence_strategy(eval_params)
+                for experiment_name, eval_params in run.get_eval_params_per_experiment().items()
+            }
+            run.joint_planners = self.share_splitters(strategies, run.get_eval_params_per_experiment())
+            run.run_id = EvaluationQueue.start_run(run.job_id, run.eval_params_list)
+        except Exception:
+            logger.error(f"Could not admit job '{run.job_id}'", exc_info=True)
+            with self.__runs_condition:
+                if not run.is_finished():
+                    self.__finish_run(run, 'failed')
+                self.__runs_condition.notify_all()
+            return
+
+        with self.__runs_condition:
+            # Jobs that arrive while the dispatcher winds down are admitted in a fresh one
+            self.__runs_condition.wait_for(lambda: self.__dispatcher_status != 'stopping')
+            if run.is_finished():
+                # Cancelled or stopped while the strategies were created
+                self.__finish_run(run, run.status)
+                return
+            if self.__dispatcher_status == 'idle':
+                self.__start_dispatching(run.eval_params_list[0].sequence_configuration.nb_of_containers)
+            for experiment_name, eval_params in run.get_eval_params_per_experiment().items():
+                browser_name = eval_params.browser_configuration.browser_name
+                logger.info(f"Starting evaluation for experiment '{experiment_name}' with browser '{browser_name}'")
+                self.__runs_per_experiment[experiment_name] = run
+                self.__eval_params_per_experiment[experiment_name] = eval_params
+                strategy = strategies[experiment_name]
+                self.scheduler.add(experiment_name, strategy, eval_params.weight, eval_params.get_priority_rank())
+                if isinstance(strategy, EvaluationPlan):
+                    strategy.on_progress = lambda scheduler=self.scheduler, name=experiment_name: scheduler.wake(name)
+                    run.plans[experiment_name] = strategy
+                    strategy.compile(run.run_id, experiment_name)
+            run.scheduler = self.scheduler
+            run.status = 'running'
+            resumed_jobs = self.__register_resumed_jobs(run)
+            worker_manager = self.worker_manager
+            self.__runs_condition.notify_all()
+        self.__reattach_resumed_jobs(resumed_jobs, worker_manager)
+
+    def __start_dispatching(self, nb_of_containers: int) -> None:
+        """
+        Starts dispatching the evaluations of the admitted jobs over a fresh pool of workers, which should be called
+        while holding the lock on the jobs.
+        """
         self.stop_gracefully = False
         self.stop_forcefully = False
-        try:
-            self.__init_eval_queue(eval_params_list)
-            for eval_params in eval_params_list:
-                if self.stop_gracefully or self.stop_forcefully:
-                    break
-                self.__update_eval_queue(eval_params.evaluation_range.mech_group, 'active')
-                self.__update_state(is_running=True,reason='user', status='running', queue=self.eval_queue)
-                self.run_single_evaluation(eval_params, worker_manager)
+        self.is_detaching = False
+        self.worker_manager = WorkerManager(nb_of_containers)
+        self.scheduler = FairShareScheduler(
+            on_experiment_finished=self.__on_experiment_finished, on_experiment_failed=self.__on_experiment_failed
+        )
+        self.__in_flight = {}
+        self.__nb_of_attempts = {}
+        self.__runs_per_experiment = {}
+        self.__eval_params_per_experiment = {}
+        self.__heartbeat_stop_event = threading.Event()
+        threading.Thread(target=self.__send_heartbeats, args=[self.__heartbeat_stop_event], daemon=True).start()
+        self.__dispatcher_status = 'dispatching'
+        threading.Thread(target=self.__dispatch).start()
+        self.__update_state(is_running=True, reason='user', status='running')
 
-        except Exception as e:
+    def __dispatch(self) -> None:
+        worker_manager = self.worker_manager
+        try:
+            self.run_interleaved_evaluations(worker_manager)
+        except Exception:
             logger.critical('A critical error occurred', exc_info=True)
-            raise e
+            with self.__runs_condition:
+                self.__dispatcher_status = 'stopping'
         finally:
-            # Gracefully exit
-            if self.stop_gracefully:
-                logger.info('Gracefully stopping experiment queue due to user end signal...')
-                self.state['reason'] = 'user'
-            if self.stop_forcefully:
-                logger.info('Forcefully stopping experiment queue due to user end signal...')
-                self.state['reason'] = 'user'
-                worker_manager.forcefully_stop_all_running_containers()
+            if self.is_detaching:
+                # Running workers and the durable queue are left as they are, so the jobs can be resumed
+                logger.info('Leaving the jobs to be resumed after restarting the core.')
             else:
-                logger.info('Gracefully stopping experiment queue since last experiment started.')
-            # MongoDB.disconnect()
-            logger.info('Waiting for remaining experiments to stop...')
-            worker_manager.wait_until_all_evaluations_are_done()
-            logger.info('BugHog has finished the evaluation!')
-            self.__update_state(is_running=False, status='idle', queue=self.eval_queue)
+                # Gracefully exit
+                if self.stop_gracefully:
+                    logger.info('Gracefully stopping experiment queue due to user end signal...')
+                    self.state['reason'] = 'user'
+                if self.stop_forcefully:
+                    logger.info('Forcefully stopping experiment queue due to user end signal...')
+                    self.state['reason'] = 'user'
+                    worker_manager.cancel_pending_evaluations()
+                    worker_manager.forcefully_stop_all_running_containers()
+                else:
+                    logger.info('Gracefully stopping experiment queue since last experiment started.')
+                # MongoDB.disconnect()
+                logger.info('Waiting for remaining experiments to stop...')
+                worker_manager.wait_until_all_evaluations_are_done()
+                worker_manager.shutdown()
+                self.__heartbeat_stop_event.set()
+                with self.__runs_condition:
+                    for run in self.runs.values():
+                        if run.status == 'running':
+                            self.__finish_run(run, 'stopped')
+                    self.__dispatcher_status = 'idle'
+                    self.__runs_condition.notify_all()
+                logger.info('BugHog has finished the evaluation!')
+                self.__update_state(is_running=False, status='idle', queue=self.eval_queue)
 
-    def run_single_evaluation(self, eval_params: EvaluationParameters, worker_manager: WorkerManager) -> None:
-        browser_name = eval_params.browser_configuration.browser_name
-        experiment_name = eval_params.evaluation_range.mech_group
-
-        logger.info(f"Starting evaluation for experiment '{experiment_name}' with browser '{browser_name}'")
-
-        search_strategy = self.create_sequence_strategy(eval_params)
-
-        try:
-            while (self.stop_gracefully or self.stop_forcefully) is False:
-                # Update search strategy with new potentially new results
-                current_state = search_strategy.next()
+    def run_interleaved_evaluations(self, worker_manager: WorkerManager) -> None:
+        """
+        Interleaves the evaluations of the experiments of all admitted jobs, such that workers are shared fairly among
+        them instead of waiting for the search strategy of a single experiment.
+        Returns once all jobs are finished or the dispatching is stopped.
+        """
+        while True:
+            # States are only chosen once a slot is free, such that the most urgent state at that time is started
+            min_priority_rank = 0
+            if not self.__is_stopping():
+                if (min_priority_rank := worker_manager.wait_for_free_slot(timeout=SLOT_POLL_INTERVAL)) is None:
+                    continue
+            if min_priority_rank > 0:
+                # Only the interactive slots are free, which stay empty until a state of a higher priority class arrives
+                if (
+                    scheduled := self.scheduler.next(min_priority_rank=min_priority_rank, timeout=SLOT_POLL_INTERVAL)
+                ) is None:
+                    continue
+            elif (scheduled := self.scheduler.next()) is None:
+                with self.__runs_condition:
+                    if self.__is_stopping() or not self.__has_unfinished_runs():
+                        self.__dispatcher_status = 'stopping'
+                        break
+                    if any(run.status == 'admitting' for run in self.runs.values()):
+                        # The experiments of the jobs that are being admitted are added to the scheduler shortly
+                        self.__runs_condition.wait()
+                continue
+            # Other experiments that can proceed right away often need the same state, which is then evaluated at once
+            batch = [scheduled]
+            while len(batch) < len(self.__eval_params_per_experiment) and (
+                scheduled := self.scheduler.next(blocking=False, min_priority_rank=min_priority_rank)
+            ):
+                batch.append(scheduled)
+            batch = self.__remove_duplicates(batch, self.__eval_params_per_experiment)
 
-                # Prepare worker parameters
-                worker_params = eval_params.create_worker_params_for(current_state, self.db_connection_params)
+            groups = self.group_by_state(batch, self.__eval_params_per_experiment, self.db_connection_params)
+            for i, (experiment_names, worker_params) in enumerate(groups):
+                if self.__is_stopping():
+                    break
+                if i + 1 < len(groups):
+                    # Inline evaluations block this loop, so the next state of the batch is prepared in the meantime
+                    worker_manager.prefetch(groups[i + 1][1])
+                for experiment_name in experiment_names:
+                    self.__update_eval_queue(experiment_name, 'active')
 
                 # Start worker to perform evaluation
-                worker_manager.start_test(worker_params)
+                run_ids = list(dict.fromkeys(self.__runs_per_experiment[name].run_id for name in experiment_names))
+                job_id = EvaluationQueue.add_job(run_ids, experiment_names, worker_params, self.core_id)
+                worker_manager.start_test(
+                    worker_params,
+                    on_finished=lambda success, job_id=job_id, names=experiment_names, params=worker_params: (
+                        self.__on_job_finished(job_id, names, params, success)
+                    ),
+                    time_budget=self.evaluation_framework.get_time_budget(worker_params),
+                    priority=max(
+                        self.__eval_params_per_experiment[name].get_priority_rank() for name in experiment_names
+                    ),
+                )
+                EvaluationQueue.start_job(job_id)
 
-        except SequenceFinished:
+        if not self.__is_stopping():
             logger.debug('Last experiment has started')
             self.state['reason'] = 'finished'
-            self.__update_eval_queue(eval_params.evaluation_range.mech_group, 'done')
+
+    def __has_unfinished_runs(self) -> bool:
+        return any(not run.is_finished() for run in self.runs.values())
+
+    def __register_resumed_jobs(self, run: EvaluationRun) -> list[tuple[dict, WorkerParameters, list[str]]]:
+        """
+        Registers the jobs that were left behind by a previous core for the given job as running evaluations, which
+        should be called while holding the lock on the jobs.
+        Completed states are not evaluated again, since the strategies start from the stored results.
+
+        :return: Each job with its parameters and the names of the admitted experiments it evaluates.
+        """
+        resumed_jobs = []
+        for job in EvaluationQueue.get_jobs(run.run_id):
+            params = WorkerParameters.deserialize(job['params'])
+            # Experiments of jobs that are not admitted yet are left to their own strategy
+            experiment_names = [name for name in job['experiment_names'] if name in self.__runs_per_experiment]
+            with self.__in_flight_lock:
+                experiment_names = [name for name in experiment_names if (name, params.state) not in self.__in_flight]
+                for experiment_name in experiment_names:
+                    self.__in_flight[(experiment_name, params.state)] = 0
+            if not experiment_names:
+                continue
+            for experiment_name in experiment_names:
+                self.scheduler.add_running_evaluation(experiment_name)
+                self.__update_eval_queue(experiment_name, 'active')
+            resumed_jobs.append((job, params, experiment_names))
+        return resumed_jobs
+
+    def __reattach_resumed_jobs(
+        self, resumed_jobs: list[tuple[dict, WorkerParameters, list[str]]], worker_manager: WorkerManager
+    ) -> None:
+        """
+        Reattaches the resumed jobs of which the worker is still running, the others are requeued once their lease
+        expires.
+        """
+        for job, params, experiment_names in resumed_jobs:
+            if job['status'] == 'running' and worker_manager.reattach(
+                params,
+                on_finished=lambda success, job_id=job['_id'], names=experiment_names, params=params: (
+                    self.__on_job_finished(job_id, names, params, success)
+                ),
+                time_budget=self.evaluation_framework.get_time_budget(params),
+            ):
+                EvaluationQueue.take_over_job(job['_id'], self.core_id)
+            else:
+                logger.info(f"Evaluation of '{params.state}' will be requeued once its lease expires")
+
+    def __send_heartbeats(self, stop_event: threading.Event) -> None:
+        """
+        Renews the leases on the jobs of this core and requeues the jobs of which the lease expired.
+        """
+        while not stop_event.wait(HEARTBEAT_INTERVAL):
+            try:
+                EvaluationQueue.renew_leases(self.core_id)
+                with self.__runs_condition:
+                    run_ids = [run.run_id for run in self.runs.values() if run.status == 'running']
+                while run_ids and (job := EvaluationQueue.pop_expired_job(run_ids)) is not None:
+                    self.__requeue_job(job)
+            except Exception:
+                logger.error('Could not renew the leases on the evaluation jobs', exc_info=True)
+
+    def __requeue_job(self, job: dict) -> None:
+        params = WorkerParameters.deserialize(job['params'])
+        logger.info(f"Lease on the evaluation of '{params.state}' expired, requeueing it")
+        for experiment_name in job['experiment_names']:
+            with self.__in_flight_lock:
+                if (nb_of_duplicates := self.__in_flight.pop((experiment_name, params.state), None)) is None:
+                    continue
+            # Duplicates are released, they will be deduplicated against the requeued evaluation
+            for _ in range(nb_of_duplicates):
+                self.scheduler.on_evaluation_finished(experiment_name)
+            self.scheduler.requeue(experiment_name, params.state)
+
+    def __remove_duplicates(
+        self, batch: list[tuple[str, State]], eval_params_per_experiment: dict[str, EvaluationParameters]
+    ) -> list[tuple[str, State]]:
+        """
+        Removes the scheduled states that are already being evaluated or of which the result is already stored, so
+        duplicates never cost a worker.
+        Duplicates of running evaluations are reported as finished to the scheduler together with the original.
+
+        :param batch: The scheduled experiment names and states.
+        :param eval_params_per_experiment: The evaluation parameters of each experiment.
+        :return: The scheduled experiment names and states that should be dispatched.
+        """
+        unique = []
+        with self.__in_flight_lock:
+            for experiment_name, state in batch:
+                if (key := (experiment_name, state)) in self.__in_flight:
+                    logger.info(f"Experiment '{experiment_name}' for '{state}' is already being evaluated, skipping.")
+                    self.__in_flight[key] += 1
+                else:
+                    self.__in_flight[key] = 0
+                    unique.append(key)
+        if not unique:
+            return []
+
+        test_params_list = [
+            eval_params_per_experiment[experiment_name].create_test_for(state) for experiment_name, state in unique
+        ]
+        remaining = []
+        for (experiment_name, state), has_result in zip(unique, MongoDB().has_results(test_params_list)):
+            if has_result:
+                logger.info(f"Experiment '{experiment_name}' for '{state}' was already performed, skipping.")
+                self.__on_evaluation_finished([experiment_name], state)
+            else:
+                remaining.append((experiment_name, state))
+        return remaining
+
+    @staticmethod
+    def group_by_state(
+        batch: list[tuple[str, State]],
+        eval_params_per_experiment: dict[str, EvaluationParameters],
+        db_connection_params: DatabaseParameters,
+    ) -> list[tuple[list[str], WorkerParameters]]:
+        """
+        Groups the scheduled states of experiments by state, such that the binary of each state is prepared only once.
+        Only experiments with the same evaluation configuration are grouped.
+
+        :param batch: The scheduled experiment names and states.
+        :param eval_params_per_experiment: The evaluation parameters of each experiment.
+        :param db_connection_params: The database the workers should connect to.
+        :return: The names of the experiments and the worker parameters that perform their tests, per state.
+        """
+        # Experiments of different jobs can concern other browsers or evaluation configurations, which cannot be batched
+        scheduled_per_state: dict[tuple, list[tuple[str, State]]] = {}
+        for experiment_name, state in batch:
+            evaluation_configuration = eval_params_per_experiment[experiment_name].evaluation_configuration
+            key = (state.browser_name, state, state.repetition, evaluation_configuration)
+            scheduled_per_state.setdefault(key, []).append((experiment_name, state))
+
+        groups = []
+        for scheduled in scheduled_per_state.values():
+            worker_params_list = [
+                eval_params_per_experiment[experiment_name].create_worker_params_for(state, db_connection_params)
+                for experiment_name, state in scheduled
+            ]
+            groups.append(([experiment_name for experiment_name, _ in scheduled], WorkerParameters.batch(worker_params_list)))
+        return groups
 
     @staticmethod
-    def create_sequence_strategy(eval_params: EvaluationParameters) -> SequenceStrategy:
+    def share_splitters(
+        strategies: dict[str, SequenceStrategy | EvaluationPlan],
+        eval_params_per_experiment: dict[str, EvaluationParameters],
+    ) -> list[JointPlanner]:
+        """
+        Lets the strategies of experiments that search the same browser align their splitters, such that their
+        evaluations can share binaries where their ranges overlap.
+
+        :param strategies: The strategy of each experiment.
+        :param eval_params_per_experiment: The evaluation parameters of each experiment.
+        :return: The joint planners, one for each group of at least two experiments.
+        """
+        strategies_per_browser: dict[tuple, list] = {}
+        for experiment_name, strategy in strategies.items():
+            eval_params = eval_params_per_experiment[experiment_name]
+            key = (
+                eval_params.browser_configuration.browser_name,
+                eval_params.evaluation_range.only_release_revisions,
+            )
+            strategies_per_browser.setdefault(key, []).append(strategy)
+
+        joint_planners = []
+        for grouped_strategies in strategies_per_browser.values():
+            if len(grouped_strategies) < 2:
+                continue
+            joint_planner = JointPlanner()
+            for strategy in grouped_strategies:
+                if isinstance(strategy, EvaluationPlan):
+                    strategy = strategy.strategy
+                strategy.share_splitters(joint_planner)
+            joint_planners.append(joint_planner)
+        return joint_planners
+
+    @staticmethod
+    def create_sequence_strategy(eval_params: EvaluationParameters) -> SequenceStrategy | EvaluationPlan:
         sequence_config = eval_params.sequence_configuration
         search_strategy = sequence_config.search_strategy
         sequence_limit = sequence_config.sequence_limit
@@ -114,11 +475,16 @@ class Master:
         state_factory = StateFactory(eval_params, outcome_checker)
 
         if search_strategy == 'bgb_sequence':
-            strategy = BiggestGapBisectionSequence(state_factory, sequence_limit)
+            # The sequence does not depend on outcomes, so it is compiled up front instead of state by state
+            strategy = EvaluationPlan(BiggestGapBisectionSequence(state_factory, sequence_limit))
         elif search_strategy == 'bgb_search':
             strategy = BiggestGapBisectionSearch(state_factory)
         elif search_strategy == 'comp_search':
             strategy = CompositeSearch(state_factory, sequence_limit)
+        elif search_strategy == 'multisection_search':
+            strategy = MultisectionSearch(state_factory, sequence_config.nb_of_containers)
+        elif search_strategy == 'probabilistic_search':
+            strategy = ProbabilisticBisectionSearch(state_factory, sequence_config.nb_of_containers)
         else:
             raise AttributeError("Unknown search strategy option '%s'" % search_strategy)
         return strategy
@@ -126,6 +492,7 @@ class Master:
     def activate_stop_gracefully(self):
         if self.evaluation_framework:
             self.stop_gracefully = True
+            self.__stop_admissions()
             self.__update_state(is_running=True, reason='user', status='waiting_to_stop')
             self.evaluation_framework.stop_gracefully()
             logger.info('Received user signal to gracefully stop.')
@@ -135,6 +502,7 @@ class Master:
     def activate_stop_forcefully(self) -> None:
         if self.evaluation_framework:
             self.stop_forcefully = True
+            self.__stop_admissions()
             self.__update_state(is_running=True, reason='user', status='waiting_to_stop')
             self.evaluation_framework.stop_gracefully()
             WorkerManager.forcefully_stop_all_running_containers()
@@ -142,28 +510,234 @@ class Master:
         else:
             logger.info('Received user signal to forcefully stop, but no evaluation is running.')
 
+    def __stop_admissions(self) -> None:
+        """
+        Stops the scheduler and all jobs that are not admitted yet, the running jobs are stopped once their evaluations
+        are.
+        """
+        with self.__runs_condition:
+            if self.scheduler:
+                self.scheduler.stop()
+            for run in self.runs.values():
+                if run.status == 'admitting':
+                    self.__finish_run(run, 'stopped')
+            self.__runs_condition.notify_all()
+
+    def cancel_job(self, job_id: str) -> bool:
+        """
+        Cancels the given job without affecting the other jobs.
+        Its running evaluations are left to finish, but no new evaluations are dispatched for it.
+
+        :return: False if the job does not exist or is already finished.
+        """
+        with self.__runs_condition:
+            if (run := self.runs.get(job_id)) is None or run.is_finished():
+                return False
+            is_admitted = run.status == 'running'
+            self.__finish_run(run, 'cancelled')
+            self.__runs_condition.notify_all()
+        logger.info(f"Cancelled job '{job_id}'")
+        if is_admitted:
+            for experiment_name in run.get_eval_params_per_experiment():
+                run.scheduler.cancel(experiment_name)
+        self.__update_state(queue=self.eval_queue)
+        return True
+
+    def get_jobs(self) -> list[dict]:
+        """
+        Returns a summary of every job that was submitted since the core started.
+        """
+        with self.__runs_condition:
+            return [run.to_summary() for run in self.runs.values()]
+
+    def get_job_progress(self, job_id: str) -> Optional[dict]:
+        """
+        Returns the progress of each experiment of the given job, or None if the job does not exist.
+        """
+        with self.__runs_condition:
+            run = self.runs.get(job_id)
+        return run.get_progress() if run is not None else None
+
+    def get_interrupted_jobs(self) -> list[tuple[str, list[EvaluationParameters]]]:
+        """
+        Returns the identifier and parameters of the jobs that were running when the core stopped.
+        """
+        try:
+            return EvaluationQueue.get_unfinished_runs()
+        except ServerException:
+            logger.error('Could not check for interrupted jobs', exc_info=True)
+            return []
+
+    def detach(self) -> None:
+        """
+        Stops dispatching evaluations without stopping the running ones, so the jobs can be resumed after the core
+        restarted.
+        """
+        self.is_detaching = True
+        with self.__runs_condition:
+            if self.scheduler:
+                self.scheduler.stop()
+            self.__runs_condition.notify_all()
+
     def stop_bughog(self) -> None:
-        logger.info('Stopping all running BugHog containers...')
-        self.activate_stop_forcefully()
-        mongodb_container.stop()
+        if self.state['is_running']:
+            # Workers keep running and storing their results, and are reattached once the core is back
+            logger.info('Detaching from running BugHog workers...')
+            self.detach()
+        else:
+            logger.info('Stopping all running BugHog containers...')
+            self.activate_stop_forcefully()
+            mongodb_container.stop()
         logger.info('Stopping BugHog core...')
         exit(0)
 
+    def __is_stopping(self) -> bool:
+        return self.stop_gracefully or self.stop_forcefully or self.is_detaching
+
     def __update_state(self, **kwargs) -> None:
         for key, value in kwargs.items():
             self.state[key] = value
         Clients.push_info_to_all('state')
 
-    def __init_eval_queue(self, eval_params_list: list[EvaluationParameters]) -> None:
-        self.eval_queue = []
-        for eval_params in eval_params_list:
-            self.eval_queue.append({
-                'experiment': eval_params.evaluation_range.mech_group,
-                'state': 'pending'
-            })
+    def __on_job_finished(
+        self, job_id: ObjectId, experiment_names: list[str], params: WorkerParameters, success: bool
+    ) -> None:
+        EvaluationQueue.finish_job(job_id)
+        retried_experiment_names = self.__retry_failed_tests(experiment_names, params, success)
+        self.__on_evaluation_finished(
+            [name for name in experiment_names if name not in retried_experiment_names], params.state
+        )
+
+    def __retry_failed_tests(self, experiment_names: list[str], params: WorkerParameters, success: bool) -> list[str]:
+        """
+        Evaluates the failed tests of the given evaluation again after a backoff, such that the strategies do not have
+        to route around them. Tests that failed too often are given up on, and their state is excluded from future runs.
+        A retried evaluation keeps counting as running in the scheduler until it is finished for good.
+
+        :param success: Whether the worker exited successfully. Tests of a failed worker without a recorded failure or
+            stored result are considered to have crashed the browser, since the worker died before recording it.
+        :return: The experiments that are retried.
+        """
+        try:
+            failures = EvaluationFailures.pop_failures(params)
+        except Exception:
+            logger.error(f"Could not check for failed tests of '{params.state}'", exc_info=True)
+            return []
+        # Experiments are retried after a backoff that depends on their own number of attempts
+        retried_experiment_names_per_attempts: dict[int, list[str]] = {}
+        for experiment_name in experiment_names:
+            eval_params = self.__eval_params_per_experiment[experiment_name]
+            test_params = eval_params.create_test_for(params.state)
+            if (failure_class := failures.get(eval_params.evaluation_range.mech_group)) is None:
+                if success or self.__has_result(test_params):
+                    continue
+                failure_class = 'browser_crash'
+            key = (experiment_name, params.state)
+            with self.__in_flight_lock:
+                nb_of_attempts = self.__nb_of_attempts.pop(key, 0) + 1
+                if not self.__is_stopping() and nb_of_attempts <= Global.get_max_nb_of_retries():
+                    self.__nb_of_attempts[key] = nb_of_attempts
+            if self.__is_stopping():
+                continue
+            if nb_of_attempts > Global.get_max_nb_of_retries():
+                logger.warning(
+                    f"Experiment '{experiment_name}' for '{params.state}' failed {nb_of_attempts} times "
+                    f"({failure_class}), excluding the state from future runs"
+                )
+                try:
+                    EvaluationFailures.exclude(test_params, failure_class, nb_of_attempts)
+                except Exception:
+                    logger.error(f"Could not exclude '{params.state}' for '{experiment_name}'", exc_info=True)
+                continue
+            try:
+                # The dirty result would otherwise count as performed
+                MongoDB().remove_dirty_result(test_params)
+            except Exception:
+                logger.error(f"Could not remove the dirty result of '{experiment_name}' for '{params.state}'", exc_info=True)
+                continue
+            logger.info(f"Experiment '{experiment_name}' for '{params.state}' failed ({failure_class}), retrying it")
+            retried_experiment_names_per_attempts.setdefault(nb_of_attempts, []).append(experiment_name)
+        for nb_of_attempts, retried_experiment_names in retried_experiment_names_per_attempts.items():
+            backoff = Global.get_retry_backoff() * 2 ** (nb_of_attempts - 1)
+            timer = threading.Timer(
+                backoff, self.__requeue_failed, args=[self.scheduler, retried_experiment_names, params.state]
+            )
+            timer.daemon = True
+            timer.start()
+        return [name for names in retried_experiment_names_per_attempts.values() for name in names]
+
+    @staticmethod
+    def __has_result(test_params: TestParameters) -> bool:
+        try:
+            return MongoDB().has_result(test_params)
+        except Exception:
+            logger.error(f"Could not check for the result of '{test_params}'", exc_info=True)
+            # Not retrying is safer, since the strategy routes around a missing result
+            return True
+
+    def __requeue_failed(self, scheduler: FairShareScheduler, experiment_names: list[str], state: State) -> None:
+        for experiment_name in experiment_names:
+            with self.__in_flight_lock:
+                nb_of_duplicates = self.__in_flight.pop((experiment_name, state), 0)
+            # Duplicates are released, they will be deduplicated against the retried evaluation
+            for _ in range(nb_of_duplicates):
+                scheduler.on_evaluation_finished(experiment_name)
+            scheduler.requeue(experiment_name, state)
+
+    def __on_evaluation_finished(self, experiment_names: list[str], state: State) -> None:
+        for experiment_name in experiment_names:
+            with self.__in_flight_lock:
+                nb_of_duplicates = self.__in_flight.pop((experiment_name, state), 0)
+            self.scheduler.on_evaluation_finished(experiment_name, state)
+            for _ in range(nb_of_duplicates):
+                self.scheduler.on_evaluation_finished(experiment_name)
+
+    def __on_experiment_finished(self, experiment_name: str) -> None:
+        self.__update_eval_queue(experiment_name, 'done')
+        with self.__runs_condition:
+            run = self.__runs_per_experiment[experiment_name]
+            run.finished_experiment_names.add(experiment_name)
+            if not run.is_finished() and len(run.finished_experiment_names) == len(run.get_eval_params_per_experiment()):
+                logger.info(f"All experiments of job '{run.job_id}' are done")
+                self.__finish_run(run, 'done')
+        self.__update_state(queue=self.eval_queue)
+
+    def __on_experiment_failed(self, experiment_name: str) -> None:
+        """
+        Fails the job of the given experiment, of which the other experiments are cancelled.
+        """
+        with self.__runs_condition:
+            run = self.__runs_per_experiment[experiment_name]
+            if run.is_finished():
+                return
+            logger.error(f"Experiment '{experiment_name}' failed, failing job '{run.job_id}'")
+            self.__finish_run(run, 'failed')
+            self.__runs_condition.notify_all()
+        for name in run.get_eval_params_per_experiment():
+            if name != experiment_name:
+                run.scheduler.cancel(name)
+
+    def __finish_run(self, run: EvaluationRun, status: str) -> None:
+        """
+        Finishes the given job, which should be called while holding the lock on the jobs.
+        """
+        run.finish(status)
+        for joint_planner in run.joint_planners:
+            report = joint_planner.get_report()
+            logger.info(
+                f"Job '{run.job_id}' aligned {report['nb_of_aligned_splitters']} of {report['nb_of_splitters']} "
+                f"splitters, fetching {report['nb_of_binaries']} instead of {report['nb_of_binaries_without_alignment']} "
+                f'binaries ({report["reduction"]:.0%} fewer)'
+            )
+        if run.run_id is None:
+            return
+        try:
+            EvaluationQueue.finish_run(run.run_id, status)
+        except ServerException:
+            logger.error(f"Could not mark job '{run.job_id}' as {status}", exc_info=True)
 
-    def __update_eval_queue(self, experiment: str, state: str) -> None:
+    def __update_eval_queue(self, experiment_name: str, state: str) -> None:
         for eval in self.eval_queue:
-            if eval['experiment'] == experiment:
+            if eval['name'] == experiment_name:
                 eval['state'] = state
                 return
@@ -28,23 +28,23 @@ class BiggestGapBisectionSearch(BiggestGapBisectionSequence):
         """
         Returns the next state to evaluate.
         """
-        # Fetch all evaluated states
-        self._fetch_evaluated_states()
+        # Fetch the states that were evaluated since the previous call
+        self._fetch_new_evaluated_states()
 
         if self._limit and self._limit <= len(self._completed_states):
             raise SequenceFinished()
 
-        if self._lower_state not in self._completed_states:
+        if self._lower_state not in self._intervals:
             self._add_state(self._lower_state)
             return self._lower_state
-        if self._upper_state not in self._completed_states:
+        if self._upper_state not in self._intervals:
             self._add_state(self._upper_state)
             return self._upper_state
 
         while next_pair := self.__get_next_pair_to_split():
             splitter_state = self._find_best_splitter_state(next_pair[0], next_pair[1])
             if splitter_state is None:
-                self._unavailability_gap_pairs.add(next_pair)
+                self._add_unavailability_gap(next_pair)
             if splitter_state:
                 logger.debug(f'Splitting [{next_pair[0].index}]--/{splitter_state.index}/--[{next_pair[1].index}]')
                 self._add_state(splitter_state)
@@ -63,7 +63,7 @@ class BiggestGapBisectionSearch(BiggestGapBisectionSequence):
         # Remove the first and last pair if they have a first and last state with a None outcome, respectively
         if pairs[0][0].outcome is None:
             pairs = pairs[1:]
-        if pairs[-1][1].outcome is None:
+        if pairs and pairs[-1][1].outcome is None:
             pairs = pairs[:-1]
         # Remove all pairs that have already been identified as unavailability gaps
         pairs = [pair for pair in pairs if pair not in self._unavailability_gap_pairs]
@@ -21,8 +21,17 @@ class BiggestGapBisectionSequence(SequenceStrategy):
         :param limit: The maximum number of states to evaluate. 0 means no limit.
         """
         super().__init__(state_factory, limit)
-        self._unavailability_gap_pairs: set[tuple[State, State]] = set()
-        """Tuples in this list are **strict** boundaries of ranges without any available binaries."""
+
+    @property
+    def _unavailability_gap_pairs(self) -> set[tuple[State, State]]:
+        """
+        Pairs of states that are **strict** boundaries of ranges without any available binaries.
+        Gaps should be added through `_add_unavailability_gap`.
+        """
+        return self._intervals.unavailability_gaps
+
+    def _add_unavailability_gap(self, pair: tuple[State, State]) -> None:
+        self._intervals.add_unavailability_gap(pair)
 
     def next(self) -> State:
         """
@@ -35,27 +44,24 @@ class BiggestGapBisectionSequence(SequenceStrategy):
         if self._limit and self._limit <= len(self._completed_states):
             raise SequenceFinished()
 
-        if self._lower_state not in self._completed_states:
+        if self._lower_state not in self._intervals:
             self._add_state(self._lower_state)
             return self._lower_state
-        if self._upper_state not in self._completed_states:
+        if self._upper_state not in self._intervals:
             self._add_state(self._upper_state)
             return self._upper_state
 
-        pairs = list(zip(self._completed_states, self._completed_states[1:]))
-        while pairs:
-            filtered_pairs = [pair for pair in pairs if not self._pair_is_in_unavailability_gap(pair)]
-            furthest_pair = max(filtered_pairs, key=lambda x: x[1].index - x[0].index)
+        # Popped gaps are either split or marked as unavailable, so they never have to be considered again
+        while furthest_pair := self._intervals.pop_biggest_gap():
             splitter_state = self._find_best_splitter_state(furthest_pair[0], furthest_pair[1])
             if splitter_state is None:
-                self._unavailability_gap_pairs.add(furthest_pair)
+                self._add_unavailability_gap(furthest_pair)
             elif splitter_state:
                 logger.debug(
                     f'Splitting [{furthest_pair[0].index}]--/{splitter_state.index}/--[{furthest_pair[1].index}]'
                 )
                 self._add_state(splitter_state)
                 return splitter_state
-            pairs.remove(furthest_pair)
         raise SequenceFinished()
 
     def _find_best_splitter_state(self, first_state: State, last_state: State) -> Optional[State]:
@@ -73,19 +79,10 @@ class BiggestGapBisectionSequence(SequenceStrategy):
         """
         Returns True if the state is in a gap between two states without any available binaries.
         """
-        for pair in self._unavailability_gap_pairs:
-            if pair[0].index < state.index < pair[1].index:
-                return True
-        return False
+        return self._intervals.is_in_unavailability_gap(state.index)
 
     def _pair_is_in_unavailability_gap(self, pair: tuple[State, State]) -> bool:
         """
         Returns True if the pair of states is in a gap between two states without any available binaries
         """
-        for gap_pair in self._unavailability_gap_pairs:
-            if (
-                gap_pair[0].index < pair[0].index < gap_pair[1].index
-                and gap_pair[0].index < pair[1].index < gap_pair[1].index
-            ):
-                return True
-        return False
+        return self._intervals.is_in_unavailability_gap(pair[0].index, pair[1].index)
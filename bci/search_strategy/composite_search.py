@@ -1,5 +1,6 @@
 from bci.search_strategy.bgb_search import BiggestGapBisectionSearch
 from bci.search_strategy.bgb_sequence import BiggestGapBisectionSequence
+from bci.search_strategy.joint_planner import JointPlanner
 from bci.search_strategy.sequence_strategy import SequenceFinished
 from bci.version_control.factory import StateFactory
 from bci.version_control.states.state import State
@@ -11,6 +12,14 @@ class CompositeSearch():
         self.search_strategy = BiggestGapBisectionSearch(state_factory)
         self.sequence_strategy_finished = False
 
+    def share_splitters(self, joint_planner: JointPlanner) -> None:
+        self.sequence_strategy.share_splitters(joint_planner)
+        self.search_strategy.share_splitters(joint_planner)
+
+    def on_evaluation_finished(self, state: State) -> None:
+        self.sequence_strategy.on_evaluation_finished(state)
+        self.search_strategy.on_evaluation_finished(state)
+
     def next(self) -> State:
         # First we use the sequence strategy to select the next state
         if not self.sequence_strategy_finished:
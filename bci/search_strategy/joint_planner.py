@@ -0,0 +1,85 @@
+import bisect
+import threading
+from typing import Optional
+
+# Splitters are aligned to states of other experiments that lie within this fraction of the gap from the target
+DEFAULT_ALIGNMENT_TOLERANCE = 0.1
+
+
+class JointPlanner:
+    """
+    Aligns the splitter states of the search strategies of experiments that search the same browser.
+    Experiments with slightly different ranges or outcomes would each pick their own splitters, of which the binaries
+    barely overlap. Instead, when a strategy splits a gap, it reuses a state that another experiment already picked if
+    it lies within a tolerance of the preferred state, such that a single prepared binary serves several experiments.
+    The planner only shares indexes, each strategy still creates its own state objects.
+    """
+
+    def __init__(self, tolerance: float = DEFAULT_ALIGNMENT_TOLERANCE) -> None:
+        """
+        :param tolerance: The maximum distance between the preferred and the aligned state, as a fraction of the gap.
+        """
+        self.tolerance = tolerance
+        self.__lock = threading.Lock()
+        self.__picked_indexes: list[int] = []
+        # The states the strategies would have picked on their own, to report the effect of aligning
+        self.__preferred_indexes: set[int] = set()
+        self.__nb_of_picks = 0
+        self.__nb_of_aligned_picks = 0
+
+    def find_aligned_index(self, target_index: int, first_index: int, last_index: int) -> Optional[int]:
+        """
+        Returns the index picked by any experiment that is nearest to the target, within the tolerance and **strictly**
+        between the given indexes. Of two equally near indexes, the lower one is returned.
+
+        :param target_index: The index the strategy prefers.
+        :param first_index: The lower boundary of the gap.
+        :param last_index: The upper boundary of the gap.
+        """
+        max_distance = int(self.tolerance * (last_index - first_index))
+        lower = max(first_index + 1, target_index - max_distance)
+        upper = min(last_index - 1, target_index + max_distance)
+        with self.__lock:
+            start = bisect.bisect_left(self.__picked_indexes, lower)
+            end = bisect.bisect_right(self.__picked_indexes, upper)
+            candidates = self.__picked_indexes[start:end]
+        if not candidates:
+            return None
+        return min(candidates, key=lambda index: (abs(index - target_index), index))
+
+    def register(self, index: int, preferred_index: Optional[int], is_aligned: bool) -> None:
+        """
+        Records that a strategy picked the given index as splitter.
+
+        :param index: The picked index.
+        :param preferred_index: The index of the available binary the strategy would have picked on its own, or None if
+        it would not have found any.
+        :param is_aligned: Whether the index was picked by another experiment before.
+        """
+        with self.__lock:
+            position = bisect.bisect_left(self.__picked_indexes, index)
+            if position == len(self.__picked_indexes) or self.__picked_indexes[position] != index:
+                self.__picked_indexes.insert(position, index)
+            if preferred_index is not None:
+                self.__preferred_indexes.add(preferred_index)
+            self.__nb_of_picks += 1
+            self.__nb_of_aligned_picks += is_aligned
+
+    def get_report(self) -> dict:
+        """
+        Returns the number of splitters that were picked, of which how many were aligned, and the number of unique
+        binaries they concern compared to the number of unique binaries the strategies would have picked on their own
+        for the same splits.
+        """
+        with self.__lock:
+            nb_of_binaries = len(self.__picked_indexes)
+            nb_of_binaries_without_alignment = len(self.__preferred_indexes)
+            return {
+                'nb_of_splitters': self.__nb_of_picks,
+                'nb_of_aligned_splitters': self.__nb_of_aligned_picks,
+                'nb_of_binaries': nb_of_binaries,
+                'nb_of_binaries_without_alignment': nb_of_binaries_without_alignment,
+                'reduction': (
+                    1 - nb_of_binaries / nb_of_binaries_without_alignment if nb_of_binaries_without_alignment else 0.0
+                ),
+            }
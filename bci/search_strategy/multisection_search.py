@@ -0,0 +1,139 @@
+import heapq
+import itertools
+import logging
+import threading
+
+from bci.search_strategy.bgb_sequence import BiggestGapBisectionSequence
+from bci.search_strategy.sequence_strategy import SequenceFinished
+from bci.version_control.factory import StateFactory
+from bci.version_control.states.state import State
+
+logger = logging.getLogger(__name__)
+
+
+class MultisectionSearch(BiggestGapBisectionSequence):
+    """
+    This search strategy is a parallel variant of the biggest gap bisection search.
+    Instead of splitting the biggest gap between two states with different outcomes in half, it keeps up to
+    `parallelism` states of such gaps under evaluation, splitting them in multiple parts at once.
+    Next to the middle of a gap, the middles of both halves are evaluated speculatively, as either one of them will be
+    the next gap to split.
+    States that were planned but are made redundant by new outcomes are dropped before they are evaluated.
+    """
+
+    def __init__(self, state_factory: StateFactory, parallelism: int) -> None:
+        """
+        Initializes the search strategy.
+
+        :param state_factory: The factory to create new states.
+        :param parallelism: The number of states that can be evaluated concurrently.
+        """
+        super().__init__(state_factory, 0)
+        self._parallelism = max(1, parallelism)
+        self._in_flight: set[int] = set()
+        """Indexes of states that were returned, but of which the result is not available yet."""
+        self._planned: list[State] = []
+        # Indexes of which the evaluation finished for good, reported from other threads until the next call to `next`
+        self.__finished_indexes: set[int] = set()
+        self.__finished_indexes_lock = threading.Lock()
+
+    def next(self) -> State:
+        """
+        Returns the next state to evaluate.
+        If the maximum number of useful states is already being evaluated, SequenceFinished is raised. Calling this
+        method again after some of those states are evaluated can yield new states.
+        """
+        self.__fetch_new_evaluated_states()
+
+        for boundary_state in (self._lower_state, self._upper_state):
+            if boundary_state not in self._intervals:
+                return self.__dispatch(boundary_state)
+
+        active_gaps = self.__get_active_gaps()
+        nb_of_planned_states = len(self._planned)
+        self._planned = [state for state in self._planned if self.__is_in_gaps(state.index, active_gaps)]
+        if len(self._planned) < nb_of_planned_states:
+            logger.debug(f'Dropped {nb_of_planned_states - len(self._planned)} redundant planned state(s)')
+
+        if not self._planned:
+            self._planned = self.__plan(active_gaps)
+        if not self._planned:
+            raise SequenceFinished()
+        return self.__dispatch(self._planned.pop(0))
+
+    def on_evaluation_finished(self, state: State) -> None:
+        with self.__finished_indexes_lock:
+            self.__finished_indexes.add(state.index)
+
+    def __fetch_new_evaluated_states(self) -> None:
+        """
+        Fetches the states that were evaluated since the previous call, while keeping the states that are still being
+        evaluated.
+        States of which the evaluation finished without a result, e.g., because they were excluded after failing
+        repeatedly, are no longer in flight, and are kept as failed states so they are not dispatched again.
+        """
+        # Results are stored before their evaluation is reported as finished, so they are fetched afterwards
+        with self.__finished_indexes_lock:
+            finished_indexes, self.__finished_indexes = self.__finished_indexes, set()
+        evaluated_indexes = {state.index for state in self._fetch_new_evaluated_states()}
+        self._in_flight -= evaluated_indexes | finished_indexes
+
+    def __dispatch(self, state: State) -> State:
+        self._add_state(state)
+        self._in_flight.add(state.index)
+        return state
+
+    def __get_active_gaps(self) -> list[tuple[State, State]]:
+        """
+        Returns all gaps between consecutive evaluated states with a different outcome.
+        """
+        informative_states = [
+            state
+            for state in self._completed_states
+            if state.index not in self._in_flight and state.outcome is not None
+        ]
+        return [
+            (first_state, last_state)
+            for first_state, last_state in zip(informative_states, informative_states[1:])
+            if first_state.outcome != last_state.outcome
+        ]
+
+    @staticmethod
+    def __is_in_gaps(index: int, gaps: list[tuple[State, State]]) -> bool:
+        return any(first_state.index < index < last_state.index for first_state, last_state in gaps)
+
+    def __plan(self, active_gaps: list[tuple[State, State]]) -> list[State]:
+        """
+        Plans the states that should be evaluated next, such that the number of useful states under evaluation reaches
+        the parallelism.
+        The active gaps are cut into intervals by the states that are being evaluated (or that failed), after which the
+        biggest interval is split repeatedly. This yields the middle of a gap, followed by the middles of its halves, etc.
+        States that are being evaluated outside the active gaps are redundant and thus do not count as useful.
+        """
+        nb_of_useful_in_flight_states = len([index for index in self._in_flight if self.__is_in_gaps(index, active_gaps)])
+        budget = self._parallelism - nb_of_useful_in_flight_states
+        if budget <= 0:
+            return []
+
+        counter = itertools.count()
+        intervals = []
+        for first_state, last_state in active_gaps:
+            inner_states = self._intervals.get_states_between(first_state.index, last_state.index)
+            boundaries = [first_state] + inner_states + [last_state]
+            for first, last in zip(boundaries, boundaries[1:]):
+                heapq.heappush(intervals, (first.index - last.index, next(counter), first, last))
+
+        planned_states = []
+        while intervals and len(planned_states) < budget:
+            _, _, first_state, last_state = heapq.heappop(intervals)
+            if (first_state, last_state) in self._unavailability_gap_pairs:
+                continue
+            splitter_state = self._find_best_splitter_state(first_state, last_state)
+            if splitter_state is None:
+                self._add_unavailability_gap((first_state, last_state))
+                continue
+            logger.debug(f'Splitting [{first_state.index}]--/{splitter_state.index}/--[{last_state.index}]')
+            planned_states.append(splitter_state)
+            heapq.heappush(intervals, (first_state.index - splitter_state.index, next(counter), first_state, splitter_state))
+            heapq.heappush(intervals, (splitter_state.index - last_state.index, next(counter), splitter_state, last_state))
+        return planned_states
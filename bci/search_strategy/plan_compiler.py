@@ -0,0 +1,172 @@
+import logging
+import threading
+import time
+from typing import Callable, Optional
+
+from bson import ObjectId
+
+from bci.database.mongo.evaluation_plan_store import EvaluationPlanStore
+from bci.search_strategy.sequence_strategy import SequenceFinished, SequenceNotReady, SequenceStrategy
+from bci.version_control.states.state import State
+
+logger = logging.getLogger(__name__)
+
+# Compiled states are persisted in batches of this size
+PERSIST_BATCH_SIZE = 25
+
+
+class EvaluationPlan:
+    """
+    Compiles the ordered list of states of a sequence strategy that does not depend on evaluation outcomes, such as
+    `BiggestGapBisectionSequence`, in a background thread.
+    The dispatcher consumes the plan while it is compiled, so it never waits for the availability probing of the
+    strategy while states are ready, and the persisted plan allows reporting progress and an ETA.
+    """
+
+    def __init__(self, strategy: SequenceStrategy) -> None:
+        """
+        Initializes the plan without compiling it.
+
+        :param strategy: The outcome-independent strategy of which the states are compiled.
+        """
+        self.strategy = strategy
+        # Called whenever new states are compiled, e.g., to wake the scheduler that waits for them
+        self.on_progress: Callable[[], None] = lambda: None
+        self.__states: list[State] = []
+        self.__nb_of_dispatched_states = 0
+        self.__first_dispatch_ts: Optional[float] = None
+        self.__is_compiled = False
+        # The error that aborted the compilation, which is raised to the consumer of the plan
+        self.__error: Optional[Exception] = None
+        self.__lock = threading.Lock()
+        self.__stop_event = threading.Event()
+        self.__run_id: Optional[ObjectId] = None
+        self.__experiment_name: Optional[str] = None
+
+    def compile(self, run_id: Optional[ObjectId] = None, experiment_name: Optional[str] = None) -> None:
+        """
+        Starts compiling the plan in the background.
+
+        :param run_id: The run under which the plan is persisted, or None if it should not be persisted.
+        :param experiment_name: The name of the experiment the plan belongs to.
+        """
+        self.__run_id = run_id
+        self.__experiment_name = experiment_name
+        threading.Thread(target=self.__compile, name=f'bh_plan_compiler_{experiment_name}', daemon=True).start()
+
+    def stop(self) -> None:
+        """
+        Stops compiling, the states that are already compiled are still handed out.
+        """
+        self.__stop_event.set()
+
+    def next(self) -> State:
+        """
+        Returns the next state of the plan.
+
+        :raises SequenceNotReady: If the next state is still being compiled.
+        :raises SequenceFinished: If all states of the plan were handed out.
+        :raises Exception: The error of the strategy if compiling the plan failed.
+        """
+        with self.__lock:
+            if self.__error is not None:
+                raise self.__error
+            if self.__nb_of_dispatched_states == len(self.__states):
+                if self.__is_compiled:
+                    raise SequenceFinished()
+                raise SequenceNotReady()
+            state = self.__states[self.__nb_of_dispatched_states]
+            self.__nb_of_dispatched_states += 1
+            nb_of_dispatched_states = self.__nb_of_dispatched_states
+            if self.__first_dispatch_ts is None:
+                self.__first_dispatch_ts = time.time()
+        if self.__run_id is not None:
+            try:
+                EvaluationPlanStore.set_nb_of_dispatched_states(
+                    self.__run_id, self.__experiment_name, nb_of_dispatched_states
+                )
+            except Exception:
+                logger.warning(f"Could not persist the progress of plan '{self.__experiment_name}'", exc_info=True)
+        return state
+
+    def on_evaluation_finished(self, state: State) -> None:
+        """
+        The plan does not depend on evaluation outcomes, so finished evaluations are ignored.
+        """
+        pass
+
+    def is_compiled(self) -> bool:
+        with self.__lock:
+            return self.__is_compiled
+
+    def is_failed(self) -> bool:
+        with self.__lock:
+            return self.__error is not None
+
+    def get_progress(self, nb_of_finished_evaluations: int) -> dict:
+        """
+        Returns the size of the plan and the number of dispatched states, with an estimate of the remaining seconds
+        based on the rate at which evaluations finished so far.
+
+        :param nb_of_finished_evaluations: The number of evaluations of the plan that finished.
+        """
+        with self.__lock:
+            nb_of_planned_states = len(self.__states)
+            progress = {
+                'nb_of_planned_states': nb_of_planned_states,
+                'nb_of_dispatched_states': self.__nb_of_dispatched_states,
+                'is_compiled': self.__is_compiled,
+                'is_failed': self.__error is not None,
+                'eta': None,
+            }
+            if self.__is_compiled and self.__first_dispatch_ts is not None and nb_of_finished_evaluations > 0:
+                seconds_per_evaluation = (time.time() - self.__first_dispatch_ts) / nb_of_finished_evaluations
+                nb_of_remaining_states = max(0, nb_of_planned_states - nb_of_finished_evaluations)
+                progress['eta'] = nb_of_remaining_states * seconds_per_evaluation
+        return progress
+
+    def __compile(self) -> None:
+        start = time.monotonic()
+        nb_of_persisted_states = 0
+        try:
+            if self.__run_id is not None:
+                EvaluationPlanStore.start_plan(self.__run_id, self.__experiment_name)
+            while not self.__stop_event.is_set():
+                try:
+                    state = self.strategy.next()
+                except SequenceFinished:
+                    break
+                with self.__lock:
+                    self.__states.append(state)
+                self.on_progress()
+                if self.__run_id is not None and len(self.__states) - nb_of_persisted_states >= PERSIST_BATCH_SIZE:
+                    nb_of_persisted_states = self.__persist(nb_of_persisted_states)
+        except Exception as e:
+            logger.error(f"Could not compile the plan of '{self.__experiment_name}'", exc_info=True)
+            with self.__lock:
+                self.__error = e
+        finally:
+            with self.__lock:
+                error = self.__error
+                self.__is_compiled = error is None
+            if self.__run_id is not None:
+                try:
+                    self.__persist(nb_of_persisted_states, is_compiled=error is None)
+                    if error is not None:
+                        EvaluationPlanStore.fail_plan(self.__run_id, self.__experiment_name, str(error))
+                except Exception:
+                    logger.warning(f"Could not persist the plan of '{self.__experiment_name}'", exc_info=True)
+            self.on_progress()
+        if error is None:
+            logger.info(
+                f"Compiled plan of {len(self.__states)} states for '{self.__experiment_name}' in "
+                f'{time.monotonic() - start:.1f}s'
+            )
+
+    def __persist(self, nb_of_persisted_states: int, is_compiled: bool = False) -> int:
+        with self.__lock:
+            states = self.__states[nb_of_persisted_states:]
+        EvaluationPlanStore.add_states(
+            self.__run_id, self.__experiment_name, [state.name for state in states], is_compiled
+        )
+        return nb_of_persisted_states + len(states)
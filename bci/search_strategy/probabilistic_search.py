@@ -0,0 +1,345 @@
+import logging
+import math
+import threading
+from typing import Optional
+
+from bci.search_strategy.sequence_strategy import SequenceFinished, SequenceStrategy
+from bci.version_control.factory import StateFactory
+from bci.version_control.states.state import State, StateCondition
+
+logger = logging.getLogger(__name__)
+
+# Expected reproduction rates are kept away from 0 and 1 when estimating the information gain
+MIN_REPRODUCTION_RATE = 0.02
+MAX_REPRODUCTION_RATE = 0.98
+# Evaluations that are expected to yield less information (in bits) are not worth a browser run
+MIN_INFORMATION_GAIN = 0.001
+# The posterior quantiles near which new states are considered
+CANDIDATE_QUANTILES = (0.5, 0.25, 0.75, 0.125, 0.375, 0.625, 0.875)
+# The beta prior of the reproduction rates on either side of the transition, which favors rates near 0 and 1, as most
+# PoCs either reproduce reliably or not at all
+REPRODUCTION_RATE_PRIOR = (0.5, 0.5)
+# Boundaries of which all outcomes agree are evaluated up to this many times before concluding there is no transition
+MAX_NB_OF_BOUNDARY_EVALUATIONS = 3
+# Without a limit, the number of evaluations is capped at this many per bit of the evaluation range
+MAX_NB_OF_EVALUATIONS_PER_BIT = 4
+
+
+class ProbabilisticBisectionSearch(SequenceStrategy):
+    """
+    This search strategy looks for a single transition in the evaluation range (e.g., the introduction or fix of a bug)
+    of which the outcomes are flaky.
+    Instead of trusting each outcome, it keeps a posterior distribution over the index at which the transition lies.
+    The PoC is assumed to reproduce with an unknown rate on either side of the transition, which is estimated from all
+    outcomes together with the posterior.
+    Each evaluation is picked among new states near the posterior quantiles and repetitions of evaluated states,
+    maximizing the expected information gain. States are thus only repeated where this resolves more uncertainty than
+    splitting further, typically at the boundaries of the most likely gap.
+    The search finishes once a gap between consecutive states with available binaries holds the transition with the
+    requested confidence.
+
+    Repetitions of a state are only dispatched when no earlier evaluation of that state is running, because the
+    scheduler deduplicates running evaluations of the same state.
+    """
+
+    def __init__(self, state_factory: StateFactory, parallelism: int, confidence: float = 0.95, limit: int = 0) -> None:
+        """
+        Initializes the search strategy.
+
+        :param state_factory: The factory to create new states.
+        :param parallelism: The number of states that can be evaluated concurrently.
+        :param confidence: The posterior probability with which the transition should lie in the final gap.
+        :param limit: The maximum number of evaluations. 0 means the limit is derived from the size of the range.
+        """
+        super().__init__(state_factory, limit)
+        self._parallelism = max(1, parallelism)
+        self._confidence = confidence
+        if not self._limit:
+            nb_of_bits = math.ceil(math.log2(max(2, self._upper_state.index - self._lower_state.index)))
+            self._limit = MAX_NB_OF_EVALUATIONS_PER_BIT * (nb_of_bits + 2)
+        self._outcomes: dict[tuple[int, int], Optional[bool]] = {}
+        """Outcomes of evaluations by index and repetition, of which failed evaluations are None."""
+        self._in_flight: dict[int, int] = {}
+        """Repetitions of states that were returned, but of which the result is not available yet, by index."""
+        self._nb_of_evaluations: dict[int, int] = {}
+        self._states: dict[int, State] = {
+            self._lower_state.index: self._lower_state,
+            self._upper_state.index: self._upper_state,
+        }
+        self._unsplittable_gaps: set[tuple[int, int]] = set()
+        """Gaps between evaluated indexes without available binaries strictly in between."""
+        self._is_finished = False
+        # Evaluations that finished for good by index and repetition, reported from other threads until the next fetch
+        self.__finished_evaluations: list[tuple[int, int]] = []
+        self.__finished_evaluations_lock = threading.Lock()
+
+    def next(self) -> State:
+        """
+        Returns the next state to evaluate, which can be a repetition of an evaluated state.
+        If no useful state can be evaluated until running evaluations finish, SequenceFinished is raised. Calling this
+        method again after some of those states are evaluated can yield new states.
+        """
+        self.__fetch_outcomes()
+        if self._is_finished:
+            raise SequenceFinished()
+        if len(self._in_flight) >= self._parallelism or len(self._outcomes) + len(self._in_flight) >= self._limit:
+            raise SequenceFinished()
+
+        if (boundary_index := self.__get_boundary_to_evaluate()) is not None:
+            return self.__dispatch(boundary_index)
+        if not self.__do_boundaries_differ():
+            # The boundaries are being evaluated, or never yielded a difference
+            self._is_finished = not self._in_flight
+            raise SequenceFinished()
+
+        breakpoints, posterior, rates = self.__estimate()
+        if self.__has_converged(breakpoints, posterior):
+            self._is_finished = True
+            raise SequenceFinished()
+        if (index := self.__pick_most_informative_index(breakpoints, posterior, rates)) is None:
+            self._is_finished = not self._in_flight
+            raise SequenceFinished()
+        return self.__dispatch(index)
+
+    def get_transition(self) -> Optional[tuple[int, int, float]]:
+        """
+        Returns the most likely gap in which the transition lies, as the indexes of the evaluated states that bound it,
+        together with the posterior probability of the transition lying in it.
+        Returns None if the boundaries were not evaluated yet.
+        """
+        self.__fetch_outcomes()
+        if not self.__do_boundaries_differ():
+            return None
+        breakpoints, posterior, _ = self.__estimate()
+        k = max(range(len(posterior)), key=lambda i: posterior[i])
+        return breakpoints[k], breakpoints[k + 1], posterior[k]
+
+    def on_evaluation_finished(self, state: State) -> None:
+        with self.__finished_evaluations_lock:
+            self.__finished_evaluations.append((state.index, state.repetition))
+
+    def __fetch_outcomes(self) -> None:
+        # Results are stored before their evaluation is reported as finished, so they are fetched afterwards
+        with self.__finished_evaluations_lock:
+            finished_evaluations, self.__finished_evaluations = self.__finished_evaluations, []
+        new_states, self._evaluated_states_mark = self._state_factory.create_new_evaluated_states(
+            self._evaluated_states_mark
+        )
+        for state in new_states:
+            outcome = None if state.condition == StateCondition.FAILED else state.outcome
+            self._outcomes[(state.index, state.repetition)] = outcome
+            self._states.setdefault(state.index, state)
+            self._nb_of_evaluations[state.index] = max(
+                self._nb_of_evaluations.get(state.index, 0), state.repetition + 1
+            )
+            if self._in_flight.get(state.index) == state.repetition:
+                del self._in_flight[state.index]
+        for index, repetition in finished_evaluations:
+            if self._in_flight.get(index) == repetition:
+                # Evaluations without a result, e.g., excluded after failing repeatedly, count as failed
+                del self._in_flight[index]
+                self._outcomes.setdefault((index, repetition), None)
+
+    def __dispatch(self, index: int) -> State:
+        repetition = self._nb_of_evaluations.get(index, 0)
+        if repetition == 0 and index in self._states:
+            state = self._states[index]
+        else:
+            state = self._state_factory.create_state(index)
+            self._states.setdefault(index, state)
+        state.repetition = repetition
+        self._nb_of_evaluations[index] = repetition + 1
+        self._in_flight[index] = repetition
+        if repetition:
+            logger.debug(f'Repeating evaluation of {state} ({repetition + 1}x)')
+        return state
+
+    def __get_counts(self) -> dict[int, tuple[int, int]]:
+        """
+        Returns the number of outcomes that did and did not reproduce, by index.
+        """
+        counts = {}
+        for (index, _), outcome in self._outcomes.items():
+            if outcome is None:
+                continue
+            nb_reproduced, nb_not_reproduced = counts.get(index, (0, 0))
+            if outcome:
+                counts[index] = (nb_reproduced + 1, nb_not_reproduced)
+            else:
+                counts[index] = (nb_reproduced, nb_not_reproduced + 1)
+        return counts
+
+    def __do_boundaries_differ(self) -> bool:
+        """
+        Returns True if both boundaries yielded an outcome and their outcomes show a difference.
+        """
+        counts = self.__get_counts()
+        lower_counts = counts.get(self._lower_state.index)
+        upper_counts = counts.get(self._upper_state.index)
+        if lower_counts is None or upper_counts is None:
+            return False
+        # With all outcomes alike on both sides, there is no evidence of a transition yet
+        return {i for i in (0, 1) if lower_counts[i]} != {i for i in (0, 1) if upper_counts[i]}
+
+    def __get_boundary_to_evaluate(self) -> Optional[int]:
+        if self.__do_boundaries_differ():
+            return None
+        # The boundary that was evaluated least often goes first, so both sides are repeated alike
+        indexes = sorted(
+            (self._lower_state.index, self._upper_state.index), key=lambda i: self._nb_of_evaluations.get(i, 0)
+        )
+        for index in indexes:
+            if index not in self._in_flight and self._nb_of_evaluations.get(index, 0) < MAX_NB_OF_BOUNDARY_EVALUATIONS:
+                return index
+        return None
+
+    def __estimate(self) -> tuple[list[int], list[float], tuple[float, float]]:
+        """
+        Estimates the posterior of the transition location and the reproduction rates below and above it.
+        The transition is identified by the first index above it. Evaluated indexes cut the range into gaps, within
+        which all locations are equally likely. The unknown reproduction rates are integrated out, such that the
+        likelihood of a gap is the beta-binomial likelihood of the outcomes below it times that of the outcomes above.
+
+        :return: The evaluated indexes, the posterior probability of the transition lying in the gap following each
+        index but the last, and the expected reproduction rates below and above the transition.
+        """
+        counts = self.__get_counts()
+        breakpoints = sorted(counts)
+        nb_of_reproduced = sum(nb_reproduced for nb_reproduced, _ in counts.values())
+        nb_of_not_reproduced = sum(nb_not_reproduced for _, nb_not_reproduced in counts.values())
+
+        log_weights, expected_rates = [], []
+        nb_of_reproduced_below = nb_of_not_reproduced_below = 0
+        for first_index, last_index in zip(breakpoints, breakpoints[1:]):
+            nb_of_reproduced_below += counts[first_index][0]
+            nb_of_not_reproduced_below += counts[first_index][1]
+            below = (nb_of_reproduced_below, nb_of_not_reproduced_below)
+            above = (nb_of_reproduced - nb_of_reproduced_below, nb_of_not_reproduced - nb_of_not_reproduced_below)
+            log_weights.append(
+                math.log(last_index - first_index)
+                + self.__log_marginal_likelihood(*below)
+                + self.__log_marginal_likelihood(*above)
+            )
+            expected_rates.append((self.__get_expected_rate(*below), self.__get_expected_rate(*above)))
+
+        max_log_weight = max(log_weights)
+        weights = [math.exp(log_weight - max_log_weight) for log_weight in log_weights]
+        total_weight = sum(weights)
+        posterior = [weight / total_weight for weight in weights]
+        rates = tuple(
+            sum(probability * expected_rate[side] for probability, expected_rate in zip(posterior, expected_rates))
+            for side in (0, 1)
+        )
+        rates = tuple(min(MAX_REPRODUCTION_RATE, max(MIN_REPRODUCTION_RATE, rate)) for rate in rates)
+        return breakpoints, posterior, rates
+
+    @staticmethod
+    def __log_marginal_likelihood(nb_reproduced: int, nb_not_reproduced: int) -> float:
+        """
+        Returns the log-likelihood of the given outcomes on one side of the transition, of which the reproduction rate
+        follows the prior.
+        """
+        a, b = REPRODUCTION_RATE_PRIOR
+        return (
+            math.lgamma(a + nb_reproduced)
+            + math.lgamma(b + nb_not_reproduced)
+            - math.lgamma(a + b + nb_reproduced + nb_not_reproduced)
+            - (math.lgamma(a) + math.lgamma(b) - math.lgamma(a + b))
+        )
+
+    @staticmethod
+    def __get_expected_rate(nb_reproduced: int, nb_not_reproduced: int) -> float:
+        a, b = REPRODUCTION_RATE_PRIOR
+        return (a + nb_reproduced) / (a + b + nb_reproduced + nb_not_reproduced)
+
+    def __has_converged(self, breakpoints: list[int], posterior: list[float]) -> bool:
+        k = max(range(len(posterior)), key=lambda i: posterior[i])
+        return posterior[k] >= self._confidence and self.__find_splitter(breakpoints[k], breakpoints[k + 1]) is None
+
+    def __find_splitter(self, first_index: int, last_index: int, target_index: Optional[int] = None) -> Optional[int]:
+        """
+        Returns the index of the state with an available binary nearest to the target, **strictly** between the given
+        indexes.
+        """
+        if (first_index, last_index) in self._unsplittable_gaps or last_index - first_index < 2:
+            return None
+        if target_index is None:
+            target_index = (first_index + last_index) // 2
+        boundaries = (self.__get_state(first_index), self.__get_state(last_index))
+        target_state = self._state_factory.create_state(target_index)
+        if (state := self._find_closest_state_with_available_binary(target_state, boundaries)) is None:
+            self._unsplittable_gaps.add((first_index, last_index))
+            return None
+        self._states.setdefault(state.index, state)
+        return state.index
+
+    def __get_state(self, index: int) -> State:
+        if index not in self._states:
+            self._states[index] = self._state_factory.create_state(index)
+        return self._states[index]
+
+    def __pick_most_informative_index(
+        self, breakpoints: list[int], posterior: list[float], rates: tuple[float, float]
+    ) -> Optional[int]:
+        """
+        Returns the index of which an evaluation is expected to yield the most information about the transition, or
+        None if no evaluation is worthwhile.
+        """
+        # The probability of the transition lying above each evaluated index, i.e., of the index lying below it
+        probabilities_above = [1.0]
+        for probability in posterior:
+            probabilities_above.append(probabilities_above[-1] - probability)
+
+        # The probability of each candidate index lying below the transition, starting with repetitions
+        candidates: dict[int, float] = {}
+        for j, index in enumerate(breakpoints):
+            candidates[index] = max(0.0, probabilities_above[j])
+        for quantile in CANDIDATE_QUANTILES:
+            # The gap in which the cumulative posterior reaches the quantile
+            k, cumulative_probability = 0, 0.0
+            while k < len(posterior) - 1 and cumulative_probability + posterior[k] < quantile:
+                cumulative_probability += posterior[k]
+                k += 1
+            if posterior[k] <= 0:
+                continue
+            first_index, last_index = breakpoints[k], breakpoints[k + 1]
+            fraction = min(1.0, max(0.0, (quantile - cumulative_probability) / posterior[k]))
+            target_index = first_index + round(fraction * (last_index - first_index))
+            target_index = min(last_index - 1, max(first_index + 1, target_index))
+            if (index := self.__find_splitter(first_index, last_index, target_index)) is None or index in candidates:
+                continue
+            # Within a gap, all locations of the transition are equally likely
+            fraction_above = (last_index - index) / (last_index - first_index)
+            candidates[index] = probabilities_above[k + 1] + posterior[k] * fraction_above
+
+        best_index, best_information_gain = None, MIN_INFORMATION_GAIN
+        for index, probability_below in sorted(candidates.items()):
+            if index in self._in_flight:
+                continue
+            information_gain = self.__get_expected_information_gain(1 - probability_below, rates)
+            if information_gain > best_information_gain:
+                best_index, best_information_gain = index, information_gain
+        return best_index
+
+    @staticmethod
+    def __get_expected_information_gain(probability_above: float, rates: tuple[float, float]) -> float:
+        """
+        Returns the mutual information (in bits) between the outcome of an evaluation and the side of the transition it
+        lies on.
+
+        :param probability_above: The probability that the evaluated state lies above the transition.
+        :param rates: The reproduction rates below and above the transition.
+        """
+
+        def entropy(p: float) -> float:
+            if p <= 0 or p >= 1:
+                return 0.0
+            return -p * math.log2(p) - (1 - p) * math.log2(1 - p)
+
+        rate_below, rate_above = rates
+        probability_reproduced = (1 - probability_above) * rate_below + probability_above * rate_above
+        return (
+            entropy(probability_reproduced)
+            - (1 - probability_above) * entropy(rate_below)
+            - probability_above * entropy(rate_above)
+        )
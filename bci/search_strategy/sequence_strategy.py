@@ -3,6 +3,10 @@ from abc import abstractmethod
 from concurrent.futures import ThreadPoolExecutor
 from typing import Optional
 
+from bson import ObjectId
+
+from bci.search_strategy.joint_planner import JointPlanner
+from bci.search_strategy.state_intervals import StateIntervals
 from bci.version_control.factory import StateFactory
 from bci.version_control.states.state import State
 
@@ -19,34 +23,75 @@ class SequenceStrategy:
         """
         self._state_factory = state_factory
         self._limit = limit
+        self._joint_planner: Optional[JointPlanner] = None
+        first_state, last_state = state_factory.boundary_states
+        self._availability = state_factory.get_availability(first_state.index, last_state.index)
         self._lower_state, self._upper_state = self.__create_available_boundary_states()
-        self._completed_states = []
+        self._intervals = StateIntervals()
+        # The high-water mark of the evaluated states that were fetched incrementally
+        self._evaluated_states_mark: Optional[ObjectId] = None
+
+    @property
+    def _completed_states(self) -> list[State]:
+        """
+        The evaluated states (and those being evaluated) sorted by index.
+        """
+        return self._intervals.states
+
+    @_completed_states.setter
+    def _completed_states(self, states: list[State]) -> None:
+        self._intervals.reset(states)
 
     @abstractmethod
     def next(self) -> State:
         pass
 
+    def share_splitters(self, joint_planner: JointPlanner) -> None:
+        """
+        Aligns the states this strategy picks with those of other strategies that share the given planner.
+        """
+        self._joint_planner = joint_planner
+
+    def on_evaluation_finished(self, state: State) -> None:
+        """
+        Reports that the evaluation of the given state finished for good, whether or not a result was stored, e.g.,
+        because it was given up on after failing repeatedly.
+        This can be called from any thread. Strategies that keep track of the states they returned override this.
+        """
+        pass
+
     def is_available(self, state: State) -> bool:
         return state.has_available_binary()
 
     def _add_state(self, elem: State) -> None:
         """
-        Adds an element to the list of evaluated states and sorts the list.
+        Adds an element to the list of evaluated states, keeping it sorted.
         """
-        self._completed_states.append(elem)
-        self._completed_states.sort(key=lambda x: x.index)
+        self._intervals.add(elem)
 
     def _fetch_evaluated_states(self) -> None:
         """
         Fetches all evaluated states from the database and stores them in the list of evaluated states.
         """
         fetched_states = self._state_factory.create_evaluated_states()
-        for state in self._completed_states:
-            if state not in fetched_states:
-                fetched_states.append(state)
-        fetched_states.sort(key=lambda x: x.index)
+        fetched_indexes = {state.index for state in fetched_states}
+        fetched_states.extend(state for state in self._completed_states if state.index not in fetched_indexes)
         self._completed_states = fetched_states
 
+    def _fetch_new_evaluated_states(self) -> list[State]:
+        """
+        Fetches the states that were evaluated since the previous fetch and merges them into the list of evaluated
+        states, replacing the states with the same index.
+
+        :return: The newly evaluated states.
+        """
+        new_states, self._evaluated_states_mark = self._state_factory.create_new_evaluated_states(
+            self._evaluated_states_mark
+        )
+        for state in new_states:
+            self._intervals.update(state)
+        return new_states
+
     def __create_available_boundary_states(self) -> tuple[State, State]:
         first_state, last_state = self._state_factory.boundary_states
         available_first_state = self._find_closest_state_with_available_binary(first_state, (first_state, last_state))
@@ -60,7 +105,42 @@ class SequenceStrategy:
     def _find_closest_state_with_available_binary(self, target: State, boundaries: tuple[State, State]) -> State | None:
         """
         Finds the closest state with an available binary **strictly** within the given boundaries.
+        If the strategy shares splitters, a state that another strategy picked near the target is preferred.
         """
+        if self._joint_planner is None:
+            return self.__find_closest_state_with_available_binary(target, boundaries)
+
+        first_state, last_state = boundaries
+        aligned_index = self._joint_planner.find_aligned_index(target.index, first_state.index, last_state.index)
+        if aligned_index is not None:
+            state = target if aligned_index == target.index else self._state_factory.create_state(aligned_index)
+            # Binaries that are unavailable or excluded for this experiment are not reused
+            if self._availability is not None and self._availability.covers(aligned_index):
+                is_available = self._availability.is_available(aligned_index)
+            else:
+                is_available = self.is_available(state)
+            if is_available:
+                # The report compares against the binary this strategy would have picked on its own
+                preferred_state = self.__find_closest_state_with_available_binary(target, boundaries)
+                preferred_index = preferred_state.index if preferred_state is not None else None
+                self._joint_planner.register(aligned_index, preferred_index, is_aligned=True)
+                return state
+
+        state = self.__find_closest_state_with_available_binary(target, boundaries)
+        if state is not None:
+            self._joint_planner.register(state.index, state.index, is_aligned=False)
+        return state
+
+    def __find_closest_state_with_available_binary(
+        self, target: State, boundaries: tuple[State, State]
+    ) -> State | None:
+        if self._availability is not None and self._availability.covers(target.index):
+            first_state, last_state = boundaries
+            index = self._availability.get_nearest_available(target.index, first_state.index, last_state.index)
+            if index is None:
+                return None
+            return target if index == target.index else self._state_factory.create_state(index)
+
         if target.has_available_binary():
             return target
 
@@ -82,8 +162,8 @@ class SequenceStrategy:
         diff = 1
         first_state, last_state = boundaries
         best_splitter_index = target.index
-        while (best_splitter_index - diff) > first_state.index or (best_splitter_index + diff) < last_state.index:
-            with ThreadPoolExecutor(max_workers=6) as executor:
+        with ThreadPoolExecutor(max_workers=6) as executor:
+            while (best_splitter_index - diff) > first_state.index or (best_splitter_index + diff) < last_state.index:
                 futures = []
                 for offset in (-diff, diff, - 1 - diff, 1 + diff, - 2 - diff, 2 + diff):
                     target_index = best_splitter_index + offset
@@ -95,7 +175,7 @@ class SequenceStrategy:
                     if state:
                         return state
 
-            diff += 2
+                diff += 2
         return None
 
 
@@ -121,5 +201,11 @@ class SequenceStrategy:
 class SequenceFinished(Exception):
     pass
 
+
+class SequenceNotReady(Exception):
+    """
+    Raised when the strategy will have a state to evaluate, but is still computing it.
+    """
+
 class FunctionalityNotAvailable(Exception):
     pass
@@ -0,0 +1,154 @@
+import bisect
+import heapq
+import itertools
+from typing import Iterable, Iterator, Optional
+
+from bci.version_control.states.state import State
+
+
+class StateIntervals:
+    """
+    Keeps the states of a sequence strategy sorted by index, together with the gaps between consecutive states and the
+    gaps that are known to lack available binaries.
+
+    - States are kept in a sorted array, so lookups are binary searches.
+    - Gaps between consecutive states are kept in a max-heap on their size. Entries of gaps that were split afterward
+      are dropped lazily when they surface, so finding the biggest gap does not require building all pairs.
+    - Unavailability gaps are kept sorted by their lower index, together with the running maximum of their upper index,
+      such that checking whether a range lies within any of them is a binary search.
+    """
+
+    def __init__(self, states: Iterable[State] = ()) -> None:
+        self.__states: list[State] = []
+        self.__indexes: list[int] = []
+        self.__gap_heap: list[tuple[int, int, int, State, State]] = []
+        self.__counter = itertools.count()
+
+        self.unavailability_gaps: set[tuple[State, State]] = set()
+        """Pairs of states that are **strict** boundaries of ranges without any available binaries."""
+        self.__unavailability_gap_starts: list[int] = []
+        self.__unavailability_gap_ends: list[int] = []
+        self.__unavailability_gap_max_ends: list[int] = []
+
+        self.reset(states)
+
+    @property
+    def states(self) -> list[State]:
+        """
+        The states sorted by index, which should not be modified directly.
+        """
+        return self.__states
+
+    def __len__(self) -> int:
+        return len(self.__states)
+
+    def __iter__(self) -> Iterator[State]:
+        return iter(self.__states)
+
+    def __contains__(self, state: State) -> bool:
+        position = bisect.bisect_left(self.__indexes, state.index)
+        return position < len(self.__indexes) and self.__indexes[position] == state.index
+
+    def reset(self, states: Iterable[State]) -> None:
+        """
+        Replaces all states, the unavailability gaps are kept.
+        """
+        self.__states = sorted(states, key=lambda state: state.index)
+        self.__indexes = [state.index for state in self.__states]
+        self.__gap_heap = [
+            self.__create_gap_entry(first_state, last_state)
+            for first_state, last_state in zip(self.__states, self.__states[1:])
+        ]
+        heapq.heapify(self.__gap_heap)
+
+    def add(self, state: State) -> None:
+        """
+        Inserts the given state, splitting the gap it falls in.
+        """
+        position = bisect.bisect_right(self.__indexes, state.index)
+        self.__indexes.insert(position, state.index)
+        self.__states.insert(position, state)
+        if position > 0:
+            heapq.heappush(self.__gap_heap, self.__create_gap_entry(self.__states[position - 1], state))
+        if position + 1 < len(self.__states):
+            heapq.heappush(self.__gap_heap, self.__create_gap_entry(state, self.__states[position + 1]))
+
+    def update(self, state: State) -> None:
+        """
+        Replaces the state with the same index, or inserts the given state if there is none.
+        """
+        position = bisect.bisect_left(self.__indexes, state.index)
+        if position < len(self.__indexes) and self.__indexes[position] == state.index:
+            self.__states[position] = state
+        else:
+            self.add(state)
+
+    def get_states_between(self, first_index: int, last_index: int) -> list[State]:
+        """
+        Returns the states of which the index lies **strictly** between the given indexes.
+        """
+        start = bisect.bisect_right(self.__indexes, first_index)
+        end = bisect.bisect_left(self.__indexes, last_index)
+        return self.__states[start:end]
+
+    def pop_biggest_gap(self) -> Optional[tuple[State, State]]:
+        """
+        Removes and returns the biggest gap between two consecutive states that does not lie within an unavailability
+        gap. Of equally big gaps, the one with the lowest indexes is returned first.
+        Popped gaps are not returned again, unless the states are reset. This is fine for strategies that either split
+        the gap, which replaces it by two new ones, or mark it as an unavailability gap.
+
+        :return: The states that bound the gap, or None if there are no gaps left.
+        """
+        while self.__gap_heap:
+            _, _, _, first_state, last_state = heapq.heappop(self.__gap_heap)
+            if not self.__are_consecutive(first_state, last_state):
+                continue
+            if self.is_in_unavailability_gap(first_state.index, last_state.index):
+                continue
+            return first_state, last_state
+        return None
+
+    def add_unavailability_gap(self, gap: tuple[State, State]) -> None:
+        """
+        Marks the range strictly between the given states as lacking available binaries.
+        """
+        if gap in self.unavailability_gaps:
+            return
+        self.unavailability_gaps.add(gap)
+        first_index, last_index = gap[0].index, gap[1].index
+        position = bisect.bisect_right(self.__unavailability_gap_starts, first_index)
+        self.__unavailability_gap_starts.insert(position, first_index)
+        self.__unavailability_gap_ends.insert(position, last_index)
+        self.__unavailability_gap_max_ends.insert(position, last_index)
+        # Gaps are bounded by consecutive states, so they rarely overlap and the running maximum settles quickly
+        running_max_end = self.__unavailability_gap_max_ends[position - 1] if position > 0 else last_index
+        for i in range(position, len(self.__unavailability_gap_starts)):
+            new_max_end = max(running_max_end, self.__unavailability_gap_ends[i])
+            if i > position and self.__unavailability_gap_max_ends[i] == new_max_end:
+                break
+            self.__unavailability_gap_max_ends[i] = running_max_end = new_max_end
+
+    def is_in_unavailability_gap(self, first_index: int, last_index: Optional[int] = None) -> bool:
+        """
+        Returns True if the range between the given indexes lies **strictly** within an unavailability gap.
+
+        :param first_index: The lower index of the range.
+        :param last_index: The upper index of the range, or None to check a single index.
+        """
+        if last_index is None:
+            last_index = first_index
+        # Only gaps that start below the range can contain it, of which the one reaching furthest is decisive
+        position = bisect.bisect_left(self.__unavailability_gap_starts, first_index)
+        return position > 0 and self.__unavailability_gap_max_ends[position - 1] > last_index
+
+    def __are_consecutive(self, first_state: State, last_state: State) -> bool:
+        position = bisect.bisect_left(self.__indexes, first_state.index)
+        return (
+            position + 1 < len(self.__indexes)
+            and self.__indexes[position] == first_state.index
+            and self.__indexes[position + 1] == last_state.index
+        )
+
+    def __create_gap_entry(self, first_state: State, last_state: State) -> tuple[int, int, int, State, State]:
+        return first_state.index - last_state.index, first_state.index, next(self.__counter), first_state, last_state
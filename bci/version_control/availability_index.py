@@ -0,0 +1,186 @@
+"""
+Persists the binary availability of revisions per browser as run-length encoded revision ranges, which are
+memory-mapped such that availability queries are binary searches instead of database round trips.
+"""
+import bisect
+import logging
+import mmap
+import os
+import struct
+import threading
+import uuid
+from typing import Iterable, Optional, Sequence
+
+from bci.configuration import Global
+
+logger = logging.getLogger(__name__)
+
+# Magic, format version, number of known runs and number of available runs
+HEADER = struct.Struct('<4sIII')
+MAGIC = b'BHAI'
+FORMAT_VERSION = 1
+# Run boundaries are stored as native unsigned 32-bit integers
+RUN_BOUNDARY_FORMAT = 'I'
+
+
+class AvailabilityIndex:
+    """
+    The binary availability of the revisions of one browser, stored as two lists of inclusive revision ranges:
+    the ranges of which the availability is known, and the ranges of which a binary is available.
+    Each list is stored as an array of start revisions followed by an array of end revisions.
+    """
+
+    def __init__(self, path: str) -> None:
+        """
+        Loads the index at the given path, which is empty if it does not exist yet.
+
+        :param path: The file in which the index is persisted.
+        """
+        self.path = path
+        self.__lock = threading.Lock()
+        self.__known_starts: Sequence[int] = []
+        self.__known_ends: Sequence[int] = []
+        self.__available_starts: Sequence[int] = []
+        self.__available_ends: Sequence[int] = []
+        self.__load()
+
+    def is_known(self, first_revision_nb: int, last_revision_nb: int) -> bool:
+        """
+        Returns True if the availability of all revisions in the given range (inclusive) is known.
+        """
+        with self.__lock:
+            i = bisect.bisect_right(self.__known_starts, first_revision_nb) - 1
+            return i >= 0 and self.__known_ends[i] >= last_revision_nb
+
+    def is_available(self, revision_nb: int) -> Optional[bool]:
+        """
+        Returns whether a binary is available for the given revision, or None if this is not known.
+        """
+        if not self.is_known(revision_nb, revision_nb):
+            return None
+        with self.__lock:
+            i = bisect.bisect_right(self.__available_starts, revision_nb) - 1
+            return i >= 0 and self.__available_ends[i] >= revision_nb
+
+    def get_available_runs(self, first_revision_nb: int, last_revision_nb: int) -> list[tuple[int, int]]:
+        """
+        Returns the ranges (inclusive) of available revisions that overlap with the given range, clipped to it.
+        """
+        with self.__lock:
+            start = max(0, bisect.bisect_right(self.__available_starts, first_revision_nb) - 1)
+            end = bisect.bisect_right(self.__available_starts, last_revision_nb)
+            return [
+                (max(self.__available_starts[i], first_revision_nb), min(self.__available_ends[i], last_revision_nb))
+                for i in range(start, end)
+                if self.__available_ends[i] >= first_revision_nb
+            ]
+
+    def update(self, first_revision_nb: int, last_revision_nb: int, available_revision_nbs: Iterable[int]) -> None:
+        """
+        Records the availability of all revisions in the given range (inclusive) and persists the index.
+
+        :param first_revision_nb: The first revision of the range.
+        :param last_revision_nb: The last revision of the range.
+        :param available_revision_nbs: The revisions in the range for which a binary is available.
+        """
+        new_available_runs = to_runs(
+            revision_nb for revision_nb in available_revision_nbs if first_revision_nb <= revision_nb <= last_revision_nb
+        )
+        with self.__lock:
+            known_runs = merge_runs(
+                list(zip(self.__known_starts, self.__known_ends)) + [(first_revision_nb, last_revision_nb)]
+            )
+            available_runs = []
+            for start, end in zip(self.__available_starts, self.__available_ends):
+                # The parts outside of the updated range are kept
+                if start < first_revision_nb:
+                    available_runs.append((start, min(end, first_revision_nb - 1)))
+                if end > last_revision_nb:
+                    available_runs.append((max(start, last_revision_nb + 1), end))
+            available_runs = merge_runs(available_runs + new_available_runs)
+            self.__write(known_runs, available_runs)
+            self.__load()
+
+    def clear(self) -> None:
+        """
+        Forgets all availability, e.g., when the source it was derived from is refreshed.
+        """
+        with self.__lock:
+            try:
+                os.remove(self.path)
+            except FileNotFoundError:
+                pass
+            self.__known_starts, self.__known_ends = [], []
+            self.__available_starts, self.__available_ends = [], []
+
+    def __load(self) -> None:
+        try:
+            with open(self.path, 'rb') as file:
+                mapped_file = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        except (FileNotFoundError, ValueError):
+            # Empty files cannot be mapped
+            return
+        magic, version, nb_of_known_runs, nb_of_available_runs = HEADER.unpack_from(mapped_file)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            logger.warning(f"Ignoring availability index '{self.path}' with an unknown format")
+            return
+        # The file remains mapped as long as the views exist
+        boundaries = memoryview(mapped_file)[HEADER.size:].cast(RUN_BOUNDARY_FORMAT)
+        self.__known_starts = boundaries[:nb_of_known_runs]
+        self.__known_ends = boundaries[nb_of_known_runs : 2 * nb_of_known_runs]
+        offset = 2 * nb_of_known_runs
+        self.__available_starts = boundaries[offset : offset + nb_of_available_runs]
+        self.__available_ends = boundaries[offset + nb_of_available_runs : offset + 2 * nb_of_available_runs]
+
+    def __write(self, known_runs: list[tuple[int, int]], available_runs: list[tuple[int, int]]) -> None:
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        # The folder is shared by the core and the workers, of which the process identifiers can coincide
+        tmp_path = f'{self.path}.{uuid.uuid4().hex}.tmp'
+        with open(tmp_path, 'wb') as file:
+            file.write(HEADER.pack(MAGIC, FORMAT_VERSION, len(known_runs), len(available_runs)))
+            for runs in (known_runs, available_runs):
+                file.write(struct.pack(f'={len(runs)}{RUN_BOUNDARY_FORMAT}', *(start for start, _ in runs)))
+                file.write(struct.pack(f'={len(runs)}{RUN_BOUNDARY_FORMAT}', *(end for _, end in runs)))
+        # Readers keep their mapping of the previous file, which is replaced atomically
+        os.replace(tmp_path, self.path)
+
+
+def to_runs(revision_nbs: Iterable[int]) -> list[tuple[int, int]]:
+    """
+    Encodes the given revisions as sorted, inclusive ranges of consecutive revisions.
+    """
+    runs = []
+    for revision_nb in sorted(set(revision_nbs)):
+        if runs and runs[-1][1] + 1 == revision_nb:
+            runs[-1] = (runs[-1][0], revision_nb)
+        else:
+            runs.append((revision_nb, revision_nb))
+    return runs
+
+
+def merge_runs(runs: list[tuple[int, int]]) -> list[tuple[int, int]]:
+    """
+    Merges overlapping and adjacent inclusive ranges.
+    """
+    merged_runs = []
+    for start, end in sorted(runs):
+        if merged_runs and start <= merged_runs[-1][1] + 1:
+            merged_runs[-1] = (merged_runs[-1][0], max(merged_runs[-1][1], end))
+        else:
+            merged_runs.append((start, end))
+    return merged_runs
+
+
+_indexes: dict[str, AvailabilityIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_availability_index(browser_name: str) -> AvailabilityIndex:
+    """
+    Returns the availability index of the given browser, which is loaded on first use.
+    """
+    with _indexes_lock:
+        if browser_name not in _indexes:
+            path = os.path.join(Global.get_availability_index_folder(), f'{browser_name}.bin')
+            _indexes[browser_name] = AvailabilityIndex(path)
+        return _indexes[browser_name]
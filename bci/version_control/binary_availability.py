@@ -0,0 +1,155 @@
+"""
+Resolves the binary availability of a whole range of revisions at once, such that sequence strategies can pick the
+nearest available revision in memory instead of probing revisions one by one.
+"""
+import logging
+from typing import Iterable, Optional
+
+from bci.database.mongo.mongodb import MongoDB
+from bci.database.mongo.revision_cache import RevisionCache
+from bci.version_control.availability_index import get_availability_index
+from bci.version_control.states.revisions.chromium import fetch_revision_nbs_with_online_binary
+
+logger = logging.getLogger(__name__)
+
+
+class AvailabilityBitmap:
+    """
+    The binary availability of a range of revisions, stored as one bit per revision.
+    """
+
+    def __init__(self, first_index: int, last_index: int, bits: int = 0) -> None:
+        """
+        :param first_index: The first index of the range.
+        :param last_index: The last index of the range (inclusive).
+        :param bits: The bitmap, of which bit `i` is set if the state with index `first_index + i` is available.
+        """
+        self.first_index = first_index
+        self.last_index = last_index
+        self.__bits = bits & ((1 << (last_index - first_index + 1)) - 1) if last_index >= first_index else 0
+
+    @staticmethod
+    def from_runs(first_index: int, last_index: int, runs: Iterable[tuple[int, int]]) -> 'AvailabilityBitmap':
+        """
+        Creates the bitmap from inclusive ranges of available indexes.
+        """
+        bitmap = bytearray(max(0, last_index - first_index + 1) // 8 + 1)
+        for start, end in runs:
+            start, end = max(start, first_index) - first_index, min(end, last_index) - first_index
+            # Partial bytes are filled bit by bit, whole bytes at once
+            while start <= end and start & 7:
+                bitmap[start >> 3] |= 1 << (start & 7)
+                start += 1
+            while start <= end and (end + 1) & 7:
+                bitmap[end >> 3] |= 1 << (end & 7)
+                end -= 1
+            if start <= end:
+                bitmap[start >> 3 : (end + 1) >> 3] = b'\xff' * (((end + 1) >> 3) - (start >> 3))
+        return AvailabilityBitmap(first_index, last_index, int.from_bytes(bitmap, 'little'))
+
+    @staticmethod
+    def from_indexes(first_index: int, last_index: int, indexes: Iterable[int]) -> 'AvailabilityBitmap':
+        bitmap = bytearray(max(0, last_index - first_index + 1) // 8 + 1)
+        for index in indexes:
+            if first_index <= index <= last_index:
+                offset = index - first_index
+                bitmap[offset >> 3] |= 1 << (offset & 7)
+        return AvailabilityBitmap(first_index, last_index, int.from_bytes(bitmap, 'little'))
+
+    def covers(self, index: int) -> bool:
+        return self.first_index <= index <= self.last_index
+
+    def is_available(self, index: int) -> bool:
+        return self.covers(index) and bool(self.__bits >> (index - self.first_index) & 1)
+
+    def get_nb_of_available(self) -> int:
+        return self.__bits.bit_count()
+
+    def without(self, indexes: Iterable[int]) -> 'AvailabilityBitmap':
+        """
+        Returns a copy of the bitmap in which the given indexes are unavailable.
+        """
+        mask = AvailabilityBitmap.from_indexes(self.first_index, self.last_index, indexes).__bits
+        return AvailabilityBitmap(self.first_index, self.last_index, self.__bits & ~mask)
+
+    def get_nearest_available(self, target: int, lower: int, upper: int) -> Optional[int]:
+        """
+        Returns the target if it is available, or else the nearest available index **strictly** between the given
+        boundaries. Of two equally near indexes, the lower one is returned.
+
+        :param target: The preferred index.
+        :param lower: The lower boundary.
+        :param upper: The upper boundary.
+        """
+        if self.is_available(target):
+            return target
+        lower = max(lower, self.first_index - 1)
+        upper = min(upper, self.last_index + 1)
+        if upper - lower < 2:
+            return None
+        offset = self.first_index
+        # Only the bits strictly between the boundaries are considered
+        bits = self.__bits & ((1 << (upper - offset)) - 1) & ~((1 << (lower + 1 - offset)) - 1)
+        previous_index = next_index = None
+        if below := bits & ((1 << max(0, min(target, upper) - offset)) - 1):
+            previous_index = offset + below.bit_length() - 1
+        first_above = max(target, lower) + 1
+        if above := bits >> max(0, first_above - offset):
+            next_index = max(first_above, offset) + (above & -above).bit_length() - 1
+        if previous_index is None:
+            return next_index
+        if next_index is None:
+            return previous_index
+        return previous_index if target - previous_index <= next_index - target else next_index
+
+
+def get_availability(browser_name: str, first_revision_nb: int, last_revision_nb: int) -> AvailabilityBitmap:
+    """
+    Returns the binary availability of all revisions in the given range (inclusive).
+    Availability is read from the availability index of the browser if it covers the range. Otherwise, it is fetched
+    from the database with a single range query. Chromium revisions of which the availability is not cached yet are
+    resolved with a single listing of the snapshot bucket, after which they are cached.
+
+    :raises ValueError: If the browser is not supported.
+    """
+    availability_index = get_availability_index(browser_name)
+    if availability_index.is_known(first_revision_nb, last_revision_nb):
+        return AvailabilityBitmap.from_runs(
+            first_revision_nb,
+            last_revision_nb,
+            availability_index.get_available_runs(first_revision_nb, last_revision_nb),
+        )
+
+    match browser_name:
+        case 'chromium':
+            availability = MongoDB().get_binary_availability_in_range('chromium', first_revision_nb, last_revision_nb)
+            nb_of_unknown = last_revision_nb - first_revision_nb + 1 - len(availability)
+            if nb_of_unknown > 0:
+                unknown_revision_nbs = [
+                    revision_nb
+                    for revision_nb in range(first_revision_nb, last_revision_nb + 1)
+                    if revision_nb not in availability
+                ]
+                logger.debug(f'Resolving the availability of {nb_of_unknown} chromium revisions online')
+                online_revision_nbs = fetch_revision_nbs_with_online_binary(
+                    unknown_revision_nbs[0], unknown_revision_nbs[-1]
+                )
+                new_availability = {
+                    revision_nb: revision_nb in online_revision_nbs for revision_nb in unknown_revision_nbs
+                }
+                MongoDB().store_binary_availability_in_bulk('chromium', new_availability)
+                availability.update(new_availability)
+            available_revision_nbs = [revision_nb for revision_nb, available in availability.items() if available]
+        case 'firefox':
+            available_revision_nbs = RevisionCache.firefox_get_revision_nbs_with_binary(
+                first_revision_nb, last_revision_nb
+            )
+        case _:
+            raise ValueError(f'Unknown browser name: {browser_name}')
+    # Without any available revision, the source is more likely incomplete than the range empty
+    if available_revision_nbs:
+        try:
+            availability_index.update(first_revision_nb, last_revision_nb, available_revision_nbs)
+        except OSError:
+            logger.warning(f"Could not persist the availability index '{availability_index.path}'", exc_info=True)
+    return AvailabilityBitmap.from_indexes(first_revision_nb, last_revision_nb, available_revision_nbs)
@@ -1,15 +1,25 @@
 from __future__ import annotations
 
+import logging
+from typing import Optional
+
+from bson import ObjectId
+
+from bci.database.mongo.evaluation_failures import EvaluationFailures
 from bci.database.mongo.mongodb import MongoDB
 from bci.evaluations.logic import EvaluationParameters
 from bci.evaluations.outcome_checker import OutcomeChecker
+from bci.version_control import binary_availability
+from bci.version_control.binary_availability import AvailabilityBitmap
 from bci.version_control.states.revisions.chromium import ChromiumRevision
 from bci.version_control.states.revisions.firefox import FirefoxRevision
-from bci.version_control.states.state import State
+from bci.version_control.states.state import State, StateCondition
 from bci.version_control.states.versions.base import BaseVersion
 from bci.version_control.states.versions.chromium import ChromiumVersion
 from bci.version_control.states.versions.firefox import FirefoxVersion
 
+logger = logging.getLogger(__name__)
+
 
 class StateFactory:
     def __init__(self, eval_params: EvaluationParameters, outcome_checker: OutcomeChecker) -> None:
@@ -20,6 +30,7 @@ class StateFactory:
         """
         self.__eval_params = eval_params
         self.__outcome_checker = outcome_checker
+        self.__excluded_indexes = self.__get_excluded_indexes()
         self.boundary_states = self.__create_boundary_states()
 
     def create_state(self, index: int) -> State:
@@ -37,6 +48,41 @@ class StateFactory:
         else:
             return self.__create_revision_state(index)
 
+    def get_availability(self, first_index: int, last_index: int) -> Optional[AvailabilityBitmap]:
+        """
+        Returns the binary availability of all states in the given range (inclusive), in which excluded states are
+        unavailable.
+        Returns None if the availability cannot be resolved in bulk, in which case states have to be checked one by one.
+        """
+        eval_range = self.__eval_params.evaluation_range
+        if eval_range.only_release_revisions:
+            return None
+        browser_name = self.__eval_params.browser_configuration.browser_name
+        try:
+            availability = binary_availability.get_availability(browser_name, first_index, last_index)
+        except Exception:
+            logger.warning(
+                f'Could not resolve the availability of {browser_name} revisions {first_index}-{last_index} in bulk',
+                exc_info=True,
+            )
+            return None
+        return availability.without(self.__excluded_indexes)
+
+    def __get_excluded_indexes(self) -> set[int]:
+        """
+        Returns the indexes of the states that failed too often, which are treated as unavailable.
+        """
+        try:
+            return EvaluationFailures.get_excluded_indexes(self.__eval_params)
+        except Exception:
+            logger.warning('Could not fetch the excluded states', exc_info=True)
+            return set()
+
+    def __mark_if_excluded(self, state: State) -> State:
+        if state.index in self.__excluded_indexes:
+            state.condition = StateCondition.UNAVAILABLE
+        return state
+
     def __create_boundary_states(self) -> tuple[State, State]:
         """
         Create the boundary state objects for the evaluation range.
@@ -65,6 +111,17 @@ class StateFactory:
         """
         return MongoDB().get_evaluated_states(self.__eval_params, self.boundary_states, self.__outcome_checker)
 
+    def create_new_evaluated_states(self, inserted_after: Optional[ObjectId]) -> tuple[list[State], Optional[ObjectId]]:
+        """
+        Create the evaluated state objects of which the result was stored after the given high-water mark.
+
+        :param inserted_after: The high-water mark returned by the previous call, or None to create all evaluated states.
+        :return: The evaluated states and the new high-water mark.
+        """
+        return MongoDB().get_evaluated_states_since(
+            self.__eval_params, self.boundary_states, self.__outcome_checker, inserted_after
+        )
+
     def __create_version_state(self, index: int) -> BaseVersion:
         """
         Create a version state object associated with the given index.
@@ -72,9 +129,9 @@ class StateFactory:
         browser_config = self.__eval_params.browser_configuration
         match browser_config.browser_name:
             case 'chromium':
-                return ChromiumVersion(index)
+                return self.__mark_if_excluded(ChromiumVersion(index))
             case 'firefox':
-                return FirefoxVersion(index)
+                return self.__mark_if_excluded(FirefoxVersion(index))
             case _:
                 raise ValueError(f'Unknown browser name: {browser_config.browser_name}')
 
@@ -85,8 +142,8 @@ class StateFactory:
         browser_config = self.__eval_params.browser_configuration
         match browser_config.browser_name:
             case 'chromium':
-                return ChromiumRevision(revision_nb=index)
+                return self.__mark_if_excluded(ChromiumRevision(revision_nb=index))
             case 'firefox':
-                return FirefoxRevision(revision_nb=index)
+                return self.__mark_if_excluded(FirefoxRevision(revision_nb=index))
             case _:
                 raise ValueError(f'Unknown browser name: {browser_config.browser_name}')
@@ -3,11 +3,49 @@ from typing import Optional
 import requests
 
 from bci.database.mongo.mongodb import MongoDB
+from bci.version_control.availability_index import get_availability_index
 from bci.version_control.revision_parser.chromium_parser import ChromiumRevisionParser
 from bci.version_control.states.revisions.base import BaseRevision
 
 PARSER = ChromiumRevisionParser()
 
+SNAPSHOT_LISTING_URL = 'https://www.googleapis.com/storage/v1/b/chromium-browser-snapshots/o'
+
+
+def fetch_revision_nbs_with_online_binary(first_revision_nb: int, last_revision_nb: int) -> set[int]:
+    """
+    Returns the revision numbers in the given range (inclusive) for which a snapshot binary is available online, by
+    listing the snapshot bucket instead of probing each revision.
+
+    :raises requests.HTTPError: If the bucket could not be listed.
+    """
+    revision_nbs = set()
+    # Object names are ordered lexicographically, which only matches the numeric order for numbers of the same length
+    for nb_of_digits in range(len(str(first_revision_nb)), len(str(last_revision_nb)) + 1):
+        first = max(first_revision_nb, 10 ** (nb_of_digits - 1))
+        last = min(last_revision_nb, 10**nb_of_digits - 1)
+        params = {
+            'prefix': 'Linux_x64/',
+            'matchGlob': 'Linux_x64/*/chrome-linux.zip',
+            'startOffset': f'Linux_x64/{first}/',
+            # '/' sorts before '0', so this bound includes all objects of the last revision
+            'endOffset': f'Linux_x64/{last}0',
+            'fields': 'items(name),nextPageToken',
+            'maxResults': 1000,
+        }
+        while True:
+            response = requests.get(SNAPSHOT_LISTING_URL, params=params, timeout=30)
+            response.raise_for_status()
+            listing = response.json()
+            for item in listing.get('items', []):
+                revision_nb_string = item['name'].split('/')[1]
+                if revision_nb_string.isdigit() and first <= int(revision_nb_string) <= last:
+                    revision_nbs.add(int(revision_nb_string))
+            if (page_token := listing.get('nextPageToken')) is None:
+                break
+            params['pageToken'] = page_token
+    return revision_nbs
+
 
 class ChromiumRevision(BaseRevision):
     def __init__(self, revision_id: Optional[str] = None, revision_nb: Optional[int] = None):
@@ -18,6 +56,9 @@ class ChromiumRevision(BaseRevision):
         return 'chromium'
 
     def has_online_binary(self) -> bool:
+        indexed_binary_available_online = get_availability_index('chromium').is_available(self._revision_nb)
+        if indexed_binary_available_online is not None:
+            return indexed_binary_available_online
         cached_binary_available_online = MongoDB().has_binary_available_online('chromium', self)
         if cached_binary_available_online is not None:
             return cached_binary_available_online
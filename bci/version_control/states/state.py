@@ -38,7 +38,8 @@ class StateResult:
 
     @staticmethod
     def from_dict(data: dict, is_dirty: bool = False) -> StateResult:
-        return StateResult(data['requests'], data['req_vars'], data['log_vars'], is_dirty)
+        # Requests are not fetched if they are not needed to determine the outcome
+        return StateResult(data.get('requests'), data['req_vars'], data['log_vars'], is_dirty)
 
 
 class State:
@@ -46,6 +47,9 @@ class State:
         self.condition = StateCondition.PENDING
         self.result: StateResult
         self.outcome: bool | None = None
+        # The number of earlier evaluations of this state by the same experiment, such that strategies can evaluate
+        # a state repeatedly without the results being considered duplicates.
+        self.repetition = 0
 
     @property
     @abstractmethod
@@ -1,7 +1,6 @@
 import json
 import logging
 import os
-import threading
 
 from flask import Blueprint, request
 
@@ -13,18 +12,16 @@ from bci.web.clients import Clients
 logger = logging.getLogger(__name__)
 api = Blueprint('api', __name__, url_prefix='/api')
 
-THREAD = None
-
-
-def start_thread(func, args=None) -> bool:
-    global THREAD
-    if THREAD and THREAD.is_alive():
-        return False
-    else:
-        THREAD = threading.Thread(target=func, args=args)
-        THREAD.start()
-        return True
 
+def resume_interrupted_jobs() -> None:
+    """
+    Resubmits the jobs that were running when the core was stopped, if any.
+    """
+    if not bci_api.is_ready():
+        return
+    for job_id, params in bci_api.get_interrupted_jobs():
+        logger.info(f"Resuming job '{job_id}' that was interrupted by a restart of the core")
+        bci_api.submit_job(params, job_id)
 
 
 @api.before_request
@@ -57,14 +54,18 @@ Starting and stopping processses
 def start_evaluation():
     data = request.json.copy()
     params = evaluation_factory(data)
-    if start_thread(bci_api.run, args=[params]):
-        return {
-            'status': 'OK'
-        }
-    else:
+    # Evaluations that are started while others are running are admitted next to them
+    try:
+        job_id = bci_api.submit_job(params)
+    except AttributeError as e:
         return {
-            'status': 'NOK'
-        }
+            'status': 'NOK',
+            'msg': str(e)
+        }, 400
+    return {
+        'status': 'OK',
+        'job_id': job_id
+    }
 
 
 @api.route('/evaluation/stop/', methods=['POST'])
@@ -80,6 +81,62 @@ def stop_evaluation():
     }
 
 
+'''
+Evaluation jobs
+'''
+
+
+@api.route('/jobs/', methods=['POST'])
+def submit_job():
+    data = request.json.copy()
+    job_id = data.pop('job_id', None)
+    params = evaluation_factory(data)
+    try:
+        job_id = bci_api.submit_job(params, job_id)
+    except AttributeError as e:
+        return {
+            'status': 'NOK',
+            'msg': str(e)
+        }, 400
+    return {
+        'status': 'OK',
+        'job_id': job_id
+    }
+
+
+@api.route('/jobs/', methods=['GET'])
+def get_jobs():
+    return {
+        'status': 'OK',
+        'jobs': bci_api.get_jobs()
+    }
+
+
+@api.route('/jobs/<job_id>/', methods=['GET'])
+def get_job_progress(job_id: str):
+    if (progress := bci_api.get_job_progress(job_id)) is None:
+        return {
+            'status': 'NOK',
+            'msg': f"Unknown job '{job_id}'"
+        }
+    return {
+        'status': 'OK',
+        'job': progress
+    }
+
+
+@api.route('/jobs/<job_id>/cancel/', methods=['POST'])
+def cancel_job(job_id: str):
+    if bci_api.cancel_job(job_id):
+        return {
+            'status': 'OK'
+        }
+    return {
+        'status': 'NOK',
+        'msg': f"Job '{job_id}' does not exist or is already finished"
+    }
+
+
 '''
 Requesting information
 '''
@@ -56,6 +56,8 @@ def report():
     # Respond to collector on same IP
     # remote_ip = request.remote_addr
     remote_ip = request.headers.get("X-Real-IP")
+    # Identifies the worker process when several of them share the same IP
+    remote_port = request.headers.get("X-Real-Port", "")
 
     response_data = {
         "url": request.url,
@@ -66,7 +68,12 @@ def report():
 
     def send_report_to_collector():
         try:
-            requests.post(f"http://{remote_ip}:5001/report/", json=response_data, timeout=5)
+            requests.post(
+                f"http://{remote_ip}:5001/report/",
+                json=response_data,
+                headers={"X-Real-Port": remote_port},
+                timeout=5,
+            )
         except requests.exceptions.ConnectionError:
             logger.warning(f"WARNING: Could not propagate request to collector at {remote_ip}:5001")
 
@@ -1,15 +1,33 @@
 import logging
+import logging.handlers
 import os
+import signal
 import sys
+import threading
+import time
+from collections import deque
+from datetime import datetime, timedelta, timezone
+from multiprocessing.connection import Connection
 
-from bci.configuration import Loggers
+from bci import garbage_collector
+from bci.browser.automation.terminal import TerminalAutomation
+from bci.configuration import Global, Loggers
 from bci.database.mongo.mongodb import MongoDB
+from bci.database.mongo.worker_job_queue import WorkerJobQueue
 from bci.evaluations.custom.custom_evaluation import CustomEvaluationFramework
-from bci.evaluations.logic import WorkerParameters
+from bci.evaluations.logic import DatabaseParameters, WorkerParameters
+from bci.evaluations.pipeline import EvaluationPipeline
 
 # This logger argument is set explicitly so when this file is ran as a script, it will still use the logger configuration
 logger = logging.getLogger('bci.worker')
 
+# Pooled workers poll the job queue at this interval when idle
+POOL_POLL_INTERVAL = 0.25
+# Pooled workers exit when they have not received a job for this long, e.g., because the core was stopped
+POOL_MAX_IDLE_SECONDS = 600
+# Jobs that are pending for this long were not picked up by an idle worker, so a busy worker can claim them in advance
+POOL_LOOK_AHEAD_GRACE_PERIOD = 4 * POOL_POLL_INTERVAL
+
 
 def run(params: WorkerParameters):
 
@@ -23,6 +41,139 @@ def run(params: WorkerParameters):
     # browser_build, repo_state = get_browser_build_and_repo_state(params)
 
     evaluation_framework.evaluate(params)
+    # The trash is not drained, since that would keep the slot of this one-shot container occupied. Its own file system
+    # is discarded on exit, and folders left in a shared trash folder are deleted by the next worker that uses it.
+
+
+def run_pool(pool_id: str, database_params: DatabaseParameters, max_nb_of_jobs: int, look_ahead: int = 0):
+    """
+    Keeps performing evaluations from the job queue of the given pool until `max_nb_of_jobs` are done.
+    Imports, the database connection and the evaluation framework are thus only initialized once.
+    While a job is evaluated, up to `look_ahead` jobs that no idle worker picked up are claimed and prepared.
+    """
+    MongoDB().connect(database_params)
+    pipeline = EvaluationPipeline(CustomEvaluationFramework(), look_ahead)
+    worker_name = os.getenv('HOSTNAME', 'bh_worker')
+
+    # Claimed jobs of which the evaluation did not start yet
+    claimed = deque()
+    nb_of_jobs = 0
+    last_job_ts = time.time()
+    while nb_of_jobs < max_nb_of_jobs:
+        if not claimed:
+            if (job := WorkerJobQueue.claim(pool_id, worker_name)) is None:
+                if time.time() - last_job_ts > POOL_MAX_IDLE_SECONDS:
+                    logger.info(f'No jobs received for {POOL_MAX_IDLE_SECONDS}s.')
+                    break
+                time.sleep(POOL_POLL_INTERVAL)
+                continue
+            claimed.append(job)
+        job_id, params = claimed.popleft()
+        # Only this job fails if the worker is replaced, the jobs it claimed in advance are requeued
+        if not WorkerJobQueue.start(job_id):
+            logger.debug(f'Skipping cancelled job for {params.state}')
+            pipeline.discard(params)
+            continue
+        evaluation_done = threading.Event()
+        claimer = threading.Thread(
+            target=claim_upcoming_jobs,
+            args=[pool_id, worker_name, pipeline, claimed, max_nb_of_jobs - nb_of_jobs - 1, evaluation_done],
+        )
+        claimer.start()
+        success = True
+        try:
+            pipeline.evaluate(params)
+        except Exception:
+            logger.error(f'Could not perform evaluation for {params.state}', exc_info=True)
+            success = False
+        finally:
+            evaluation_done.set()
+            claimer.join()
+            WorkerJobQueue.finish(job_id, success)
+        nb_of_jobs += 1
+        last_job_ts = time.time()
+    pipeline.close()
+    drain_garbage_collector()
+    logger.info(f'Pooled worker performed {nb_of_jobs} evaluations.')
+
+
+def claim_upcoming_jobs(
+    pool_id: str,
+    worker_name: str,
+    pipeline: EvaluationPipeline,
+    claimed: deque,
+    max_nb_of_jobs: int,
+    evaluation_done: threading.Event,
+) -> None:
+    """
+    Claims pending jobs while the current evaluation runs, such that their binaries are prepared in the meantime.
+    Only jobs that are pending for a while are claimed, since those were not picked up by an idle worker of the pool.
+    """
+    while not evaluation_done.wait(POOL_POLL_INTERVAL):
+        if len(claimed) >= max_nb_of_jobs or not pipeline.can_prefetch():
+            continue
+        submitted_before = datetime.now(timezone.utc) - timedelta(seconds=POOL_LOOK_AHEAD_GRACE_PERIOD)
+        if (job := WorkerJobQueue.claim(pool_id, worker_name, submitted_before)) is None:
+            continue
+        logger.debug(f'Claimed upcoming job for {job[1].state}')
+        claimed.append(job)
+        pipeline.prefetch(job[1])
+
+
+def drain_garbage_collector() -> None:
+    """
+    Waits until the folders that were removed in the background are deleted, before a long-lived worker exits.
+    """
+    collector = garbage_collector.get_garbage_collector()
+    if (backlog := collector.get_backlog()) > 0:
+        logger.info(f'Waiting for {backlog} removed folder(s) to be deleted')
+        collector.drain()
+
+
+def run_process(environment: dict[str, str], connection: Connection, log_queue) -> None:
+    """
+    Keeps performing the evaluations received over `connection` in a worker process of the core, until it is closed.
+    The success of each evaluation is sent back over the same connection.
+
+    :param environment: Environment variables that isolate this process from the other worker processes.
+    :param connection: The connection to the core.
+    :param log_queue: Queue through which log records are passed to the core.
+    """
+    os.environ.update(environment)
+    os.makedirs(Global.get_worker_tmp_folder(), exist_ok=True)
+    # Helper processes are put in the same process group, so they can be stopped all at once
+    os.setsid()
+    # Browsers lead their own process group, so they are killed explicitly when the core stops this worker process
+    signal.signal(signal.SIGTERM, stop_process)
+    bci_logger = logging.getLogger('bci')
+    bci_logger.setLevel(logging.DEBUG)
+    bci_logger.addHandler(logging.handlers.QueueHandler(log_queue))
+
+    # Binaries of finished evaluations are removed while the next evaluation is performed
+    pipeline = EvaluationPipeline(CustomEvaluationFramework(), max_look_ahead=0)
+    database_params = None
+    while True:
+        try:
+            params = WorkerParameters.deserialize(connection.recv())
+        except EOFError:
+            pipeline.close()
+            drain_garbage_collector()
+            break
+        success = True
+        try:
+            if params.database_connection_params != database_params:
+                MongoDB().connect(params.database_connection_params)
+                database_params = params.database_connection_params
+            pipeline.evaluate(params)
+        except Exception:
+            logger.error(f'Could not perform evaluation for {params.state}', exc_info=True)
+            success = False
+        connection.send(success)
+
+
+def stop_process(signum, frame) -> None:
+    TerminalAutomation.kill_running_browsers()
+    os._exit(1)
 
 
 if __name__ == '__main__':
@@ -30,6 +181,13 @@ if __name__ == '__main__':
     if len(sys.argv) < 2:
         logger.info('Worker did not receive any arguments.')
         os._exit(0)
+    if sys.argv[1] == '--pool':
+        pool_id, database_params, max_nb_of_jobs = sys.argv[2], sys.argv[3], int(sys.argv[4])
+        look_ahead = int(sys.argv[5]) if len(sys.argv) > 5 else 0
+        logger.info('Pooled worker started')
+        run_pool(pool_id, DatabaseParameters.deserialize(database_params), max_nb_of_jobs, look_ahead)
+        logger.info('Pooled worker finished, exiting...')
+        os._exit(0)
     args = sys.argv[1]
     params = WorkerParameters.deserialize(args)
     logger.info('Worker started')
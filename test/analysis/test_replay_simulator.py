@@ -0,0 +1,64 @@
+import unittest
+
+from bci.analysis.replay_simulator import RecordedOutcomes, SyntheticOutcomes, lognormal_latency, simulate
+from bci.evaluations.logic import SequenceConfiguration
+from bci.evaluations.outcome_checker import OutcomeChecker
+
+
+class TestReplaySimulator(unittest.TestCase):
+
+    @staticmethod
+    def create_document(revision_nb: int, reproduced: bool, repetition: int = 0) -> dict:
+        req_vars = [{'var': 'reproduced', 'val': 'OK'}] if reproduced else []
+        document = {
+            'state': {'type': 'revision', 'browser_name': 'chromium', 'revision_number': revision_nb},
+            'results': {'req_vars': req_vars, 'log_vars': [], 'requests': []},
+        }
+        if repetition:
+            document['repetition'] = repetition
+        return document
+
+    def test_pinpoint_synthetic_transition(self):
+        source = SyntheticOutcomes(0, 10_000, 6_543, unavailable_fraction=0.2, seed=1)
+        report = simulate('bgb_search', source, 1, lognormal_latency(60), seed=1)
+        assert report.is_correct((6_542, 6_543))
+        assert report.nb_of_evaluations == report.nb_of_binaries
+        assert report.nb_of_evaluations_to_pinpoint <= report.nb_of_evaluations
+        assert 0.99 <= report.slot_utilisation <= 1.0
+
+    def test_slots_reduce_wall_clock(self):
+        source = SyntheticOutcomes(0, 100_000, 12_345, seed=2)
+        sequential = simulate('multisection_search', source, 1, lognormal_latency(60), seed=2)
+        parallel = simulate('multisection_search', source, 8, lognormal_latency(60), seed=2)
+        assert parallel.is_correct((12_344, 12_345))
+        assert parallel.wall_clock < sequential.wall_clock / 2
+        assert parallel.slot_utilisation <= 1.0
+
+    def test_probabilistic_search_reports_transition(self):
+        source = SyntheticOutcomes(0, 1_000, 321, flakiness=0.2, seed=3)
+        report = simulate('probabilistic_search', source, 4, lognormal_latency(60), seed=3)
+        assert len(report.transitions) == 1
+        assert report.nb_of_evaluations >= report.nb_of_binaries
+
+    def test_recorded_outcomes(self):
+        documents = [
+            self.create_document(100, True),
+            self.create_document(150, True),
+            self.create_document(170, False, repetition=1),
+            self.create_document(170, True),
+            self.create_document(200, False),
+        ]
+        outcome_checker = OutcomeChecker(SequenceConfiguration(target_mech_id='reproduced'))
+        source = RecordedOutcomes.from_documents(documents, outcome_checker)
+        assert (source.first_index, source.last_index) == (100, 200)
+        assert source.availability.get_nb_of_available() == 4
+        assert not source.availability.is_available(160)
+        # Repeated evaluations cycle through the recorded outcomes in order of repetition
+        assert [source.get_outcome(170, repetition, None) for repetition in range(3)] == [True, False, True]
+
+        report = simulate('bgb_search', source, 2, lognormal_latency(60))
+        assert report.transitions == [(170, 200)]
+
+    def test_unknown_strategy(self):
+        source = SyntheticOutcomes(0, 100, 50)
+        self.assertRaises(AttributeError, simulate, 'unknown', source, 1, lognormal_latency(60))
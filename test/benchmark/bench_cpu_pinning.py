@@ -0,0 +1,72 @@
+"""
+Reports the variance of visit latencies when worker slots run concurrently, with and without CPU pinning.
+
+Each slot repeatedly performs a visit, which is a CPU-heavy Python process by default (similar to a browser starting up
+and rendering a page), or the given command, e.g., a headless browser visiting an experiment page.
+The suggested visit budget is the 99th percentile latency, which is what `seconds_per_visit` has to cover.
+
+Usage: python -m test.benchmark.bench_cpu_pinning [--slots 4] [--rounds 20] [--command '<visit command>']
+"""
+import argparse
+import functools
+import os
+import shlex
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from typing import Optional
+
+from bci.distribution.cpu_pinning import CoreSet, assign_core_sets, format_cpu_list, get_cores_per_node
+
+SYNTHETIC_VISIT = [sys.executable, '-c', 'sum(i * i for i in range(3_000_000))']
+
+
+def perform_visits(command: list[str], core_set: Optional[CoreSet], nb_of_rounds: int, latencies: list[float]) -> None:
+    preexec_fn = functools.partial(os.sched_setaffinity, 0, core_set.cores) if core_set is not None else None
+
+    for _ in range(nb_of_rounds):
+        start = time.perf_counter()
+        subprocess.run(command, preexec_fn=preexec_fn, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=False)
+        latencies.append(time.perf_counter() - start)
+
+
+def run(command: list[str], core_sets: list[Optional[CoreSet]], nb_of_rounds: int) -> list[float]:
+    latencies = []
+    threads = [
+        threading.Thread(target=perform_visits, args=[command, core_set, nb_of_rounds, latencies])
+        for core_set in core_sets
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return latencies
+
+
+def report(name: str, latencies: list[float]) -> None:
+    latencies = sorted(latencies)
+    p99 = latencies[min(len(latencies) - 1, int(0.99 * len(latencies)))]
+    print(
+        f'{name:>10}: mean {statistics.mean(latencies):.3f}s, stdev {statistics.stdev(latencies):.3f}s, '
+        f'variance {statistics.variance(latencies):.5f}, max {latencies[-1]:.3f}s, suggested visit budget {p99:.2f}s'
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--slots', type=int, default=len(os.sched_getaffinity(0)))
+    parser.add_argument('--rounds', type=int, default=20)
+    parser.add_argument('--command', type=shlex.split, default=SYNTHETIC_VISIT)
+    args = parser.parse_args()
+
+    core_sets = assign_core_sets(args.slots, get_cores_per_node(), pin_memory=False)
+    print(f'{args.slots} slots, {args.rounds} visits per slot')
+    print(f'Core sets: {[format_cpu_list(core_set.cores) for core_set in core_sets]}')
+    report('unpinned', run(args.command, [None] * args.slots, args.rounds))
+    report('pinned', run(args.command, core_sets, args.rounds))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,109 @@
+"""
+Compares search strategies offline by replaying outcomes through a simulated pool of worker slots.
+
+Outcomes are generated synthetically for a single transition at a random position, with the given flakiness and holes
+in the binary availability, or replayed from an exported results collection (`--export`).
+For each strategy, the mean number of evaluations until it finishes and until the transition is pinpointed are
+reported, together with the simulated wall-clock time, the slot utilisation and how often the (majority) outcomes show
+exactly the expected transition.
+
+Usage: python -m test.benchmark.bench_search_strategies [--revisions 100000] [--slots 8] [--runs 20] [--flakiness 0]
+    [--unavailable 0.2] [--latency 60] [--export results.json --experiment <mech_group>]
+"""
+import argparse
+import random
+import statistics
+from typing import Optional
+
+from bci.analysis.replay_simulator import (
+    STRATEGIES,
+    RecordedOutcomes,
+    SyntheticOutcomes,
+    lognormal_latency,
+    simulate,
+)
+
+
+def mean(values: list[Optional[float]]) -> str:
+    values = [value for value in values if value is not None]
+    return f'{statistics.mean(values):.1f}' if values else '-'
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--revisions', type=int, default=100_000)
+    parser.add_argument('--slots', type=int, default=8)
+    parser.add_argument('--runs', type=int, default=20)
+    parser.add_argument('--flakiness', type=float, default=0.0)
+    parser.add_argument('--unavailable', type=float, default=0.2)
+    parser.add_argument('--latency', type=float, default=60, help='median seconds per evaluation')
+    parser.add_argument('--latency-sigma', type=float, default=0.5)
+    parser.add_argument('--sequence-limit', type=int, default=50)
+    parser.add_argument('--strategies', nargs='+', default=list(STRATEGIES), choices=STRATEGIES)
+    parser.add_argument('--export', help='exported results collection to replay instead of synthetic outcomes')
+    parser.add_argument('--experiment', help='experiment (mech_group) of the exported results to replay')
+    parser.add_argument('--target-mech-id', help='reproduction ID, the experiment by default')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    recorded_outcomes = None
+    if args.export:
+        if not args.experiment:
+            parser.error('--experiment is required with --export')
+        recorded_outcomes = RecordedOutcomes.load(args.export, args.experiment, args.target_mech_id)
+        print(
+            f'Replaying {len(recorded_outcomes.outcomes_per_index)} recorded revisions of {args.experiment} '
+            f'[{recorded_outcomes.first_index}, {recorded_outcomes.last_index}]'
+        )
+    else:
+        print(
+            f'{args.runs} runs over {args.revisions} revisions, {args.flakiness:.0%} flakiness, '
+            f'{args.unavailable:.0%} unavailable runs'
+        )
+    print(f'{args.slots} slots, median latency {args.latency:.0f}s\n')
+
+    rng = random.Random(args.seed)
+    sources = []
+    for run in range(args.runs):
+        if recorded_outcomes:
+            sources.append(recorded_outcomes)
+        else:
+            transition_index = rng.randint(1, args.revisions - 1)
+            sources.append(
+                SyntheticOutcomes(
+                    0,
+                    args.revisions - 1,
+                    transition_index,
+                    flakiness=args.flakiness,
+                    unavailable_fraction=args.unavailable,
+                    seed=args.seed + run,
+                )
+            )
+
+    latency = lognormal_latency(args.latency, args.latency_sigma)
+    print(
+        f'{"strategy":>22} {"evaluations":>12} {"to pinpoint":>12} {"binaries":>9} {"minutes":>8} '
+        f'{"utilisation":>12} {"correct":>8}'
+    )
+    for strategy_name in args.strategies:
+        reports = [
+            simulate(strategy_name, source, args.slots, latency, args.sequence_limit, seed=args.seed + run)
+            for run, source in enumerate(sources)
+        ]
+        nb_of_correct = sum(
+            report.is_correct(source.get_expected_transition())
+            for report, source in zip(reports, sources)
+            if source.get_expected_transition()
+        )
+        print(
+            f'{strategy_name:>22} {mean([report.nb_of_evaluations for report in reports]):>12} '
+            f'{mean([report.nb_of_evaluations_to_pinpoint for report in reports]):>12} '
+            f'{mean([report.nb_of_binaries for report in reports]):>9} '
+            f'{mean([report.wall_clock / 60 for report in reports]):>8} '
+            f'{statistics.mean(report.slot_utilisation for report in reports):>12.0%} '
+            f'{(str(nb_of_correct) + "/" + str(len(reports))) if not recorded_outcomes else "-":>8}'
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,152 @@
+"""
+Compares the overhead of the biggest gap bisection sequence with the indexed state intervals against the previous
+implementation, which re-sorted all states on every insert and rebuilt and scanned all pairs to find the biggest gap.
+
+Binary availability is simulated in memory with runs of unavailable revisions, such that only the overhead of the
+strategy itself is measured.
+
+Usage: python -m test.benchmark.bench_state_intervals [--revisions 500000] [--limit 2000] [--unavailable 0.3]
+"""
+import argparse
+import bisect
+import random
+import time
+from typing import Optional
+
+from bci.search_strategy.bgb_sequence import BiggestGapBisectionSequence
+from bci.search_strategy.sequence_strategy import SequenceFinished
+
+
+class SimulatedState:
+    def __init__(self, index: int, available_indexes: list[int]) -> None:
+        self.index = index
+        self.revision_nb = index
+        self.condition = None
+        self.__available_indexes = available_indexes
+
+    def has_available_binary(self) -> bool:
+        position = bisect.bisect_left(self.__available_indexes, self.index)
+        return position < len(self.__available_indexes) and self.__available_indexes[position] == self.index
+
+    def get_previous_and_next_state_with_binary(self) -> tuple[Optional['SimulatedState'], Optional['SimulatedState']]:
+        position = bisect.bisect_left(self.__available_indexes, self.index)
+        previous_state = self.__create(position - 1)
+        next_state = self.__create(position)
+        return previous_state, next_state
+
+    def __create(self, position: int) -> Optional['SimulatedState']:
+        if 0 <= position < len(self.__available_indexes):
+            return SimulatedState(self.__available_indexes[position], self.__available_indexes)
+        return None
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, SimulatedState) and self.index == other.index
+
+    def __hash__(self) -> int:
+        return hash(self.index)
+
+
+class SimulatedStateFactory:
+    def __init__(self, nb_of_revisions: int, unavailable_fraction: float, seed: int) -> None:
+        rng = random.Random(seed)
+        self.available_indexes = []
+        index = 0
+        # Unavailable revisions come in runs, like builds that were not archived for a while
+        while index < nb_of_revisions:
+            run_length = rng.randint(1, 200)
+            if rng.random() >= unavailable_fraction or index == 0:
+                self.available_indexes.extend(range(index, min(index + run_length, nb_of_revisions)))
+            index += run_length
+        self.available_indexes.append(nb_of_revisions - 1)
+        self.available_indexes = sorted(set(self.available_indexes))
+        self.boundary_states = (self.create_state(0), self.create_state(nb_of_revisions - 1))
+
+    def create_state(self, index: int) -> SimulatedState:
+        return SimulatedState(index, self.available_indexes)
+
+    def create_evaluated_states(self) -> list[SimulatedState]:
+        return []
+
+
+class PreviousBiggestGapBisectionSequence(BiggestGapBisectionSequence):
+    """
+    The previous implementation, kept here for comparison.
+    """
+
+    def __init__(self, state_factory, limit: int) -> None:
+        super().__init__(state_factory, limit)
+        self.__states = []
+        self.__gaps = set()
+
+    def next(self):
+        if self._limit and self._limit <= len(self.__states):
+            raise SequenceFinished()
+        for boundary_state in (self._lower_state, self._upper_state):
+            if boundary_state not in self.__states:
+                self.__add(boundary_state)
+                return boundary_state
+
+        pairs = list(zip(self.__states, self.__states[1:]))
+        while pairs:
+            filtered_pairs = [pair for pair in pairs if not self.__is_in_gap(pair)]
+            furthest_pair = max(filtered_pairs, key=lambda x: x[1].index - x[0].index)
+            splitter_state = self._find_best_splitter_state(furthest_pair[0], furthest_pair[1])
+            if splitter_state is None:
+                self.__gaps.add(furthest_pair)
+            elif splitter_state:
+                self.__add(splitter_state)
+                return splitter_state
+            pairs.remove(furthest_pair)
+        raise SequenceFinished()
+
+    def __add(self, state) -> None:
+        self.__states.append(state)
+        self.__states.sort(key=lambda x: x.index)
+
+    def __is_in_gap(self, pair) -> bool:
+        for gap_pair in self.__gaps:
+            if (
+                gap_pair[0].index < pair[0].index < gap_pair[1].index
+                and gap_pair[0].index < pair[1].index < gap_pair[1].index
+            ):
+                return True
+        return False
+
+
+def run(sequence: BiggestGapBisectionSequence) -> tuple[list[int], float]:
+    indexes = []
+    start = time.perf_counter()
+    while True:
+        try:
+            indexes.append(sequence.next().index)
+        except SequenceFinished:
+            break
+    return indexes, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--revisions', type=int, default=500_000)
+    parser.add_argument('--limit', type=int, default=2_000)
+    parser.add_argument('--unavailable', type=float, default=0.3)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    state_factory = SimulatedStateFactory(args.revisions, args.unavailable, args.seed)
+    print(
+        f'{args.revisions} revisions of which {len(state_factory.available_indexes)} available, '
+        f'up to {args.limit} states'
+    )
+    results = {}
+    for name, sequence_class in (
+        ('previous', PreviousBiggestGapBisectionSequence),
+        ('indexed', BiggestGapBisectionSequence),
+    ):
+        indexes, duration = run(sequence_class(state_factory, args.limit))
+        results[name] = indexes
+        print(f'{name:>10}: {len(indexes)} states in {duration:.3f}s, {duration / len(indexes) * 1e6:.1f}us per state')
+    assert results['previous'] == results['indexed'], 'Both implementations should yield the same sequence'
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+import unittest
+from unittest.mock import MagicMock, patch
+
+from bson import ObjectId
+
+from bci.database.mongo.mongodb import MongoDB
+from bci.evaluations import logic
+from bci.evaluations.logic import BrowserConfiguration, EvaluationConfiguration
+from bci.evaluations.outcome_checker import OutcomeChecker
+from bci.version_control.states.revisions.chromium import ChromiumRevision
+
+
+class TestMongoDB(unittest.TestCase):
+    @staticmethod
+    def create_params(mech_group: str, revision_nb: int, collection: str = 'collection') -> logic.TestParameters:
+        return logic.TestParameters(
+            BrowserConfiguration('chromium', 'default', [], ['a.crx', 'b.crx']),
+            EvaluationConfiguration('project', 'terminal'),
+            ChromiumRevision(revision_id='a' * 40, revision_nb=revision_nb),
+            mech_group,
+            collection,
+        )
+
+    @staticmethod
+    def to_document(params: logic.TestParameters) -> dict:
+        return {
+            'state': params.state.to_dict(),
+            'browser_automation': 'terminal',
+            'browser_config': 'default',
+            'mech_group': params.mech_group,
+            'extensions': ['b.crx', 'a.crx'],
+            'cli_options': [],
+        }
+
+    def test_has_results_queries_each_collection_once(self):
+        stored = [self.create_params('a', 1), self.create_params('b', 2, 'other_collection')]
+        params_list = [
+            self.create_params('a', 1),
+            self.create_params('a', 2),
+            self.create_params('b', 2, 'other_collection'),
+            self.create_params('b', 1, 'other_collection'),
+        ]
+        collections = {}
+
+        def get_collection(name: str, create_if_not_found: bool = False):
+            collection = collections.setdefault(name, MagicMock())
+            collection.find.return_value = [
+                self.to_document(params) for params in stored if params.database_collection == name
+            ]
+            return collection
+
+        with patch.object(MongoDB(), 'get_collection', side_effect=get_collection):
+            assert MongoDB().has_results(params_list) == [True, False, True, False]
+        assert all(collection.find.call_count == 1 for collection in collections.values())
+        assert len(collections['collection'].find.call_args[0][0]['$or']) == 2
+
+    def test_evaluated_states_are_fetched_since_high_water_mark(self):
+        params = self.create_params('a', 1)
+        eval_params = MagicMock()
+        eval_params.database_collection = 'collection'
+        eval_params.evaluation_range.only_release_revisions = False
+        eval_params.browser_configuration = params.browser_configuration
+        boundary_states = (params.state, ChromiumRevision(revision_id='b' * 40, revision_nb=10))
+        outcome_checker = OutcomeChecker(MagicMock(target_mech_id=None))
+        ids = [ObjectId(), ObjectId()]
+        collection = MagicMock()
+        collection.find.return_value = [
+            {
+                '_id': object_id,
+                'state': params.state.to_dict(),
+                'dirty': False,
+                'results': {'req_vars': [{'var': 'reproduced', 'val': 'OK'}], 'log_vars': []},
+            }
+            for object_id in ids
+        ]
+
+        with patch.object(MongoDB(), 'get_collection', return_value=collection):
+            states, high_water_mark = MongoDB().get_evaluated_states_since(
+                eval_params, boundary_states, outcome_checker, ids[0]
+            )
+        assert high_water_mark == ids[1]
+        assert [state.outcome for state in states] == [True, True]
+        query, projection = collection.find.call_args[0]
+        assert query['_id']['$gt'] < ids[0]
+        # Recorded requests are not needed for the outcome, so they are not fetched
+        assert 'results.requests.url' not in projection
+        assert projection['results.req_vars']
+
@@ -0,0 +1,35 @@
+import unittest
+from unittest.mock import MagicMock, patch
+
+from bci.database.mongo.mongodb import MongoDB
+from bci.database.mongo.worker_job_queue import WorkerJobQueue
+
+
+class TestWorkerJobQueue(unittest.TestCase):
+    def test_only_started_jobs_of_released_worker_fail(self):
+        collection = MagicMock()
+        collection.update_many.side_effect = [MagicMock(modified_count=1), MagicMock(modified_count=2)]
+        with patch.object(MongoDB(), 'get_collection', return_value=collection):
+            assert WorkerJobQueue.release_jobs_of_worker('pool', 'bh_pool_worker_0') == (1, 2)
+
+        (failed_query, failed_update), (requeued_query, requeued_update) = [
+            call[0] for call in collection.update_many.call_args_list
+        ]
+        assert failed_query['started_ts'] == {'$exists': True}
+        assert failed_update['$set']['status'] == 'failed'
+        # Jobs that were claimed in advance are given back to the pool
+        assert requeued_query['started_ts'] == {'$exists': False}
+        assert requeued_update['$set'] == {'status': 'pending', 'worker': None}
+        for query in [failed_query, requeued_query]:
+            assert query['worker'] == 'bh_pool_worker_0'
+            assert query['status'] == 'running'
+
+    def test_finished_jobs_are_claimed_one_at_a_time(self):
+        collection = MagicMock()
+        collection.find_one_and_delete.side_effect = [{'_id': 1, 'status': 'done'}, {'_id': 2, 'status': 'failed'}, None]
+        with patch.object(MongoDB(), 'get_collection', return_value=collection):
+            assert WorkerJobQueue.pop_finished_jobs('pool') == [
+                {'_id': 1, 'status': 'done'},
+                {'_id': 2, 'status': 'failed'},
+            ]
+        collection.delete_many.assert_not_called()
@@ -0,0 +1,78 @@
+import json
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+import unittest
+from unittest.mock import patch
+
+import requests
+
+from bci.distribution.collector_relay import CollectorRelay
+from bci.evaluations.collectors.requests import RequestCollector
+
+
+def get_free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+class TestCollectorRelay(unittest.TestCase):
+    def setUp(self) -> None:
+        # Stands in for nginx, to which the browser of a worker process connects
+        self.server = socket.socket()
+        self.server.bind(('127.0.0.1', 0))
+        self.server.listen()
+        # Stands in for a worker process, of which a child process acts as the browser
+        script = (
+            'import socket, subprocess, sys, time\n'
+            'if len(sys.argv) > 1:\n'
+            '    sock = socket.create_connection(("127.0.0.1", int(sys.argv[1])))\n'
+            '    time.sleep(30)\n'
+            'else:\n'
+            f'    subprocess.run([sys.executable, "-c", sys.stdin.read(), "{self.server.getsockname()[1]}"])\n'
+        )
+        self.worker = subprocess.Popen(
+            [sys.executable, '-c', script], stdin=subprocess.PIPE, text=True, start_new_session=True
+        )
+        self.worker.stdin.write(script)
+        self.worker.stdin.close()
+        self.browser_connection, (_, self.browser_port) = self.server.accept()
+        self.relay = CollectorRelay(get_free_port())
+
+    def tearDown(self) -> None:
+        self.relay.stop()
+        os.killpg(self.worker.pid, signal.SIGKILL)
+        self.worker.wait()
+        self.browser_connection.close()
+        self.server.close()
+
+    def test_browser_is_traced_back_to_worker_process(self):
+        assert self.relay.get_collector_port_for(self.browser_port) is None
+        self.relay.register(self.worker.pid, 5123)
+        assert self.relay.get_collector_port_for(self.browser_port) == 5123
+        self.relay.unregister(self.worker.pid)
+        assert self.relay.get_collector_port_for(self.browser_port) is None
+
+    def test_report_is_forwarded_to_collector_of_worker_process(self):
+        collector_port = get_free_port()
+        with patch.dict(os.environ, {'BCI_COLLECTOR_PORT': str(collector_port)}):
+            collector = RequestCollector()
+            collector.start()
+        self.relay.register(self.worker.pid, collector_port)
+        self.relay.start()
+
+        report = {'url': 'https://a.test/report/?bughog_reproduced=OK'}
+        requests.post(
+            f'http://127.0.0.1:{self.relay.port}/report/',
+            data=json.dumps(report),
+            headers={'X-Real-Port': str(self.browser_port), 'Content-Type': 'application/json'},
+            timeout=5,
+        )
+        time.sleep(0.2)
+        collector.stop()
+        assert collector.data['requests'] == [report]
+        assert collector.data['req_vars'] == [{'var': 'reproduced', 'val': 'OK'}]
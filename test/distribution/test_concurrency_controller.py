@@ -0,0 +1,96 @@
+import os
+import tempfile
+import unittest
+
+from bci.distribution.concurrency_controller import (
+    ConcurrencyController,
+    ResourceSample,
+    get_container_memory_utilization,
+    read_cpu_times,
+    read_memory_utilization,
+    read_pressure,
+)
+from bci.distribution.slot_scheduler import SlotScheduler
+
+
+class TestConcurrencyController(unittest.TestCase):
+
+    def setUp(self):
+        self.scheduler = SlotScheduler(8)
+        self.scheduler.set_limit(4)
+        self.nb_of_increases = 0
+
+        def on_limit_increased():
+            self.nb_of_increases += 1
+
+        self.controller = ConcurrencyController(self.scheduler, 0.8, on_limit_increased, sample_resources=lambda: None)
+
+    def occupy_all_slots(self):
+        while self.scheduler.acquire(timeout=0) is not None:
+            pass
+
+    def test_grow_when_saturated_and_below_target(self):
+        self.occupy_all_slots()
+        assert self.controller.step(ResourceSample(cpu_utilization=0.4, memory_utilization=0.3)) == 5
+        assert self.nb_of_increases == 1
+
+    def test_do_not_grow_without_demand(self):
+        self.scheduler.acquire()
+        assert self.controller.step(ResourceSample(cpu_utilization=0.4, memory_utilization=0.3)) == 4
+        assert self.nb_of_increases == 0
+
+    def test_do_not_grow_beyond_nb_of_slots(self):
+        self.scheduler.set_limit(8)
+        self.occupy_all_slots()
+        assert self.controller.step(ResourceSample(cpu_utilization=0.1, memory_utilization=0.1)) == 8
+
+    def test_keep_limit_on_target(self):
+        self.occupy_all_slots()
+        assert self.controller.step(ResourceSample(cpu_utilization=0.82, memory_utilization=0.5)) == 4
+
+    def test_shrink_when_above_target(self):
+        assert self.controller.step(ResourceSample(cpu_utilization=0.95, memory_utilization=0.5)) == 3
+        assert self.controller.step(ResourceSample(cpu_utilization=0.5, memory_utilization=0.97)) == 2
+
+    def test_shrink_under_pressure(self):
+        self.occupy_all_slots()
+        sample = ResourceSample(cpu_utilization=0.4, memory_utilization=0.3, io_pressure=0.3)
+        assert self.controller.step(sample) == 3
+
+    def test_shrink_when_container_is_close_to_memory_limit(self):
+        sample = ResourceSample(cpu_utilization=0.4, memory_utilization=0.3, container_memory_utilization=0.95)
+        assert self.controller.step(sample) == 3
+
+    def test_never_shrink_below_one(self):
+        self.scheduler.set_limit(1)
+        assert self.controller.step(ResourceSample(cpu_utilization=1.0, memory_utilization=1.0)) == 1
+
+
+class TestResourceSampling(unittest.TestCase):
+
+    def write(self, folder: str, name: str, content: str) -> str:
+        path = os.path.join(folder, name)
+        with open(path, 'w') as file:
+            file.write(content)
+        return path
+
+    def test_read_proc_files(self):
+        with tempfile.TemporaryDirectory() as folder:
+            stat = self.write(folder, 'stat', 'cpu  100 0 50 800 50 0 0 0 0 0\ncpu0 100 0 50 800 50 0 0 0 0 0\n')
+            assert read_cpu_times(stat) == (150, 1000)
+
+            meminfo = self.write(folder, 'meminfo', 'MemTotal: 1000 kB\nMemFree: 100 kB\nMemAvailable: 250 kB\n')
+            assert read_memory_utilization(meminfo) == 0.75
+
+            pressure = self.write(
+                folder,
+                'io',
+                'some avg10=12.50 avg60=3.00 avg300=1.00 total=100\nfull avg10=5.00 avg60=1.00 avg300=0.00 total=50\n',
+            )
+            assert read_pressure(pressure) == 0.125
+            assert read_pressure(os.path.join(folder, 'missing')) is None
+
+    def test_container_memory_utilization(self):
+        stats = {'memory_stats': {'usage': 600, 'limit': 1000, 'stats': {'inactive_file': 100}}}
+        assert get_container_memory_utilization(stats) == 0.5
+        assert get_container_memory_utilization({'memory_stats': {}}) is None
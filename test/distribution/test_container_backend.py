@@ -0,0 +1,52 @@
+import threading
+import time
+import unittest
+from unittest.mock import MagicMock, patch
+
+from bci.distribution.backends.container import ContainerBackend
+
+
+class EventStream:
+    """
+    Blocks like the Docker event stream until it is closed.
+    """
+
+    def __init__(self) -> None:
+        self.closed = threading.Event()
+
+    def __iter__(self):
+        self.closed.wait()
+        return iter([])
+
+    def close(self) -> None:
+        self.closed.set()
+
+
+class TestContainerBackend(unittest.TestCase):
+    @staticmethod
+    def create_backend(client: MagicMock) -> ContainerBackend:
+        with patch('docker.from_env', return_value=client):
+            return ContainerBackend(1)
+
+    def test_shutdown_stops_event_listener(self):
+        client = MagicMock()
+        stream = EventStream()
+        client.events.return_value = stream
+        backend = self.create_backend(client)
+
+        time.sleep(0.1)
+        backend.shutdown()
+        assert stream.closed.wait(1)
+        time.sleep(0.1)
+        assert client.events.call_count == 1
+        assert not any(thread.name == 'bh_container_events' for thread in threading.enumerate())
+
+    def test_unreachable_daemon_is_not_polled_continuously(self):
+        client = MagicMock()
+        client.events.side_effect = ConnectionError('Docker daemon is unreachable')
+        backend = self.create_backend(client)
+
+        time.sleep(0.5)
+        backend.shutdown()
+        # The listener backs off before reconnecting
+        assert client.events.call_count == 1
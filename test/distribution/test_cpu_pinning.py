@@ -0,0 +1,25 @@
+import unittest
+
+from bci.distribution.cpu_pinning import CoreSet, CpuPinning, assign_core_sets, format_cpu_list, parse_cpu_list
+
+
+class TestCpuPinning(unittest.TestCase):
+    def test_cpu_list(self):
+        assert parse_cpu_list('0-3,8,10-11\n') == [0, 1, 2, 3, 8, 10, 11]
+        assert format_cpu_list([11, 0, 1, 2, 3, 8, 10]) == '0-3,8,10-11'
+        assert parse_cpu_list('') == []
+
+    def test_slots_get_disjoint_core_sets(self):
+        core_sets = assign_core_sets(4, {0: list(range(8))}, pin_memory=False)
+        assert [core_set.cores for core_set in core_sets] == [(0, 1), (2, 3), (4, 5), (6, 7)]
+        assert all(core_set.node is None for core_set in core_sets)
+
+    def test_core_sets_do_not_span_numa_nodes(self):
+        core_sets = assign_core_sets(3, {0: [0, 1, 2, 3], 1: [4, 5, 6, 7]}, pin_memory=True)
+        assert core_sets == [CoreSet((0, 1), 0), CoreSet((2, 3), 0), CoreSet((4, 5, 6, 7), 1)]
+        assert core_sets[0].get_run_arguments() == {'cpuset_cpus': '0-1', 'cpuset_mems': '0'}
+
+    def test_slots_share_cores_when_there_are_more_slots(self):
+        cpu_pinning = CpuPinning(3, {0: [0, 1]}, pin_memory=False)
+        assert [cpu_pinning.get_core_set(slot_id).cores for slot_id in range(3)] == [(0,), (1,), (0,)]
+        assert cpu_pinning.get_run_arguments(1) == {'cpuset_cpus': '1'}
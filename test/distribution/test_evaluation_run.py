@@ -0,0 +1,65 @@
+import unittest
+
+from bci.distribution.evaluation_run import EvaluationRun
+from bci.distribution.fair_share_scheduler import FairShareScheduler
+from bci.evaluations.logic import (
+    BrowserConfiguration,
+    EvaluationConfiguration,
+    EvaluationParameters,
+    EvaluationRange,
+    SequenceConfiguration,
+)
+from bci.search_strategy.joint_planner import JointPlanner
+from bci.search_strategy.sequence_strategy import SequenceFinished
+
+
+class FinishedStrategy:
+    def next(self):
+        raise SequenceFinished()
+
+
+def create_eval_params(mech_group: str) -> EvaluationParameters:
+    return EvaluationParameters(
+        BrowserConfiguration('chromium', 'default', [], []),
+        EvaluationConfiguration('project', 'terminal', 10),
+        EvaluationRange(mech_group, revision_number_range=(1000, 2000)),
+        SequenceConfiguration(4, 50),
+        'collection',
+    )
+
+
+class TestEvaluationRun(unittest.TestCase):
+    def test_experiment_names_are_unique_over_jobs(self):
+        eval_params = create_eval_params('experiment')
+        first, second = EvaluationRun('first', [eval_params]), EvaluationRun('second', [eval_params])
+        assert first.get_experiment_name(eval_params) != second.get_experiment_name(eval_params)
+
+    def test_progress(self):
+        run = EvaluationRun('job', [create_eval_params('a'), create_eval_params('b')])
+        assert run.get_progress()['status'] == 'admitting'
+
+        run.scheduler = FairShareScheduler(on_experiment_finished=run.finished_experiment_names.add)
+        for experiment_name in run.get_eval_params_per_experiment():
+            run.scheduler.add(experiment_name, FinishedStrategy())
+        run.status = 'running'
+        assert run.scheduler.next() is None
+
+        progress = run.get_progress()
+        assert progress['nb_of_finished_experiments'] == 2
+        assert [experiment['experiment'] for experiment in progress['experiments']] == ['a', 'b']
+        assert all(experiment['is_finished'] for experiment in progress['experiments'])
+
+        run.finish('done')
+        assert run.is_finished()
+        assert run.to_summary()['finished_ts'] is not None
+
+    def test_progress_reports_splitter_alignment(self):
+        run = EvaluationRun('job', [create_eval_params('a'), create_eval_params('b')])
+        assert 'splitter_alignment' not in run.get_progress()
+
+        joint_planner = JointPlanner()
+        joint_planner.register(1500, 1500, is_aligned=False)
+        joint_planner.register(1500, 1510, is_aligned=True)
+        run.joint_planners.append(joint_planner)
+        report = run.get_progress()['splitter_alignment'][0]
+        assert report['nb_of_binaries'] == 1 and report['nb_of_binaries_without_alignment'] == 2
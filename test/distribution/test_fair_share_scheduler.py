@@ -0,0 +1,194 @@
+import threading
+import unittest
+
+from bci.distribution.fair_share_scheduler import FairShareScheduler
+from bci.search_strategy.sequence_strategy import SequenceFinished, SequenceNotReady
+
+
+class StrategyStub:
+    """
+    Yields a state for each of the given batches, but only once all states of the previous batch are evaluated.
+    """
+
+    def __init__(self, batches: list[list[int]]) -> None:
+        self.batches = batches
+        self.nb_of_running = 0
+
+    def next(self):
+        if self.nb_of_running > 0 and not self.batches[0]:
+            raise SequenceFinished()
+        if not self.batches[0]:
+            self.batches.pop(0)
+        if not self.batches:
+            raise SequenceFinished()
+        self.nb_of_running += 1
+        return self.batches[0].pop(0)
+
+
+class TestFairShareScheduler(unittest.TestCase):
+    def test_states_are_interleaved_by_weight(self):
+        scheduler = FairShareScheduler()
+        scheduler.add('a', StrategyStub([list(range(100))]), weight=1)
+        scheduler.add('b', StrategyStub([list(range(100))]), weight=3)
+
+        experiments = [scheduler.next()[0] for _ in range(8)]
+        assert experiments.count('a') == 2
+        assert experiments.count('b') == 6
+
+    def test_waiting_experiment_resumes_after_evaluation_finished(self):
+        finished_experiments = []
+        scheduler = FairShareScheduler(on_experiment_finished=finished_experiments.append)
+        strategy_a = StrategyStub([[1], [2, 3]])
+        scheduler.add('a', strategy_a)
+        scheduler.add('b', StrategyStub([[1]]))
+
+        assert scheduler.next() == ('a', 1)
+        assert scheduler.next() == ('b', 1)
+
+        def finish_evaluations():
+            strategy_a.nb_of_running = 0
+            scheduler.on_evaluation_finished('a')
+            scheduler.on_evaluation_finished('b')
+
+        # Both strategies wait for their running evaluation, so the scheduler blocks until they are finished
+        threading.Timer(0.1, finish_evaluations).start()
+        assert scheduler.next() == ('a', 2)
+        assert scheduler.next() == ('a', 3)
+        assert finished_experiments == ['b']
+
+        strategy_a.nb_of_running = 0
+        scheduler.on_evaluation_finished('a')
+        scheduler.on_evaluation_finished('a')
+        assert scheduler.next() is None
+        assert finished_experiments == ['b', 'a']
+
+    def test_stop(self):
+        scheduler = FairShareScheduler()
+        scheduler.add('a', StrategyStub([[1], [2]]))
+        assert scheduler.next() == ('a', 1)
+        threading.Timer(0.1, scheduler.stop).start()
+        assert scheduler.next() is None
+
+    def test_non_blocking_next(self):
+        scheduler = FairShareScheduler()
+        scheduler.add('a', StrategyStub([[1], [2]]))
+        assert scheduler.next(blocking=False) == ('a', 1)
+        assert scheduler.next(blocking=False) is None
+
+    def test_resumed_evaluations(self):
+        finished_experiments = []
+        scheduler = FairShareScheduler(on_experiment_finished=finished_experiments.append)
+        scheduler.add('a', StrategyStub([[1]]))
+        scheduler.add_running_evaluation('a')
+        assert scheduler.next() == ('a', 1)
+
+        # The experiment waits for the evaluation that was taken over, which is requeued
+        threading.Timer(0.1, scheduler.requeue, args=['a', 5]).start()
+        assert scheduler.next() == ('a', 5)
+        for _ in range(2):
+            scheduler.on_evaluation_finished('a')
+        assert scheduler.next() is None
+        assert finished_experiments == ['a']
+
+    def test_cancel(self):
+        finished_experiments = []
+        scheduler = FairShareScheduler(on_experiment_finished=finished_experiments.append)
+        scheduler.add('a', StrategyStub([list(range(100))]))
+        scheduler.add('b', StrategyStub([[1], [2]]))
+        assert scheduler.next() == ('a', 0)
+        assert scheduler.next() == ('b', 1)
+
+        # The running evaluation of the cancelled experiment is awaited, but no new states are handed out
+        scheduler.cancel('a')
+        assert scheduler.get_statistics('a')['is_finished'] is False
+        scheduler.on_evaluation_finished('a')
+        assert finished_experiments == ['a']
+        assert scheduler.next(blocking=False) is None
+
+    def test_cancel_drops_requeued_states(self):
+        finished_experiments = []
+        scheduler = FairShareScheduler(on_experiment_finished=finished_experiments.append)
+        scheduler.add('a', StrategyStub([[1], [2]]))
+        assert scheduler.next() == ('a', 1)
+        scheduler.requeue('a', 1)
+        scheduler.cancel('a')
+        assert finished_experiments == ['a']
+        assert scheduler.get_statistics('a')['nb_of_running_evaluations'] == 0
+
+    def test_experiment_added_while_waiting(self):
+        scheduler = FairShareScheduler()
+        scheduler.add('a', StrategyStub([[1], [2]]))
+        assert scheduler.next() == ('a', 1)
+
+        threading.Timer(0.1, scheduler.add, args=['b', StrategyStub([[3]])]).start()
+        assert scheduler.next() == ('b', 3)
+
+    def test_higher_priority_classes_go_first(self):
+        scheduler = FairShareScheduler()
+        scheduler.add('batch', StrategyStub([list(range(100))]), weight=10)
+        scheduler.add('interactive', StrategyStub([[1, 2]]), priority_rank=1)
+
+        assert [scheduler.next()[0] for _ in range(3)] == ['interactive', 'interactive', 'batch']
+
+    def test_min_priority_rank(self):
+        scheduler = FairShareScheduler()
+        scheduler.add('batch', StrategyStub([list(range(100))]))
+        assert scheduler.next(min_priority_rank=1, timeout=0.1) is None
+
+        threading.Timer(0.1, scheduler.add, args=['interactive', StrategyStub([[1]])], kwargs={'priority_rank': 1}).start()
+        assert scheduler.next(min_priority_rank=1, timeout=5) == ('interactive', 1)
+
+    def test_not_ready_experiment_resumes_when_woken(self):
+        finished_experiments = []
+        scheduler = FairShareScheduler(on_experiment_finished=finished_experiments.append)
+        states = []
+
+        class CompilingStrategy:
+            def next(self):
+                if not states:
+                    raise SequenceNotReady()
+                state = states.pop(0)
+                if state is None:
+                    raise SequenceFinished()
+                return state
+
+        scheduler.add('a', CompilingStrategy())
+        assert scheduler.next(blocking=False) is None
+
+        def compile_states():
+            states.extend([1, None])
+            scheduler.wake('a')
+
+        # The experiment is not finished while its states are computed, even though none of its evaluations run
+        threading.Timer(0.1, compile_states).start()
+        assert scheduler.next() == ('a', 1)
+        scheduler.on_evaluation_finished('a')
+        assert scheduler.next() is None
+        assert finished_experiments == ['a']
+
+    def test_finished_states_are_reported_to_the_strategy(self):
+        scheduler = FairShareScheduler()
+        strategy = StrategyStub([[1]])
+        strategy.finished_states = []
+        strategy.on_evaluation_finished = strategy.finished_states.append
+        scheduler.add('a', strategy)
+
+        assert scheduler.next() == ('a', 1)
+        scheduler.on_evaluation_finished('a', 1)
+        assert strategy.finished_states == [1]
+
+    def test_failing_strategy_fails_its_experiment(self):
+        events = []
+        scheduler = FairShareScheduler(
+            on_experiment_finished=lambda name: events.append(('finished', name)),
+            on_experiment_failed=lambda name: events.append(('failed', name)),
+        )
+        strategy = StrategyStub([[1], [2]])
+        scheduler.add('a', strategy)
+        assert scheduler.next() == ('a', 1)
+        strategy.next = lambda: 1 / 0
+        scheduler.on_evaluation_finished('a')
+
+        # The failed experiment is cancelled, which finishes it since none of its evaluations are running
+        assert scheduler.next() is None
+        assert events == [('failed', 'a'), ('finished', 'a')]
@@ -0,0 +1,144 @@
+import threading
+import unittest
+from unittest.mock import patch
+
+from werkzeug.serving import make_server
+
+from bci.distribution.backends import remote
+from bci.distribution.backends.base import ExecutionBackend
+from bci.distribution.backends.remote import RemoteNodeBackend
+from bci.distribution.node_agent import create_agent
+from bci.evaluations.logic import (
+    BrowserConfiguration,
+    DatabaseParameters,
+    EvaluationConfiguration,
+    WorkerParameters,
+)
+from bci.version_control.states.revisions.chromium import ChromiumRevision
+
+
+class ManualBackend(ExecutionBackend):
+    """
+    Backend of which evaluations only finish when the test says so.
+    """
+
+    def __init__(self, nb_of_slots: int) -> None:
+        super().__init__('manual')
+        self.nb_of_slots = nb_of_slots
+        self.running = []
+
+    def get_nb_of_slots(self) -> int:
+        return self.nb_of_slots
+
+    def get_nb_of_free_slots(self) -> int:
+        return self.nb_of_slots - len(self.running)
+
+    def get_cached_binaries(self) -> set[str]:
+        return {'chromium/1'}
+
+    def start(self, params, on_finished) -> None:
+        self.running.append((params, on_finished))
+
+    def cancel_pending(self) -> None:
+        pass
+
+    def shutdown(self) -> None:
+        pass
+
+    def finish_all(self) -> None:
+        running, self.running = self.running, []
+        for _, on_finished in running:
+            on_finished(True)
+
+
+class TestNodeAgent(unittest.TestCase):
+    def setUp(self) -> None:
+        poll_interval_patch = patch.object(remote, 'POLL_INTERVAL', 0.05)
+        poll_interval_patch.start()
+        self.addCleanup(poll_interval_patch.stop)
+        self.local_backend = ManualBackend(2)
+        self.server = make_server('127.0.0.1', 0, create_agent(self.local_backend, 'secret'), threaded=True)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.url = f'http://127.0.0.1:{self.server.server_port}/'
+        self.backend = RemoteNodeBackend(self.url, 'secret')
+
+    def tearDown(self) -> None:
+        self.backend.shutdown()
+        self.server.shutdown()
+
+    @staticmethod
+    def create_params(revision_nb: int) -> WorkerParameters:
+        return WorkerParameters(
+            BrowserConfiguration('chromium', 'default', [], []),
+            EvaluationConfiguration('project', 'custom'),
+            ChromiumRevision(revision_id='a' * 40, revision_nb=revision_nb),
+            'mech_group',
+            'collection',
+            DatabaseParameters('host', 'user', 'password', 'database', 0),
+        )
+
+    def test_capacity(self):
+        assert self.backend.get_nb_of_slots() == 2
+        assert self.backend.get_nb_of_free_slots() == 2
+        assert self.backend.has_cached_binary(ChromiumRevision(revision_id='a' * 40, revision_nb=1))
+        assert not self.backend.has_cached_binary(ChromiumRevision(revision_id='a' * 40, revision_nb=2))
+
+    def test_evaluations_are_reported_when_finished(self):
+        finished = threading.Event()
+        capacity_changed = threading.Event()
+        self.backend.on_capacity_changed = capacity_changed.set
+
+        self.backend.start(self.create_params(1), lambda success: success and finished.set())
+        self.backend.start(self.create_params(2), lambda _: None)
+        assert len(self.local_backend.running) == 2
+        assert self.local_backend.running[0][0].state.revision_nb == 1
+        assert self.backend.get_nb_of_free_slots() == 0
+
+        self.local_backend.finish_all()
+        assert finished.wait(timeout=5)
+        assert capacity_changed.wait(timeout=5)
+        assert self.backend.get_nb_of_free_slots() == 2
+
+    def test_full_node_refuses_evaluations(self):
+        self.local_backend.nb_of_slots = 0
+        with self.assertRaises(remote.NodeUnavailable):
+            self.backend.start(self.create_params(1), lambda _: None)
+        assert self.backend.get_nb_of_free_slots() == 0
+
+    def test_failed_start_is_refused(self):
+        def start(params, on_finished):
+            raise AttributeError('Evaluation was started without a free slot')
+
+        self.local_backend.start = start
+        with self.assertRaises(remote.NodeUnavailable):
+            self.backend.start(self.create_params(1), lambda _: None)
+
+    def test_concurrent_evaluations_do_not_exceed_free_slots(self):
+        client = create_agent(self.local_backend, 'secret').test_client()
+        params = self.create_params(1).serialize()
+        responses = []
+
+        def post():
+            responses.append(
+                client.post('/evaluations/', json={'params': params}, headers={'Authorization': 'Bearer secret'})
+            )
+
+        threads = [threading.Thread(target=post) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert sorted(response.status_code for response in responses) == [200] * 2 + [503] * 6
+        assert all(response.json['status'] in ('OK', 'NOK') for response in responses)
+        assert len(self.local_backend.running) == 2
+
+    def test_requests_without_token_are_refused(self):
+        backend = RemoteNodeBackend(self.url, 'wrong')
+        try:
+            assert backend.get_nb_of_slots() == 0
+            with self.assertRaises(remote.NodeUnavailable):
+                backend.start(self.create_params(1), lambda _: None)
+        finally:
+            backend.shutdown()
+        assert not self.local_backend.running
+        self.assertRaises(AttributeError, create_agent, self.local_backend, '')
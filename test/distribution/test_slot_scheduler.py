@@ -0,0 +1,108 @@
+import threading
+import time
+import unittest
+
+from bci.distribution.slot_scheduler import SlotScheduler
+
+
+class TestSlotScheduler(unittest.TestCase):
+
+    def test_acquire_until_exhausted(self):
+        scheduler = SlotScheduler(2)
+        first = scheduler.acquire()
+        second = scheduler.acquire()
+        assert {first.slot_id, second.slot_id} == {0, 1}
+        assert scheduler.get_nb_of_busy_slots() == 2
+        assert scheduler.acquire(timeout=0) is None
+
+    def test_release_is_idempotent(self):
+        scheduler = SlotScheduler(1)
+        lease = scheduler.acquire()
+        assert scheduler.release(lease)
+        assert not scheduler.release(lease)
+
+        # A stale lease should never release the slot of a newer evaluation
+        new_lease = scheduler.acquire()
+        assert new_lease.slot_id == lease.slot_id
+        assert not scheduler.release(lease)
+        assert scheduler.get_nb_of_busy_slots() == 1
+        assert scheduler.release(new_lease)
+
+    def test_waiting_dispatcher_is_woken_on_release(self):
+        scheduler = SlotScheduler(1)
+        lease = scheduler.acquire()
+        acquired = []
+
+        def dispatch():
+            acquired.append(scheduler.acquire())
+
+        thread = threading.Thread(target=dispatch)
+        thread.start()
+        time.sleep(0.1)
+        assert not acquired
+
+        scheduler.release(lease)
+        thread.join(timeout=1)
+        assert acquired and acquired[0].slot_id == lease.slot_id
+
+        statistics = scheduler.get_refill_statistics()
+        assert statistics['nb_of_refills'] == 1
+        assert statistics['max_refill_latency'] < 1
+
+    def test_wait_until_all_released(self):
+        scheduler = SlotScheduler(3)
+        leases = [scheduler.acquire() for _ in range(3)]
+        assert not scheduler.wait_until_all_released(timeout=0)
+
+        for lease in leases:
+            threading.Timer(0.05, scheduler.release, args=[lease]).start()
+        assert scheduler.wait_until_all_released(timeout=1)
+
+    def test_idle_time_is_tracked_per_slot(self):
+        scheduler = SlotScheduler(2)
+        time.sleep(0.05)
+        lease = scheduler.acquire()
+        idle_time = scheduler.get_idle_time_per_slot()
+        assert set(idle_time.keys()) == {0, 1}
+        assert idle_time[lease.slot_id] >= 0.05
+        assert idle_time[1 - lease.slot_id] >= 0.05
+
+    def test_limit_restricts_concurrent_leases(self):
+        scheduler = SlotScheduler(3)
+        scheduler.set_limit(1)
+        lease = scheduler.acquire()
+        assert scheduler.get_nb_of_free_slots() == 0
+        assert scheduler.acquire(timeout=0) is None
+
+        scheduler.set_limit(2)
+        assert scheduler.get_nb_of_free_slots() == 1
+        assert scheduler.acquire(timeout=0) is not None
+
+        # Lowering the limit does not revoke leases, but no slot is handed out until enough were released
+        scheduler.set_limit(1)
+        scheduler.release(lease)
+        assert scheduler.acquire(timeout=0) is None
+
+        scheduler.set_limit(10)
+        assert scheduler.get_limit() == 3
+
+    def test_acquire_specific_slot(self):
+        scheduler = SlotScheduler(2)
+        lease = scheduler.acquire_slot(1)
+        assert lease.slot_id == 1
+        assert scheduler.acquire_slot(1) is None
+        assert scheduler.acquire_slot(2) is None
+        assert scheduler.acquire().slot_id == 0
+        assert scheduler.release(lease)
+
+    def test_retry_avoids_previous_slot(self):
+        scheduler = SlotScheduler(2)
+        lease = scheduler.acquire(key='chromium/1')
+        assert lease.slot_id == 0
+        scheduler.release(lease)
+        retry_lease = scheduler.acquire(key='chromium/1')
+        assert retry_lease.slot_id == 1
+        scheduler.release(retry_lease)
+        # If only the previous slot is free, it is used anyway
+        other_lease = scheduler.acquire(key='chromium/2')
+        assert scheduler.acquire(key='chromium/1').slot_id == 1 - other_lease.slot_id
@@ -0,0 +1,92 @@
+import time
+import unittest
+
+from bci.distribution.backends.base import ExecutionBackend
+from bci.distribution.watchdog import WatchedEvaluation, Watchdog
+from bci.distribution.worker_manager import MAX_NB_OF_RETRIES_AFTER_TIMEOUT, WorkerManager
+from bci.evaluations.logic import BrowserConfiguration, DatabaseParameters, EvaluationConfiguration, WorkerParameters
+from bci.version_control.states.revisions.chromium import ChromiumRevision
+
+
+def create_params(revision_nb: int = 1) -> WorkerParameters:
+    return WorkerParameters(
+        BrowserConfiguration('chromium', 'default', [], []),
+        EvaluationConfiguration('project', 'terminal'),
+        ChromiumRevision(revision_id='a' * 40, revision_nb=revision_nb),
+        'experiment',
+        'collection',
+        DatabaseParameters('host', 'user', 'password', 'database', 0),
+    )
+
+
+class HangingBackend(ExecutionBackend):
+    """
+    Backend of which evaluations only finish when they are killed.
+    """
+
+    def __init__(self) -> None:
+        super().__init__('hanging')
+        self.running = {}
+        self.nb_of_starts = 0
+
+    def get_nb_of_slots(self) -> int:
+        return 1
+
+    def get_nb_of_free_slots(self) -> int:
+        return 1 - len(self.running)
+
+    def start(self, params, on_finished) -> None:
+        self.nb_of_starts += 1
+        self.running[id(params)] = on_finished
+
+    def kill(self, params) -> bool:
+        if (on_finished := self.running.pop(id(params), None)) is None:
+            return False
+        on_finished(False)
+        return True
+
+    def cancel_pending(self) -> None:
+        pass
+
+    def shutdown(self) -> None:
+        pass
+
+
+class TestWatchdog(unittest.TestCase):
+
+    def test_kill_overdue_evaluations(self):
+        backend = HangingBackend()
+        watchdog = Watchdog()
+        finished = []
+        overdue = WatchedEvaluation(create_params(), backend, 60, started_at=0)
+        on_time = WatchedEvaluation(create_params(), backend, 120, started_at=0)
+        unlimited = WatchedEvaluation(create_params(), backend, None, started_at=0)
+        for evaluation in [overdue, on_time, unlimited]:
+            backend.start(evaluation.params, finished.append)
+            watchdog.watch(evaluation)
+
+        assert watchdog.check(now=90) == [overdue]
+        assert finished == [False]
+        assert len(backend.running) == 2
+        # An evaluation is only killed once, even if the backend did not report it as finished yet
+        assert watchdog.check(now=100) == []
+        assert watchdog.get_nb_of_timeouts_per_backend() == {'hanging': 1}
+
+    def test_requeue_until_retry_cap(self):
+        worker_manager = WorkerManager(1)
+        backend = HangingBackend()
+        backend.on_capacity_changed = worker_manager.backends[0].on_capacity_changed
+        worker_manager.backends = [backend]
+        finished = []
+        try:
+            worker_manager.start_test(create_params(), on_finished=finished.append, time_budget=0)
+            for nb_of_starts in range(1, MAX_NB_OF_RETRIES_AFTER_TIMEOUT + 2):
+                while backend.nb_of_starts < nb_of_starts:
+                    time.sleep(0.01)
+                assert worker_manager.watchdog.check() != []
+            worker_manager.wait_until_all_evaluations_are_done()
+            assert backend.nb_of_starts == MAX_NB_OF_RETRIES_AFTER_TIMEOUT + 1
+            assert finished == [False]
+            assert worker_manager.get_slot_statistics()['hanging']['nb_of_timeouts'] == MAX_NB_OF_RETRIES_AFTER_TIMEOUT + 1
+        finally:
+            worker_manager.shutdown()
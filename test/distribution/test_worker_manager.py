@@ -0,0 +1,49 @@
+import os
+import time
+import unittest
+from unittest.mock import MagicMock, patch
+
+from bci.distribution.worker_manager import WorkerManager
+from bci.evaluations.logic import (
+    BrowserConfiguration,
+    DatabaseParameters,
+    EvaluationConfiguration,
+    WorkerParameters,
+)
+from bci.version_control.states.revisions.chromium import ChromiumRevision
+from test.distribution.test_container_backend import EventStream
+
+
+class TestWorkerManager(unittest.TestCase):
+    @staticmethod
+    def create_params(revision_nb: int) -> WorkerParameters:
+        return WorkerParameters(
+            BrowserConfiguration('chromium', 'default', [], []),
+            EvaluationConfiguration('project', 'custom'),
+            ChromiumRevision(revision_id='a' * 40, revision_nb=revision_nb),
+            'mech_group',
+            'collection',
+            DatabaseParameters('host', 'user', 'password', 'database', 0),
+        )
+
+    def test_refills_of_container_slots_are_measured(self):
+        client = MagicMock()
+        client.events.return_value = EventStream()
+        client.containers.list.return_value = []
+        # Each worker container takes a while to perform its evaluation
+        client.containers.run.side_effect = lambda *args, **kwargs: time.sleep(0.2)
+        environment = {'HOST_PWD': '/host', 'BUGHOG_VERSION': 'test', 'BCI_WORKER_MODE': 'container', 'BCI_REMOTE_NODES': ''}
+        with patch.dict(os.environ, environment), patch('docker.from_env', return_value=client):
+            worker_manager = WorkerManager(2)
+            try:
+                # The third evaluation waits until one of the first two releases its slot
+                for revision_nb in range(1, 4):
+                    worker_manager.start_test(self.create_params(revision_nb))
+                worker_manager.wait_until_all_evaluations_are_done()
+                statistics = worker_manager.get_slot_statistics()['local']
+            finally:
+                worker_manager.shutdown()
+
+        assert client.containers.run.call_count == 3
+        assert statistics['nb_of_refills'] == 1
+        assert 0 < statistics['max_refill_latency'] < 0.2
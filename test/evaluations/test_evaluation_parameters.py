@@ -0,0 +1,24 @@
+import unittest
+
+from bci.evaluations.logic import (
+    BrowserConfiguration,
+    EvaluationConfiguration,
+    EvaluationParameters,
+    EvaluationRange,
+    SequenceConfiguration,
+)
+
+
+class TestEvaluationParameters(unittest.TestCase):
+    def test_serialization(self):
+        params = EvaluationParameters(
+            BrowserConfiguration('chromium', 'default', ['--disable-web-security'], []),
+            EvaluationConfiguration('project', 'terminal', 10),
+            EvaluationRange('experiment', revision_number_range=(1000, 2000)),
+            SequenceConfiguration(4, 50, search_strategy='bgb_search'),
+            'collection',
+            weight=2,
+            priority='interactive',
+        )
+        assert EvaluationParameters.from_dict(params.to_dict()) == params
+        assert params.get_priority_rank() == 1
@@ -0,0 +1,94 @@
+import threading
+import unittest
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from bci.evaluations.pipeline import EvaluationPipeline
+
+
+class FakeEvaluationFramework:
+    def __init__(self) -> None:
+        self.calls = []
+        self.cleanup_started = threading.Event()
+        self.cleanup_allowed = threading.Event()
+        self.cleanup_allowed.set()
+
+    def prepare(self, worker_params):
+        self.calls.append(('prepare', worker_params.state.name))
+        return worker_params.state.name
+
+    def perform(self, prepared):
+        self.calls.append(('perform', prepared))
+
+    def cleanup(self, prepared):
+        self.cleanup_started.set()
+        self.cleanup_allowed.wait()
+        self.calls.append(('cleanup', prepared))
+
+
+def create_params(name: str) -> SimpleNamespace:
+    return SimpleNamespace(state=SimpleNamespace(browser_name='chromium', name=name))
+
+
+@patch('bci.evaluations.pipeline.EvaluationPipeline._EvaluationPipeline__has_disk_space_left', return_value=True)
+class TestEvaluationPipeline(unittest.TestCase):
+    def test_prefetched_evaluation_is_prepared_once(self, _):
+        framework = FakeEvaluationFramework()
+        pipeline = EvaluationPipeline(framework, max_look_ahead=1)
+        params = create_params('1')
+        assert pipeline.prefetch(params)
+        pipeline.evaluate(params)
+        pipeline.close()
+        assert framework.calls == [('prepare', '1'), ('perform', '1'), ('cleanup', '1')]
+
+    def test_look_ahead_is_bounded(self, _):
+        pipeline = EvaluationPipeline(FakeEvaluationFramework(), max_look_ahead=1)
+        first, second = create_params('1'), create_params('2')
+        assert pipeline.prefetch(first)
+        assert not pipeline.can_prefetch()
+        assert not pipeline.prefetch(second)
+        pipeline.evaluate(first)
+        assert pipeline.can_prefetch()
+        pipeline.close()
+
+    def test_cleanup_runs_in_background(self, _):
+        framework = FakeEvaluationFramework()
+        framework.cleanup_allowed.clear()
+        pipeline = EvaluationPipeline(framework, max_look_ahead=0)
+        pipeline.evaluate(create_params('1'))
+        assert framework.cleanup_started.wait(timeout=5)
+        # The next evaluation does not wait for the cleanup of the previous one
+        pipeline.evaluate(create_params('2'))
+        assert ('perform', '2') in framework.calls
+        assert ('cleanup', '1') not in framework.calls
+        assert pipeline.get_backlog() == 2
+        framework.cleanup_allowed.set()
+        pipeline.close()
+        assert pipeline.get_backlog() == 0
+        assert framework.calls[-2:] == [('cleanup', '1'), ('cleanup', '2')]
+
+    def test_same_state_waits_for_cleanup(self, _):
+        framework = FakeEvaluationFramework()
+        pipeline = EvaluationPipeline(framework, max_look_ahead=0)
+        pipeline.evaluate(create_params('1'))
+        pipeline.evaluate(create_params('1'))
+        pipeline.close()
+        assert framework.calls == [('prepare', '1'), ('perform', '1'), ('cleanup', '1')] * 2
+
+    def test_unperformed_evaluation_is_cleaned_up_on_close(self, _):
+        framework = FakeEvaluationFramework()
+        pipeline = EvaluationPipeline(framework, max_look_ahead=1)
+        assert pipeline.prefetch(create_params('1'))
+        pipeline.close()
+        assert framework.calls == [('prepare', '1'), ('cleanup', '1')]
+        assert pipeline.get_backlog() == 0
+
+    def test_discarded_evaluation_is_cleaned_up(self, _):
+        framework = FakeEvaluationFramework()
+        pipeline = EvaluationPipeline(framework, max_look_ahead=1)
+        params = create_params('1')
+        assert pipeline.prefetch(params)
+        pipeline.discard(params)
+        assert pipeline.can_prefetch()
+        pipeline.close()
+        assert framework.calls == [('prepare', '1'), ('cleanup', '1')]
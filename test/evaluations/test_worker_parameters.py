@@ -0,0 +1,52 @@
+import unittest
+
+from bci.evaluations.logic import (
+    BrowserConfiguration,
+    DatabaseParameters,
+    EvaluationConfiguration,
+    WorkerParameters,
+)
+from bci.version_control.states.revisions.chromium import ChromiumRevision
+
+
+class TestWorkerParameters(unittest.TestCase):
+    @staticmethod
+    def create_params(mech_group: str, revision_nb: int = 1, cli_options: list[str] = None) -> WorkerParameters:
+        return WorkerParameters(
+            BrowserConfiguration('chromium', 'default', cli_options or [], []),
+            EvaluationConfiguration('project', 'terminal'),
+            ChromiumRevision(revision_id='a' * 40, revision_nb=revision_nb),
+            mech_group,
+            'collection',
+            DatabaseParameters('host', 'user', 'password', 'database', 0),
+        )
+
+    def test_batch(self):
+        params = WorkerParameters.batch(
+            [self.create_params('a'), self.create_params('b', cli_options=['--disable-web-security'])]
+        )
+        test_params_list = params.create_test_params_list()
+        assert [test_params.mech_group for test_params in test_params_list] == ['a', 'b']
+        assert test_params_list[1].browser_configuration.cli_options == ['--disable-web-security']
+        assert all(test_params.state.revision_nb == 1 for test_params in test_params_list)
+        assert str(params).endswith(': [a, b])')
+
+    def test_batch_of_different_states(self):
+        with self.assertRaises(AttributeError):
+            WorkerParameters.batch([self.create_params('a', 1), self.create_params('b', 2)])
+
+    def test_serialization(self):
+        params = WorkerParameters.batch([self.create_params('a'), self.create_params('b'), self.create_params('c')])
+        deserialized_params = WorkerParameters.deserialize(params.serialize())
+        assert [test.mech_group for test in deserialized_params.batched_tests] == ['b', 'c']
+        assert deserialized_params.create_test_params_list() == params.create_test_params_list()
+
+    def test_repetition(self):
+        params = self.create_params('a')
+        params.state.repetition = 2
+        deserialized_params = WorkerParameters.deserialize(params.serialize())
+        assert deserialized_params.state.repetition == 2
+
+        # Repetitions of a state are separate evaluations
+        with self.assertRaises(AttributeError):
+            WorkerParameters.batch([params, self.create_params('b')])
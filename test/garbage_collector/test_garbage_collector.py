@@ -0,0 +1,49 @@
+import os
+import tempfile
+import unittest
+
+from bci.garbage_collector import TRASH_FOLDER_NAME, GarbageCollector
+
+
+class TestGarbageCollector(unittest.TestCase):
+    def setUp(self) -> None:
+        self.folder = tempfile.TemporaryDirectory()
+        self.addCleanup(self.folder.cleanup)
+
+    def create_folder(self, name: str) -> str:
+        path = os.path.join(self.folder.name, name)
+        os.makedirs(os.path.join(path, 'sub'))
+        with open(os.path.join(path, 'sub', 'file'), 'w') as file:
+            file.write('content')
+        return path
+
+    def test_dispose(self):
+        collector = GarbageCollector(high_water_mark=1)
+        path = self.create_folder('binary')
+        assert collector.dispose(path)
+        # The folder is moved out of the way right away
+        assert not os.path.exists(path)
+        collector.drain()
+        assert collector.get_backlog() == 0
+        assert os.listdir(os.path.join(self.folder.name, TRASH_FOLDER_NAME)) == []
+
+    def test_dispose_missing_folder(self):
+        collector = GarbageCollector(high_water_mark=1)
+        assert collector.dispose(os.path.join(self.folder.name, 'missing'))
+        assert collector.dispose(None)
+        assert collector.get_backlog() == 0
+
+    def test_leftovers_are_collected(self):
+        trash_folder = os.path.join(self.folder.name, TRASH_FOLDER_NAME)
+        os.makedirs(os.path.join(trash_folder, 'leftover'))
+        collector = GarbageCollector(high_water_mark=1)
+        collector.dispose(self.create_folder('binary'))
+        collector.drain()
+        assert os.listdir(trash_folder) == []
+
+    def test_high_water_mark_deletes_right_away(self):
+        # Any disk is above a high-water mark of 0
+        collector = GarbageCollector(high_water_mark=0)
+        collector.dispose(self.create_folder('binary'))
+        assert collector.get_backlog() == 0
+        assert os.listdir(os.path.join(self.folder.name, TRASH_FOLDER_NAME)) == []
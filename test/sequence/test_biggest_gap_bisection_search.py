@@ -79,3 +79,29 @@ class TestBiggestGapBisectionSearch(unittest.TestCase):
 
         assert ([state.index for state in sequence._completed_states]
                 == [0, 12, 22, 34, 36, 38, 44, 56, 66, 68, 72, 78, 88, 98])
+
+    def test_sbg_search_fetches_evaluated_states_incrementally(self):
+        def outcome_func(index):
+            return index < 35
+
+        state_factory = helper.create_state_factory(helper.only_has_binaries_for_even, outcome_func=outcome_func)
+        evaluated_states = []
+        marks = []
+
+        def create_new_evaluated_states(inserted_after):
+            marks.append(inserted_after)
+            return evaluated_states[inserted_after or 0 :], len(evaluated_states)
+
+        state_factory.create_new_evaluated_states = create_new_evaluated_states
+        sequence = BiggestGapBisectionSearch(state_factory)
+        while True:
+            try:
+                state = sequence.next()
+            except SequenceFinished:
+                break
+            evaluated_states.append(helper.create_state(state.index, helper.only_has_binaries_for_even, outcome_func))
+
+        assert [state.index for state in sequence._completed_states] == [0, 24, 30, 32, 34, 36, 48, 98]
+        # Every fetch continues from the high-water mark of the previous one
+        assert marks == [None] + list(range(len(marks) - 1))
+        assert all(state in evaluated_states for state in sequence._completed_states)
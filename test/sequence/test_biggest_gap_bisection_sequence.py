@@ -40,3 +40,10 @@ class TestBiggestGapBisectionSequence(unittest.TestCase):
         print(index_sequence)
         assert index_sequence == [0, 99, 24, 80, 36, 12, 70, 89, 42, 6, 18, 30, 55, 75, 94]
         self.assertRaises(SequenceFinished, sequence.next)
+
+    def test_sbg_sequence_with_availability_bitmap(self):
+        for is_available in (helper.only_has_binaries_for_even, helper.has_very_few_binaries_in_first_half):
+            expected_sequence = BiggestGapBisectionSequence(helper.create_state_factory(is_available), 17)
+            state_factory = helper.create_state_factory(is_available, with_availability_bitmap=True)
+            sequence = BiggestGapBisectionSequence(state_factory, 17)
+            assert [sequence.next().index for _ in range(17)] == [expected_sequence.next().index for _ in range(17)]
@@ -0,0 +1,119 @@
+import unittest
+
+from bci.search_strategy.bgb_search import BiggestGapBisectionSearch
+from bci.search_strategy.joint_planner import JointPlanner
+from bci.search_strategy.sequence_strategy import SequenceFinished
+from test.sequence.test_sequence_strategy import TestSequenceStrategy as helper
+
+
+class TestJointPlanner(unittest.TestCase):
+
+    def test_find_aligned_index(self):
+        joint_planner = JointPlanner(tolerance=0.1)
+        assert joint_planner.find_aligned_index(50, 0, 100) is None
+        for index in (44, 57, 90):
+            joint_planner.register(index, index, is_aligned=False)
+
+        assert joint_planner.find_aligned_index(50, 0, 100) == 44
+        assert joint_planner.find_aligned_index(53, 0, 100) == 57
+        # The tolerance is relative to the gap
+        assert joint_planner.find_aligned_index(50, 40, 60) is None
+        # Aligned indexes lie strictly within the gap
+        assert joint_planner.find_aligned_index(89, 80, 90) is None
+
+    def test_report(self):
+        joint_planner = JointPlanner()
+        joint_planner.register(50, 50, is_aligned=False)
+        joint_planner.register(50, 48, is_aligned=True)
+        joint_planner.register(25, 25, is_aligned=False)
+        assert joint_planner.get_report() == {
+            'nb_of_splitters': 3,
+            'nb_of_aligned_splitters': 1,
+            'nb_of_binaries': 2,
+            'nb_of_binaries_without_alignment': 3,
+            'reduction': 1 - 2 / 3,
+        }
+
+    @staticmethod
+    def run_searches(
+        experiments: list[tuple[int, int, int]], joint_planner: JointPlanner = None
+    ) -> tuple[set[int], list[set[int]]]:
+        """
+        Returns the indexes evaluated by any search, and the pair of indexes found by each search.
+
+        :param experiments: The first and last index of the range of each experiment and the index of its transition.
+        """
+        evaluated_indexes = set()
+        found_pairs = []
+        for first_index, last_index, transition in experiments:
+            state_factory = helper.create_state_factory(
+                helper.always_has_binary, outcome_func=lambda x, transition=transition: x < transition
+            )
+            state_factory.boundary_states = (state_factory.create_state(first_index), state_factory.create_state(last_index))
+            sequence = BiggestGapBisectionSearch(state_factory)
+            if joint_planner:
+                sequence.share_splitters(joint_planner)
+            while True:
+                try:
+                    evaluated_indexes.add(sequence.next().index)
+                except SequenceFinished:
+                    break
+            states = sequence._completed_states
+            found_pairs.append(
+                {(first.index, last.index) for first, last in zip(states, states[1:]) if first.outcome != last.outcome}
+            )
+        return evaluated_indexes, found_pairs
+
+    def test_searches_share_binaries(self):
+        # Related experiments with slightly different ranges
+        experiments = [
+            (0, 100_000, 31_337),
+            (250, 99_000, 42_000),
+            (1_000, 100_000, 58_123),
+            (1_500, 98_500, 61_000),
+            (2_000, 97_000, 27_500),
+        ]
+        independent_indexes, independent_pairs = self.run_searches(experiments)
+        joint_planner = JointPlanner()
+        joint_indexes, joint_pairs = self.run_searches(experiments, joint_planner)
+
+        # Aligning splitters does not change the outcome of the searches
+        assert joint_pairs == independent_pairs
+        assert len(joint_indexes) < len(independent_indexes)
+        report = joint_planner.get_report()
+        assert report['nb_of_aligned_splitters'] > 0
+        assert report['reduction'] > 0
+
+    @staticmethod
+    def create_aligned_search(is_available, with_availability_bitmap: bool) -> tuple:
+        state_factory = helper.create_state_factory(is_available, with_availability_bitmap=with_availability_bitmap)
+        joint_planner = JointPlanner()
+        joint_planner.register(48, 48, is_aligned=False)
+        sequence = BiggestGapBisectionSearch(state_factory)
+        sequence.share_splitters(joint_planner)
+        return state_factory, sequence, joint_planner
+
+    def test_unavailable_aligned_index_is_not_reused(self):
+        # Without an availability bitmap, the aligned state itself is checked
+        for with_availability_bitmap in (False, True):
+            state_factory, sequence, joint_planner = self.create_aligned_search(
+                lambda index: index != 48, with_availability_bitmap
+            )
+            target = state_factory.create_state(49)
+            state = sequence._find_closest_state_with_available_binary(target, state_factory.boundary_states)
+            assert state.index == 49
+            assert joint_planner.get_report()['nb_of_aligned_splitters'] == 0
+
+    def test_report_resolves_preferred_binary(self):
+        for with_availability_bitmap in (False, True):
+            state_factory, sequence, joint_planner = self.create_aligned_search(
+                lambda index: not 49 <= index <= 55, with_availability_bitmap
+            )
+            target = state_factory.create_state(52)
+            state = sequence._find_closest_state_with_available_binary(target, state_factory.boundary_states)
+            assert state.index == 48
+            # Without aligning, the nearest available binary to the target would have been the same one
+            report = joint_planner.get_report()
+            assert report['nb_of_aligned_splitters'] == 1
+            assert report['nb_of_binaries'] == 1
+            assert report['nb_of_binaries_without_alignment'] == 1
@@ -0,0 +1,110 @@
+import unittest
+
+from bci.search_strategy.multisection_search import MultisectionSearch
+from bci.search_strategy.sequence_strategy import SequenceFinished
+from test.sequence.test_sequence_strategy import TestSequenceStrategy as helper
+
+
+class TestMultisectionSearch(unittest.TestCase):
+
+    @staticmethod
+    def create_search(parallelism: int, outcome_func, is_available=helper.always_has_binary):
+        """
+        Returns the search strategy and the list of evaluated states, which the test can extend to finish evaluations.
+        """
+        evaluated_states = []
+        state_factory = helper.create_state_factory(is_available, outcome_func=outcome_func)
+        # The high-water mark is simply the number of states that were fetched
+        state_factory.create_new_evaluated_states = lambda inserted_after: (
+            evaluated_states[inserted_after or 0 :],
+            len(evaluated_states),
+        )
+        return MultisectionSearch(state_factory, parallelism), evaluated_states
+
+    @staticmethod
+    def next_batch(sequence: MultisectionSearch) -> list[int]:
+        batch = []
+        while True:
+            try:
+                batch.append(sequence.next())
+            except SequenceFinished:
+                return batch
+
+    def test_gap_is_split_in_multiple_parts(self):
+        sequence, evaluated_states = self.create_search(3, lambda x: x < 50)
+
+        boundary_states = self.next_batch(sequence)
+        assert [state.index for state in boundary_states] == [0, 99]
+        evaluated_states.extend(boundary_states)
+
+        # The middle of the gap, followed by the middles of both halves
+        splitter_states = self.next_batch(sequence)
+        assert [state.index for state in splitter_states] == [49, 74, 24]
+
+        # 24 turned out to be redundant, so only 74 is still useful and two more states are evaluated
+        evaluated_states.append(splitter_states[0])
+        assert [state.index for state in self.next_batch(sequence)] == [61, 86]
+
+    def test_redundant_planned_states_are_dropped(self):
+        sequence, evaluated_states = self.create_search(3, lambda x: x < 50)
+        evaluated_states.extend(self.next_batch(sequence))
+
+        assert sequence.next().index == 49
+        # 74 and 24 are planned, but 24 becomes redundant once the outcome of 49 is known
+        evaluated_states.append(sequence._completed_states[1])
+        assert [state.index for state in self.next_batch(sequence)] == [74, 61, 86]
+
+    def test_converges_in_fewer_rounds(self):
+        sequence, evaluated_states = self.create_search(3, lambda x: x < 50)
+        nb_of_rounds = 0
+        while batch := self.next_batch(sequence):
+            evaluated_states.extend(batch)
+            nb_of_rounds += 1
+
+        evaluated_indexes = [state.index for state in evaluated_states]
+        assert 49 in evaluated_indexes and 50 in evaluated_indexes
+        # Serial bisection requires 8 rounds (see BiggestGapBisectionSearch)
+        assert nb_of_rounds == 4
+        self.assertRaises(SequenceFinished, sequence.next)
+
+    def test_unavailable_binaries(self):
+        sequence, evaluated_states = self.create_search(4, lambda x: x < 35, helper.only_has_binaries_for_even)
+        while batch := self.next_batch(sequence):
+            evaluated_states.extend(batch)
+
+        evaluated_indexes = sorted(state.index for state in evaluated_states)
+        assert 34 in evaluated_indexes and 36 in evaluated_indexes
+        assert len(evaluated_indexes) == len(set(evaluated_indexes))
+        assert (34, 36) in {(first.index, last.index) for (first, last) in sequence._unavailability_gap_pairs}
+
+    def test_states_without_result_are_no_longer_in_flight(self):
+        sequence, evaluated_states = self.create_search(1, lambda x: x < 50)
+        evaluated_states.extend(self.next_batch(sequence))
+
+        # The evaluation of 49 is given up on without storing a result, e.g., because its binary could not be fetched
+        lost_state = sequence.next()
+        assert lost_state.index == 49
+        self.assertRaises(SequenceFinished, sequence.next)
+        sequence.on_evaluation_finished(lost_state)
+
+        # 49 is not dispatched again, instead the halves around it are split
+        assert sequence.next().index == 74
+        assert 49 not in sequence._in_flight
+
+    def test_evaluated_states_are_fetched_incrementally(self):
+        sequence, evaluated_states = self.create_search(3, lambda x: x < 50)
+        nb_of_fetched_states = []
+        create_new_evaluated_states = sequence._state_factory.create_new_evaluated_states
+
+        def count_fetched_states(inserted_after):
+            new_states, mark = create_new_evaluated_states(inserted_after)
+            nb_of_fetched_states.append(len(new_states))
+            return new_states, mark
+
+        sequence._state_factory.create_new_evaluated_states = count_fetched_states
+        while batch := self.next_batch(sequence):
+            evaluated_states.extend(batch)
+
+        # Each evaluated state is fetched exactly once
+        assert sum(nb_of_fetched_states) == len(evaluated_states)
+        assert sequence._completed_states == sorted(evaluated_states, key=lambda state: state.index)
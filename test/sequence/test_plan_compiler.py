@@ -0,0 +1,67 @@
+import threading
+import unittest
+from unittest.mock import patch
+
+from bci.search_strategy.bgb_sequence import BiggestGapBisectionSequence
+from bci.search_strategy.plan_compiler import EvaluationPlan
+from bci.search_strategy.sequence_strategy import SequenceFinished, SequenceNotReady
+from test.sequence.test_sequence_strategy import TestSequenceStrategy as helper
+
+
+class TestEvaluationPlan(unittest.TestCase):
+    @staticmethod
+    def compile(plan: EvaluationPlan) -> None:
+        compiled = threading.Event()
+        plan.on_progress = lambda: plan.is_compiled() and compiled.set()
+        plan.compile()
+        assert compiled.wait(timeout=5)
+
+    def test_plan_follows_sequence(self):
+        state_factory = helper.create_state_factory(helper.only_has_binaries_for_even)
+        plan = EvaluationPlan(BiggestGapBisectionSequence(state_factory, 12))
+        self.compile(plan)
+        assert [plan.next().index for _ in range(12)] == [0, 98, 48, 72, 24, 84, 12, 36, 60, 90, 6, 18]
+        self.assertRaises(SequenceFinished, plan.next)
+
+    def test_plan_is_not_ready_before_compiling(self):
+        state_factory = helper.create_state_factory(helper.always_has_binary)
+        plan = EvaluationPlan(BiggestGapBisectionSequence(state_factory, 4))
+        self.assertRaises(SequenceNotReady, plan.next)
+
+    def test_progress(self):
+        state_factory = helper.create_state_factory(helper.always_has_binary)
+        plan = EvaluationPlan(BiggestGapBisectionSequence(state_factory, 4))
+        self.compile(plan)
+        plan.next()
+        progress = plan.get_progress(nb_of_finished_evaluations=1)
+        assert progress['nb_of_planned_states'] == 4
+        assert progress['nb_of_dispatched_states'] == 1
+        assert progress['is_compiled']
+        assert progress['eta'] is not None
+
+    def test_failed_compilation_is_raised(self):
+        state_factory = helper.create_state_factory(helper.always_has_binary)
+        strategy = BiggestGapBisectionSequence(state_factory, 4)
+        strategy.next = lambda: 1 / 0
+        plan = EvaluationPlan(strategy)
+        failed = threading.Event()
+        plan.on_progress = lambda: plan.is_failed() and failed.set()
+        plan.compile()
+        assert failed.wait(timeout=5)
+
+        self.assertRaises(ZeroDivisionError, plan.next)
+        assert not plan.is_compiled()
+        assert plan.get_progress(nb_of_finished_evaluations=0)['is_failed']
+
+    def test_failed_compilation_is_persisted(self):
+        state_factory = helper.create_state_factory(helper.always_has_binary)
+        strategy = BiggestGapBisectionSequence(state_factory, 4)
+        strategy.next = lambda: 1 / 0
+        plan = EvaluationPlan(strategy)
+        failed = threading.Event()
+        plan.on_progress = lambda: failed.set()
+        with patch('bci.search_strategy.plan_compiler.EvaluationPlanStore') as store:
+            plan.compile(run_id='run', experiment_name='experiment')
+            assert failed.wait(timeout=5)
+        store.fail_plan.assert_called_once_with('run', 'experiment', 'division by zero')
+        store.add_states.assert_called_once_with('run', 'experiment', [], False)
@@ -0,0 +1,135 @@
+import random
+import unittest
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+from bci.search_strategy.probabilistic_search import ProbabilisticBisectionSearch
+from bci.search_strategy.sequence_strategy import SequenceFinished
+from bci.version_control.states.state import StateCondition
+from test.sequence.test_sequence_strategy import TestSequenceStrategy as helper
+
+
+@dataclass(frozen=True)
+class EvaluatedState:
+    index: int
+    repetition: int
+    outcome: Optional[bool]
+    condition: StateCondition = StateCondition.COMPLETED
+
+
+class TestProbabilisticBisectionSearch(unittest.TestCase):
+
+    @staticmethod
+    def create_search(parallelism: int, is_available=helper.always_has_binary):
+        """
+        Returns the search strategy and the list of evaluated states, which the test can extend to finish evaluations.
+        """
+        evaluated_states = []
+        state_factory = helper.create_state_factory(is_available)
+        # The high-water mark is simply the number of states that were fetched
+        state_factory.create_new_evaluated_states = lambda inserted_after: (
+            evaluated_states[inserted_after or 0 :],
+            len(evaluated_states),
+        )
+        return ProbabilisticBisectionSearch(state_factory, parallelism), evaluated_states
+
+    @staticmethod
+    def next_batch(sequence: ProbabilisticBisectionSearch) -> list:
+        batch = []
+        while True:
+            try:
+                batch.append(sequence.next())
+            except SequenceFinished:
+                return batch
+
+    def run_search(
+        self, sequence: ProbabilisticBisectionSearch, evaluated_states: list, outcome_func: Callable
+    ) -> list[EvaluatedState]:
+        while batch := self.next_batch(sequence):
+            in_flight = [(state.index, state.repetition) for state in batch]
+            # The same state is never evaluated twice at once
+            assert len({index for index, _ in in_flight}) == len(in_flight)
+            evaluated_states.extend(
+                EvaluatedState(index, repetition, outcome_func(index)) for index, repetition in in_flight
+            )
+        return evaluated_states
+
+    def test_reliable_outcomes(self):
+        sequence, evaluated_states = self.create_search(1)
+        self.run_search(sequence, evaluated_states, lambda x: x < 50)
+
+        first_index, last_index, probability = sequence.get_transition()
+        assert (first_index, last_index) == (49, 50)
+        assert probability >= 0.95
+        # Confirming the transition costs a few repetitions more than plain bisection
+        assert len(evaluated_states) <= 16
+        self.assertRaises(SequenceFinished, sequence.next)
+
+    def test_flaky_outcomes(self):
+        nb_of_evaluations = []
+        nb_of_correct_transitions = 0
+        for seed in range(20):
+            rng = random.Random(seed)
+            sequence, evaluated_states = self.create_search(1)
+            # The PoC only reproduces in 70% of the evaluations before the transition
+            self.run_search(sequence, evaluated_states, lambda x, rng=rng: x < 50 and rng.random() < 0.7)
+            nb_of_evaluations.append(len(evaluated_states))
+            nb_of_correct_transitions += sequence.get_transition()[:2] == (49, 50)
+            # States are only repeated where it is worthwhile, not across the whole search
+            assert any(state.repetition > 0 for state in evaluated_states)
+        assert nb_of_correct_transitions >= 18
+        assert sum(nb_of_evaluations) / len(nb_of_evaluations) <= 30
+
+    def test_parallel_evaluations(self):
+        sequence, evaluated_states = self.create_search(4)
+        assert [state.index for state in self.next_batch(sequence)] == [0, 99]
+        evaluated_states.extend([EvaluatedState(0, 0, True), EvaluatedState(99, 0, False)])
+        batch = self.next_batch(sequence)
+        assert len(batch) == 4
+        # Until some of them are evaluated, no more states are returned
+        self.assertRaises(SequenceFinished, sequence.next)
+        evaluated_states.extend(EvaluatedState(state.index, state.repetition, state.index < 50) for state in batch)
+
+        self.run_search(sequence, evaluated_states, lambda x: x < 50)
+        assert sequence.get_transition()[:2] == (49, 50)
+
+    def test_unavailable_binaries(self):
+        sequence, evaluated_states = self.create_search(1, helper.only_has_binaries_for_even)
+        self.run_search(sequence, evaluated_states, lambda x: x < 35)
+
+        assert sequence.get_transition()[:2] == (34, 36)
+        assert all(state.index % 2 == 0 for state in evaluated_states)
+
+    def test_no_transition(self):
+        sequence, evaluated_states = self.create_search(1)
+        self.run_search(sequence, evaluated_states, lambda x: False)
+
+        # Both boundaries are repeated before concluding that the outcome never changes
+        assert sorted((state.index, state.repetition) for state in evaluated_states) == [
+            (0, 0), (0, 1), (0, 2), (99, 0), (99, 1), (99, 2)
+        ]
+        assert sequence.get_transition() is None
+
+    def test_failed_evaluations_are_repeated(self):
+        sequence, evaluated_states = self.create_search(1)
+        assert sequence.next().index == 0
+        evaluated_states.append(EvaluatedState(0, 0, None, StateCondition.FAILED))
+        assert sequence.next().index == 99
+        evaluated_states.append(EvaluatedState(99, 0, False))
+
+        state = sequence.next()
+        assert (state.index, state.repetition) == (0, 1)
+
+    def test_evaluations_without_result_are_no_longer_in_flight(self):
+        sequence, evaluated_states = self.create_search(1)
+        # The evaluation of the lower boundary is given up on without storing a result
+        lost_state = sequence.next()
+        assert lost_state.index == 0
+        self.assertRaises(SequenceFinished, sequence.next)
+        sequence.on_evaluation_finished(lost_state)
+
+        assert sequence.next().index == 99
+        evaluated_states.append(EvaluatedState(99, 0, False))
+        # The lost evaluation counts as failed, so the lower boundary is evaluated again
+        state = sequence.next()
+        assert (state.index, state.repetition) == (0, 1)
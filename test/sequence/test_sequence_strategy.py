@@ -5,6 +5,7 @@ from unittest.mock import MagicMock
 from bci.evaluations.logic import EvaluationConfiguration, EvaluationRange
 from bci.evaluations.outcome_checker import OutcomeChecker
 from bci.search_strategy.sequence_strategy import SequenceStrategy
+from bci.version_control.binary_availability import AvailabilityBitmap
 from bci.version_control.factory import StateFactory
 from bci.version_control.states.state import State
 
@@ -23,7 +24,8 @@ class TestSequenceStrategy(unittest.TestCase):
     def create_state_factory(
         is_available: Callable,
         evaluated_indexes: list[int] = None,
-        outcome_func: Callable = None) -> StateFactory:
+        outcome_func: Callable = None,
+        with_availability_bitmap: bool = False) -> StateFactory:
         eval_params = MagicMock(spec=EvaluationConfiguration)
         eval_params.evaluation_range = MagicMock(spec=EvaluationRange)
         eval_params.evaluation_range.major_version_range = [0, 99]
@@ -35,11 +37,18 @@ class TestSequenceStrategy(unittest.TestCase):
         first_state = TestSequenceStrategy.create_state(0, is_available, outcome_func)
         last_state = TestSequenceStrategy.create_state(99, is_available, outcome_func)
         factory.boundary_states = (first_state, last_state)
+        if with_availability_bitmap:
+            factory.get_availability = lambda first_index, last_index: AvailabilityBitmap.from_indexes(
+                first_index, last_index, filter(is_available, range(first_index, last_index + 1))
+            )
+        else:
+            factory.get_availability = lambda first_index, last_index: None
 
         if evaluated_indexes:
             factory.create_evaluated_states = lambda: TestSequenceStrategy.get_states(evaluated_indexes, lambda _: True, outcome_func)
         else:
             factory.create_evaluated_states = lambda: []
+        factory.create_new_evaluated_states = lambda inserted_after: (factory.create_evaluated_states(), None)
         return factory
 
     @staticmethod
@@ -103,3 +112,15 @@ class TestSequenceStrategy(unittest.TestCase):
         sequence_strategy = SequenceStrategy(state_factory, 0)
         state = sequence_strategy._find_closest_state_with_available_binary(state_factory.create_state(1), (state_factory.create_state(0), state_factory.create_state(2)))
         assert state is None
+
+    def test_find_closest_state_with_availability_bitmap(self):
+        state_factory = TestSequenceStrategy.create_state_factory(
+            TestSequenceStrategy.has_very_few_binaries, with_availability_bitmap=True
+        )
+        sequence_strategy = SequenceStrategy(state_factory, 0)
+        boundaries = (state_factory.create_state(0), state_factory.create_state(33))
+        assert sequence_strategy._find_closest_state_with_available_binary(state_factory.create_state(16), boundaries).index == 11
+        assert sequence_strategy._find_closest_state_with_available_binary(state_factory.create_state(17), boundaries).index == 22
+        assert sequence_strategy._find_closest_state_with_available_binary(state_factory.create_state(22), boundaries).index == 22
+        boundaries = (state_factory.create_state(11), state_factory.create_state(22))
+        assert sequence_strategy._find_closest_state_with_available_binary(state_factory.create_state(16), boundaries) is None
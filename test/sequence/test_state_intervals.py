@@ -0,0 +1,54 @@
+import unittest
+from dataclasses import dataclass
+
+from bci.search_strategy.state_intervals import StateIntervals
+
+
+@dataclass(frozen=True)
+class FakeState:
+    index: int
+
+
+def create_states(*indexes: int) -> list[FakeState]:
+    return [FakeState(index) for index in indexes]
+
+
+class TestStateIntervals(unittest.TestCase):
+    def test_states_are_kept_sorted(self):
+        intervals = StateIntervals(create_states(50, 0))
+        for state in create_states(99, 25, 75):
+            intervals.add(state)
+        assert [state.index for state in intervals] == [0, 25, 50, 75, 99]
+        assert create_states(75)[0] in intervals
+        assert create_states(74)[0] not in intervals
+        assert [state.index for state in intervals.get_states_between(25, 99)] == [50, 75]
+
+    def test_biggest_gap_is_popped_first(self):
+        intervals = StateIntervals(create_states(0, 10, 40, 100))
+        first_state, last_state = intervals.pop_biggest_gap()
+        assert (first_state.index, last_state.index) == (40, 100)
+        # Splitting a gap replaces it by its halves
+        intervals.add(create_states(30)[0])
+        gaps = []
+        while gap := intervals.pop_biggest_gap():
+            gaps.append((gap[0].index, gap[1].index))
+        assert gaps == [(10, 30), (0, 10), (30, 40)]
+
+    def test_unavailability_gaps(self):
+        states = create_states(0, 10, 20, 30)
+        intervals = StateIntervals(states)
+        intervals.add_unavailability_gap((states[1], states[2]))
+        assert intervals.is_in_unavailability_gap(15)
+        assert intervals.is_in_unavailability_gap(11, 19)
+        assert not intervals.is_in_unavailability_gap(10, 19)
+        assert not intervals.is_in_unavailability_gap(25)
+        intervals.add_unavailability_gap((states[0], states[3]))
+        assert intervals.is_in_unavailability_gap(5, 25)
+        assert not intervals.is_in_unavailability_gap(30)
+        # Gaps strictly within an unavailability gap are skipped
+        intervals.add(create_states(5)[0])
+        intervals.add(create_states(25)[0])
+        gaps = []
+        while gap := intervals.pop_biggest_gap():
+            gaps.append((gap[0].index, gap[1].index))
+        assert gaps == [(0, 5), (25, 30)]
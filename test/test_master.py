@@ -0,0 +1,107 @@
+import time
+import unittest
+from unittest.mock import MagicMock, patch
+
+from bci.distribution.evaluation_run import EvaluationRun
+from bci.master import Master
+
+
+def patch_dependencies(test_case: unittest.TestCase) -> None:
+    """
+    Patches the folders, job queue and clients the master uses, the patches are stopped after the test.
+    """
+    for target in [
+        'bci.master.Global.initialize_folders',
+        'bci.master.Global.get_database_params',
+        'bci.master.RevisionCache',
+        'bci.master.CustomEvaluationFramework',
+        'bci.master.EvaluationQueue',
+        'bci.master.Clients',
+    ]:
+        patch(target).start()
+    test_case.addCleanup(patch.stopall)
+
+
+class TestMasterRetries(unittest.TestCase):
+    def setUp(self):
+        patch_dependencies(self)
+        self.mongodb = patch('bci.master.MongoDB').start().return_value
+        self.mongodb.has_result.return_value = False
+        self.failures = patch('bci.master.EvaluationFailures').start()
+        self.failures.pop_failures.return_value = {}
+
+        self.master = Master()
+        self.master.scheduler = MagicMock()
+        self.eval_params = MagicMock()
+        self.eval_params.evaluation_range.mech_group = 'experiment'
+        self.test_params = self.eval_params.create_test_for.return_value
+        self.master._Master__eval_params_per_experiment['experiment'] = self.eval_params
+        self.params = MagicMock()
+
+    def finish_job(self, success: bool) -> None:
+        self.master._Master__on_job_finished('job', ['experiment'], self.params, success)
+
+    def wait_for_requeues(self, nb_of_requeues: int) -> None:
+        deadline = time.time() + 5
+        while self.master.scheduler.requeue.call_count < nb_of_requeues and time.time() < deadline:
+            time.sleep(0.01)
+        assert self.master.scheduler.requeue.call_count == nb_of_requeues
+
+    @patch.dict('os.environ', {'BCI_MAX_RETRIES': '2', 'BCI_RETRY_BACKOFF': '0.2'})
+    def test_dirty_result_is_removed_and_requeued_after_backoff(self):
+        self.failures.pop_failures.return_value = {'experiment': 'sanity_failure'}
+        self.finish_job(True)
+
+        self.mongodb.remove_dirty_result.assert_called_once_with(self.test_params)
+        # The retried evaluation keeps counting as running until its backoff passed
+        self.master.scheduler.on_evaluation_finished.assert_not_called()
+        self.master.scheduler.requeue.assert_not_called()
+        self.wait_for_requeues(1)
+        self.master.scheduler.requeue.assert_called_with('experiment', self.params.state)
+
+    @patch.dict('os.environ', {'BCI_MAX_RETRIES': '1', 'BCI_RETRY_BACKOFF': '0.01'})
+    def test_state_is_excluded_after_max_retries(self):
+        self.failures.pop_failures.return_value = {'experiment': 'sanity_failure'}
+        self.finish_job(True)
+        self.wait_for_requeues(1)
+        self.failures.exclude.assert_not_called()
+
+        self.finish_job(True)
+        self.failures.exclude.assert_called_once_with(self.test_params, 'sanity_failure', 2)
+        self.master.scheduler.on_evaluation_finished.assert_called_once_with('experiment', self.params.state)
+        self.wait_for_requeues(1)
+
+    @patch.dict('os.environ', {'BCI_MAX_RETRIES': '0'})
+    def test_failed_worker_without_recorded_failure_is_a_browser_crash(self):
+        self.finish_job(False)
+        self.failures.exclude.assert_called_once_with(self.test_params, 'browser_crash', 1)
+
+    @patch.dict('os.environ', {'BCI_MAX_RETRIES': '0'})
+    def test_failed_worker_with_stored_result_is_not_retried(self):
+        self.mongodb.has_result.return_value = True
+        self.finish_job(False)
+        self.failures.exclude.assert_not_called()
+        self.master.scheduler.on_evaluation_finished.assert_called_once_with('experiment', self.params.state)
+
+
+class TestMasterFailures(unittest.TestCase):
+    def setUp(self):
+        patch_dependencies(self)
+        patch('bci.master.MongoDB').start()
+        self.master = Master()
+
+    def test_failed_experiment_fails_its_job(self):
+        eval_params_list = [MagicMock(), MagicMock()]
+        eval_params_list[0].evaluation_range.mech_group = 'a'
+        eval_params_list[1].evaluation_range.mech_group = 'b'
+        run = EvaluationRun('job', eval_params_list, status='running', scheduler=MagicMock())
+        for experiment_name in run.get_eval_params_per_experiment():
+            self.master._Master__runs_per_experiment[experiment_name] = run
+
+        self.master._Master__on_experiment_failed('job/a')
+        assert run.status == 'failed'
+        run.scheduler.cancel.assert_called_once_with('job/b')
+        # Finishing the cancelled experiments does not mark the job as done
+        self.master._Master__on_experiment_finished('job/a')
+        self.master._Master__on_experiment_finished('job/b')
+        assert run.status == 'failed'
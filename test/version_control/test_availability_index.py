@@ -0,0 +1,62 @@
+import os
+import tempfile
+import unittest
+
+from bci.version_control.availability_index import AvailabilityIndex, merge_runs, to_runs
+from bci.version_control.binary_availability import AvailabilityBitmap
+
+
+class TestAvailabilityIndex(unittest.TestCase):
+    def setUp(self) -> None:
+        self.folder = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.folder.name, 'chromium.bin')
+
+    def tearDown(self) -> None:
+        self.folder.cleanup()
+
+    def test_runs(self):
+        assert to_runs([5, 3, 4, 8, 10, 9]) == [(3, 5), (8, 10)]
+        assert merge_runs([(8, 10), (1, 3), (4, 5), (9, 12)]) == [(1, 5), (8, 12)]
+
+    def test_index_is_persisted(self):
+        index = AvailabilityIndex(self.path)
+        assert not index.is_known(100, 200)
+        assert index.is_available(150) is None
+        index.update(100, 200, [100, 101, 102, 150, 200])
+
+        index = AvailabilityIndex(self.path)
+        assert index.is_known(100, 200)
+        assert not index.is_known(99, 200)
+        assert index.is_available(101)
+        assert index.is_available(103) is False
+        assert index.get_available_runs(101, 160) == [(101, 102), (150, 150)]
+
+    def test_update_replaces_range(self):
+        index = AvailabilityIndex(self.path)
+        index.update(0, 100, range(0, 101))
+        index.update(50, 150, [60, 61, 150])
+        assert index.is_known(0, 150)
+        assert index.get_available_runs(0, 150) == [(0, 49), (60, 61), (150, 150)]
+        index.clear()
+        assert not index.is_known(0, 0)
+        assert not os.path.exists(self.path)
+
+    def test_nearest_available(self):
+        index = AvailabilityIndex(self.path)
+        index.update(0, 100, [10, 20, 21, 22, 95])
+        # Strategies look up the nearest available revision in the bitmap that is read from the index
+        bitmap = AvailabilityBitmap.from_runs(0, 100, index.get_available_runs(0, 100))
+        assert bitmap.get_nearest_available(21, 0, 100) == 21
+        assert bitmap.get_nearest_available(14, 0, 100) == 10
+        assert bitmap.get_nearest_available(15, 0, 100) == 10
+        assert bitmap.get_nearest_available(16, 0, 100) == 20
+        assert bitmap.get_nearest_available(60, 22, 100) == 95
+        assert bitmap.get_nearest_available(15, 10, 20) is None
+        assert bitmap.get_nearest_available(50, 0, 95) == 22
+
+    def test_bitmap_from_runs(self):
+        runs = [(3, 5), (8, 30), (40, 40)]
+        bitmap = AvailabilityBitmap.from_runs(0, 45, runs)
+        expected = AvailabilityBitmap.from_indexes(0, 45, [i for start, end in runs for i in range(start, end + 1)])
+        assert all(bitmap.is_available(i) == expected.is_available(i) for i in range(46))
+        assert bitmap.get_nb_of_available() == 27
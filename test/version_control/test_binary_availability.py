@@ -0,0 +1,27 @@
+import unittest
+
+from bci.version_control.binary_availability import AvailabilityBitmap
+
+
+class TestAvailabilityBitmap(unittest.TestCase):
+    def test_availability(self):
+        bitmap = AvailabilityBitmap.from_indexes(100, 200, [99, 100, 150, 200, 201])
+        assert bitmap.get_nb_of_available() == 3
+        assert bitmap.is_available(100)
+        assert bitmap.is_available(200)
+        assert not bitmap.is_available(99)
+        assert not bitmap.is_available(151)
+        assert not bitmap.without([150]).is_available(150)
+        assert bitmap.is_available(150)
+
+    def test_nearest_available(self):
+        bitmap = AvailabilityBitmap.from_indexes(0, 100, [10, 20, 30, 95])
+        assert bitmap.get_nearest_available(20, 0, 100) == 20
+        assert bitmap.get_nearest_available(14, 0, 100) == 10
+        assert bitmap.get_nearest_available(16, 0, 100) == 20
+        # Equally near indexes prefer the lower one
+        assert bitmap.get_nearest_available(15, 0, 100) == 10
+        assert bitmap.get_nearest_available(60, 30, 100) == 95
+        # Boundaries are exclusive
+        assert bitmap.get_nearest_available(15, 10, 20) is None
+        assert bitmap.get_nearest_available(50, 0, 95) == 30
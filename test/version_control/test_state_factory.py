@@ -0,0 +1,51 @@
+import unittest
+from unittest.mock import MagicMock, patch
+
+from bci.version_control.binary_availability import AvailabilityBitmap
+from bci.version_control.factory import StateFactory
+from bci.version_control.states.state import StateCondition
+
+
+class TestStateFactory(unittest.TestCase):
+    def setUp(self):
+        # Revision identifiers are irrelevant for availability
+        patcher = patch('bci.version_control.states.revisions.chromium.ChromiumRevision._fetch_missing_data')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    @staticmethod
+    def create_eval_params() -> MagicMock:
+        eval_params = MagicMock()
+        eval_params.browser_configuration.browser_name = 'chromium'
+        eval_params.evaluation_range.only_release_revisions = False
+        eval_params.evaluation_range.major_version_range = None
+        eval_params.evaluation_range.revision_number_range = (100, 110)
+        return eval_params
+
+    @staticmethod
+    def create_state_factory(excluded_indexes: set[int]) -> StateFactory:
+        eval_params = TestStateFactory.create_eval_params()
+        with patch('bci.version_control.factory.EvaluationFailures.get_excluded_indexes', return_value=excluded_indexes):
+            return StateFactory(eval_params, MagicMock())
+
+    def test_excluded_states_are_unavailable(self):
+        factory = self.create_state_factory({105, 110})
+        assert factory.create_state(105).condition == StateCondition.UNAVAILABLE
+        assert factory.create_state(106).condition == StateCondition.PENDING
+        assert factory.boundary_states[0].condition == StateCondition.PENDING
+        assert factory.boundary_states[1].condition == StateCondition.UNAVAILABLE
+
+    def test_excluded_indexes_are_removed_from_availability(self):
+        factory = self.create_state_factory({105})
+        all_available = AvailabilityBitmap.from_indexes(100, 110, range(100, 111))
+        with patch('bci.version_control.factory.binary_availability.get_availability', return_value=all_available):
+            availability = factory.get_availability(100, 110)
+        assert not availability.is_available(105)
+        assert availability.get_nb_of_available() == 10
+
+    def test_unreachable_exclusions_exclude_nothing(self):
+        with patch(
+            'bci.version_control.factory.EvaluationFailures.get_excluded_indexes', side_effect=Exception('unreachable')
+        ):
+            factory = StateFactory(self.create_eval_params(), MagicMock())
+        assert factory.create_state(105).condition == StateCondition.PENDING